@@ -7,18 +7,29 @@ import time
 import schedule
 from pathlib import Path
 
+import duckdb
+
 from brain_graph.agents.dreamer import DreamerAgent
 from brain_graph.agents.researcher import ResearcherAgent
 from brain_graph.agents.gardener import GardenerAgent
 from brain_graph.agents.reflex import ReflexEngine
 from brain_graph.agents.archivist import ArchivistAgent
+from brain_graph.db.relevance import refresh_relevance
 from brain_graph.utils.file_utils import load_config
 
 
+DEFAULT_DB_PATH = ".brain_graph/brain.duckdb"
+
+
+def db_path(config) -> Path:
+    # Main database the agents work on (config.md: Agents / db_path)
+    return Path(config.get("agents_db_path") or DEFAULT_DB_PATH)
+
+
 def run_dreamer(config):
     print("Running Dreamer...", file=sys.stderr)
     try:
-        agent = DreamerAgent(Path(".brain_graph/brain.duckdb"), config)
+        agent = DreamerAgent(db_path(config), config)
         agent.run()
     except Exception as e:
         print(f"Dreamer failed: {e}", file=sys.stderr)
@@ -36,7 +47,7 @@ def run_researcher(config):
 def run_gardener(config):
     print("Running Gardener...", file=sys.stderr)
     try:
-        agent = GardenerAgent(Path(".brain_graph/brain.duckdb"), config)
+        agent = GardenerAgent(db_path(config), config)
         agent.run()
     except Exception as e:
         print(f"Gardener failed: {e}", file=sys.stderr)
@@ -60,6 +71,20 @@ def run_archivist(config):
         print(f"Archivist failed: {e}", file=sys.stderr)
 
 
+def run_relevance_refresh(config):
+    # Recency decays by days: refresh the materialized relevance used by semantic search
+    print("Refreshing document relevance...", file=sys.stderr)
+    try:
+        con = duckdb.connect(str(db_path(config)))
+        try:
+            stats = refresh_relevance(con)
+        finally:
+            con.close()
+        print(f"Relevance of {stats['documents']} documents refreshed", file=sys.stderr)
+    except Exception as e:
+        print(f"Relevance refresh failed: {e}", file=sys.stderr)
+
+
 def main():
     print("Starting Agent Daemon...", file=sys.stderr)
     config = load_config()
@@ -95,6 +120,9 @@ def main():
         # Default fallback
         schedule.every().day.at("02:00").do(run_archivist, config)
 
+    # Document relevance (search ranking)
+    schedule.every().day.at("01:30").do(run_relevance_refresh, config)
+
     print("Scheduler running. Press Ctrl+C to exit.", file=sys.stderr)
 
     while True:
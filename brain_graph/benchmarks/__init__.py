@@ -0,0 +1,3 @@
+"""Micro-benchmarks for pipeline and search hot paths (`python -m brain_graph.benchmarks.<name>`)."""
+
+__all__ = []
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Matryoshka cascade configurations (db/matryoshka.py).
+
+Runs each cascade ("dim:candidates,...,dim") over the same queries and
+reports mean/p95 latency, the memory the cascade holds (first-level
+prefixes, plus the 256d vectors without a vector store) and
+recall@k against exact search at the largest available dimension (one level,
+every chunk scored with the full vector).
+
+Queries are the embedded queries of `brain_graph/tests/test_queries.json`, or
+stored full vectors sampled from the vector store (no embedding server
+needed) with some noise added.
+
+Usage:
+    python -m brain_graph.benchmarks.cascade --db .brain_graph/brain.duckdb
+    python -m brain_graph.benchmarks.cascade --sample-queries 200 --cascades 64:2000,256:200,1024 128:500,1024
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import numpy as np
+
+from brain_graph.db.index_snapshot import open_search_connection
+from brain_graph.db.matryoshka import MatryoshkaCascade, format_cascade
+from brain_graph.db.vector_store import open_vector_store
+from brain_graph.search.searcher import embed_queries
+from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
+from brain_graph.utils.file_utils import load_config
+
+
+QUERIES = Path(__file__).resolve().parent.parent / "tests" / "test_queries.json"
+DEFAULT_CASCADES = [
+    "256:100,1024",
+    "64:500,1024",
+    "64:1000,256:100,1024",
+    "64:2000,256:200,1024",
+    "128:1000,256:100,1024",
+]
+
+
+def load_queries(con: duckdb.DuckDBPyConnection, args: argparse.Namespace) -> list[list[float]]:
+    """Full-dimension query embeddings: sampled store rows (with noise) or the embedded test queries."""
+    if args.sample_queries:
+        store = open_vector_store(con)
+        if store is None:
+            raise RuntimeError("--sample-queries needs the full-vector store (run `brain db build --output ...`)")
+        rng = np.random.default_rng(7)
+        rows = rng.choice(len(store), size=min(args.sample_queries, len(store)), replace=False)
+        vectors = np.asarray(store.matrix[np.sort(rows)], dtype=np.float32)
+        vectors += rng.normal(scale=args.noise / np.sqrt(store.dim), size=vectors.shape).astype(np.float32)
+        return vectors.tolist()
+    queries = [q["query"] for q in json.loads(QUERIES.read_text(encoding="utf-8"))["queries"]]
+    return embed_queries(queries, load_config(args.config))
+
+
+def bench(
+    cascade: MatryoshkaCascade,
+    queries: list[list[float]],
+    reference: list[set[str]],
+    k: int,
+) -> dict[str, Any]:
+    timings, recalls = [], []
+    for query, expected in zip(queries, reference):
+        start = time.perf_counter()
+        hits = cascade.search(query, k)
+        timings.append(time.perf_counter() - start)
+        recalls.append(len({chunk_id for chunk_id, _ in hits} & expected) / max(len(expected), 1))
+    return {
+        "cascade": format_cascade(cascade.levels),
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "mean_ms": round(float(np.mean(timings)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(timings, 95)) * 1000, 3),
+        "memory_bytes": cascade.nbytes,
+    }
+
+
+def main():
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Benchmark Matryoshka cascade configurations")
+    parser.add_argument("--db", type=Path, default=Path(".brain_graph/brain.duckdb"), help="DuckDB database path")
+    parser.add_argument("--config", type=Path, default=None, help="Config file path (default: auto-detect)")
+    parser.add_argument(
+        "--cascades", nargs="+", default=DEFAULT_CASCADES, help="Cascades to compare (dim:candidates,...,dim)"
+    )
+    parser.add_argument(
+        "--sample-queries", type=int, default=0, help="Use N stored full vectors (plus noise) as queries"
+    )
+    parser.add_argument("--noise", type=float, default=0.5, help="Noise norm added to sampled queries (default: 0.5)")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    args = parser.parse_args()
+
+    try:
+        con, _ = open_search_connection(args.db)
+        queries = load_queries(con, args)
+        k = args.k
+
+        # Reference: one level at the largest available dimension (exact)
+        exact = MatryoshkaCascade.load(con, str(len(queries[0])))
+        reference = [{chunk_id for chunk_id, _ in exact.search(query, k)} for query in queries]
+        print(
+            f"{len(queries)} queries, {len(exact)} chunks, reference {format_cascade(exact.levels)}",
+            file=sys.stderr,
+        )
+
+        rows = [bench(exact, queries, reference, k)]
+        for spec in args.cascades:
+            rows.append(bench(MatryoshkaCascade.load(con, spec), queries, reference, k))
+        for row in rows:
+            print(
+                f"{row['cascade']:>24}: recall {row[f'recall@{k}']:.3f}, "
+                f"mean {row['mean_ms']:.2f} ms, p95 {row['p95_ms']:.2f} ms",
+                file=sys.stderr,
+            )
+
+        emit_json(
+            ok_result("bench_cascade", queries=len(queries), k=k, results=rows, duration_ms=ms_since(start)),
+            pretty=args.pretty,
+        )
+        return 0
+    except Exception as e:
+        emit_json(error_result("bench_cascade", e, duration_ms=ms_since(start)), pretty=args.pretty)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
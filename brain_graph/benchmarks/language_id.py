@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: language identification during chunking.
+
+Compares the previous behavior (langdetect on every text block) with
+`utils.language_id` (one detection per document, long blocks re-checked,
+memoized by content hash) on synthetic notes with many short paragraphs.
+Reports blocks/s for both and the share of blocks where both agree.
+
+Usage:
+    python -m brain_graph.benchmarks.language_id
+    python -m brain_graph.benchmarks.language_id --paragraphs 200 1000 --english-share 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Any
+
+from langdetect import LangDetectException, detect
+
+from brain_graph.pipeline.chunker import parse_markdown
+from brain_graph.utils import language_id
+from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
+
+
+_GERMAN = (
+    "der die das und ist nicht mit für eine auf Graph Suche Notiz wird "
+    "werden über auch nach bei können diese Datei Ergebnis Abfrage"
+).split()
+_ENGLISH = (
+    "the and is not with for a on graph search note will be about also "
+    "after at can these file result query which"
+).split()
+
+
+def make_note(paragraphs: int, *, english_share: float, seed: int = 0) -> str:
+    """
+    Mostly German note split into short sections (each one a text block).
+
+    A share of the paragraphs is English, some are long enough to be re-checked.
+    """
+    rng = random.Random(seed)
+    parts = ["# Notiz", ""]
+    for i in range(paragraphs):
+        if rng.random() < 0.5:
+            parts += [f"## Abschnitt {i + 1}", ""]
+        words = _ENGLISH if rng.random() < english_share else _GERMAN
+        length = rng.randint(40, 80) if rng.random() < 0.2 else rng.randint(4, 20)
+        parts.append(" ".join(rng.choice(words) for _ in range(length)) + ".")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def baseline_language(text: str, default: str) -> str:
+    """Previous chunker behavior: langdetect per block, first 500 chars."""
+    if not text or len(text) < 20:
+        return default
+    try:
+        return detect(text[:500])
+    except LangDetectException:
+        return default
+
+
+def bench(paragraphs: int, english_share: float, default: str) -> dict[str, Any]:
+    texts = [
+        b.content
+        for b in parse_markdown(make_note(paragraphs, english_share=english_share))
+        if b.type == "text"
+    ]
+
+    baseline_language("Profile laden, damit sie nicht mitgemessen werden.", default)
+    start = time.perf_counter()
+    baseline = [baseline_language(t, default) for t in texts]
+    baseline_s = time.perf_counter() - start
+
+    language_id.clear_memo()
+    start = time.perf_counter()
+    doc_lang = language_id.detect_document_language(texts, default)
+    cached = [language_id.block_language(t, doc_lang) for t in texts]
+    cold_s = time.perf_counter() - start
+
+    # Re-chunking the same note: all detections come from the memo
+    start = time.perf_counter()
+    doc_lang = language_id.detect_document_language(texts, default)
+    [language_id.block_language(t, doc_lang) for t in texts]
+    warm_s = time.perf_counter() - start
+
+    agree = sum(1 for a, b in zip(baseline, cached) if a == b)
+    return {
+        "paragraphs": paragraphs,
+        "blocks": len(texts),
+        "document_language": doc_lang,
+        "baseline_blocks_per_s": round(len(texts) / baseline_s, 1),
+        "cold_blocks_per_s": round(len(texts) / cold_s, 1),
+        "warm_blocks_per_s": round(len(texts) / warm_s, 1) if warm_s else None,
+        "speedup_cold": round(baseline_s / cold_s, 2),
+        "agreement": round(agree / len(texts), 3) if texts else None,
+    }
+
+
+def main():
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Benchmark language identification for chunking")
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        nargs="+",
+        default=[100, 500, 2000],
+        help="Paragraphs per note (default: 100 500 2000)",
+    )
+    parser.add_argument(
+        "--english-share",
+        type=float,
+        default=0.1,
+        help="Share of English paragraphs (default: 0.1)",
+    )
+    parser.add_argument("--default", default="de", help="Default language (default: de)")
+    parser.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    args = parser.parse_args()
+
+    try:
+        rows = []
+        for paragraphs in args.paragraphs:
+            row = bench(paragraphs, args.english_share, args.default)
+            print(
+                f"{paragraphs:>6} paragraphs: baseline {row['baseline_blocks_per_s']:>9.1f} blocks/s, "
+                f"cached {row['cold_blocks_per_s']:>9.1f} blocks/s (x{row['speedup_cold']}), "
+                f"agreement {row['agreement']:.1%}",
+                file=sys.stderr,
+            )
+            rows.append(row)
+        emit_json(
+            ok_result("bench_language_id", results=rows, duration_ms=ms_since(start)),
+            pretty=args.pretty,
+        )
+        return 0
+    except Exception as e:
+        emit_json(error_result("bench_language_id", e, duration_ms=ms_since(start)), pretty=args.pretty)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
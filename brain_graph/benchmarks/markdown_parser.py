@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunker.parse_markdown() on large chat exports.
+
+Generates synthetic notes in the format of `chat_converter.py` (title,
+`**Role**:` turns, repeated `##` headings, fenced code, `---` separators) at
+increasing sizes and reports parse time per MB. A linear parser keeps
+`ms_per_mb` roughly flat as notes grow.
+
+Usage:
+    python -m brain_graph.benchmarks.markdown_parser
+    python -m brain_graph.benchmarks.markdown_parser --sizes-kb 256 1024 8192 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Any
+
+from brain_graph.pipeline.chunker import parse_markdown
+from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
+
+
+_WORDS = (
+    "Graph Vektor Suche Datei Notiz Modell Embedding Index Abfrage Kontext "
+    "Übersicht Beispiel Antwort Frage Schritt Ergebnis pipeline chunk token"
+).split()
+
+
+def make_chat_export(size_bytes: int, *, seed: int = 0) -> str:
+    """Synthetic chat export of roughly `size_bytes` UTF-8 bytes."""
+    rng = random.Random(seed)
+    parts = ["# Chat Export", "", "+type:chat", "+status:active", ""]
+    size = sum(len(p) + 1 for p in parts)
+    turn = 0
+    while size < size_bytes:
+        role = "User" if turn % 2 == 0 else "Assistant"
+        lines = [f"**{role}**:"]
+        if role == "Assistant":
+            # Chat answers repeat the same headings over and over
+            lines += [f"## Schritt {turn % 5 + 1}", ""]
+        for _ in range(rng.randint(1, 4)):
+            lines.append(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(12, 40))) + ".")
+            lines.append("")
+        if rng.random() < 0.3:
+            lines += ["```python", "def f(x):", "    # kein Heading", "    return x * 2", "```", ""]
+        lines += ["---", ""]
+        parts.extend(lines)
+        size += sum(len(line.encode("utf-8")) + 1 for line in lines)
+        turn += 1
+    return "\n".join(parts)
+
+
+def bench(size_kb: int, repeat: int) -> dict[str, Any]:
+    text = make_chat_export(size_kb * 1024)
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    timings = []
+    blocks = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        blocks = parse_markdown(text)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "size_kb": size_kb,
+        "blocks": len(blocks),
+        "best_ms": round(best * 1000, 2),
+        "ms_per_mb": round(best * 1000 / size_mb, 2),
+    }
+
+
+def main():
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Benchmark the markdown block parser")
+    parser.add_argument(
+        "--sizes-kb",
+        type=int,
+        nargs="+",
+        default=[64, 256, 1024, 4096],
+        help="Note sizes in KB (default: 64 256 1024 4096)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best is reported)")
+    parser.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    args = parser.parse_args()
+
+    try:
+        rows = []
+        for size_kb in args.sizes_kb:
+            row = bench(size_kb, args.repeat)
+            print(
+                f"{size_kb:>6} KB: {row['blocks']:>7} blocks, {row['best_ms']:>9.2f} ms "
+                f"({row['ms_per_mb']:.2f} ms/MB)",
+                file=sys.stderr,
+            )
+            rows.append(row)
+        # Linear parsing: ms/MB of the largest note stays close to the smallest
+        scaling = round(rows[-1]["ms_per_mb"] / rows[0]["ms_per_mb"], 2) if rows[0]["ms_per_mb"] else None
+        emit_json(
+            ok_result(
+                "bench_markdown_parser",
+                results=rows,
+                scaling=scaling,
+                duration_ms=ms_since(start),
+            ),
+            pretty=args.pretty,
+        )
+        return 0
+    except Exception as e:
+        emit_json(error_result("bench_markdown_parser", e, duration_ms=ms_since(start)), pretty=args.pretty)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark: quantized first stage of semantic search (db/quantized_index.py).
+
+Embeds the queries of `brain_graph/tests/test_queries.json` (or samples stored
+chunk embeddings as queries, which needs no embedding server) and compares,
+per query, the top-k chunks of
+
+- exact float search (brute force over the normalized 256d vectors),
+- the current path (HNSW scan of `chunk_embeddings_256d`; an exact scan
+  where the vss extension is not loaded),
+- sign bits only (Hamming distance), int8 codes only, and Hamming + int8
+  candidates re-scored with the float vectors at several re-score depths.
+
+Reports recall@k against exact search and against the current path,
+per-query latency (mean, p50, p95), the memory per row of each representation
+and the resident set size of the process (what the search daemon would hold)
+after loading each first stage: the quantized index is loaded and queried
+before the HNSW index is touched, the exact reference is computed last.
+
+Usage:
+    python -m brain_graph.benchmarks.quantization --db .brain_graph/brain.duckdb
+    python -m brain_graph.benchmarks.quantization --sample-queries 200 --rescore 64 256 1024
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import duckdb
+import numpy as np
+
+from brain_graph.db.index_snapshot import open_search_connection
+from brain_graph.db.quantized_index import QuantizedIndex
+from brain_graph.search.searcher import ChunkMatrix, embed_queries
+from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
+from brain_graph.utils.file_utils import load_config
+
+
+QUERIES = Path(__file__).resolve().parent.parent / "tests" / "test_queries.json"
+
+
+def load_queries(con: duckdb.DuckDBPyConnection, args: argparse.Namespace) -> list[list[float]]:
+    """Query embeddings: sampled chunk embeddings or the embedded test queries."""
+    if args.sample_queries:
+        rows = con.execute(
+            f"SELECT embedding FROM chunk_embeddings_256d USING SAMPLE {int(args.sample_queries)} ROWS (reservoir, 7)"
+        ).fetchall()
+        return [list(row[0]) for row in rows]
+    queries = [q["query"] for q in json.loads(QUERIES.read_text(encoding="utf-8"))["queries"]]
+    return [embedding[:256] for embedding in embed_queries(queries, load_config(args.config))]
+
+
+def hnsw_top(con: duckdb.DuckDBPyConnection, query: list[float], k: int) -> list[str]:
+    rows = con.execute(
+        f"""
+        SELECT chunk_id
+        FROM chunk_embeddings_256d
+        ORDER BY array_cosine_distance(embedding, ?::FLOAT[256]) ASC
+        LIMIT {int(k)}
+        """,
+        [query],
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run(
+    search: Callable[[list[float]], list[str]], queries: list[list[float]], k: int
+) -> tuple[list[set[str]], list[float]]:
+    """(top-k ids, seconds) per query."""
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        ids = set(search(query)[:k])
+        timings.append(time.perf_counter() - start)
+        results.append(ids)
+    return results, timings
+
+
+def summarize(
+    name: str,
+    results: list[set[str]],
+    timings: list[float],
+    exact: list[set[str]],
+    current: list[set[str]],
+    k: int,
+) -> dict[str, Any]:
+    vs_exact = [len(ids & expected) / max(len(expected), 1) for ids, expected in zip(results, exact)]
+    vs_current = [len(ids & expected) / max(len(expected), 1) for ids, expected in zip(results, current)]
+    return {
+        "method": name,
+        f"recall@{k}_vs_exact": round(float(np.mean(vs_exact)), 4),
+        f"recall@{k}_vs_current": round(float(np.mean(vs_current)), 4),
+        "mean_ms": round(float(np.mean(timings)) * 1000, 3),
+        "p50_ms": round(float(np.percentile(timings, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(timings, 95)) * 1000, 3),
+    }
+
+
+def main():
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Benchmark the quantized vector search first stage")
+    parser.add_argument("--db", type=Path, default=Path(".brain_graph/brain.duckdb"), help="DuckDB database path")
+    parser.add_argument("--config", type=Path, default=None, help="Config file path (default: auto-detect)")
+    parser.add_argument(
+        "--sample-queries", type=int, default=0, help="Use N stored chunk embeddings as queries (offline)"
+    )
+    parser.add_argument("--k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument(
+        "--rescore", type=int, nargs="+", default=[64, 128, 256, 512], help="Re-score depths (default: 64 128 256 512)"
+    )
+    parser.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    args = parser.parse_args()
+
+    try:
+        con, _ = open_search_connection(args.db)
+        queries = load_queries(con, args)
+        k = args.k
+        rss = {"opened": rss_bytes()}
+
+        # Quantized first stage, before the HNSW index is loaded
+        index = QuantizedIndex.load(con, "chunk")
+        if index is None:
+            raise RuntimeError("Quantized embeddings not built (run `brain db build`)")
+        print(f"{len(queries)} queries, {len(index)} chunks", file=sys.stderr)
+        methods: list[tuple[str, Callable[[list[float]], list[str]]]] = [
+            ("bits", lambda q: [index.ids[i] for i in np.argsort(index.hamming_distances(q), kind="stable")[:k]]),
+            ("int8", lambda q: [row_id for row_id, _ in index.candidates(q, k, hamming_overfetch=len(index))]),
+        ]
+        for depth in args.rescore:
+            methods.append(
+                (
+                    f"rescore_{depth}",
+                    lambda q, depth=depth: [row_id for row_id, _ in index.search(q, k, rescore=depth)],
+                )
+            )
+        runs = {name: run(search, queries, k) for name, search in methods}
+        rss["quantized"] = rss_bytes()
+
+        # Current path: HNSW scan
+        runs["current"] = run(lambda q: hnsw_top(con, q, k), queries, k)
+        rss["hnsw"] = rss_bytes()
+
+        matrix = ChunkMatrix.load(con)
+        exact = [{matrix.ids[i] for i, _ in hits} for hits in matrix.top_k(np.array(queries), k)]
+        current = runs["current"][0]
+
+        rows = []
+        for name in ["current", *(name for name, _ in methods)]:
+            row = summarize(name, *runs[name], exact, current, k)
+            print(
+                f"{name:>14}: recall vs exact {row[f'recall@{k}_vs_exact']:.3f}, "
+                f"vs current {row[f'recall@{k}_vs_current']:.3f}, "
+                f"p50 {row['p50_ms']:.2f} ms, p95 {row['p95_ms']:.2f} ms",
+                file=sys.stderr,
+            )
+            rows.append(row)
+        print(
+            f"RSS: opened {rss['opened'] / 2**20:.1f} MB, "
+            f"+quantized {(rss['quantized'] - rss['opened']) / 2**20:.1f} MB, "
+            f"+hnsw {(rss['hnsw'] - rss['quantized']) / 2**20:.1f} MB",
+            file=sys.stderr,
+        )
+
+        memory = {
+            "rows": len(index),
+            "float32_bytes_per_row": index.dim * 4,
+            "int8_bytes_per_row": index.codes.shape[1],
+            "bits_bytes_per_row": index.bits.shape[1],
+            "quantized_index_bytes": index.nbytes,
+            "rescore_source": "vector_store" if index.store is not None else "float16",
+            "rescore_bytes": index.rescore_nbytes,
+            "rss_bytes": rss,
+            "quantized_rss_delta_bytes": rss["quantized"] - rss["opened"],
+            "hnsw_rss_delta_bytes": rss["hnsw"] - rss["quantized"],
+        }
+        emit_json(
+            ok_result(
+                "bench_quantization",
+                queries=len(queries),
+                k=k,
+                memory=memory,
+                results=rows,
+                duration_ms=ms_since(start),
+            ),
+            pretty=args.pretty,
+        )
+        return 0
+    except Exception as e:
+        emit_json(error_result("bench_quantization", e, duration_ms=ms_since(start)), pretty=args.pretty)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sentence segmentation (`RuleSegmenter` vs. pysbd).
+
+Segments the German and English test fixtures (repeated to a given size) with
+both segmenters and reports sentences/s and the share of pysbd sentence spans
+the rule-based segmenter reproduces exactly.
+
+Usage:
+    python -m brain_graph.benchmarks.segmenter
+    python -m brain_graph.benchmarks.segmenter --size-kb 512 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from brain_graph.pipeline.segmenter import SEGMENTER_KINDS, get_segmenter
+from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+
+def load_text(lang: str, size_kb: int) -> str:
+    """Fixture text of `lang`, repeated to roughly `size_kb` KB."""
+    base = (FIXTURES / f"sentences_{lang}.md").read_text(encoding="utf-8").strip() + "\n"
+    return base * max(1, size_kb * 1024 // len(base.encode("utf-8")))
+
+
+def bench(lang: str, size_kb: int, repeat: int) -> dict[str, Any]:
+    text = load_text(lang, size_kb)
+    row: dict[str, Any] = {"lang": lang, "size_kb": size_kb}
+    spans: dict[str, list[tuple[int, int]]] = {}
+    for kind in SEGMENTER_KINDS:
+        segmenter = get_segmenter(lang, kind)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            spans[kind] = segmenter.spans(text)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        row[kind] = {
+            "sentences": len(spans[kind]),
+            "best_ms": round(best * 1000, 2),
+            "sentences_per_s": round(len(spans[kind]) / best, 1) if best else None,
+        }
+    reference = spans["pysbd"]
+    row["agreement"] = round(len(set(spans["rule"]) & set(reference)) / len(reference), 3) if reference else None
+    row["speedup"] = round(row["pysbd"]["best_ms"] / row["rule"]["best_ms"], 1) if row["rule"]["best_ms"] else None
+    return row
+
+
+def main():
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Benchmark sentence segmenters")
+    parser.add_argument("--langs", nargs="+", default=["de", "en"], help="Languages (default: de en)")
+    parser.add_argument("--size-kb", type=int, default=128, help="Text size per language in KB (default: 128)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per segmenter (best is reported)")
+    parser.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    args = parser.parse_args()
+
+    try:
+        rows = []
+        for lang in args.langs:
+            row = bench(lang, args.size_kb, args.repeat)
+            print(
+                f"{lang}: rule {row['rule']['best_ms']:>9.2f} ms, pysbd {row['pysbd']['best_ms']:>9.2f} ms "
+                f"(x{row['speedup']}), agreement {row['agreement']:.1%}",
+                file=sys.stderr,
+            )
+            rows.append(row)
+        emit_json(
+            ok_result("bench_segmenter", results=rows, duration_ms=ms_since(start)),
+            pretty=args.pretty,
+        )
+        return 0
+    except Exception as e:
+        emit_json(error_result("bench_segmenter", e, duration_ms=ms_since(start)), pretty=args.pretty)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
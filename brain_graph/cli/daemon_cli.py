@@ -30,6 +30,14 @@ def cmd_daemon_start(args: argparse.Namespace) -> int:
         cmd.extend(["--db", args.db])
     if args.config:
         cmd.extend(["--config", args.config])
+    if args.workers:
+        cmd.extend(["--workers", str(args.workers)])
+    if args.queue_depth is not None:
+        cmd.extend(["--queue-depth", str(args.queue_depth)])
+    if args.timeout is not None:
+        cmd.extend(["--timeout", str(args.timeout)])
+    if args.first_stage:
+        cmd.extend(["--first-stage", args.first_stage])
 
     if args.background:
         # Run in background
@@ -129,6 +137,22 @@ def setup_daemon_parser(subparsers) -> None:
         "--db", help="DuckDB database path (default: .brain_graph/brain.duckdb)"
     )
     start_parser.add_argument("--config", help="Config file path")
+    start_parser.add_argument(
+        "--workers", type=int, help="Worker threads (default: 8)"
+    )
+    start_parser.add_argument(
+        "--queue-depth",
+        type=int,
+        help="Requests allowed to wait before the daemon answers 503 (default: 32)",
+    )
+    start_parser.add_argument(
+        "--timeout", type=float, help="Per-request search timeout in seconds (default: 10)"
+    )
+    start_parser.add_argument(
+        "--first-stage",
+        choices=["hnsw", "quantized", "cascade"],
+        help="Candidate source of semantic search (default: hnsw)",
+    )
     start_parser.add_argument(
         "-b",
         "--background",
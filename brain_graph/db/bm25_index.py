@@ -0,0 +1,267 @@
+"""
+Top-k BM25 engine on block-max posting lists.
+
+`fts_main_nodes.match_bm25(id, q)` is a scalar macro: `WHERE match_bm25(...) IS
+NOT NULL ORDER BY ... LIMIT` evaluates it for every row of `nodes`. After the
+FTS index is built, `BrainGraphDB.build_indexes()` turns its tables (same
+German stemming, stopwords and tokenization) into impact-ordered postings:
+
+- `bm25_terms(term, term_id, df, max_impact)`: ART index on `term`
+- `bm25_blocks(term_id, block, first_doc, last_doc, max_impact, doc_gaps, impacts)`:
+  postings in blocks of `BLOCK_SIZE` docs; doc ids are delta-coded (small
+  gaps bit-pack well), `impacts` are the precomputed BM25 term scores;
+  ART index on `term_id`
+- `bm25_docs(doc_id, node_id)`: ART index on `doc_id`
+
+`bm25_topk()` runs MaxScore term-at-a-time: terms are processed by decreasing
+upper bound; once the bounds of the remaining terms cannot lift an unseen doc
+above the current k-th score, only blocks that contain a surviving candidate
+(and whose block max can still lift it) are read. Scores equal `match_bm25`
+(k1=1.2, b=0.75, log10 idf) up to float32 rounding of the impacts, so the cost
+depends on the postings of the query terms, not on the corpus size.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import duckdb
+import numpy as np
+
+from brain_graph.db.index_snapshot import FTS_SCHEMA, build_lookup_indexes, table_exists
+
+
+TERMS_TABLE = "bm25_terms"
+BLOCKS_TABLE = "bm25_blocks"
+DOCS_TABLE = "bm25_docs"
+BM25_TABLES = (TERMS_TABLE, BLOCKS_TABLE, DOCS_TABLE)
+
+# Must match create_fts_index (db_builder.py, index_snapshot.build_fts_index)
+STEMMER = "german"
+K1 = 1.2
+B = 0.75
+BLOCK_SIZE = 128
+
+
+def build_bm25_index(con: duckdb.DuckDBPyConnection) -> dict[str, Any]:
+    """(Re)build the BM25 postings from the FTS index tables of `nodes`."""
+    start = time.perf_counter()
+    con.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE _bm25_postings AS
+        WITH
+        tf AS (
+            SELECT termid, docid, COUNT(*) AS tf
+            FROM {FTS_SCHEMA}.terms
+            GROUP BY termid, docid
+        ),
+        scored AS (
+            SELECT
+                tf.termid::INTEGER AS term_id,
+                tf.docid::INTEGER AS doc_id,
+                -- Same subscore as match_bm25
+                (
+                    log((s.num_docs - d.df + 0.5) / (d.df + 0.5) + 1)
+                    * (tf.tf * ({K1} + 1) / (tf.tf + {K1} * (1 - {B} + {B} * (docs.len / s.avgdl))))
+                )::FLOAT AS impact
+            FROM tf
+            JOIN {FTS_SCHEMA}.dict d ON d.termid = tf.termid
+            JOIN {FTS_SCHEMA}.docs docs ON docs.docid = tf.docid,
+            {FTS_SCHEMA}.stats s
+        )
+        SELECT
+            term_id,
+            doc_id,
+            impact,
+            ((row_number() OVER (PARTITION BY term_id ORDER BY doc_id) - 1) // {BLOCK_SIZE})::INTEGER AS block
+        FROM scored
+        """
+    )
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {BLOCKS_TABLE} AS
+        SELECT
+            term_id,
+            block,
+            MIN(doc_id) AS first_doc,
+            MAX(doc_id) AS last_doc,
+            MAX(impact) AS max_impact,
+            list(gap ORDER BY doc_id) AS doc_gaps,
+            list(impact ORDER BY doc_id) AS impacts
+        FROM (
+            SELECT
+                term_id,
+                block,
+                doc_id,
+                impact,
+                doc_id - COALESCE(lag(doc_id) OVER (PARTITION BY term_id, block ORDER BY doc_id), doc_id)
+                    AS gap
+            FROM _bm25_postings
+        )
+        GROUP BY term_id, block
+        ORDER BY term_id, block
+        """
+    )
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {TERMS_TABLE} AS
+        SELECT d.term::VARCHAR AS term, b.term_id, d.df::INTEGER AS df, b.max_impact
+        FROM (SELECT term_id, MAX(max_impact) AS max_impact FROM {BLOCKS_TABLE} GROUP BY term_id) b
+        JOIN {FTS_SCHEMA}.dict d ON d.termid = b.term_id
+        ORDER BY term
+        """
+    )
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {DOCS_TABLE} AS
+        SELECT docid::INTEGER AS doc_id, name::VARCHAR AS node_id
+        FROM {FTS_SCHEMA}.docs
+        WHERE docid IN (SELECT DISTINCT doc_id FROM _bm25_postings)
+        ORDER BY doc_id
+        """
+    )
+    con.execute("DROP TABLE _bm25_postings")
+
+    build_lookup_indexes(con)
+    terms, blocks, postings = con.execute(
+        f"""
+        SELECT
+            (SELECT COUNT(*) FROM {TERMS_TABLE}),
+            COUNT(*),
+            COALESCE(SUM(len(doc_gaps)), 0)
+        FROM {BLOCKS_TABLE}
+        """
+    ).fetchone()
+    return {
+        "terms": terms,
+        "blocks": blocks,
+        "postings": int(postings),
+        "duration_ms": round((time.perf_counter() - start) * 1000),
+    }
+
+
+def bm25_index_available(con: duckdb.DuckDBPyConnection) -> bool:
+    """True if all BM25 engine tables exist."""
+    return all(table_exists(con, table) for table in BM25_TABLES)
+
+
+def query_terms(con: duckdb.DuckDBPyConnection, query: str) -> list[str]:
+    """Distinct stemmed query terms, tokenized exactly like `match_bm25` does."""
+    rows = con.execute(
+        f"SELECT DISTINCT stem(UNNEST({FTS_SCHEMA}.tokenize(?)), '{STEMMER}') AS t",
+        [query],
+    ).fetchall()
+    return [row[0] for row in rows if row[0]]
+
+
+def _read_blocks(
+    con: duckdb.DuckDBPyConnection, term_id: int, blocks: list[int] | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Decoded (doc ids, impacts) of a term's blocks (all blocks if `blocks` is None)."""
+    sql = f"SELECT first_doc, doc_gaps, impacts FROM {BLOCKS_TABLE} WHERE term_id = ?"
+    params: list[int] = [term_id]
+    if blocks is not None:
+        sql += f" AND block IN ({', '.join('?' * len(blocks))})"
+        params += blocks
+    table = con.execute(sql, params).to_arrow_table()
+    if table.num_rows == 0:
+        return np.empty(0, np.int64), np.empty(0, np.float64)
+
+    gaps_col = table.column("doc_gaps").combine_chunks()
+    offsets = gaps_col.offsets.to_numpy()
+    lengths = np.diff(offsets)
+    gaps = gaps_col.flatten().to_numpy(zero_copy_only=False).astype(np.int64)
+    impacts = table.column("impacts").combine_chunks().flatten().to_numpy(zero_copy_only=False)
+
+    # Per block: first_doc + running sum of the gaps (the first gap is 0)
+    running = np.cumsum(gaps)
+    first_docs = table.column("first_doc").to_numpy().astype(np.int64)
+    block_base = first_docs - (running[offsets[:-1]] - gaps[offsets[:-1]])
+    docs = running + np.repeat(block_base, lengths)
+    return docs, impacts.astype(np.float64)
+
+
+def _kth_score(scores: np.ndarray, k: int) -> float:
+    """k-th highest score (0 while there are fewer than k candidates)."""
+    if len(scores) < k:
+        return 0.0
+    return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+
+def bm25_topk_terms(
+    con: duckdb.DuckDBPyConnection, terms: list[str], k: int, stats: dict[str, Any] | None = None
+) -> list[tuple[str, float]]:
+    """Top-k (node_id, score) for already stemmed terms, best first."""
+    if not terms or k <= 0:
+        return []
+    placeholders = ", ".join("?" * len(terms))
+    term_rows = con.execute(
+        f"SELECT term_id, max_impact FROM {TERMS_TABLE} WHERE term IN ({placeholders})", terms
+    ).fetchall()
+    if not term_rows:
+        return []
+    # Terms by decreasing upper bound; rest[i] = bound of all terms after i
+    term_rows.sort(key=lambda row: -row[1])
+    bounds = np.array([row[1] for row in term_rows], dtype=np.float64)
+    rest = np.concatenate([np.cumsum(bounds[::-1])[::-1][1:], [0.0]])
+
+    docs = np.empty(0, np.int64)
+    scores = np.empty(0, np.float64)
+    read_postings = 0
+    for i, (term_id, bound) in enumerate(term_rows):
+        theta = _kth_score(scores, k)
+        if theta == 0.0 or bound + rest[i] >= theta:
+            # Essential term: an unseen doc could still reach the top-k
+            term_docs, term_impacts = _read_blocks(con, term_id)
+            read_postings += len(term_docs)
+            merged_docs, inverse = np.unique(np.concatenate([docs, term_docs]), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate([scores, term_impacts]))
+            docs = merged_docs
+            continue
+
+        # Non-essential: only candidates that can still reach theta, only blocks that can lift them
+        keep = scores + bound + rest[i] >= theta
+        docs, scores = docs[keep], scores[keep]
+        meta = con.execute(
+            f"SELECT block, first_doc, last_doc, max_impact FROM {BLOCKS_TABLE} WHERE term_id = ?",
+            [term_id],
+        ).fetchnumpy()
+        lo = np.searchsorted(docs, meta["first_doc"], side="left")
+        hi = np.searchsorted(docs, meta["last_doc"], side="right")
+        best = np.array(
+            [scores[a:b].max() if b > a else -np.inf for a, b in zip(lo, hi)], dtype=np.float64
+        )
+        needed = best + meta["max_impact"].astype(np.float64) + rest[i] >= theta
+        if needed.any():
+            term_docs, term_impacts = _read_blocks(con, term_id, meta["block"][needed].tolist())
+            read_postings += len(term_docs)
+            pos = np.searchsorted(term_docs, docs)
+            pos = np.minimum(pos, len(term_docs) - 1)
+            hit = term_docs[pos] == docs
+            scores[hit] += term_impacts[pos[hit]]
+        # Candidates in skipped blocks missed this term's impact; they stay below theta
+        keep = scores + rest[i] >= theta
+        docs, scores = docs[keep], scores[keep]
+
+    if stats is not None:
+        stats.update(terms=len(term_rows), postings_read=read_postings, candidates=len(docs))
+    if not len(docs):
+        return []
+    k = min(k, len(docs))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.lexsort((docs[top], -scores[top]))]
+    top_docs = docs[top].tolist()
+    placeholders = ", ".join("?" * len(top_docs))
+    names = dict(
+        con.execute(
+            f"SELECT doc_id, node_id FROM {DOCS_TABLE} WHERE doc_id IN ({placeholders})", top_docs
+        ).fetchall()
+    )
+    return [(names[doc], float(score)) for doc, score in zip(top_docs, scores[top])]
+
+
+def bm25_topk(
+    con: duckdb.DuckDBPyConnection, query: str, k: int, stats: dict[str, Any] | None = None
+) -> list[tuple[str, float]]:
+    """Top-k (node_id, BM25 score) for a query, best first (same ranking as match_bm25)."""
+    return bm25_topk_terms(con, query_terms(con, query), k, stats)
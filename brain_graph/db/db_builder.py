@@ -6,7 +6,7 @@ Creates an in-memory database with:
 - Vector similarity search (VSS) with Matryoshka embeddings (256d)
 - Full-text search (FTS/BM25)
 - Property graph queries (DuckPGQ)
-- Reference to full 1024d vectors in Parquet for re-ranking
+- Full 1024d vectors consolidated into a memory-mapped store for re-ranking
 
 Usage:
     brain db build --output .brain_graph/brain.duckdb
@@ -18,13 +18,24 @@ Inputs (default):
 """
 
 import argparse
+import hashlib
 import sys
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 import duckdb
 
+from brain_graph.db.bm25_index import BM25_TABLES, build_bm25_index
+from brain_graph.db.index_snapshot import connect, snapshot_path_for, write_snapshot
+from brain_graph.db.matryoshka import DEFAULT_CASCADE, format_cascade, parse_cascade, record_cascade
+from brain_graph.db.quantized_index import build_quantized_embeddings
+from brain_graph.db.relevance import refresh_relevance
+from brain_graph.db.trigram_index import TRIGRAM_TABLES, build_trigram_index, trigram_index_available
+from brain_graph.db.trigram_index import add_nodes as add_trigram_nodes
+from brain_graph.db.trigram_index import remove_nodes as remove_trigram_nodes
+from brain_graph.db.typo_index import build_typo_index
+from brain_graph.db.vector_store import build_vector_store, vector_store_path_for
 from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
 
 
@@ -43,23 +54,63 @@ def _find_duckpgq_extension() -> Path:
     return REPO_ROOT / "lib" / "duckpgq" / "duckpgq.duckdb_extension"
 
 
+TAXONOMY_NODES_PATH = Path(".brain_graph/config/taxonomy.md.nodes.json")
+TAXONOMY_EDGES_PATH = Path(".brain_graph/config/taxonomy.md.edges.json")
+TAXONOMY_PARQUET_PATH = Path(".brain_graph/config/taxonomy.md.parquet")
+
+
 def _sql_quote(value: str) -> str:
     """Escape a string for use as a single-quoted SQL literal."""
     return value.replace("'", "''")
 
 
+def _sql_list(values: list[str]) -> str:
+    """Render strings as a DuckDB list literal (e.g. for read_json_auto([...]))."""
+    return "[" + ", ".join(f"'{_sql_quote(v)}'" for v in values) + "]"
+
+
+def _file_sha256(path: str | Path) -> str:
+    """sha256 of a file's bytes (hex)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ManifestEntry(NamedTuple):
+    """One `import_manifest` row: stats of an imported file (Document JSON or taxonomy)."""
+
+    kind: str
+    file_base: str | None = None
+    doc_id: str | None = None
+    source_file: str | None = None
+    document_sha256: str | None = None
+    mtime_ns: int | None = None
+    size: int | None = None
+    embedding_path: str | None = None
+    embedding_mtime_ns: int | None = None
+    code_embedding_path: str | None = None
+    code_embedding_mtime_ns: int | None = None
+
+    def same_embeddings(self, other: "ManifestEntry") -> bool:
+        """True if the embedding parquets have the same paths and mtimes."""
+        return self[7:] == other[7:]
+
+    def same_files(self, other: "ManifestEntry") -> bool:
+        """True if the file (and its parquets) have the same stats as in `other`."""
+        return (self.mtime_ns, self.size) == (other.mtime_ns, other.size) and self.same_embeddings(
+            other
+        )
+
+
 class BrainGraphDB:
     """Builds and manages the brain-graph DuckDB database."""
 
     def __init__(self, db_path: str = ":memory:"):
         """Initialize database connection."""
-        self.con = duckdb.connect(
-            db_path,
-            config={
-                "allow_unsigned_extensions": "true",
-                "hnsw_enable_experimental_persistence": "true",
-            },
-        )
+        self.db_path = db_path
+        self.con = connect(db_path)
         self._setup_extensions()
         self._create_schema()
 
@@ -210,6 +261,27 @@ class BrainGraphDB:
         """
         )
 
+        # Import manifest (file stats of imported documents, drives incremental builds)
+        self.con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS import_manifest (
+                path VARCHAR PRIMARY KEY,
+                kind VARCHAR NOT NULL,
+                file_base VARCHAR,
+                doc_id VARCHAR,
+                source_file VARCHAR,
+                document_sha256 VARCHAR,
+                mtime_ns BIGINT,
+                size BIGINT,
+                embedding_path VARCHAR,
+                embedding_mtime_ns BIGINT,
+                code_embedding_path VARCHAR,
+                code_embedding_mtime_ns BIGINT,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """
+        )
+
         # Relevance Scores View (Dynamic Calculation)
         # Formula: importance * 0.4 + uses * 0.2 + (1.0 / (1.0 + decay * days_since_modified / 365.0)) * 0.4
         # Default values: importance=5, decay=5 if null
@@ -254,219 +326,31 @@ class BrainGraphDB:
         - meta (document-level)
         - embedding_sources + chunk_embeddings_256d (chunk_id = chunk ulid)
         - taxonomy nodes/embeddings/edges (if available)
+        - import_manifest (file stats for `import_incremental`)
         """
         docs_dir = documents_dir or (data_dir / "documents")
         doc_glob = f"{docs_dir.as_posix()}/**/*.document.json"
         emb_dir = data_dir / "embeddings"
         emb_glob = f"{emb_dir.as_posix()}/**/*.parquet"
+        code_emb_glob = f"{data_dir.as_posix()}/embeddings/**/*.code.parquet"
 
-        taxonomy_nodes_path = Path(".brain_graph/config/taxonomy.md.nodes.json")
-        taxonomy_edges_path = Path(".brain_graph/config/taxonomy.md.edges.json")
-        taxonomy_parquet_path = Path(".brain_graph/config/taxonomy.md.parquet")
-
-        if not docs_dir.exists():
-            raise FileNotFoundError(
-                f"Documents directory not found: {docs_dir}\n"
-                "Make sure your pipeline has written *.document.json files (or pass --documents-dir)."
-            )
-        if not any(docs_dir.rglob("*.document.json")):
-            raise FileNotFoundError(
-                f"No '*.document.json' files found under {docs_dir}\n"
-                "Make sure your pipeline has written *.document.json files."
-            )
+        self._check_documents_dir(docs_dir)
 
         has_embeddings = emb_dir.exists() and any(emb_dir.rglob("*.parquet"))
+        has_code_embeddings = bool(list(data_dir.glob("embeddings/**/*.code.parquet")))
 
         # Stage documents once (avoid re-scanning JSON multiple times).
-        self.con.execute(
-            f"""
-            CREATE OR REPLACE TEMP TABLE documents AS
-            SELECT
-                id::VARCHAR AS doc_id,
-                path::VARCHAR AS source_file,
-                language::VARCHAR AS language,
-                doc_type::VARCHAR AS doc_type,
-                research_status::VARCHAR AS research_status,
-                file_hash::VARCHAR AS source_hash,
-                source_commit::VARCHAR AS source_commit,
-                source_commit_date::VARCHAR AS source_commit_date,
-                source_dirty::BOOLEAN AS source_dirty,
-                created::VARCHAR AS created,
-                updated::VARCHAR AS updated,
-                uses::INTEGER AS uses,
-                importance::DOUBLE AS importance,
-                decay::DOUBLE AS decay,
-                nodes AS nodes,
-                edges AS edges,
-                links AS links,
-                regexp_extract(filename, '([^/]+)[.]document[.]json$', 1) AS file_base
-            FROM read_json_auto('{_sql_quote(doc_glob)}', filename=true);
-            """
-        )
-
-        # Nodes (one CTAS; id = ulid)
-        self.con.execute(
-            """
-            CREATE OR REPLACE TABLE nodes AS
-            WITH
-            sections AS (
-                SELECT
-                    sec.ulid::VARCHAR AS id,
-                    sec.ulid::VARCHAR AS ulid,
-                    'section'::VARCHAR AS type,
-                    d.source_file AS source_file,
-                    sec.title::VARCHAR AS title,
-                    NULL::VARCHAR AS text,
-                    NULL::VARCHAR AS description,
-                    []::VARCHAR[] AS keywords,
-                    d.language AS language,
-                    NULL::INTEGER AS char_start,
-                    NULL::INTEGER AS char_end,
-                    NULL::VARCHAR AS summary,
-                    NULL::VARCHAR AS entity_type,
-                    NULL::INTEGER AS occurrences,
-                    []::VARCHAR[] AS mentioned_in,
-                    sec.level::INTEGER AS level,
-                    NULL::VARCHAR AS code_language,
-                    CURRENT_TIMESTAMP AS created_at
-                FROM documents d, UNNEST(d.nodes.sections) AS s(sec)
-            ),
-            chunks AS (
-                SELECT
-                    ch.ulid::VARCHAR AS id,
-                    ch.ulid::VARCHAR AS ulid,
-                    'chunk'::VARCHAR AS type,
-                    d.source_file AS source_file,
-                    NULL::VARCHAR AS title,
-                    ch.text::VARCHAR AS text,
-                    NULL::VARCHAR AS description,
-                    []::VARCHAR[] AS keywords,
-                    ch.language::VARCHAR AS language,
-                    ch.char_start::INTEGER AS char_start,
-                    ch.char_end::INTEGER AS char_end,
-                    ch.summary::VARCHAR AS summary,
-                    NULL::VARCHAR AS entity_type,
-                    NULL::INTEGER AS occurrences,
-                    []::VARCHAR[] AS mentioned_in,
-                    NULL::INTEGER AS level,
-                    NULL::VARCHAR AS code_language,
-                    CURRENT_TIMESTAMP AS created_at
-                FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
-            ),
-            entities AS (
-                SELECT
-                    ent.ulid::VARCHAR AS id,
-                    ent.ulid::VARCHAR AS ulid,
-                    'entity'::VARCHAR AS type,
-                    d.source_file AS source_file,
-                    NULL::VARCHAR AS title,
-                    ent.title::VARCHAR AS text,
-                    NULL::VARCHAR AS description,
-                    []::VARCHAR[] AS keywords,
-                    d.language AS language,
-                    NULL::INTEGER AS char_start,
-                    NULL::INTEGER AS char_end,
-                    NULL::VARCHAR AS summary,
-                    ent.entity_type::VARCHAR AS entity_type,
-                    ent.occurrences::INTEGER AS occurrences,
-                    ent.mentioned_in::VARCHAR[] AS mentioned_in,
-                    NULL::INTEGER AS level,
-                    NULL::VARCHAR AS code_language,
-                    CURRENT_TIMESTAMP AS created_at
-                FROM documents d, UNNEST(d.nodes.entities) AS e(ent)
-            )
-            SELECT * FROM sections
-            UNION ALL SELECT * FROM chunks
-            UNION ALL SELECT * FROM entities;
-            """
-        )
-
-        # Edges: map document-local IDs -> node ULIDs
-        self.con.execute(
-            """
-            CREATE OR REPLACE TABLE edges AS
-            WITH
-            node_map AS (
-                SELECT d.doc_id, sec.id::VARCHAR AS local_id, sec.ulid::VARCHAR AS ulid
-                FROM documents d, UNNEST(d.nodes.sections) AS s(sec)
-                UNION ALL
-                SELECT d.doc_id, ch.id::VARCHAR AS local_id, ch.ulid::VARCHAR AS ulid
-                FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
-                UNION ALL
-                SELECT d.doc_id, ent.id::VARCHAR AS local_id, ent.ulid::VARCHAR AS ulid
-                FROM documents d, UNNEST(d.nodes.entities) AS e(ent)
-            ),
-            doc_edges AS (
-                SELECT
-                    d.doc_id,
-                    d.source_file,
-                    edge.from_id::VARCHAR AS from_local_id,
-                    edge.to_id::VARCHAR AS to_local_id,
-                    edge.type::VARCHAR AS type,
-                    edge.weight::DOUBLE AS weight,
-                    edge.similarity::DOUBLE AS similarity,
-                    edge.overlap_chars::INTEGER AS overlap_chars
-                FROM documents d, UNNEST(d.edges) AS e(edge)
-            )
-            SELECT
-                row_number() OVER ()::INTEGER AS id,
-                fm.ulid AS from_id,
-                tm.ulid AS to_id,
-                de.type AS type,
-                de.weight AS weight,
-                de.similarity AS similarity,
-                de.overlap_chars AS overlap_chars,
-                de.source_file AS source_file,
-                CURRENT_TIMESTAMP AS created_at
-            FROM doc_edges de
-            JOIN node_map fm ON fm.doc_id = de.doc_id AND fm.local_id = de.from_local_id
-            JOIN node_map tm ON tm.doc_id = de.doc_id AND tm.local_id = de.to_local_id;
-            """
-        )
+        self._stage_documents(f"'{_sql_quote(doc_glob)}'")
 
-        # Meta (doc-level)
-        self.con.execute(
-            """
-            CREATE OR REPLACE TABLE meta AS
-            SELECT
-                doc_id::VARCHAR AS ulid,
-                source_file::VARCHAR AS source_file,
-                COALESCE(source_hash, '')::VARCHAR AS source_hash,
-                source_commit::VARCHAR AS source_commit,
-                try_cast(source_commit_date AS TIMESTAMP) AS source_commit_date,
-                source_dirty::BOOLEAN AS source_dirty,
-                try_cast(created AS TIMESTAMP) AS created_at,
-                try_cast(updated AS TIMESTAMP) AS modified_at,
-                uses::INTEGER AS uses,
-                importance::DOUBLE AS importance,
-                decay::DOUBLE AS decay,
-                doc_type::VARCHAR AS doc_type,
-                research_status::VARCHAR AS research_status
-            FROM documents;
-            """
-        )
+        self._write_table("nodes", self._nodes_select())
+        self._write_table("edges", self._edges_select("0"))
+        self._write_table("meta", self._meta_select())
 
         # Embedding sources: map vault path -> parquet path (via filename base)
         if has_embeddings:
-            self.con.execute(
-                f"""
-                CREATE OR REPLACE TABLE embedding_sources AS
-                WITH
-                emb_files AS (
-                    SELECT DISTINCT
-                        regexp_extract(filename, '([^/]+)[.]parquet$', 1) AS file_base,
-                        filename AS parquet_path
-                    FROM read_parquet('{_sql_quote(emb_glob)}', filename=true)
-                )
-                SELECT
-                    d.source_file::VARCHAR AS source_file,
-                    e.parquet_path::VARCHAR AS parquet_path,
-                    1024::INTEGER AS embedding_dim,
-                    'unknown'::VARCHAR AS model,
-                    CURRENT_TIMESTAMP AS created_at
-                FROM documents d
-                JOIN emb_files e USING (file_base);
-                """
+            self._write_table(
+                "embedding_sources",
+                self._embedding_sources_select(f"'{_sql_quote(emb_glob)}'"),
             )
         else:
             self.con.execute(
@@ -484,36 +368,9 @@ class BrainGraphDB:
 
         # Chunk embeddings (256d): map chunk_idx (local chunk ID) -> chunk ulid, include source_file for grouping
         if has_embeddings:
-            self.con.execute(
-                f"""
-                CREATE OR REPLACE TABLE chunk_embeddings_256d AS
-                WITH
-                chunk_map AS (
-                    SELECT
-                        d.file_base,
-                        d.source_file,
-                        ch.id::VARCHAR AS chunk_local_id,
-                        ch.ulid::VARCHAR AS chunk_ulid
-                    FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
-                ),
-                emb_raw AS (
-                    SELECT
-                        regexp_extract(filename, '([^/]+)[.]parquet$', 1) AS file_base,
-                        chunk_idx::VARCHAR AS chunk_local_id,
-                        embedding AS embedding,
-                        filename AS parquet_path
-                    FROM read_parquet('{_sql_quote(emb_glob)}', filename=true)
-                )
-                SELECT
-                    cm.chunk_ulid AS chunk_id,
-                    cm.chunk_local_id AS chunk_local_id,
-                    CAST(emb_raw.embedding[1:{target_dim}] AS FLOAT[{target_dim}]) AS embedding,
-                    cm.source_file AS source_file
-                FROM emb_raw
-                JOIN chunk_map cm
-                  ON cm.file_base = emb_raw.file_base
-                 AND cm.chunk_local_id = emb_raw.chunk_local_id;
-                """
+            self._write_table(
+                "chunk_embeddings_256d",
+                self._chunk_embeddings_select(f"'{_sql_quote(emb_glob)}'", target_dim),
             )
         else:
             self.con.execute(
@@ -529,43 +386,10 @@ class BrainGraphDB:
             )
 
         # Code embeddings (256d): map code_idx (local code ID) -> code ulid, include source_file and language
-        code_emb_glob = f"{data_dir.as_posix()}/embeddings/**/*.code.parquet"
-        has_code_embeddings = bool(list(data_dir.glob("embeddings/**/*.code.parquet")))
-
         if has_code_embeddings:
-            self.con.execute(
-                f"""
-                CREATE OR REPLACE TABLE code_embeddings_256d AS
-                WITH
-                code_map AS (
-                    SELECT
-                        d.file_base,
-                        d.source_file,
-                        code.id::VARCHAR AS code_local_id,
-                        code.ulid::VARCHAR AS code_ulid,
-                        code.language::VARCHAR AS language
-                    FROM documents d, UNNEST(d.nodes.codes) AS c(code)
-                    WHERE code.type IN ('function', 'class', 'method')
-                ),
-                emb_raw AS (
-                    SELECT
-                        regexp_extract(filename, '([^/]+)[.]code[.]parquet$', 1) AS file_base,
-                        code_idx::VARCHAR AS code_local_id,
-                        embedding AS embedding,
-                        filename AS parquet_path
-                    FROM read_parquet('{_sql_quote(code_emb_glob)}', filename=true)
-                )
-                SELECT
-                    cm.code_ulid AS code_id,
-                    cm.code_local_id AS code_local_id,
-                    CAST(emb_raw.embedding[1:{target_dim}] AS FLOAT[{target_dim}]) AS embedding,
-                    cm.source_file AS source_file,
-                    cm.language AS language
-                FROM emb_raw
-                JOIN code_map cm
-                  ON cm.file_base = emb_raw.file_base
-                 AND cm.code_local_id = emb_raw.code_local_id;
-                """
+            self._write_table(
+                "code_embeddings_256d",
+                self._code_embeddings_select(f"'{_sql_quote(code_emb_glob)}'", target_dim),
             )
         else:
             self.con.execute(
@@ -586,21 +410,7 @@ class BrainGraphDB:
         # Note: This does not write back into *.document.json files; it only creates DB tables
         # that can be queried by the search/graph layer.
         try:
-            self.con.execute(
-                """
-                CREATE OR REPLACE TABLE doc_links AS
-                SELECT
-                    d.doc_id::VARCHAR AS source_doc_id,
-                    l.link.target_id::VARCHAR AS target_doc_id,
-                    l.link.type::VARCHAR AS type,
-                    l.link.source_node::VARCHAR AS source_node,
-                    l.link.context::VARCHAR AS context,
-                    l.link.char_offset::INTEGER AS char_offset
-                FROM documents d, UNNEST(d.links) AS l(link)
-                WHERE l.link.target_id IS NOT NULL
-                  AND length(l.link.target_id::VARCHAR) = 26;
-                """
-            )
+            self._write_table("doc_links", self._doc_links_select())
             self.con.execute(
                 """
                 CREATE OR REPLACE TABLE doc_backlinks AS
@@ -647,15 +457,7 @@ class BrainGraphDB:
             )
 
         # Optional taxonomy import (nodes + embeddings + edges).
-        if taxonomy_nodes_path.exists():
-            tax_nodes = taxonomy_nodes_path.as_posix()
-            self.con.execute(
-                f"""
-                CREATE OR REPLACE TEMP TABLE taxonomy AS
-                SELECT * FROM read_json_auto('{_sql_quote(tax_nodes)}', format='array');
-                """
-            )
-
+        if self._stage_taxonomy():
             self.con.execute(
                 """
                 INSERT INTO nodes
@@ -682,8 +484,8 @@ class BrainGraphDB:
                 """
             )
 
-            if taxonomy_parquet_path.exists():
-                tax_parquet = taxonomy_parquet_path.as_posix()
+            if TAXONOMY_PARQUET_PATH.exists():
+                tax_parquet = TAXONOMY_PARQUET_PATH.as_posix()
                 self.con.execute(
                     f"""
                     CREATE OR REPLACE TABLE taxonomy_embeddings_256d AS
@@ -707,8 +509,8 @@ class BrainGraphDB:
                     """
                 )
 
-            if taxonomy_edges_path.exists():
-                tax_edges = taxonomy_edges_path.as_posix()
+            if TAXONOMY_EDGES_PATH.exists():
+                tax_edges = TAXONOMY_EDGES_PATH.as_posix()
                 self.con.execute(
                     f"""
                     INSERT INTO edges
@@ -740,41 +542,7 @@ class BrainGraphDB:
                     """
                 )
 
-            # Chunk -> category edges from Document chunk.categories (weight/similarity not available at schema-level yet).
-            self.con.execute(
-                """
-                INSERT INTO edges
-                WITH
-                chunk_categories AS (
-                    SELECT
-                        d.source_file,
-                        ch.ulid::VARCHAR AS chunk_ulid,
-                        COALESCE(try_cast(ch.categories AS VARCHAR[]), []::VARCHAR[]) AS categories
-                    FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
-                ),
-                mapped AS (
-                    SELECT
-                        cc.source_file,
-                        cc.chunk_ulid AS from_id,
-                        t.ulid::VARCHAR AS to_id,
-                        'categorized_as'::VARCHAR AS type
-                    FROM chunk_categories cc,
-                         UNNEST(cc.categories) cat_slug
-                    JOIN taxonomy t ON t.id::VARCHAR = cat_slug::VARCHAR
-                )
-                SELECT
-                    (SELECT COALESCE(MAX(id), 0) FROM edges) + row_number() OVER ()::INTEGER AS id,
-                    from_id,
-                    to_id,
-                    type,
-                    NULL::DOUBLE AS weight,
-                    NULL::DOUBLE AS similarity,
-                    NULL::INTEGER AS overlap_chars,
-                    source_file,
-                    CURRENT_TIMESTAMP AS created_at
-                FROM mapped;
-                """
-            )
+            self.con.execute(f"INSERT INTO edges {self._categorized_as_select()}")
         else:
             # Ensure taxonomy_embeddings_256d exists even if taxonomy is missing.
             self.con.execute(
@@ -785,31 +553,653 @@ class BrainGraphDB:
                 """
             )
 
+        # Sign bits + int8 codes for the quantized first stage of vector search.
+        build_quantized_embeddings(self.con)
+
+        # Every document is now in sync with the DB.
+        self.con.execute("DELETE FROM import_manifest")
+        self._record_manifest(self._scan_files(docs_dir, emb_dir, hash_documents=True))
+
         # Drop staging table to reduce memory footprint (nodes/edges/meta/embeddings already materialized).
         self.con.execute("DROP TABLE IF EXISTS documents")
+        # All nodes are new: build_indexes() rebuilds the trigram index.
+        for table in TRIGRAM_TABLES:
+            self.con.execute(f"DROP TABLE IF EXISTS {table}")
 
-    def build_indexes(self):
-        """Build all indexes after data import."""
-        print("\nBuilding indexes...", file=sys.stderr)
+    def import_incremental(
+        self,
+        data_dir: Path,
+        documents_dir: Path | None = None,
+        target_dim: int = 256,
+    ) -> dict[str, Any]:
+        """
+        Re-import only documents that changed since the last build.
 
-        # Get chunk count for progress estimation
-        chunk_count = self.con.execute(
-            "SELECT COUNT(*) FROM chunk_embeddings_256d"
-        ).fetchone()[0]
-        print(f"  VSS indexes (HNSW) for {chunk_count} chunks...", file=sys.stderr)
+        The dirty set comes from `import_manifest` (file stats of every Document JSON
+        and its embedding parquets): only files whose stats changed are parsed. Of
+        those, documents whose `file_hash` still equals `meta.source_hash`, whose JSON
+        bytes are unchanged and whose parquets were not rewritten are skipped. Rows of
+        dirty and deleted documents are deleted and re-inserted (edges get fresh ids
+        above MAX(id), `categorized_as` edges are re-derived for the dirty chunks).
 
-        # HNSW parameters:
-        # - metric='cosine' for normalized embeddings (consistent with searcher.py)
-        # - M: connections per layer (16 default)
-        # - ef_construction: search depth during build (128 default)
-        start = time.time()
-        try:
-            self.con.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_chunk_embeddings_hnsw
-                ON chunk_embeddings_256d
-                USING HNSW (embedding)
-                WITH (metric = 'cosine')
+        Falls back to a full `import_directory()` if the DB has no manifest yet or
+        the taxonomy files changed.
+        """
+        docs_dir = documents_dir or (data_dir / "documents")
+        emb_dir = data_dir / "embeddings"
+        self._check_documents_dir(docs_dir)
+
+        recorded = {
+            row[0]: ManifestEntry(*row[1:])
+            for row in self.con.execute(
+                f"SELECT path, {', '.join(ManifestEntry._fields)} FROM import_manifest"
+            ).fetchall()
+        }
+        current = self._scan_files(docs_dir, emb_dir)
+
+        taxonomy = {p for p, e in {**recorded, **current}.items() if e.kind == "taxonomy"}
+        taxonomy_changed = any(
+            p not in recorded or p not in current or not recorded[p].same_files(current[p])
+            for p in taxonomy
+        )
+        if not recorded or taxonomy_changed:
+            reason = "no manifest" if not recorded else "taxonomy changed"
+            print(f"Incremental import not possible ({reason}), full import...", file=sys.stderr)
+            self.import_directory(data_dir, documents_dir=documents_dir, target_dim=target_dim)
+            return {"mode": "full", "reason": reason}
+
+        deleted = [p for p, e in recorded.items() if e.kind == "document" and p not in current]
+        candidates = [
+            p
+            for p, e in current.items()
+            if e.kind == "document" and (p not in recorded or not recorded[p].same_files(e))
+        ]
+        print(
+            f"Incremental import: {len(candidates)} changed file(s), {len(deleted)} deleted",
+            file=sys.stderr,
+        )
+
+        counts = {"added": 0, "changed": 0, "unchanged": 0, "deleted": len(deleted)}
+        dirty: list[str] = []
+        if candidates:
+            self._stage_documents(_sql_list(candidates))
+            hashes = {
+                row[0]: (row[1], row[2])
+                for row in self.con.execute(
+                    """
+                    SELECT d.file_base, d.source_hash, m.source_hash
+                    FROM documents d
+                    LEFT JOIN meta m ON m.ulid = d.doc_id
+                    """
+                ).fetchall()
+            }
+            for path in candidates:
+                entry = current[path] = current[path]._replace(document_sha256=_file_sha256(path))
+                old = recorded.get(path)
+                new_hash, db_hash = hashes.get(entry.file_base, (None, None))
+                if old is None:
+                    counts["added"] += 1
+                    dirty.append(path)
+                elif (
+                    new_hash != db_hash
+                    or old.document_sha256 != entry.document_sha256
+                    or not old.same_embeddings(entry)
+                ):
+                    counts["changed"] += 1
+                    dirty.append(path)
+                else:
+                    counts["unchanged"] += 1
+
+        # Manifest: forget deleted files, refresh rows of all parsed candidates.
+        if deleted or candidates:
+            self.con.execute(
+                f"DELETE FROM import_manifest WHERE list_contains({_sql_list(deleted + candidates)}::VARCHAR[], path)"
+            )
+            self._record_manifest({p: current[p] for p in candidates})
+
+        # Delete rows of dirty and deleted documents (by recorded and new source_file/doc_id).
+        stale = [recorded[p] for p in dirty + deleted if p in recorded]
+        stale_sources = {e.source_file for e in stale if e.source_file}
+        stale_docs = {e.doc_id for e in stale if e.doc_id}
+        if candidates:
+            dirty_bases = [current[p].file_base for p in dirty]
+            self.con.execute(
+                f"DELETE FROM documents WHERE NOT list_contains({_sql_list(dirty_bases)}::VARCHAR[], file_base)"
+            )
+            for source_file, doc_id in self.con.execute(
+                "SELECT source_file, doc_id FROM documents"
+            ).fetchall():
+                stale_sources.add(source_file)
+                stale_docs.add(doc_id)
+        self._delete_documents(sorted(stale_sources), sorted(stale_docs))
+
+        if dirty:
+            self._insert_staged_documents(
+                emb_files=[current[p].embedding_path for p in dirty if current[p].embedding_path],
+                code_emb_files=[
+                    current[p].code_embedding_path for p in dirty if current[p].code_embedding_path
+                ],
+                target_dim=target_dim,
+            )
+            if trigram_index_available(self.con):
+                add_trigram_nodes(self.con, "source_file IN (SELECT source_file FROM documents)")
+        self.con.execute("DROP TABLE IF EXISTS documents")
+
+        if dirty or deleted:
+            self._compact_hnsw_indexes()
+            # The int8 scales depend on all vectors: requantize everything.
+            build_quantized_embeddings(self.con)
+
+        return {"mode": "incremental", "documents": counts, "dirty": len(dirty)}
+
+    def _check_documents_dir(self, docs_dir: Path) -> None:
+        """Fail early with a helpful message if there is nothing to import."""
+        if not docs_dir.exists():
+            raise FileNotFoundError(
+                f"Documents directory not found: {docs_dir}\n"
+                "Make sure your pipeline has written *.document.json files (or pass --documents-dir)."
+            )
+        if not any(docs_dir.rglob("*.document.json")):
+            raise FileNotFoundError(
+                f"No '*.document.json' files found under {docs_dir}\n"
+                "Make sure your pipeline has written *.document.json files."
+            )
+
+    def _write_table(self, table: str, select_sql: str, *, append: bool = False) -> None:
+        """Materialize `select_sql` as `table` (CTAS) or append it (INSERT)."""
+        if append:
+            self.con.execute(f"INSERT INTO {table} {select_sql}")
+        else:
+            self.con.execute(f"CREATE OR REPLACE TABLE {table} AS {select_sql}")
+
+    def _stage_documents(self, doc_source: str) -> None:
+        """
+        Stage Document JSONs (glob or list literal) into TEMP table `documents`.
+
+        Optional fields missing from all staged documents become NULL instead of
+        failing the bind (older Document JSONs have no `research_status`/`links`).
+        """
+        json_source = f"read_json_auto({doc_source}, filename=true)"
+        columns = {row[0] for row in self.con.execute(f"DESCRIBE SELECT * FROM {json_source}").fetchall()}
+
+        def field(name: str, cast: str) -> str:
+            return f"{name}::{cast}" if name in columns else f"NULL::{cast}"
+
+        self.con.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE documents AS
+            SELECT
+                id::VARCHAR AS doc_id,
+                path::VARCHAR AS source_file,
+                {field("language", "VARCHAR")} AS language,
+                {field("doc_type", "VARCHAR")} AS doc_type,
+                {field("research_status", "VARCHAR")} AS research_status,
+                {field("file_hash", "VARCHAR")} AS source_hash,
+                {field("source_commit", "VARCHAR")} AS source_commit,
+                {field("source_commit_date", "VARCHAR")} AS source_commit_date,
+                {field("source_dirty", "BOOLEAN")} AS source_dirty,
+                {field("created", "VARCHAR")} AS created,
+                {field("updated", "VARCHAR")} AS updated,
+                {field("uses", "INTEGER")} AS uses,
+                {field("importance", "DOUBLE")} AS importance,
+                {field("decay", "DOUBLE")} AS decay,
+                nodes AS nodes,
+                edges AS edges,
+                {"links" if "links" in columns else "NULL"} AS links,
+                regexp_extract(filename, '([^/]+)[.]document[.]json$', 1) AS file_base
+            FROM {json_source};
+            """
+        )
+
+    def _stage_taxonomy(self) -> bool:
+        """Stage taxonomy category nodes into TEMP table `taxonomy` (if available)."""
+        if not TAXONOMY_NODES_PATH.exists():
+            return False
+        self.con.execute(
+            f"""
+            CREATE OR REPLACE TEMP TABLE taxonomy AS
+            SELECT * FROM read_json_auto('{_sql_quote(TAXONOMY_NODES_PATH.as_posix())}', format='array');
+            """
+        )
+        return True
+
+    def _nodes_select(self) -> str:
+        """Sections, chunks and entities of the staged documents (id = ulid)."""
+        return """
+            WITH
+            sections AS (
+                SELECT
+                    sec.ulid::VARCHAR AS id,
+                    sec.ulid::VARCHAR AS ulid,
+                    'section'::VARCHAR AS type,
+                    d.source_file AS source_file,
+                    sec.title::VARCHAR AS title,
+                    NULL::VARCHAR AS text,
+                    NULL::VARCHAR AS description,
+                    []::VARCHAR[] AS keywords,
+                    d.language AS language,
+                    NULL::INTEGER AS char_start,
+                    NULL::INTEGER AS char_end,
+                    NULL::VARCHAR AS summary,
+                    NULL::VARCHAR AS entity_type,
+                    NULL::INTEGER AS occurrences,
+                    []::VARCHAR[] AS mentioned_in,
+                    sec.level::INTEGER AS level,
+                    NULL::VARCHAR AS code_language,
+                    CURRENT_TIMESTAMP AS created_at
+                FROM documents d, UNNEST(d.nodes.sections) AS s(sec)
+            ),
+            chunks AS (
+                SELECT
+                    ch.ulid::VARCHAR AS id,
+                    ch.ulid::VARCHAR AS ulid,
+                    'chunk'::VARCHAR AS type,
+                    d.source_file AS source_file,
+                    NULL::VARCHAR AS title,
+                    ch.text::VARCHAR AS text,
+                    NULL::VARCHAR AS description,
+                    []::VARCHAR[] AS keywords,
+                    ch.language::VARCHAR AS language,
+                    ch.char_start::INTEGER AS char_start,
+                    ch.char_end::INTEGER AS char_end,
+                    ch.summary::VARCHAR AS summary,
+                    NULL::VARCHAR AS entity_type,
+                    NULL::INTEGER AS occurrences,
+                    []::VARCHAR[] AS mentioned_in,
+                    NULL::INTEGER AS level,
+                    NULL::VARCHAR AS code_language,
+                    CURRENT_TIMESTAMP AS created_at
+                FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
+            ),
+            entities AS (
+                SELECT
+                    ent.ulid::VARCHAR AS id,
+                    ent.ulid::VARCHAR AS ulid,
+                    'entity'::VARCHAR AS type,
+                    d.source_file AS source_file,
+                    NULL::VARCHAR AS title,
+                    ent.title::VARCHAR AS text,
+                    NULL::VARCHAR AS description,
+                    []::VARCHAR[] AS keywords,
+                    d.language AS language,
+                    NULL::INTEGER AS char_start,
+                    NULL::INTEGER AS char_end,
+                    NULL::VARCHAR AS summary,
+                    ent.entity_type::VARCHAR AS entity_type,
+                    ent.occurrences::INTEGER AS occurrences,
+                    ent.mentioned_in::VARCHAR[] AS mentioned_in,
+                    NULL::INTEGER AS level,
+                    NULL::VARCHAR AS code_language,
+                    CURRENT_TIMESTAMP AS created_at
+                FROM documents d, UNNEST(d.nodes.entities) AS e(ent)
+            )
+            SELECT * FROM sections
+            UNION ALL SELECT * FROM chunks
+            UNION ALL SELECT * FROM entities
+        """
+
+    def _edges_select(self, id_base: str) -> str:
+        """Document edges with local IDs mapped to node ULIDs; ids start after `id_base`."""
+        return f"""
+            WITH
+            node_map AS (
+                SELECT d.doc_id, sec.id::VARCHAR AS local_id, sec.ulid::VARCHAR AS ulid
+                FROM documents d, UNNEST(d.nodes.sections) AS s(sec)
+                UNION ALL
+                SELECT d.doc_id, ch.id::VARCHAR AS local_id, ch.ulid::VARCHAR AS ulid
+                FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
+                UNION ALL
+                SELECT d.doc_id, ent.id::VARCHAR AS local_id, ent.ulid::VARCHAR AS ulid
+                FROM documents d, UNNEST(d.nodes.entities) AS e(ent)
+            ),
+            doc_edges AS (
+                SELECT
+                    d.doc_id,
+                    d.source_file,
+                    edge.from_id::VARCHAR AS from_local_id,
+                    edge.to_id::VARCHAR AS to_local_id,
+                    edge.type::VARCHAR AS type,
+                    edge.weight::DOUBLE AS weight,
+                    edge.similarity::DOUBLE AS similarity,
+                    edge.overlap_chars::INTEGER AS overlap_chars
+                FROM documents d, UNNEST(d.edges) AS e(edge)
+            )
+            SELECT
+                ({id_base} + row_number() OVER ())::INTEGER AS id,
+                fm.ulid AS from_id,
+                tm.ulid AS to_id,
+                de.type AS type,
+                de.weight AS weight,
+                de.similarity AS similarity,
+                de.overlap_chars AS overlap_chars,
+                de.source_file AS source_file,
+                CURRENT_TIMESTAMP AS created_at
+            FROM doc_edges de
+            JOIN node_map fm ON fm.doc_id = de.doc_id AND fm.local_id = de.from_local_id
+            JOIN node_map tm ON tm.doc_id = de.doc_id AND tm.local_id = de.to_local_id
+        """
+
+    def _meta_select(self) -> str:
+        """Document-level meta rows of the staged documents."""
+        return """
+            SELECT
+                doc_id::VARCHAR AS ulid,
+                source_file::VARCHAR AS source_file,
+                COALESCE(source_hash, '')::VARCHAR AS source_hash,
+                source_commit::VARCHAR AS source_commit,
+                try_cast(source_commit_date AS TIMESTAMP) AS source_commit_date,
+                source_dirty::BOOLEAN AS source_dirty,
+                try_cast(created AS TIMESTAMP) AS created_at,
+                try_cast(updated AS TIMESTAMP) AS modified_at,
+                uses::INTEGER AS uses,
+                importance::DOUBLE AS importance,
+                decay::DOUBLE AS decay,
+                doc_type::VARCHAR AS doc_type,
+                research_status::VARCHAR AS research_status
+            FROM documents
+        """
+
+    def _embedding_sources_select(self, parquet_source: str) -> str:
+        """Map vault path -> parquet path (via filename base)."""
+        return f"""
+            WITH
+            emb_files AS (
+                SELECT DISTINCT
+                    regexp_extract(filename, '([^/]+)[.]parquet$', 1) AS file_base,
+                    filename AS parquet_path
+                FROM read_parquet({parquet_source}, filename=true)
+            )
+            SELECT
+                d.source_file::VARCHAR AS source_file,
+                e.parquet_path::VARCHAR AS parquet_path,
+                1024::INTEGER AS embedding_dim,
+                'unknown'::VARCHAR AS model,
+                CURRENT_TIMESTAMP AS created_at
+            FROM documents d
+            JOIN emb_files e USING (file_base)
+        """
+
+    def _chunk_embeddings_select(self, parquet_source: str, target_dim: int) -> str:
+        """Truncated (Matryoshka) chunk embeddings keyed by chunk ulid."""
+        return f"""
+            WITH
+            chunk_map AS (
+                SELECT
+                    d.file_base,
+                    d.source_file,
+                    ch.id::VARCHAR AS chunk_local_id,
+                    ch.ulid::VARCHAR AS chunk_ulid
+                FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
+            ),
+            emb_raw AS (
+                SELECT
+                    regexp_extract(filename, '([^/]+)[.]parquet$', 1) AS file_base,
+                    chunk_idx::VARCHAR AS chunk_local_id,
+                    embedding AS embedding,
+                    filename AS parquet_path
+                FROM read_parquet({parquet_source}, filename=true)
+            )
+            SELECT
+                cm.chunk_ulid AS chunk_id,
+                cm.chunk_local_id AS chunk_local_id,
+                CAST(emb_raw.embedding[1:{target_dim}] AS FLOAT[{target_dim}]) AS embedding,
+                cm.source_file AS source_file
+            FROM emb_raw
+            JOIN chunk_map cm
+              ON cm.file_base = emb_raw.file_base
+             AND cm.chunk_local_id = emb_raw.chunk_local_id
+        """
+
+    def _code_embeddings_select(self, parquet_source: str, target_dim: int) -> str:
+        """Truncated code unit embeddings keyed by code ulid."""
+        return f"""
+            WITH
+            code_map AS (
+                SELECT
+                    d.file_base,
+                    d.source_file,
+                    code.id::VARCHAR AS code_local_id,
+                    code.ulid::VARCHAR AS code_ulid,
+                    code.language::VARCHAR AS language
+                FROM documents d, UNNEST(d.nodes.codes) AS c(code)
+                WHERE code.type IN ('function', 'class', 'method')
+            ),
+            emb_raw AS (
+                SELECT
+                    regexp_extract(filename, '([^/]+)[.]code[.]parquet$', 1) AS file_base,
+                    code_idx::VARCHAR AS code_local_id,
+                    embedding AS embedding,
+                    filename AS parquet_path
+                FROM read_parquet({parquet_source}, filename=true)
+            )
+            SELECT
+                cm.code_ulid AS code_id,
+                cm.code_local_id AS code_local_id,
+                CAST(emb_raw.embedding[1:{target_dim}] AS FLOAT[{target_dim}]) AS embedding,
+                cm.source_file AS source_file,
+                cm.language AS language
+            FROM emb_raw
+            JOIN code_map cm
+              ON cm.file_base = emb_raw.file_base
+             AND cm.code_local_id = emb_raw.code_local_id
+        """
+
+    def _doc_links_select(self) -> str:
+        """Forward document links of the staged documents."""
+        return """
+            SELECT
+                d.doc_id::VARCHAR AS source_doc_id,
+                l.link.target_id::VARCHAR AS target_doc_id,
+                l.link.type::VARCHAR AS type,
+                l.link.source_node::VARCHAR AS source_node,
+                l.link.context::VARCHAR AS context,
+                l.link.char_offset::INTEGER AS char_offset
+            FROM documents d, UNNEST(d.links) AS l(link)
+            WHERE l.link.target_id IS NOT NULL
+              AND length(l.link.target_id::VARCHAR) = 26
+        """
+
+    def _categorized_as_select(self) -> str:
+        """
+        Chunk -> category edges from Document chunk.categories (weight/similarity not
+        available at schema-level yet). Requires the staged `taxonomy` table.
+        """
+        return """
+            WITH
+            chunk_categories AS (
+                SELECT
+                    d.source_file,
+                    ch.ulid::VARCHAR AS chunk_ulid,
+                    COALESCE(try_cast(ch.categories AS VARCHAR[]), []::VARCHAR[]) AS categories
+                FROM documents d, UNNEST(d.nodes.chunks) AS c(ch)
+            ),
+            mapped AS (
+                SELECT
+                    cc.source_file,
+                    cc.chunk_ulid AS from_id,
+                    t.ulid::VARCHAR AS to_id,
+                    'categorized_as'::VARCHAR AS type
+                FROM chunk_categories cc,
+                     UNNEST(cc.categories) cat_slug
+                JOIN taxonomy t ON t.id::VARCHAR = cat_slug::VARCHAR
+            )
+            SELECT
+                (SELECT COALESCE(MAX(id), 0) FROM edges) + row_number() OVER ()::INTEGER AS id,
+                from_id,
+                to_id,
+                type,
+                NULL::DOUBLE AS weight,
+                NULL::DOUBLE AS similarity,
+                NULL::INTEGER AS overlap_chars,
+                source_file,
+                CURRENT_TIMESTAMP AS created_at
+            FROM mapped
+        """
+
+    def _insert_staged_documents(
+        self, *, emb_files: list[str], code_emb_files: list[str], target_dim: int
+    ) -> None:
+        """Append all rows of the staged (dirty) documents to the existing tables."""
+        self._write_table("nodes", self._nodes_select(), append=True)
+        self._write_table(
+            "edges", self._edges_select("(SELECT COALESCE(MAX(id), 0) FROM edges)"), append=True
+        )
+        self._write_table("meta", self._meta_select(), append=True)
+        if emb_files:
+            self._write_table(
+                "embedding_sources", self._embedding_sources_select(_sql_list(emb_files)), append=True
+            )
+            self._write_table(
+                "chunk_embeddings_256d",
+                self._chunk_embeddings_select(_sql_list(emb_files), target_dim),
+                append=True,
+            )
+        if code_emb_files:
+            self._write_table(
+                "code_embeddings_256d",
+                self._code_embeddings_select(_sql_list(code_emb_files), target_dim),
+                append=True,
+            )
+        try:
+            self.con.execute(f"CREATE OR REPLACE TEMP TABLE new_links AS {self._doc_links_select()}")
+            self.con.execute("INSERT INTO doc_links SELECT * FROM new_links")
+            self.con.execute(
+                """
+                INSERT INTO doc_backlinks
+                SELECT target_doc_id, source_doc_id, type, source_node, context, char_offset
+                FROM new_links
+                """
+            )
+        except duckdb.Error as e:
+            print(f"Warning: Could not update doc_links/doc_backlinks, skipping ({e})", file=sys.stderr)
+        if self._stage_taxonomy():
+            self.con.execute(f"INSERT INTO edges {self._categorized_as_select()}")
+
+    def _delete_documents(self, source_files: list[str], doc_ids: list[str]) -> None:
+        """Delete all rows belonging to the given documents (taxonomy rows are kept)."""
+        if source_files:
+            sources = f"{_sql_list(source_files)}::VARCHAR[]"
+            if trigram_index_available(self.con):
+                remove_trigram_nodes(self.con, f"list_contains({sources}, source_file)")
+            for table in [
+                "nodes",
+                "edges",
+                "chunk_embeddings_256d",
+                "code_embeddings_256d",
+                "embedding_sources",
+            ]:
+                self.con.execute(
+                    f"DELETE FROM {table} WHERE list_contains({sources}, source_file)"
+                )
+        if doc_ids:
+            docs = f"{_sql_list(doc_ids)}::VARCHAR[]"
+            self.con.execute(f"DELETE FROM meta WHERE list_contains({docs}, ulid)")
+            self.con.execute(f"DELETE FROM doc_links WHERE list_contains({docs}, source_doc_id)")
+            self.con.execute(f"DELETE FROM doc_backlinks WHERE list_contains({docs}, source_doc_id)")
+
+    def _compact_hnsw_indexes(self) -> None:
+        """Drop deleted entries from existing HNSW indexes (inserts are indexed on the fly)."""
+        names = [
+            row[0]
+            for row in self.con.execute(
+                "SELECT index_name FROM duckdb_indexes() WHERE index_name LIKE '%_hnsw'"
+            ).fetchall()
+        ]
+        for name in names:
+            try:
+                self.con.execute(f"PRAGMA hnsw_compact_index('{name}')")
+            except duckdb.Error as e:
+                print(f"Warning: Could not compact HNSW index {name} ({e})", file=sys.stderr)
+
+    def _scan_files(
+        self, docs_dir: Path, emb_dir: Path, *, hash_documents: bool = False
+    ) -> dict[str, ManifestEntry]:
+        """Stat Document JSONs, their embedding parquets and the taxonomy files (no parsing)."""
+        parquets: dict[str, Path] = {}
+        if emb_dir.exists():
+            for path in emb_dir.rglob("*.parquet"):
+                parquets[path.name] = path
+
+        scanned: dict[str, ManifestEntry] = {}
+        for path in docs_dir.rglob("*.document.json"):
+            file_base = path.name[: -len(".document.json")]
+            emb = parquets.get(f"{file_base}.parquet")
+            code_emb = parquets.get(f"{file_base}.code.parquet")
+            st = path.stat()
+            scanned[path.as_posix()] = ManifestEntry(
+                kind="document",
+                file_base=file_base,
+                document_sha256=_file_sha256(path) if hash_documents else None,
+                mtime_ns=st.st_mtime_ns,
+                size=st.st_size,
+                embedding_path=emb.as_posix() if emb else None,
+                embedding_mtime_ns=emb.stat().st_mtime_ns if emb else None,
+                code_embedding_path=code_emb.as_posix() if code_emb else None,
+                code_embedding_mtime_ns=code_emb.stat().st_mtime_ns if code_emb else None,
+            )
+        for path in [TAXONOMY_NODES_PATH, TAXONOMY_EDGES_PATH, TAXONOMY_PARQUET_PATH]:
+            if path.exists():
+                st = path.stat()
+                scanned[path.as_posix()] = ManifestEntry(
+                    kind="taxonomy", mtime_ns=st.st_mtime_ns, size=st.st_size
+                )
+        return scanned
+
+    def _record_manifest(self, entries: dict[str, ManifestEntry]) -> None:
+        """Insert manifest rows; doc_id/source_file are resolved from the staged documents."""
+        if not entries:
+            return
+        columns = ManifestEntry._fields
+        self.con.executemany(
+            f"""
+            INSERT INTO import_manifest (path, {', '.join(columns)})
+            VALUES (?, {', '.join('?' for _ in columns)})
+            """,
+            [(path, *entry) for path, entry in entries.items()],
+        )
+        self.con.execute(
+            """
+            UPDATE import_manifest
+            SET doc_id = d.doc_id, source_file = d.source_file, imported_at = CURRENT_TIMESTAMP
+            FROM documents d
+            WHERE import_manifest.kind = 'document'
+              AND import_manifest.file_base = d.file_base
+            """
+        )
+
+    def build_indexes(
+        self, write_search_snapshot: bool = True, cascade: str = DEFAULT_CASCADE
+    ) -> dict[str, Any] | None:
+        """
+        Build all indexes after data import.
+
+        `cascade` ("dim:candidates,...,dim", see matryoshka.py) is recorded in
+        `embedding_cascade` for Matryoshka cascade search.
+
+        For file-backed databases this also builds the full-vector store
+        (`<db>.vectors.npy`, see `vector_store.py`) and writes the search snapshot
+        (`<db>.snapshot.duckdb`, see `index_snapshot.py`) and returns its info.
+        """
+        print("\nBuilding indexes...", file=sys.stderr)
+
+        # Get chunk count for progress estimation
+        chunk_count = self.con.execute(
+            "SELECT COUNT(*) FROM chunk_embeddings_256d"
+        ).fetchone()[0]
+        print(f"  VSS indexes (HNSW) for {chunk_count} chunks...", file=sys.stderr)
+
+        # HNSW parameters:
+        # - metric='cosine' for normalized embeddings (consistent with searcher.py)
+        # - M: connections per layer (16 default)
+        # - ef_construction: search depth during build (128 default)
+        start = time.time()
+        try:
+            self.con.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_chunk_embeddings_hnsw
+                ON chunk_embeddings_256d
+                USING HNSW (embedding)
+                WITH (metric = 'cosine')
                 """
             )
             elapsed = time.time() - start
@@ -874,6 +1264,13 @@ class BrainGraphDB:
             "CREATE INDEX IF NOT EXISTS idx_meta_hash ON meta(source_hash)"
         )
 
+        print("  Document relevance...", file=sys.stderr)
+        relevance = refresh_relevance(self.con)
+        print(
+            f"    {relevance['documents']} documents (max {relevance['max_relevance']:.2f})",
+            file=sys.stderr,
+        )
+
         # Load German stopwords
         print("  German stopwords...", file=sys.stderr)
         stopwords_path = Path(".brain_graph/config/stopwords_de.md")
@@ -928,6 +1325,56 @@ class BrainGraphDB:
                 f"    Warning: Could not build FTS index, skipping ({e})",
                 file=sys.stderr,
             )
+            # Postings of an older FTS index would no longer match the nodes
+            for table in BM25_TABLES:
+                self.con.execute(f"DROP TABLE IF EXISTS {table}")
+        else:
+            print("  BM25 top-k postings...", file=sys.stderr)
+            try:
+                bm25 = build_bm25_index(self.con)
+                print(
+                    f"    {bm25['terms']} terms, {bm25['postings']} postings in {bm25['blocks']} blocks "
+                    f"in {bm25['duration_ms'] / 1000:.1f}s",
+                    file=sys.stderr,
+                )
+            except duckdb.Error as e:
+                print(
+                    f"    Warning: Could not build BM25 postings, skipping ({e})",
+                    file=sys.stderr,
+                )
+
+        print("  Typo index (symmetric deletes)...", file=sys.stderr)
+        try:
+            typo = build_typo_index(self.con)
+            print(
+                f"    {typo['tokens']} tokens, {typo['postings']} postings, "
+                f"{typo['deletes']} deletes in {typo['duration_ms'] / 1000:.1f}s",
+                file=sys.stderr,
+            )
+        except duckdb.Error as e:
+            print(
+                f"    Warning: Could not build typo index, skipping ({e})",
+                file=sys.stderr,
+            )
+
+        if trigram_index_available(self.con):
+            # Kept current by import_incremental()
+            print("  Trigram index up to date", file=sys.stderr)
+        else:
+            print("  Trigram index...", file=sys.stderr)
+            try:
+                trigrams = build_trigram_index(self.con)
+                print(
+                    f"    {trigrams['nodes']} nodes, {trigrams['trigrams']} trigrams, "
+                    f"{trigrams['postings']} postings "
+                    f"in {trigrams['duration_ms'] / 1000:.1f}s",
+                    file=sys.stderr,
+                )
+            except duckdb.Error as e:
+                print(
+                    f"    Warning: Could not build trigram index, skipping ({e})",
+                    file=sys.stderr,
+                )
 
         print("  Property graph...", file=sys.stderr)
         try:
@@ -951,6 +1398,50 @@ class BrainGraphDB:
                 file=sys.stderr,
             )
 
+        levels = parse_cascade(cascade)
+        record_cascade(self.con, levels)
+        print(f"  Matryoshka cascade: {format_cascade(levels)}", file=sys.stderr)
+
+        if self.db_path == ":memory:":
+            return None
+
+        vector_store_path = vector_store_path_for(self.db_path)
+        print(f"  Full-vector store ({vector_store_path})...", file=sys.stderr)
+        try:
+            vector_store = build_vector_store(self.con, vector_store_path)
+            if vector_store:
+                print(
+                    f"    {vector_store['rows']} x {vector_store['dim']} "
+                    f"({vector_store['dtype']}) in {vector_store['duration_ms'] / 1000:.1f}s",
+                    file=sys.stderr,
+                )
+        except (duckdb.Error, OSError, ValueError) as e:
+            print(
+                f"    Warning: Could not build full-vector store, skipping ({e})",
+                file=sys.stderr,
+            )
+
+        if not write_search_snapshot:
+            return None
+
+        snapshot_path = snapshot_path_for(self.db_path)
+        print(f"  Search snapshot ({snapshot_path})...", file=sys.stderr)
+        self.con.execute("CHECKPOINT")
+        try:
+            snapshot = write_snapshot(self.con, snapshot_path)
+        except (duckdb.Error, OSError) as e:
+            print(
+                f"    Warning: Could not write search snapshot, skipping ({e})",
+                file=sys.stderr,
+            )
+            return None
+        print(
+            f"    Snapshot written in {snapshot['duration_ms'] / 1000:.1f}s "
+            f"(HNSW: {len(snapshot['hnsw_indexes'])}, FTS: {snapshot['fts_index']})",
+            file=sys.stderr,
+        )
+        return snapshot
+
     def stats(self):
         """Print database statistics."""
         print("\n=== Database Statistics ===", file=sys.stderr)
@@ -1010,6 +1501,21 @@ def main():
         default=256,
         help="Target dimension for Matryoshka truncation (default: 256)",
     )
+    parser.add_argument(
+        "--cascade",
+        default=DEFAULT_CASCADE,
+        help=f"Matryoshka search cascade, dim:candidates per level (default: {DEFAULT_CASCADE})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-import documents changed since the last build (requires --output)",
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="Do not write the search snapshot (<output>.snapshot.duckdb)",
+    )
     parser.add_argument(
         "--format",
         choices=["json", "text"],
@@ -1033,12 +1539,22 @@ def main():
         print(f"Embedding dimension: {args.embedding_dim}", file=sys.stderr)
 
         db = BrainGraphDB(db_path)
-        db.import_directory(
-            args.data_dir,
-            documents_dir=args.documents_dir,
-            target_dim=args.embedding_dim,
-        )
-        db.build_indexes()
+        if args.incremental:
+            if not args.output:
+                raise ValueError("--incremental requires --output (a persistent database)")
+            import_stats = db.import_incremental(
+                args.data_dir,
+                documents_dir=args.documents_dir,
+                target_dim=args.embedding_dim,
+            )
+        else:
+            db.import_directory(
+                args.data_dir,
+                documents_dir=args.documents_dir,
+                target_dim=args.embedding_dim,
+            )
+            import_stats = {"mode": "full"}
+        snapshot = db.build_indexes(write_search_snapshot=not args.no_snapshot, cascade=args.cascade)
         db.stats()
 
         # Collect stats for JSON output
@@ -1050,11 +1566,17 @@ def main():
         )
         result = ok_result(
             "build_db",
-            output={"db": str(args.output) if args.output else None},
+            output={
+                "db": str(args.output) if args.output else None,
+                "snapshot": snapshot["path"] if snapshot else None,
+            },
             data_dir=str(args.data_dir),
             documents_dir=str(args.documents_dir or (args.data_dir / "documents")),
             embedding_dim=args.embedding_dim,
+            cascade=args.cascade,
             mode="fast",
+            import_mode=import_stats["mode"],
+            documents=import_stats.get("documents"),
             counts={
                 "nodes_by_type": nodes_by_type,
                 "edges_by_type": edges_by_type,
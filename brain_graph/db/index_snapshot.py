@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Persistent search index snapshot for brain-graph.
+
+Building the chunk HNSW index and the FTS index takes minutes on a large vault,
+so the search daemon must not redo that work on every start. Instead,
+`BrainGraphDB.build_indexes()` writes a snapshot database next to the main DB:
+
+    .brain_graph/brain.duckdb           -> main database (agents, CLI tools)
+    .brain_graph/brain.snapshot.duckdb  -> search snapshot
+
+The snapshot contains the search tables, the persisted HNSW graphs
+(DuckDB experimental HNSW persistence), the FTS schema `fts_main_nodes`
+(dictionary, postings, stats, stopwords), the BM25 engine postings (see
+bm25_index.py), the materialized document relevance (relevance.py), the
+quantized embedding codes (quantized_index.py), the ART lookup indexes of the
+typo, trigram and BM25 indexes and an `index_snapshot` manifest with a content
+fingerprint of the main DB.
+
+`open_search_connection()` opens the snapshot read-only and compares the
+fingerprint against the main DB. Only when it no longer matches (or the snapshot
+is missing/broken) the snapshot is rebuilt; the in-memory copy is the last
+resort when no snapshot can be written.
+
+The snapshot is written to a temp file and swapped in with `os.replace()`, so a
+running daemon keeps serving its (old) file while `brain db build` runs.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+
+SNAPSHOT_VERSION = 10
+SNAPSHOT_TABLE = "index_snapshot"
+
+# Tables copied into the snapshot (and into memory for the fallback path).
+SEARCH_TABLES = [
+    "nodes",
+    "edges",
+    "chunk_embeddings_256d",
+    "code_embeddings_256d",
+    "taxonomy_embeddings_256d",
+    "embedding_sources",
+    "embedding_cascade",
+    "meta",
+    "german_stopwords",
+    "full_vector_store",
+    "full_vector_rows",
+    "vocabulary",
+    "token_postings",
+    "typo_deletes",
+    "trigram_nodes",
+    "trigram_postings",
+    "bm25_terms",
+    "bm25_blocks",
+    "bm25_docs",
+    "document_relevance",
+    "chunk_embeddings_quantized",
+    "code_embeddings_quantized",
+    "embedding_scales",
+]
+
+# Views recreated from their stored definition (they only reference SEARCH_TABLES).
+SEARCH_VIEWS = [
+    "relevance_scores",
+]
+
+# HNSW indexes: (index name, table, column)
+HNSW_INDEXES = [
+    ("idx_chunk_embeddings_hnsw", "chunk_embeddings_256d", "embedding"),
+    ("idx_code_embeddings_hnsw", "code_embeddings_256d", "embedding"),
+    ("idx_taxonomy_embeddings_hnsw", "taxonomy_embeddings_256d", "embedding"),
+]
+
+# ART indexes for point lookups (typo_index.py, trigram_index.py, bm25_index.py):
+# (index name, table, column).
+# Skipped where the column already has a PRIMARY KEY/UNIQUE index (nodes.id in the main DB).
+LOOKUP_INDEXES = [
+    ("idx_typo_deletes_variant", "typo_deletes", "variant"),
+    ("idx_token_postings_token", "token_postings", "token_id"),
+    ("idx_trigram_postings_trigram", "trigram_postings", "trigram"),
+    ("idx_trigram_nodes_key", "trigram_nodes", "node_key"),
+    ("idx_nodes_id", "nodes", "id"),
+    ("idx_bm25_terms_term", "bm25_terms", "term"),
+    ("idx_bm25_blocks_term", "bm25_blocks", "term_id"),
+    ("idx_bm25_docs_doc", "bm25_docs", "doc_id"),
+]
+
+FTS_SCHEMA = "fts_main_nodes"
+
+_CONNECT_CONFIG = {
+    "allow_unsigned_extensions": "true",
+    "hnsw_enable_experimental_persistence": "true",
+}
+
+
+def _sql_quote(value: str) -> str:
+    """Escape a string for use as a single-quoted SQL literal."""
+    return value.replace("'", "''")
+
+
+def snapshot_path_for(db_path: Path | str) -> Path:
+    """Return the snapshot path for a main DB (`brain.duckdb` -> `brain.snapshot.duckdb`)."""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.snapshot{db_path.suffix or '.duckdb'}")
+
+
+def connect(
+    db_path: Path | str = ":memory:", *, read_only: bool = False
+) -> duckdb.DuckDBPyConnection:
+    """
+    Open a DuckDB connection with HNSW persistence enabled.
+
+    Setting `hnsw_enable_experimental_persistence` requires the vss extension to be
+    autoloadable. In offline environments without vss we fall back to a plain
+    connection (HNSW indexes are then skipped by the index builders).
+    """
+    try:
+        return duckdb.connect(str(db_path), read_only=read_only, config=dict(_CONNECT_CONFIG))
+    except duckdb.InvalidInputException as e:
+        if "hnsw_enable_experimental_persistence" not in str(e):
+            raise
+        print(
+            f"Warning: HNSW persistence unavailable, connecting without it ({e})",
+            file=sys.stderr,
+        )
+        return duckdb.connect(
+            str(db_path),
+            read_only=read_only,
+            config={"allow_unsigned_extensions": "true"},
+        )
+
+
+def load_extensions(
+    con: duckdb.DuckDBPyConnection, names: tuple[str, ...] = ("vss", "fts")
+) -> dict[str, bool]:
+    """LOAD extensions (falling back to INSTALL+LOAD); never fails hard."""
+    loaded: dict[str, bool] = {}
+    for ext in names:
+        try:
+            con.execute(f"LOAD {ext};")
+            loaded[ext] = True
+        except duckdb.Error:
+            try:
+                con.execute(f"INSTALL {ext};")
+                con.execute(f"LOAD {ext};")
+                loaded[ext] = True
+            except duckdb.Error as e:
+                print(
+                    f"Warning: Could not load DuckDB extension '{ext}' ({e})",
+                    file=sys.stderr,
+                )
+                loaded[ext] = False
+    return loaded
+
+
+def table_exists(
+    con: duckdb.DuckDBPyConnection, table: str, catalog: str | None = None
+) -> bool:
+    """Check whether a table exists (in `catalog`, default: current database)."""
+    if catalog:
+        row = con.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE database_name = ? AND table_name = ?",
+            [catalog, table],
+        ).fetchone()
+    else:
+        row = con.execute(
+            """
+            SELECT COUNT(*) FROM duckdb_tables()
+            WHERE database_name = current_database() AND table_name = ?
+            """,
+            [table],
+        ).fetchone()
+    return bool(row and row[0])
+
+
+def relation_exists(con: duckdb.DuckDBPyConnection, name: str) -> bool:
+    """Check whether a table or view `name` exists in the current database."""
+    row = con.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM duckdb_tables()
+             WHERE database_name = current_database() AND table_name = ?)
+          + (SELECT COUNT(*) FROM duckdb_views()
+             WHERE database_name = current_database() AND view_name = ?)
+        """,
+        [name, name],
+    ).fetchone()
+    return bool(row and row[0])
+
+
+def view_definitions(con: duckdb.DuckDBPyConnection, catalog: str) -> list[str]:
+    """Return the CREATE VIEW statements of SEARCH_VIEWS defined in `catalog`."""
+    rows = con.execute(
+        """
+        SELECT view_name, sql FROM duckdb_views()
+        WHERE database_name = ? AND NOT internal
+        """,
+        [catalog],
+    ).fetchall()
+    by_name = dict(rows)
+    return [by_name[name] for name in SEARCH_VIEWS if name in by_name]
+
+
+def content_fingerprint(con: duckdb.DuckDBPyConnection, catalog: str | None = None) -> str:
+    """
+    Fingerprint the indexed content of a brain-graph database.
+
+    Covers document hashes (meta), the FTS-indexed node columns, the rows (keys
+    and values) of the edge, embedding, quantized and cascade tables, the full
+    vector store file (size, mtime) and the stopword list. The materialized
+    document relevance is left out: it
+    moves daily and the search daemon reloads it itself (relevance.py). Cheap
+    enough to run on every daemon start.
+    """
+    prefix = f"{catalog}." if catalog else ""
+    parts = [f"v{SNAPSHOT_VERSION}"]
+
+    if table_exists(con, "meta", catalog):
+        row = con.execute(
+            f"""
+            SELECT COUNT(*), md5(COALESCE(string_agg(ulid || ':' || source_hash, ',' ORDER BY ulid), ''))
+            FROM {prefix}meta
+            """
+        ).fetchone()
+        parts.append(f"meta:{row[0]}:{row[1]}")
+
+    if table_exists(con, "nodes", catalog):
+        row = con.execute(
+            f"""
+            SELECT COUNT(*), COALESCE(bit_xor(hash(id, text, summary, title, description)), 0)
+            FROM {prefix}nodes
+            """
+        ).fetchone()
+        parts.append(f"nodes:{row[0]}:{row[1]}")
+
+    for table in [
+        "edges",
+        "chunk_embeddings_256d",
+        "code_embeddings_256d",
+        "taxonomy_embeddings_256d",
+        "chunk_embeddings_quantized",
+        "code_embeddings_quantized",
+        "embedding_scales",
+        "embedding_cascade",
+        "full_vector_store",
+        "full_vector_rows",
+    ]:
+        if table_exists(con, table, catalog):
+            # Whole-row hash: a re-embedded chunk keeps its id but not its vector
+            row = con.execute(
+                f"SELECT COUNT(*), COALESCE(bit_xor(hash(t)), 0) FROM {prefix}{table} t"
+            ).fetchone()
+            parts.append(f"{table}:{row[0]}:{row[1]}")
+
+    if table_exists(con, "full_vector_store", catalog):
+        # The matrix itself lives next to the database (vector_store.py)
+        for (path,) in con.execute(f"SELECT path FROM {prefix}full_vector_store").fetchall():
+            try:
+                stat = os.stat(path)
+                parts.append(f"vectors:{path}:{stat.st_size}:{stat.st_mtime_ns}")
+            except OSError:
+                parts.append(f"vectors:{path}:missing")
+
+    if table_exists(con, "german_stopwords", catalog):
+        row = con.execute(
+            f"""
+            SELECT md5(COALESCE(string_agg(word, ',' ORDER BY word), ''))
+            FROM {prefix}german_stopwords
+            """
+        ).fetchone()
+        parts.append(f"stopwords:{row[0]}")
+
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def build_fts_index(con: duckdb.DuckDBPyConnection, stopwords_table: str | None = None) -> bool:
+    """Create the BM25 index on nodes (German stemmer + stopwords). Returns success."""
+    if stopwords_table is None:
+        stopwords_table = "german_stopwords" if table_exists(con, "german_stopwords") else "none"
+    try:
+        con.execute(
+            f"""
+            PRAGMA create_fts_index(
+                'nodes', 'id', 'text', 'summary', 'title', 'description',
+                stemmer='german',
+                stopwords='{stopwords_table}',
+                ignore='(\\.|[^a-zäöüß])+',
+                strip_accents=1,
+                lower=1,
+                overwrite=1
+            )
+            """
+        )
+        return True
+    except duckdb.Error as e:
+        print(f"    Warning: Could not build FTS index, skipping ({e})", file=sys.stderr)
+        return False
+
+
+def build_hnsw_indexes(con: duckdb.DuckDBPyConnection) -> list[str]:
+    """Create the cosine HNSW indexes for all non-empty embedding tables."""
+    built: list[str] = []
+    for name, table, column in HNSW_INDEXES:
+        if not table_exists(con, table):
+            continue
+        count = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if count == 0:
+            continue
+        try:
+            con.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS {name}
+                ON {table}
+                USING HNSW ({column})
+                WITH (metric = 'cosine')
+                """
+            )
+            built.append(name)
+        except duckdb.Error as e:
+            print(f"    Warning: Could not build HNSW index {name}, skipping ({e})", file=sys.stderr)
+    return built
+
+
+def build_lookup_indexes(con: duckdb.DuckDBPyConnection) -> list[str]:
+    """Create the ART lookup indexes whose tables exist; returns their names."""
+    built = []
+    for name, table, column in LOOKUP_INDEXES:
+        if not table_exists(con, table):
+            continue
+        indexed = con.execute(
+            """
+            SELECT COUNT(*) FROM duckdb_constraints()
+            WHERE database_name = current_database() AND table_name = ?
+              AND constraint_type IN ('PRIMARY KEY', 'UNIQUE')
+              AND constraint_column_names = [?]
+            """,
+            [table, column],
+        ).fetchone()[0]
+        if not indexed:
+            con.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+            built.append(name)
+    return built
+
+
+def build_search_indexes(con: duckdb.DuckDBPyConnection) -> dict[str, Any]:
+    """Build HNSW + FTS + lookup indexes on the search tables of `con`."""
+    loaded = load_extensions(con)
+    hnsw = build_hnsw_indexes(con) if loaded.get("vss") else []
+    fts = build_fts_index(con) if loaded.get("fts") else False
+    return {"hnsw_indexes": hnsw, "fts_index": fts, "lookup_indexes": build_lookup_indexes(con)}
+
+
+def write_snapshot(
+    con: duckdb.DuckDBPyConnection,
+    snapshot_path: Path | str,
+    *,
+    catalog: str | None = None,
+) -> dict[str, Any]:
+    """
+    Write a search snapshot from the tables visible in `con`.
+
+    `catalog` qualifies the source tables (e.g. an ATTACHed read-only main DB).
+    The snapshot is built in `<snapshot>.tmp` and atomically moved into place.
+    """
+    start = time.perf_counter()
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    for stale in (tmp_path, tmp_path.with_name(tmp_path.name + ".wal")):
+        if stale.exists():
+            stale.unlink()
+
+    fingerprint = content_fingerprint(con, catalog)
+    prefix = f"{catalog}." if catalog else ""
+
+    con.execute(f"ATTACH '{_sql_quote(tmp_path.as_posix())}' AS snapshot_db")
+    try:
+        for table in SEARCH_TABLES:
+            if table_exists(con, table, catalog):
+                con.execute(f"CREATE TABLE snapshot_db.{table} AS SELECT * FROM {prefix}{table}")
+    finally:
+        con.execute("DETACH snapshot_db")
+    source_catalog = catalog or con.execute("SELECT current_database()").fetchone()[0]
+    views = view_definitions(con, source_catalog)
+
+    snap = connect(tmp_path)
+    try:
+        for view_sql in views:
+            snap.execute(view_sql)
+        indexes = build_search_indexes(snap)
+        snap.execute(
+            f"""
+            CREATE OR REPLACE TABLE {SNAPSHOT_TABLE} (
+                version INTEGER,
+                fingerprint VARCHAR,
+                hnsw_indexes VARCHAR[],
+                fts_index BOOLEAN,
+                duckdb_version VARCHAR,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        snap.execute(
+            f"""
+            INSERT INTO {SNAPSHOT_TABLE} (version, fingerprint, hnsw_indexes, fts_index, duckdb_version)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                SNAPSHOT_VERSION,
+                fingerprint,
+                indexes["hnsw_indexes"],
+                indexes["fts_index"],
+                duckdb.__version__,
+            ],
+        )
+        snap.execute("CHECKPOINT")
+    finally:
+        snap.close()
+
+    os.replace(tmp_path, snapshot_path)
+    return {
+        "path": str(snapshot_path),
+        "fingerprint": fingerprint,
+        **indexes,
+        "duration_ms": int((time.perf_counter() - start) * 1000),
+    }
+
+
+def read_manifest(con: duckdb.DuckDBPyConnection) -> dict[str, Any] | None:
+    """Read the snapshot manifest (None if `con` is not a snapshot)."""
+    if not table_exists(con, SNAPSHOT_TABLE):
+        return None
+    row = con.execute(
+        f"""
+        SELECT version, fingerprint, hnsw_indexes, fts_index, duckdb_version, created_at
+        FROM {SNAPSHOT_TABLE}
+        LIMIT 1
+        """
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        "version": row[0],
+        "fingerprint": row[1],
+        "hnsw_indexes": list(row[2] or []),
+        "fts_index": bool(row[3]),
+        "duckdb_version": row[4],
+        "created_at": str(row[5]) if row[5] is not None else None,
+    }
+
+
+def validate_snapshot(
+    con: duckdb.DuckDBPyConnection, expected_fingerprint: str | None
+) -> tuple[bool, str]:
+    """Check manifest version, fingerprint and presence of the recorded indexes."""
+    manifest = read_manifest(con)
+    if manifest is None:
+        return False, "missing manifest"
+    if manifest["version"] != SNAPSHOT_VERSION:
+        return False, f"snapshot version {manifest['version']} != {SNAPSHOT_VERSION}"
+    if expected_fingerprint is not None and manifest["fingerprint"] != expected_fingerprint:
+        return False, "fingerprint mismatch"
+
+    existing = {
+        row[0] for row in con.execute("SELECT index_name FROM duckdb_indexes()").fetchall()
+    }
+    missing = [name for name in manifest["hnsw_indexes"] if name not in existing]
+    if missing:
+        return False, f"missing HNSW indexes: {', '.join(missing)}"
+    if manifest["fts_index"]:
+        has_fts = con.execute(
+            "SELECT COUNT(*) FROM duckdb_schemas() WHERE schema_name = ?", [FTS_SCHEMA]
+        ).fetchone()[0]
+        if not has_fts:
+            return False, "missing FTS index"
+    return True, "ok"
+
+
+def source_fingerprint(db_path: Path | str) -> str | None:
+    """Fingerprint the main DB without keeping it open (None if it cannot be read)."""
+    try:
+        con = duckdb.connect(":memory:")
+    except duckdb.Error:
+        return None
+    try:
+        con.execute(f"ATTACH '{_sql_quote(Path(db_path).as_posix())}' AS disk_db (READ_ONLY)")
+        return content_fingerprint(con, "disk_db")
+    except duckdb.Error as e:
+        print(f"Warning: Could not fingerprint {db_path} ({e})", file=sys.stderr)
+        return None
+    finally:
+        con.close()
+
+
+def load_into_memory(db_path: Path | str) -> tuple[duckdb.DuckDBPyConnection, dict[str, Any]]:
+    """Copy the search tables into `:memory:` and build the indexes there (slow path)."""
+    con = duckdb.connect(":memory:")
+    con.execute(f"ATTACH '{_sql_quote(Path(db_path).as_posix())}' AS disk_db (READ_ONLY)")
+    for table in SEARCH_TABLES:
+        if table_exists(con, table, "disk_db"):
+            print(f"  Loading table: {table}", file=sys.stderr)
+            con.execute(f"CREATE TABLE {table} AS SELECT * FROM disk_db.{table}")
+    views = view_definitions(con, "disk_db")
+    con.execute("DETACH disk_db")
+    for view_sql in views:
+        con.execute(view_sql)
+
+    print("Building indexes...", file=sys.stderr)
+    return con, build_search_indexes(con)
+
+
+def open_snapshot(snapshot_path: Path | str) -> duckdb.DuckDBPyConnection:
+    """Open a snapshot read-only with the search extensions loaded."""
+    con = connect(snapshot_path, read_only=True)
+    load_extensions(con)
+    return con
+
+
+def open_search_connection(
+    db_path: Path | str,
+    *,
+    snapshot_path: Path | str | None = None,
+    rebuild_snapshot: bool = True,
+) -> tuple[duckdb.DuckDBPyConnection, dict[str, Any]]:
+    """
+    Return a connection ready for searching plus info about how it was obtained.
+
+    `info["source"]` is one of:
+    - "snapshot": valid snapshot opened as-is (fast path)
+    - "rebuilt_snapshot": snapshot was stale/missing and has been rewritten
+    - "memory": tables copied into memory and indexed (no snapshot possible)
+    """
+    db_path = Path(db_path)
+    snapshot_path = Path(snapshot_path) if snapshot_path else snapshot_path_for(db_path)
+    fingerprint = source_fingerprint(db_path)
+    info: dict[str, Any] = {"snapshot": str(snapshot_path), "fingerprint": fingerprint}
+
+    reason = "snapshot not found"
+    if snapshot_path.exists():
+        try:
+            con = open_snapshot(snapshot_path)
+            valid, reason = validate_snapshot(con, fingerprint)
+            if valid:
+                info.update(source="snapshot", manifest=read_manifest(con))
+                if fingerprint is None:
+                    info["warning"] = "fingerprint unverified (main DB not readable)"
+                return con, info
+            con.close()
+        except duckdb.Error as e:
+            reason = f"snapshot unreadable ({e})"
+    info["reason"] = reason
+    print(f"Index snapshot not usable: {reason}", file=sys.stderr)
+
+    if rebuild_snapshot:
+        print(f"Rebuilding index snapshot {snapshot_path}...", file=sys.stderr)
+        try:
+            source = duckdb.connect(":memory:")
+            try:
+                source.execute(
+                    f"ATTACH '{_sql_quote(db_path.as_posix())}' AS disk_db (READ_ONLY)"
+                )
+                written = write_snapshot(source, snapshot_path, catalog="disk_db")
+            finally:
+                source.close()
+            con = open_snapshot(snapshot_path)
+            info.update(source="rebuilt_snapshot", manifest=read_manifest(con), written=written)
+            return con, info
+        except (duckdb.Error, OSError) as e:
+            print(f"Warning: Could not write index snapshot ({e})", file=sys.stderr)
+            info["snapshot_error"] = str(e)
+
+    con, indexes = load_into_memory(db_path)
+    info.update(source="memory", **indexes)
+    return con, info
@@ -0,0 +1,241 @@
+"""
+Matryoshka cascade search over growing embedding prefixes.
+
+Jina v3 embeddings are Matryoshka-trained: every prefix of a vector is itself
+a usable (lower-resolution) embedding. The database stores the 256d prefix
+(`chunk_embeddings_256d`) and the full vectors (`full_vector_store`, see
+vector_store.py). A cascade scans every chunk with a small prefix and
+re-scores shrinking candidate sets with longer prefixes:
+
+    64:2000,256:200,1024   -> 64d over all chunks, keep 2000
+                           -> 256d over those, keep 200
+                           -> 1024d over those, keep `limit`
+
+Each level is (dim, candidates kept for the next level); the last level keeps
+the requested number of results. `BrainGraphDB.build_indexes()` records the
+configured cascade in `embedding_cascade(level, dim, candidates)` next to
+`embedding_sources`; `MatryoshkaCascade.load()` uses it unless levels are
+given. Prefixes are re-normalized, so each level ranks by the cosine
+similarity of its prefix. Later levels gather their rows by position: from
+the memory-mapped store, or (without a store) from the 256d vectors that
+`load()` keeps in memory. The search daemon uses a cascade as first stage of
+semantic search with `--first-stage cascade`.
+
+`python -m brain_graph.benchmarks.cascade` reports latency and recall per
+configuration.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import duckdb
+import numpy as np
+
+from brain_graph.db.index_snapshot import table_exists
+from brain_graph.db.vector_store import VECTOR_ROWS_TABLE, FullVectorStore, open_vector_store
+
+
+CASCADE_TABLE = "embedding_cascade"
+DEFAULT_CASCADE = "64:2000,256:200,1024"
+
+
+@dataclass(frozen=True)
+class CascadeLevel:
+    """One level: prefix dimension and rows kept for the next level (0 on the last level)."""
+
+    dim: int
+    candidates: int = 0
+
+
+def parse_cascade(spec: str) -> tuple[CascadeLevel, ...]:
+    """
+    Parse "dim:candidates,...,dim" (e.g. "64:2000,256:200,1024").
+
+    Dimensions must increase and candidate counts must not; the last level
+    has no count (it keeps the requested number of results).
+    """
+    levels: list[CascadeLevel] = []
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    for i, part in enumerate(parts):
+        dim, _, candidates = part.partition(":")
+        last = i == len(parts) - 1
+        if last and candidates:
+            raise ValueError(f"Last cascade level takes no candidate count: {part}")
+        if not last and not candidates:
+            raise ValueError(f"Cascade level needs a candidate count (dim:candidates): {part}")
+        levels.append(CascadeLevel(int(dim), int(candidates) if candidates else 0))
+    if not levels:
+        raise ValueError("Empty cascade")
+    for prev, level in zip(levels, levels[1:]):
+        if level.dim <= prev.dim:
+            raise ValueError(f"Cascade dimensions must increase: {spec}")
+        if level.candidates and level.candidates > prev.candidates:
+            raise ValueError(f"Cascade candidate counts must not increase: {spec}")
+    if any(level.dim <= 0 for level in levels) or any(level.candidates < 0 for level in levels):
+        raise ValueError(f"Cascade dimensions and counts must be positive: {spec}")
+    return tuple(levels)
+
+
+def format_cascade(levels: tuple[CascadeLevel, ...]) -> str:
+    """Inverse of parse_cascade()."""
+    return ",".join(f"{l.dim}:{l.candidates}" if l.candidates else str(l.dim) for l in levels)
+
+
+def record_cascade(con: duckdb.DuckDBPyConnection, levels: tuple[CascadeLevel, ...]) -> None:
+    """Store the configured cascade in `embedding_cascade`."""
+    con.execute(f"CREATE OR REPLACE TABLE {CASCADE_TABLE} (level INTEGER, dim INTEGER, candidates INTEGER)")
+    con.executemany(
+        f"INSERT INTO {CASCADE_TABLE} VALUES (?, ?, ?)",
+        [(i, level.dim, level.candidates) for i, level in enumerate(levels)],
+    )
+
+
+def recorded_cascade(con: duckdb.DuckDBPyConnection) -> tuple[CascadeLevel, ...] | None:
+    """The cascade recorded by `brain db build`, if any."""
+    if not table_exists(con, CASCADE_TABLE):
+        return None
+    rows = con.execute(f"SELECT dim, candidates FROM {CASCADE_TABLE} ORDER BY level").fetchall()
+    return tuple(CascadeLevel(dim, candidates) for dim, candidates in rows) or None
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _normalize(query: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(query)
+    return query / norm if norm else query
+
+
+def _stored_vectors(con: duckdb.DuckDBPyConnection) -> tuple[list[str], np.ndarray]:
+    """(ids, float32 vectors) of `chunk_embeddings_256d`."""
+    table = con.execute(
+        "SELECT chunk_id, embedding FROM chunk_embeddings_256d WHERE embedding IS NOT NULL ORDER BY chunk_id"
+    ).to_arrow_table()
+    ids = table.column("chunk_id").to_pylist()
+    dim = table.schema.field("embedding").type.list_size
+    flat = table.column("embedding").combine_chunks().flatten().to_numpy(zero_copy_only=False)
+    return ids, np.asarray(flat, dtype=np.float32).reshape(len(ids), dim)
+
+
+class MatryoshkaCascade:
+    """
+    In-memory first-level prefixes of all chunks plus the sources of longer prefixes.
+
+    Longer prefixes come from the full-vector store (rows at `offsets`) or,
+    without a store, from `vectors` (the stored 256d vectors, in memory); both
+    are indexed like `ids`. Levels longer than the available vectors are
+    clamped to the available dimension.
+    """
+
+    def __init__(
+        self,
+        levels: tuple[CascadeLevel, ...],
+        ids: list[str],
+        prefix: np.ndarray,
+        store: FullVectorStore | None,
+        offsets: np.ndarray | None,
+        vectors: np.ndarray | None = None,
+    ):
+        self.levels = levels
+        self.ids = ids
+        self.prefix = prefix
+        self.store = store
+        self.offsets = offsets
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of the first-level prefixes (and of the in-memory vectors without a store)."""
+        return self.prefix.nbytes + (self.vectors.nbytes if self.vectors is not None else 0)
+
+    @classmethod
+    def load(
+        cls, con: duckdb.DuckDBPyConnection, levels: tuple[CascadeLevel, ...] | str | None = None
+    ) -> MatryoshkaCascade:
+        """Load the first-level prefixes for `levels` (default: recorded, else DEFAULT_CASCADE)."""
+        if isinstance(levels, str):
+            levels = parse_cascade(levels)
+        levels = levels or recorded_cascade(con) or parse_cascade(DEFAULT_CASCADE)
+
+        store = open_vector_store(con)
+        ids, vectors = _stored_vectors(con)
+        available = max(vectors.shape[1], store.dim if store is not None else 0)
+        clamped: list[CascadeLevel] = []
+        for level in levels:
+            level = CascadeLevel(min(level.dim, available), level.candidates)
+            if clamped and clamped[-1].dim == level.dim:
+                clamped[-1] = CascadeLevel(level.dim, level.candidates)
+            else:
+                clamped.append(level)
+        levels = tuple(clamped)
+
+        offsets = None
+        if store is not None:
+            by_id = dict(con.execute(f"SELECT chunk_id, row_offset FROM {VECTOR_ROWS_TABLE}").fetchall())
+            offsets = np.array([by_id.get(chunk_id, -1) for chunk_id in ids], dtype=np.int64)
+
+        first = levels[0].dim
+        if first <= vectors.shape[1]:
+            prefix = vectors[:, :first]
+        else:
+            # First level longer than the stored prefix: read it from the store
+            assert store is not None and offsets is not None
+            known = offsets >= 0
+            ids = [chunk_id for chunk_id, ok in zip(ids, known) if ok]
+            offsets = offsets[known]
+            prefix = np.asarray(store.matrix[offsets][:, :first], dtype=np.float32)
+        prefix = np.ascontiguousarray(_normalize_rows(prefix), dtype=np.float32)
+        if store is not None or len(levels) == 1:
+            return cls(levels, ids, prefix, store, offsets)
+        # No store: later levels re-score from the stored vectors, kept in memory
+        return cls(levels, ids, prefix, None, None, np.ascontiguousarray(vectors[:, : levels[-1].dim]))
+
+    def _similarities(self, rows: np.ndarray, query: np.ndarray, dim: int, fallback: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the `dim` prefixes of `rows` (rows without vectors keep `fallback`)."""
+        if self.vectors is not None:
+            return _normalize_rows(self.vectors[rows, :dim]) @ _normalize(query[:dim])
+        sims = fallback.astype(np.float32, copy=True)
+        if self.store is not None and self.offsets is not None:
+            offsets = self.offsets[rows]
+            known = offsets >= 0
+            if known.any():
+                sims[known] = self.store.similarities(offsets[known], query[:dim].tolist())
+        return sims
+
+    def search(
+        self,
+        query_embedding: list[float],
+        limit: int,
+        stats: dict[str, Any] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Top `limit` (chunk_id, similarity at the last level's dimension), best first."""
+        if limit <= 0 or not len(self):
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        timings = []
+
+        start = time.perf_counter()
+        rows = np.arange(len(self))
+        sims = self.prefix @ _normalize(query[: self.levels[0].dim])
+        for i, level in enumerate(self.levels):
+            if i:
+                start = time.perf_counter()
+                sims = self._similarities(rows, query, level.dim, sims)
+            keep = min(level.candidates or limit, len(rows))
+            if keep < len(rows):
+                best = np.argpartition(-sims, keep - 1)[:keep]
+                rows, sims = rows[best], sims[best]
+            timings.append({"dim": level.dim, "kept": len(rows), "ms": round((time.perf_counter() - start) * 1000, 3)})
+
+        ranked = sorted(zip((self.ids[row] for row in rows), sims.tolist()), key=lambda hit: (-hit[1], hit[0]))
+        if stats is not None:
+            stats.update(cascade=format_cascade(self.levels), levels=timings)
+        return ranked[:limit]
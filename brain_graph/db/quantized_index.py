@@ -0,0 +1,304 @@
+"""
+Quantized first stage for vector search.
+
+`chunk_embeddings_256d` and `code_embeddings_256d` store `FLOAT[256]`
+(1 KB per row). `BrainGraphDB.import_directory()` also writes compact codes
+of the L2-normalized vectors:
+
+- `{kind}_embeddings_quantized(<id>, bits, codes)`: `bits` are the signs of
+  the dimensions (`UTINYINT[32]`, 32 bytes), `codes` the dimensions as int8
+  (`TINYINT[256]`, 256 bytes) with a symmetric per-dimension scale
+- `embedding_scales(kind, dim, scales)`: `scales[d] = max |x_d| / 127`, so
+  `x_d ~ codes[d] * scales[d]`
+
+`QuantizedIndex` holds bits and codes in memory (288 bytes per row instead of
+the float vectors plus an HNSW graph). A search ranks all rows by Hamming
+distance of the sign bits, ranks the shortlist by the int8 dot product and
+re-scores the best `RESCORE_CANDIDATES` with float vectors fetched by row
+position: the 256d prefixes of the full-vector store (vector_store.py, memory
+mapped) for chunks, otherwise float16 copies of the normalized vectors held
+next to the codes. Returned similarities are cosine similarities up to float16
+precision. `python -m brain_graph.benchmarks.quantization` measures recall,
+latency and memory.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Iterator
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+from brain_graph.db.index_snapshot import table_exists
+from brain_graph.db.vector_store import VECTOR_ROWS_TABLE, FullVectorStore, open_vector_store
+
+
+# kind -> (float embedding table, id column)
+QUANTIZED_SOURCES = {
+    "chunk": ("chunk_embeddings_256d", "chunk_id"),
+    "code": ("code_embeddings_256d", "code_id"),
+}
+SCALES_TABLE = "embedding_scales"
+QUANTIZED_TABLES = (*(f"{kind}_embeddings_quantized" for kind in QUANTIZED_SOURCES), SCALES_TABLE)
+
+# Search: Hamming shortlist per int8-ranked candidate, and int8-ranked
+# candidates re-scored with the float vectors (at least this many)
+HAMMING_OVERFETCH = 8
+RESCORE_CANDIDATES = 256
+
+# Set bits per byte value (np.bitwise_count needs numpy >= 2.0)
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def quantized_table(kind: str) -> str:
+    """Name of the quantized table of an embedding kind ("chunk" or "code")."""
+    return f"{kind}_embeddings_quantized"
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _read_normalized(
+    con: duckdb.DuckDBPyConnection, table: str, id_column: str, batch_rows: int
+) -> Iterator[tuple[list[str], np.ndarray]]:
+    """(ids, normalized float32 vectors) of an embedding table, in batches."""
+    result = con.execute(
+        f"SELECT {id_column}, embedding FROM {table} WHERE embedding IS NOT NULL ORDER BY {id_column}"
+    )
+    to_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+    for batch in to_reader(batch_rows):
+        if batch.num_rows == 0:
+            continue
+        ids = batch.column(0).to_pylist()
+        flat = batch.column(1).flatten().to_numpy(zero_copy_only=False).astype(np.float32)
+        yield ids, _normalize_rows(flat.reshape(len(ids), -1))
+
+
+def quantize(vectors: np.ndarray, scales: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(sign bits packed to uint8, int8 codes) of normalized vectors."""
+    bits = np.packbits(vectors > 0, axis=1)
+    codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return bits, codes
+
+
+def build_quantized_embeddings(con: duckdb.DuckDBPyConnection, batch_rows: int = 8192) -> dict[str, Any]:
+    """(Re)build the quantized tables of all embedding tables present."""
+    start = time.perf_counter()
+    con.execute(f"CREATE OR REPLACE TABLE {SCALES_TABLE} (kind VARCHAR, dim INTEGER, scales FLOAT[])")
+    rows: dict[str, int] = {}
+    for kind, (source, id_column) in QUANTIZED_SOURCES.items():
+        table = quantized_table(kind)
+        con.execute(f"DROP TABLE IF EXISTS {table}")
+        if not table_exists(con, source):
+            continue
+
+        # Pass 1: largest magnitude per dimension
+        max_abs: np.ndarray | None = None
+        for _, vectors in _read_normalized(con, source, id_column, batch_rows):
+            batch_max = np.abs(vectors).max(axis=0)
+            max_abs = batch_max if max_abs is None else np.maximum(max_abs, batch_max)
+        if max_abs is None:
+            rows[kind] = 0
+            continue
+        dim = len(max_abs)
+        scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+
+        # Pass 2: quantize with the final scales
+        batches = []
+        for ids, vectors in _read_normalized(con, source, id_column, batch_rows):
+            bits, codes = quantize(vectors, scales)
+            batches.append(
+                pa.record_batch(
+                    [
+                        pa.array(ids, pa.string()),
+                        pa.FixedSizeListArray.from_arrays(pa.array(bits.ravel(), pa.uint8()), bits.shape[1]),
+                        pa.FixedSizeListArray.from_arrays(pa.array(codes.ravel(), pa.int8()), dim),
+                    ],
+                    names=["id", "bits", "codes"],
+                )
+            )
+        con.register("_quantized_arrow", pa.Table.from_batches(batches))
+        try:
+            con.execute(
+                f"""
+                CREATE TABLE {table} AS
+                SELECT
+                    id AS {id_column},
+                    bits::UTINYINT[{(dim + 7) // 8}] AS bits,
+                    codes::TINYINT[{dim}] AS codes
+                FROM _quantized_arrow
+                ORDER BY id
+                """
+            )
+        finally:
+            con.unregister("_quantized_arrow")
+        con.execute(f"INSERT INTO {SCALES_TABLE} VALUES (?, ?, ?)", [kind, dim, scales.tolist()])
+        rows[kind] = sum(batch.num_rows for batch in batches)
+
+    return {"rows": rows, "duration_ms": round((time.perf_counter() - start) * 1000)}
+
+
+def quantized_index_available(con: duckdb.DuckDBPyConnection, kind: str = "chunk") -> bool:
+    """True if the quantized table of `kind` and the scales exist."""
+    return table_exists(con, quantized_table(kind)) and table_exists(con, SCALES_TABLE)
+
+
+class QuantizedIndex:
+    """
+    Sign bits and int8 codes of one embedding table, held in memory.
+
+    Candidates are re-scored from `store` rows at `offsets` (chunks with a
+    full-vector store covering every row) or from `vectors` (float16,
+    normalized), both indexed like `ids`.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        ids: list[str],
+        bits: np.ndarray,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        vectors: np.ndarray | None = None,
+        store: FullVectorStore | None = None,
+        offsets: np.ndarray | None = None,
+    ):
+        self.kind = kind
+        self.ids = ids
+        self.bits = bits
+        self.codes = codes
+        self.scales = scales
+        self.vectors = vectors
+        self.store = store
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return len(self.scales)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory of bits, codes and scales (ids not counted)."""
+        return self.bits.nbytes + self.codes.nbytes + self.scales.nbytes
+
+    @property
+    def rescore_nbytes(self) -> int:
+        """In-memory size of the re-score source (float16 vectors or store offsets)."""
+        if self.vectors is not None:
+            return self.vectors.nbytes
+        return self.offsets.nbytes if self.offsets is not None else 0
+
+    @classmethod
+    def load(cls, con: duckdb.DuckDBPyConnection, kind: str = "chunk") -> QuantizedIndex | None:
+        """Load the quantized table of `kind` (None if it was not built)."""
+        if not quantized_index_available(con, kind):
+            return None
+        row = con.execute(f"SELECT dim, scales FROM {SCALES_TABLE} WHERE kind = ?", [kind]).fetchone()
+        if row is None:
+            return None
+        dim, scales = row
+        source, id_column = QUANTIZED_SOURCES[kind]
+        table = con.execute(
+            f"SELECT {id_column}, bits, codes FROM {quantized_table(kind)} ORDER BY {id_column}"
+        ).to_arrow_table()
+        n = table.num_rows
+        index = cls(
+            kind,
+            table.column(0).to_pylist(),
+            table.column(1).combine_chunks().flatten().to_numpy(zero_copy_only=False).reshape(n, (dim + 7) // 8),
+            table.column(2).combine_chunks().flatten().to_numpy(zero_copy_only=False).reshape(n, dim),
+            np.asarray(scales, dtype=np.float32),
+        )
+
+        store = open_vector_store(con) if kind == "chunk" else None
+        if store is not None and store.dim >= dim:
+            by_id = dict(con.execute(f"SELECT chunk_id, row_offset FROM {VECTOR_ROWS_TABLE}").fetchall())
+            offsets = np.array([by_id.get(row_id, -1) for row_id in index.ids], dtype=np.int64)
+            if (offsets >= 0).all():
+                index.store, index.offsets = store, offsets
+                return index
+
+        ids: list[str] = []
+        batches = []
+        for batch_ids, vectors in _read_normalized(con, source, id_column, 8192):
+            ids.extend(batch_ids)
+            batches.append(vectors.astype(np.float16))
+        if ids != index.ids:
+            raise RuntimeError(f"{quantized_table(kind)} is out of date with {source} (run `brain db build`)")
+        index.vectors = np.concatenate(batches) if batches else np.empty((0, dim), dtype=np.float16)
+        return index
+
+    def _query(self, query_embedding: list[float]) -> np.ndarray:
+        query = np.asarray(query_embedding[: self.dim], dtype=np.float32)
+        norm = np.linalg.norm(query)
+        return query / norm if norm else query
+
+    def hamming_distances(self, query_embedding: list[float]) -> np.ndarray:
+        """Hamming distance of every row's sign bits to the query's."""
+        query_bits = np.packbits(self._query(query_embedding) > 0)
+        return POPCOUNT[np.bitwise_xor(self.bits, query_bits)].sum(axis=1, dtype=np.uint16)
+
+    def _candidate_rows(
+        self, query_embedding: list[float], n: int, hamming_overfetch: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(rows, int8 similarities) of the approximate top-n, best first."""
+        query = self._query(query_embedding)
+        shortlist = n * hamming_overfetch
+        if shortlist < len(self):
+            rows = np.argpartition(self.hamming_distances(query_embedding), shortlist - 1)[:shortlist]
+        else:
+            rows = np.arange(len(self))
+        scores = self.codes[rows].astype(np.float32) @ (query * self.scales)
+        if n < len(rows):
+            best = np.argpartition(-scores, n - 1)[:n]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def candidates(
+        self, query_embedding: list[float], n: int, *, hamming_overfetch: int = HAMMING_OVERFETCH
+    ) -> list[tuple[str, float]]:
+        """
+        Approximate top-n (id, int8 similarity), best first.
+
+        Rows are shortlisted by Hamming distance (n * `hamming_overfetch`),
+        the shortlist is ranked by the dot product with the int8 codes.
+        """
+        if n <= 0 or not len(self):
+            return []
+        rows, scores = self._candidate_rows(query_embedding, n, hamming_overfetch)
+        return [(self.ids[row], float(score)) for row, score in zip(rows, scores)]
+
+    def search(
+        self,
+        query_embedding: list[float],
+        n: int,
+        *,
+        rescore: int | None = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Top-n (id, cosine similarity), best first.
+
+        The best max(n, `rescore`) int8 candidates (default
+        RESCORE_CANDIDATES) are re-scored with their float vectors, fetched
+        by row position.
+        """
+        if rescore is None:
+            rescore = RESCORE_CANDIDATES
+        if n <= 0 or not len(self):
+            return []
+        rows, _ = self._candidate_rows(query_embedding, max(n, rescore), HAMMING_OVERFETCH)
+        if self.store is not None and self.offsets is not None:
+            sims = self.store.similarities(self.offsets[rows], list(query_embedding[: self.dim]))
+        else:
+            assert self.vectors is not None
+            sims = self.vectors[rows].astype(np.float32) @ self._query(query_embedding)
+        ranked = sorted(zip((self.ids[row] for row in rows), sims.tolist()), key=lambda hit: (-hit[1], hit[0]))
+        return ranked[:n]
@@ -0,0 +1,138 @@
+"""
+Materialized document relevance for relevance-aware semantic search.
+
+The `relevance_scores` view (db_builder.py) evaluates the relevance model from
+docs/information_decay.md (importance, uses, decay over days since the last
+change) against `CURRENT_TIMESTAMP` on every read. Ranking by
+`similarity * 0.6 + relevance / 10 * 0.4` inside the HNSW query would evaluate
+it for every chunk and rules out the index, so the scores are materialized:
+
+- `document_relevance(source_file, ulid, relevance, computed_at)`: one row
+  per document; chunks inherit the score of their document (`source_file`)
+
+`BrainGraphDB.build_indexes()` refreshes the table, the agent daemon refreshes
+it daily (the recency term only moves by days). The table is not part of the
+snapshot fingerprint, so a refresh does not trigger a snapshot rebuild. The
+search daemon holds the snapshot read-only and keeps its scores current with
+`reload_relevance()`: the same computation (from the snapshot's `meta` and
+`relevance_scores`) into an in-memory catalog `live_relevance`, which the
+helpers below prefer over the snapshot's copy. `semantic_search()` reads the
+HNSW top-N by distance, re-scores those chunks with the stored relevance and
+widens N until no unseen chunk can reach the top-k: an unseen chunk is at most
+as similar as the N-th hit, so it scores at most
+`combined_score(similarity of hit N, max_relevance())`.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import duckdb
+
+from brain_graph.db.index_snapshot import relation_exists, table_exists
+
+
+RELEVANCE_TABLE = "document_relevance"
+LIVE_CATALOG = "live_relevance"
+
+# Final ranking: similarity * SIMILARITY_WEIGHT + relevance / RELEVANCE_SCALE * RELEVANCE_WEIGHT
+SIMILARITY_WEIGHT = 0.6
+RELEVANCE_WEIGHT = 0.4
+RELEVANCE_SCALE = 10.0
+
+
+def combined_score(similarity: float, relevance: float) -> float:
+    """Ranking score of a chunk (same formula as ChunkMatrix.top_k with relevance)."""
+    return similarity * SIMILARITY_WEIGHT + (relevance / RELEVANCE_SCALE) * RELEVANCE_WEIGHT
+
+
+def _materialize(con: duckdb.DuckDBPyConnection, table: str) -> dict[str, Any]:
+    start = time.perf_counter()
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {table} AS
+        SELECT
+            m.source_file,
+            r.ulid,
+            COALESCE(r.relevance_score, 0.0)::FLOAT AS relevance,
+            CURRENT_TIMESTAMP::TIMESTAMP AS computed_at
+        FROM relevance_scores r
+        JOIN meta m USING (ulid)
+        ORDER BY m.source_file
+        """
+    )
+    documents, max_relevance = con.execute(
+        f"SELECT COUNT(*), COALESCE(MAX(relevance), 0.0) FROM {table}"
+    ).fetchone()
+    return {
+        "documents": documents,
+        "max_relevance": float(max_relevance),
+        "duration_ms": round((time.perf_counter() - start) * 1000),
+    }
+
+
+def refresh_relevance(con: duckdb.DuckDBPyConnection) -> dict[str, Any]:
+    """(Re)compute the relevance of all documents from `meta` as of now."""
+    return _materialize(con, RELEVANCE_TABLE)
+
+
+def reload_relevance(con: duckdb.DuckDBPyConnection) -> dict[str, Any] | None:
+    """
+    Recompute the relevance into the in-memory `live_relevance` catalog.
+
+    Works on the read-only search snapshot; visible to every cursor of `con`.
+    Returns None if the database has no `meta`/`relevance_scores` to compute from.
+    """
+    if not (table_exists(con, "meta") and relation_exists(con, "relevance_scores")):
+        return None
+    con.execute(f"ATTACH IF NOT EXISTS ':memory:' AS {LIVE_CATALOG} (READ_WRITE)")
+    return _materialize(con, f"{LIVE_CATALOG}.{RELEVANCE_TABLE}")
+
+
+def _relevance_table(con: duckdb.DuckDBPyConnection) -> str | None:
+    """The materialized relevance to read: live catalog first, then the database's table."""
+    if table_exists(con, RELEVANCE_TABLE, LIVE_CATALOG):
+        return f"{LIVE_CATALOG}.{RELEVANCE_TABLE}"
+    if table_exists(con, RELEVANCE_TABLE):
+        return RELEVANCE_TABLE
+    return None
+
+
+def relevance_available(con: duckdb.DuckDBPyConnection) -> bool:
+    """True if materialized relevance (live or stored) exists."""
+    return _relevance_table(con) is not None
+
+
+def relevance_join(con: duckdb.DuckDBPyConnection, alias: str = "n") -> tuple[str, str]:
+    """
+    (JOIN clause, relevance expression) for chunk rows of `nodes` aliased `alias`.
+
+    Prefers the materialized table (live, then stored); databases without it fall back to the
+    `relevance_scores` view (keyed by node ulid), else relevance is 0.
+    """
+    table = _relevance_table(con)
+    if table is not None:
+        return (
+            f"LEFT JOIN {table} r ON r.source_file = {alias}.source_file",
+            "COALESCE(r.relevance, 0.0)",
+        )
+    if relation_exists(con, "relevance_scores"):
+        return (
+            f"LEFT JOIN relevance_scores r ON {alias}.ulid = r.ulid",
+            "COALESCE(r.relevance_score, 0.0)",
+        )
+    return "", "0.0"
+
+
+def max_relevance(con: duckdb.DuckDBPyConnection) -> float:
+    """Highest relevance any chunk can have (0 without relevance data)."""
+    table = _relevance_table(con)
+    if table is not None:
+        column, source = "relevance", table
+    elif relation_exists(con, "relevance_scores"):
+        column, source = "relevance_score", "relevance_scores"
+    else:
+        return 0.0
+    value = con.execute(f"SELECT MAX({column}) FROM {source}").fetchone()[0]
+    return max(float(value or 0.0), 0.0)
+
@@ -0,0 +1,237 @@
+"""
+Trigram index for exact string and substring search.
+
+`BrainGraphDB.build_indexes()` stores the distinct lowercase trigrams of every
+node's text (chunks, entities) and title (sections):
+
+- `trigram_nodes(node_key, node_id)`: dense integer key per indexed node
+- `trigram_postings(trigram, node_keys)`: sorted node keys per trigram
+
+A string of >= 3 chars can only occur in a node that contains all of its
+trigrams, so a lookup reads the posting lists of the query trigrams (one row
+each), intersects them rarest first and runs `LIKE`/`strpos` on those
+candidates only, fetched by id. All three lookups go through ART indexes
+(`trigram`, `node_key`, `nodes.id`; see LOOKUP_INDEXES in index_snapshot.py).
+Case-sensitive lookups use the same (lowercase) candidates and verify on the
+original text. Unselective queries are cheaper as a plain scan.
+
+`import_incremental()` keeps the index current: keys of deleted nodes are
+filtered out of the posting lists, new nodes get keys above the current
+maximum and are appended (the lists stay sorted).
+"""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import duckdb
+import numpy as np
+
+from brain_graph.db.index_snapshot import build_lookup_indexes, table_exists
+
+
+NODES_TABLE = "trigram_nodes"
+POSTINGS_TABLE = "trigram_postings"
+TRIGRAM_TABLES = (NODES_TABLE, POSTINGS_TABLE)
+
+TRIGRAM_LENGTH = 3
+BUILD_BATCH_NODES = 5_000
+# Above this share of all nodes (and MIN_CANDIDATE_LIMIT), fetching the
+# candidates by id costs as much as scanning all texts
+MAX_CANDIDATE_FRACTION = 0.02
+MIN_CANDIDATE_LIMIT = 64
+
+
+def _postings_select(keys_where: str) -> str:
+    """(trigram, sorted node keys) of the keyed nodes whose key matches `keys_where`."""
+    return f"""
+        SELECT trigram, list(node_key ORDER BY node_key) AS node_keys
+        FROM (
+            SELECT
+                k.node_key,
+                UNNEST(list_distinct([
+                    substr(s, i::INTEGER, {TRIGRAM_LENGTH})
+                    for i in range(1, length(s) - {TRIGRAM_LENGTH - 2})
+                ])) AS trigram
+            FROM {NODES_TABLE} k
+            JOIN (
+                -- Title and text joined by a newline (trigrams across it only add candidates)
+                SELECT id, lower(concat_ws(chr(10), title, text)) AS s
+                FROM nodes
+                WHERE text IS NOT NULL OR title IS NOT NULL
+            ) n ON n.id = k.node_id
+            WHERE {keys_where}
+        )
+        GROUP BY trigram
+    """
+
+
+def _add_node_keys(con: duckdb.DuckDBPyConnection, where: str) -> tuple[int, int]:
+    """Give the indexed nodes matching `where` keys above the current maximum; returns the key range."""
+    first = con.execute(f"SELECT COALESCE(MAX(node_key) + 1, 0) FROM {NODES_TABLE}").fetchone()[0]
+    con.execute(
+        f"""
+        INSERT INTO {NODES_TABLE}
+        SELECT ({first} + row_number() OVER (ORDER BY id) - 1)::INTEGER AS node_key, id AS node_id
+        FROM nodes
+        WHERE (text IS NOT NULL OR title IS NOT NULL)
+          AND id NOT IN (SELECT node_id FROM {NODES_TABLE})
+          AND ({where})
+        """
+    )
+    end = con.execute(f"SELECT COALESCE(MAX(node_key) + 1, 0) FROM {NODES_TABLE}").fetchone()[0]
+    return first, max(first, end)
+
+
+def build_trigram_index(con: duckdb.DuckDBPyConnection) -> dict[str, Any]:
+    """(Re)build node keys and posting lists of all nodes."""
+    start = time.perf_counter()
+    con.execute(f"CREATE OR REPLACE TABLE {NODES_TABLE} (node_key INTEGER, node_id VARCHAR)")
+    first, end = _add_node_keys(con, "TRUE")
+
+    # Batches of nodes keep the trigram explosion small; their lists cover
+    # ascending key ranges, so concatenating them in batch order stays sorted.
+    con.execute(
+        "CREATE OR REPLACE TEMP TABLE _trigram_batches (batch INTEGER, trigram VARCHAR, node_keys INTEGER[])"
+    )
+    for batch, low in enumerate(range(first, end, BUILD_BATCH_NODES)):
+        con.execute(
+            f"""
+            INSERT INTO _trigram_batches
+            SELECT {batch}, trigram, node_keys
+            FROM ({_postings_select(f"k.node_key >= {low} AND k.node_key < {low + BUILD_BATCH_NODES}")})
+            """
+        )
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {POSTINGS_TABLE} AS
+        SELECT trigram, flatten(list(node_keys ORDER BY batch)) AS node_keys
+        FROM _trigram_batches
+        GROUP BY trigram
+        ORDER BY trigram
+        """
+    )
+    con.execute("DROP TABLE _trigram_batches")
+
+    build_lookup_indexes(con)
+    trigrams, postings = con.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(len(node_keys)), 0) FROM {POSTINGS_TABLE}"
+    ).fetchone()
+    return {
+        "nodes": end - first,
+        "trigrams": trigrams,
+        "postings": int(postings),
+        "duration_ms": round((time.perf_counter() - start) * 1000),
+    }
+
+
+def trigram_index_available(con: duckdb.DuckDBPyConnection) -> bool:
+    """True if all trigram index tables exist."""
+    return all(table_exists(con, table) for table in TRIGRAM_TABLES)
+
+
+def remove_nodes(con: duckdb.DuckDBPyConnection, where: str) -> None:
+    """Drop the nodes matching `where` from the index (call before deleting the nodes)."""
+    keys = [
+        row[0]
+        for row in con.execute(
+            f"""
+            SELECT node_key FROM {NODES_TABLE}
+            WHERE node_id IN (SELECT id FROM nodes WHERE {where})
+            """
+        ).fetchall()
+    ]
+    if not keys:
+        return
+    con.execute(
+        f"""
+        UPDATE {POSTINGS_TABLE}
+        SET node_keys = list_filter(node_keys, k -> NOT list_contains($keys, k))
+        WHERE list_has_any(node_keys, $keys)
+        """,
+        {"keys": keys},
+    )
+    con.execute(f"DELETE FROM {POSTINGS_TABLE} WHERE len(node_keys) = 0")
+    con.execute(f"DELETE FROM {NODES_TABLE} WHERE list_contains(?, node_key)", [keys])
+
+
+def add_nodes(con: duckdb.DuckDBPyConnection, where: str) -> None:
+    """Index the (new) nodes matching `where`."""
+    first, end = _add_node_keys(con, where)
+    if first == end:
+        return
+    con.execute(
+        f"CREATE OR REPLACE TEMP TABLE _trigram_new AS {_postings_select(f'k.node_key >= {first}')}"
+    )
+    # New keys are above all existing ones: appending keeps every list sorted
+    con.execute(
+        f"""
+        UPDATE {POSTINGS_TABLE} p
+        SET node_keys = list_concat(p.node_keys, n.node_keys)
+        FROM _trigram_new n
+        WHERE p.trigram = n.trigram
+        """
+    )
+    con.execute(
+        f"""
+        INSERT INTO {POSTINGS_TABLE}
+        SELECT trigram, node_keys FROM _trigram_new
+        WHERE trigram NOT IN (SELECT trigram FROM {POSTINGS_TABLE})
+        """
+    )
+    con.execute("DROP TABLE _trigram_new")
+
+
+def query_trigrams(con: duckdb.DuckDBPyConnection, query: str) -> list[str]:
+    """Distinct trigrams of `query`, lowercased like the index (DuckDB `lower`)."""
+    lowered = con.execute("SELECT lower(?)", [query]).fetchone()[0]
+    return sorted({lowered[i : i + TRIGRAM_LENGTH] for i in range(len(lowered) - TRIGRAM_LENGTH + 1)})
+
+
+def trigram_candidates(
+    con: duckdb.DuckDBPyConnection,
+    query: str,
+    max_fraction: float | None = None,
+) -> list[str] | None:
+    """
+    Ids of the nodes that contain every trigram of `query`.
+
+    None if the index cannot narrow the search: the query is shorter than a
+    trigram, or there are more candidates than `max_fraction` of all nodes
+    (at least MIN_CANDIDATE_LIMIT). The candidates are a superset of the
+    matches and still need verification.
+    """
+    if max_fraction is None:
+        max_fraction = MAX_CANDIDATE_FRACTION
+    trigrams = query_trigrams(con, query)
+    if not trigrams:
+        return None
+    placeholders = ", ".join("?" * len(trigrams))
+    lists = (
+        con.execute(
+            f"SELECT node_keys FROM {POSTINGS_TABLE} WHERE trigram IN ({placeholders})", trigrams
+        )
+        .to_arrow_table()
+        .column(0)
+        .combine_chunks()
+    )
+    if len(lists) < len(trigrams):
+        return []
+
+    arrays = sorted((lists[i].values.to_numpy() for i in range(len(lists))), key=len)
+    keys = arrays[0]
+    for array in arrays[1:]:
+        if not len(keys):
+            return []
+        keys = np.intersect1d(keys, array, assume_unique=True)
+    if not len(keys):
+        return []
+
+    total = con.execute(f"SELECT COUNT(*) FROM {NODES_TABLE}").fetchone()[0]
+    if len(keys) > max(max_fraction * total, MIN_CANDIDATE_LIMIT):
+        return None
+    placeholders = ", ".join("?" * len(keys))
+    rows = con.execute(
+        f"SELECT node_id FROM {NODES_TABLE} WHERE node_key IN ({placeholders})", keys.tolist()
+    ).fetchall()
+    return [row[0] for row in rows]
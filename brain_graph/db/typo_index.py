@@ -0,0 +1,208 @@
+"""
+Symmetric-delete typo index (SymSpell) for fuzzy search.
+
+`BrainGraphDB.build_indexes()` tokenizes the chunk texts once and stores:
+
+- `vocabulary(token_id, token, df)`: lowercase `[a-zäöüß]+` tokens (>= 3 chars)
+- `token_postings(token_id, chunk_id, tf)`: chunks containing each token
+- `typo_deletes(variant, token_id)`: every string reachable from the token's
+  first `PREFIX_LENGTH` chars by deleting up to `MAX_DISTANCE` chars
+
+Two words within `MAX_DISTANCE` edits share a delete variant, so a typo query
+generates the deletes of its terms, looks them up (ART index on `variant`),
+verifies the candidate tokens with `editdist3` and reads their postings.
+No chunk text is tokenized at query time.
+"""
+from __future__ import annotations
+
+import re
+import time
+from typing import Any
+
+import duckdb
+import pyarrow as pa
+
+from brain_graph.db.index_snapshot import build_lookup_indexes, table_exists
+
+
+VOCABULARY_TABLE = "vocabulary"
+POSTINGS_TABLE = "token_postings"
+DELETES_TABLE = "typo_deletes"
+TYPO_TABLES = (VOCABULARY_TABLE, POSTINGS_TABLE, DELETES_TABLE)
+
+TOKEN_RE = re.compile(r"[a-zäöüß]+")
+MIN_TOKEN_LENGTH = 3
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def query_terms(text: str) -> list[str]:
+    """Distinct index tokens of a query (same tokenization as the chunk texts)."""
+    return list(dict.fromkeys(t for t in TOKEN_RE.findall(text.lower()) if len(t) >= MIN_TOKEN_LENGTH))
+
+
+def deletes(word: str, max_distance: int = MAX_DISTANCE, prefix_length: int = PREFIX_LENGTH) -> set[str]:
+    """`word[:prefix_length]` and all its variants with up to `max_distance` deleted chars."""
+    word = word[:prefix_length]
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier if len(w) > 1 for i in range(len(w))} - result
+        result |= frontier
+    return result
+
+
+def build_typo_index(con: duckdb.DuckDBPyConnection) -> dict[str, Any]:
+    """(Re)build vocabulary, postings and delete variants from the chunk nodes."""
+    start = time.perf_counter()
+    con.execute(
+        f"""
+        CREATE OR REPLACE TEMP TABLE _chunk_tokens AS
+        SELECT chunk_id, token, COUNT(*)::INTEGER AS tf
+        FROM (
+            SELECT id AS chunk_id, UNNEST(regexp_split_to_array(lower(text), '[^a-zäöüß]+')) AS token
+            FROM nodes
+            WHERE type = 'chunk' AND text IS NOT NULL
+        )
+        WHERE length(token) >= {MIN_TOKEN_LENGTH}
+        GROUP BY chunk_id, token
+        """
+    )
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {VOCABULARY_TABLE} AS
+        SELECT (row_number() OVER (ORDER BY token))::INTEGER AS token_id, token, df
+        FROM (SELECT token, COUNT(*)::INTEGER AS df FROM _chunk_tokens GROUP BY token)
+        ORDER BY token_id
+        """
+    )
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {POSTINGS_TABLE} AS
+        SELECT v.token_id, c.chunk_id, c.tf
+        FROM _chunk_tokens c JOIN {VOCABULARY_TABLE} v USING (token)
+        ORDER BY v.token_id, c.chunk_id
+        """
+    )
+    con.execute("DROP TABLE _chunk_tokens")
+
+    variants: list[str] = []
+    token_ids: list[int] = []
+    for token_id, token in con.execute(f"SELECT token_id, token FROM {VOCABULARY_TABLE}").fetchall():
+        for variant in deletes(token):
+            variants.append(variant)
+            token_ids.append(token_id)
+    deletes_arrow = pa.table(
+        {"variant": pa.array(variants, pa.string()), "token_id": pa.array(token_ids, pa.int32())}
+    )
+    con.register("_typo_deletes_arrow", deletes_arrow)
+    try:
+        con.execute(
+            f"""
+            CREATE OR REPLACE TABLE {DELETES_TABLE} AS
+            SELECT variant, token_id FROM _typo_deletes_arrow ORDER BY variant, token_id
+            """
+        )
+    finally:
+        con.unregister("_typo_deletes_arrow")
+
+    build_lookup_indexes(con)
+    vocabulary = con.execute(f"SELECT COUNT(*) FROM {VOCABULARY_TABLE}").fetchone()[0]
+    postings = con.execute(f"SELECT COUNT(*) FROM {POSTINGS_TABLE}").fetchone()[0]
+    return {
+        "tokens": vocabulary,
+        "postings": postings,
+        "deletes": len(variants),
+        "duration_ms": round((time.perf_counter() - start) * 1000),
+    }
+
+
+def typo_index_available(con: duckdb.DuckDBPyConnection) -> bool:
+    """True if all typo index tables exist."""
+    return all(table_exists(con, table) for table in TYPO_TABLES)
+
+
+def typo_matches(
+    con: duckdb.DuckDBPyConnection, terms: list[str], max_distance: int = MAX_DISTANCE
+) -> list[tuple[str, int, int]]:
+    """(term, token_id, distance) of every vocabulary token within `max_distance` of a term."""
+    if not terms:
+        return []
+    variants = sorted(set().union(*(deletes(term, max_distance) for term in terms)))
+    placeholders = ", ".join("?" * len(variants))
+    return con.execute(
+        f"""
+        WITH candidates AS (
+            SELECT DISTINCT token_id FROM {DELETES_TABLE} WHERE variant IN ({placeholders})
+        ),
+        terms AS (
+            SELECT UNNEST(?::VARCHAR[]) AS term
+        )
+        SELECT t.term, v.token_id, editdist3(t.term, v.token) AS distance
+        FROM candidates c
+        JOIN {VOCABULARY_TABLE} v USING (token_id), terms t
+        WHERE editdist3(t.term, v.token) <= ?
+        """,
+        [*variants, terms, max_distance],
+    ).fetchall()
+
+
+def typo_search(
+    con: duckdb.DuckDBPyConnection,
+    query: str,
+    limit: int = 50,
+    max_distance: int = MAX_DISTANCE,
+) -> list[tuple]:
+    """
+    Chunks containing words within `max_distance` edits of the query terms.
+
+    Returns rows (id, text, summary, source_file, matched_terms, avg_distance,
+    total_matches, fuzzy_score), best first. `max_distance` must not exceed
+    `MAX_DISTANCE` (the index only holds deletes up to that distance).
+    """
+    if max_distance > MAX_DISTANCE:
+        raise ValueError(f"Typo index supports max_distance <= {MAX_DISTANCE}")
+    matches = typo_matches(con, query_terms(query), max_distance)
+    if not matches:
+        return []
+
+    terms, token_ids, distances = (list(col) for col in zip(*matches))
+    unique_ids = sorted(set(token_ids))
+    placeholders = ", ".join("?" * len(unique_ids))
+    return con.execute(
+        f"""
+        WITH matches AS (
+            SELECT
+                UNNEST(?::VARCHAR[]) AS term,
+                UNNEST(?::INTEGER[]) AS token_id,
+                UNNEST(?::INTEGER[]) AS distance
+        ),
+        postings AS (
+            SELECT token_id, chunk_id, tf FROM {POSTINGS_TABLE} WHERE token_id IN ({placeholders})
+        ),
+        scored_chunks AS (
+            SELECT
+                p.chunk_id,
+                COUNT(DISTINCT m.term) AS matched_terms,
+                SUM(m.distance * p.tf) / SUM(p.tf) AS avg_distance,
+                SUM(p.tf) AS total_matches
+            FROM matches m JOIN postings p USING (token_id)
+            GROUP BY p.chunk_id
+        )
+        SELECT
+            n.id,
+            n.text,
+            n.summary,
+            n.source_file,
+            s.matched_terms,
+            s.avg_distance,
+            s.total_matches,
+            -- Score: matched terms (higher = better) / avg distance (lower = better)
+            (s.matched_terms * 10.0 / (1.0 + s.avg_distance)) AS fuzzy_score
+        FROM scored_chunks s
+        JOIN nodes n ON n.id = s.chunk_id
+        ORDER BY fuzzy_score DESC, s.matched_terms DESC, n.id
+        LIMIT ?
+        """,
+        [terms, token_ids, distances, *unique_ids, limit],
+    ).fetchall()
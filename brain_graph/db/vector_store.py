@@ -0,0 +1,258 @@
+"""
+Memory-mapped store of full-dimension chunk embeddings for stage-2 reranking.
+
+`brain db build` consolidates the per-document embedding Parquet files into a
+single `.npy` matrix next to the database (`brain.duckdb` -> `brain.vectors.npy`):
+
+- rows are L2-normalized and stored as float16 (float32 on request)
+- `full_vector_rows` maps chunk ids (ULIDs) to row offsets
+- `full_vector_store` records path, shape and dtype of the matrix
+
+Reranking N candidates is then one offset lookup, one gather from the memory
+map and one matrix-vector product, instead of reading whole Parquet files.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import numpy as np
+
+from brain_graph.db.index_snapshot import table_exists
+
+
+VECTOR_STORE_TABLE = "full_vector_store"
+VECTOR_ROWS_TABLE = "full_vector_rows"
+
+DEFAULT_DTYPE = "float16"
+
+_open_stores: dict[tuple[str, int], FullVectorStore] = {}
+_open_stores_lock = threading.Lock()
+
+
+def vector_store_path_for(db_path: Path | str) -> Path:
+    """Return the vector store path belonging to a database file."""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.vectors.npy")
+
+
+def _sql_quote(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _create_tables(con: duckdb.DuckDBPyConnection) -> None:
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE {VECTOR_STORE_TABLE} (
+            path VARCHAR,
+            rows BIGINT,
+            dim INTEGER,
+            dtype VARCHAR,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def build_vector_store(
+    con: duckdb.DuckDBPyConnection,
+    store_path: Path | str,
+    *,
+    dtype: str = DEFAULT_DTYPE,
+    batch_rows: int = 8192,
+) -> dict[str, Any] | None:
+    """
+    Build the consolidated full-vector matrix from `embedding_sources`.
+
+    Chunks are matched to their Parquet rows via `chunk_embeddings_256d`
+    (source_file + chunk_local_id). Returns None if there is nothing to store.
+    """
+    start = time.perf_counter()
+    store_path = Path(store_path)
+    parquet_paths = [
+        row[0]
+        for row in con.execute(
+            "SELECT DISTINCT parquet_path FROM embedding_sources WHERE parquet_path IS NOT NULL"
+        ).fetchall()
+    ]
+    _create_tables(con)
+    con.execute(
+        f"CREATE OR REPLACE TABLE {VECTOR_ROWS_TABLE} "
+        "(chunk_id VARCHAR PRIMARY KEY, row_offset INTEGER)"
+    )
+    if not parquet_paths:
+        return None
+
+    source = "[" + ", ".join(f"'{_sql_quote(p)}'" for p in parquet_paths) + "]"
+    matched = f"""
+        SELECT e.chunk_id, p.embedding
+        FROM read_parquet({source}, filename=true) p
+        JOIN embedding_sources s ON s.parquet_path = p.filename
+        JOIN chunk_embeddings_256d e
+          ON e.source_file = s.source_file
+         AND COALESCE(e.chunk_local_id, e.chunk_id) = p.chunk_idx::VARCHAR
+    """
+    dim = con.execute(f"SELECT max(len(embedding)) FROM ({matched})").fetchone()[0]
+    if not dim:
+        return None
+
+    con.execute(
+        f"""
+        INSERT INTO {VECTOR_ROWS_TABLE}
+        SELECT chunk_id, (row_number() OVER (ORDER BY chunk_id) - 1)::INTEGER
+        FROM (SELECT DISTINCT chunk_id FROM ({matched}) WHERE len(embedding) = {dim})
+        """
+    )
+    rows = con.execute(f"SELECT COUNT(*) FROM {VECTOR_ROWS_TABLE}").fetchone()[0]
+
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_name(store_path.name + ".tmp")
+    matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(rows, dim))
+    try:
+        result = con.execute(
+            f"""
+            SELECT r.row_offset, m.embedding
+            FROM ({matched}) m
+            JOIN {VECTOR_ROWS_TABLE} r USING (chunk_id)
+            WHERE len(m.embedding) = {dim}
+            """
+        )
+        # to_arrow_reader() replaces fetch_record_batch() in DuckDB >= 1.4
+        to_reader = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+        for batch in to_reader(batch_rows):
+            offsets = batch.column(0).to_numpy()
+            vectors = (
+                batch.column(1).flatten().to_numpy(zero_copy_only=False).astype(np.float32)
+            )
+            matrix[offsets] = _normalize_rows(vectors.reshape(len(offsets), dim))
+        matrix.flush()
+    finally:
+        del matrix
+    os.replace(tmp_path, store_path)
+
+    con.execute(
+        f"INSERT INTO {VECTOR_STORE_TABLE} (path, rows, dim, dtype) VALUES (?, ?, ?, ?)",
+        [str(store_path.resolve()), rows, dim, dtype],
+    )
+    return {
+        "path": str(store_path),
+        "rows": rows,
+        "dim": dim,
+        "dtype": dtype,
+        "duration_ms": int((time.perf_counter() - start) * 1000),
+    }
+
+
+class FullVectorStore:
+    """Read-only memory map of normalized full-dimension chunk embeddings."""
+
+    def __init__(self, path: Path, matrix: np.ndarray):
+        self.path = path
+        self.matrix = matrix
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def similarities(self, offsets: np.ndarray, query_embedding: list[float]) -> np.ndarray:
+        """Cosine similarity of `query_embedding` with the rows at `offsets`."""
+        dim = min(self.dim, len(query_embedding))
+        query = np.asarray(query_embedding[:dim], dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(offsets), dtype=np.float32)
+        vectors = np.asarray(self.matrix[np.sort(offsets)][:, :dim], dtype=np.float32)
+        if dim < self.dim:
+            vectors = _normalize_rows(vectors)
+        scores = vectors @ (query / norm)
+        # Undo the sort so scores line up with `offsets`
+        result = np.empty_like(scores)
+        result[np.argsort(offsets, kind="stable")] = scores
+        return result
+
+
+def _resolve_store_path(con: duckdb.DuckDBPyConnection, recorded: str) -> Path | None:
+    """Recorded absolute path, else the same file name next to the open database."""
+    path = Path(recorded)
+    if path.exists():
+        return path
+    row = con.execute(
+        "SELECT path FROM duckdb_databases() WHERE database_name = current_database()"
+    ).fetchone()
+    if row and row[0]:
+        candidate = Path(row[0]).parent / path.name
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def open_vector_store(con: duckdb.DuckDBPyConnection) -> FullVectorStore | None:
+    """Open (and cache) the vector store recorded in `con`, if it is usable."""
+    if not table_exists(con, VECTOR_STORE_TABLE) or not table_exists(con, VECTOR_ROWS_TABLE):
+        return None
+    row = con.execute(f"SELECT path, rows, dim FROM {VECTOR_STORE_TABLE} LIMIT 1").fetchone()
+    if row is None:
+        return None
+    recorded, rows, dim = row
+    path = _resolve_store_path(con, recorded)
+    if path is None:
+        return None
+
+    key = (str(path), path.stat().st_mtime_ns)
+    with _open_stores_lock:
+        store = _open_stores.get(key)
+        if store is None:
+            matrix = np.load(path, mmap_mode="r")
+            if matrix.ndim != 2 or matrix.shape != (rows, dim):
+                return None
+            store = _open_stores[key] = FullVectorStore(path, matrix)
+    return store
+
+
+def full_vector_scores(
+    con: duckdb.DuckDBPyConnection,
+    chunk_ids: list[str],
+    query_embedding_full: list[float],
+) -> dict[str, float] | None:
+    """
+    Full-dimension cosine similarity per chunk id (one gather + one matvec).
+
+    Returns None if no vector store is available; chunks missing from the
+    store are absent from the result.
+    """
+    store = open_vector_store(con)
+    if store is None:
+        return None
+    if not chunk_ids:
+        return {}
+    rows = con.execute(
+        f"""
+        SELECT chunk_id, row_offset FROM {VECTOR_ROWS_TABLE}
+        WHERE chunk_id IN (SELECT UNNEST(?::VARCHAR[]))
+        """,
+        [list(chunk_ids)],
+    ).fetchall()
+    if not rows:
+        return {}
+    offsets = np.fromiter((offset for _, offset in rows), dtype=np.int64, count=len(rows))
+    scores = store.similarities(offsets, query_embedding_full)
+    return {chunk_id: float(score) for (chunk_id, _), score in zip(rows, scores)}
+
+
+def clear_cache() -> None:
+    """Drop cached memory maps (e.g. after a rebuild in the same process)."""
+    with _open_stores_lock:
+        _open_stores.clear()
@@ -24,13 +24,11 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from bisect import bisect_left
+from typing import Any, Callable
 
 import ulid
-import pysbd
 import xxhash
-import mq as markdown_query  # External dependency
-from langdetect import detect, LangDetectException
 
 # Tree-sitter imports for code parsing
 try:
@@ -59,6 +57,13 @@ from brain_graph.utils.file_utils import (
     get_source_version,
 )
 from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
+from brain_graph.pipeline.segmenter import DEFAULT_SEGMENTER, Segmenter, get_segmenter
+from brain_graph.utils.token_counter import TokenCounter, get_token_counter
+from brain_graph.utils.language_id import (
+    RECHECK_MIN_CHARS,
+    block_language,
+    detect_document_language,
+)
 
 # -----------------------------------------------------------------------------
 # Config
@@ -75,12 +80,14 @@ def load_config(config_path: Path | None = None) -> dict[str, Any]:
     2) `config.json` (legacy fallback)
 
     For backwards compatibility, `chunking_*` keys are mapped to `chunk_*`.
+    `embedding_tokenizer` is kept so chunks are sized in embedding-model tokens.
     """
     defaults = {
         "chunk_target_tokens": 384,
         "chunk_min_tokens": 100,
         "chunk_overlap_tokens": 50,
         "chunk_language": "de",
+        "chunk_segmenter": DEFAULT_SEGMENTER,
     }
 
     if config_path is None:
@@ -120,7 +127,7 @@ def load_config(config_path: Path | None = None) -> dict[str, Any]:
             if key.startswith("chunking_"):
                 mapped_key = key.replace("chunking_", "chunk_")
                 mapped_config[mapped_key] = value
-            elif key.startswith("chunk_"):
+            elif key.startswith("chunk_") or key == "embedding_tokenizer":
                 mapped_config[key] = value
         defaults.update(mapped_config)
 
@@ -158,9 +165,16 @@ class Block:
     language: str = ""  # Code-Sprache
     char_start: int = 0
     char_end: int = 0
+    byte_start: int = 0  # UTF-8 Byte-Offsets
+    byte_end: int = 0
 
 
-HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$")
+# ATX-Heading; optionale schließende `#`-Sequenz gehört nicht zum Titel
+HEADING_RE = re.compile(r"^ {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$")
+# Code-Fence (``` oder ~~~) mit Info-String
+FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})(.*)$")
+# Zeile inkl. "\n"; anders als str.splitlines() trennt nur "\n" (nicht \x0c, \u2028, ...)
+LINE_RE = re.compile(r"[^\n]*\n|[^\n]+$")
 
 
 @dataclass
@@ -173,6 +187,8 @@ class Marker:
     content: str
     level: int = 0
     language: str = ""
+    byte_start: int = 0
+    byte_end: int = 0
 
 
 @dataclass
@@ -190,6 +206,7 @@ class CodeUnit:
     parameters: list[dict[str, Any]] = field(default_factory=list)
     return_type: str | None = None
     decorators: list[str] = field(default_factory=list)
+    calls: list[str] = field(default_factory=list)  # Namen aufgerufener Funktionen
 
 
 # -----------------------------------------------------------------------------
@@ -214,16 +231,21 @@ def get_parser(language: str) -> Parser | None:
         return _PARSERS[language]
 
     try:
-        parser = Parser()
         if language == "python":
-            parser.set_language(Language(tree_sitter_python.language()))
+            ts_language = Language(tree_sitter_python.language())
         elif language in ["javascript", "js"]:
-            parser.set_language(Language(tree_sitter_javascript.language()))
+            ts_language = Language(tree_sitter_javascript.language())
         elif language in ["typescript", "ts"]:
-            parser.set_language(Language(tree_sitter_typescript.language_typescript()))
+            ts_language = Language(tree_sitter_typescript.language_typescript())
         else:
             return None
 
+        try:
+            parser = Parser(ts_language)  # tree-sitter >= 0.22
+        except TypeError:
+            parser = Parser()
+            parser.set_language(ts_language)
+
         _PARSERS[language] = parser
         return parser
     except Exception as e:
@@ -274,16 +296,48 @@ def extract_signature(node: TSNode, code_bytes: bytes) -> str:
     return lines[0].strip() if lines else ""
 
 
+# Call-Knoten: Python `call`, JavaScript/TypeScript `call_expression`
+CALL_NODE_TYPES = frozenset({"call", "call_expression"})
+
+
+def _callee_name(node: TSNode, code_bytes: bytes) -> str:
+    """Name der aufgerufenen Funktion (`f()`, `obj.f()`, `self.f()` → "f")."""
+    func = node.child_by_field_name("function")
+    if func is not None and func.type == "attribute":
+        func = func.child_by_field_name("attribute")
+    elif func is not None and func.type == "member_expression":
+        func = func.child_by_field_name("property")
+    if func is None or func.type not in ("identifier", "property_identifier"):
+        return ""
+    return code_bytes[func.start_byte : func.end_byte].decode("utf-8")
+
+
+def _byte_to_char(code: str, code_bytes: bytes) -> Callable[[int], int]:
+    """Umrechnung Tree-sitter Byte-Offset → Zeichen-Offset in `code`."""
+    if len(code) == len(code_bytes):
+        return lambda offset: offset
+    char_starts = []
+    pos = 0
+    for ch in code:
+        char_starts.append(pos)
+        pos += len(ch.encode("utf-8"))
+    return lambda offset: bisect_left(char_starts, offset)
+
+
 def parse_code_with_treesitter(code: str, language: str) -> list[CodeUnit]:
     """
     Parse code block with Tree-sitter to extract functions/classes.
 
+    Call nodes inside a function/method are recorded as `CodeUnit.calls`
+    (callee names), so call edges come from syntax instead of substrings.
+    Single iterative pre-order walk, linear in the size of the tree.
+
     Args:
         code: Code block content
         language: Programming language
 
     Returns:
-        List of CodeUnit objects
+        List of CodeUnit objects (document order; char offsets relative to `code`)
     """
     parser = get_parser(language)
     if not parser:
@@ -291,191 +345,195 @@ def parse_code_with_treesitter(code: str, language: str) -> list[CodeUnit]:
 
     code_bytes = code.encode("utf-8")
     tree = parser.parse(code_bytes)
+    to_char = _byte_to_char(code, code_bytes)
 
     units: list[CodeUnit] = []
 
-    def visit_node(node: TSNode, parent_class: str | None = None):
-        """Recursively visit AST nodes to extract code units."""
+    def node_name(node: TSNode, types: tuple[str, ...]) -> str:
+        for child in node.children:
+            if child.type in types:
+                return code_bytes[child.start_byte : child.end_byte].decode("utf-8")
+        return ""
+
+    # (node, parent_class, enclosing function unit)
+    stack: list[tuple[TSNode, str | None, CodeUnit | None]] = [(tree.root_node, None, None)]
+    while stack:
+        node, parent_class, current = stack.pop()
+        child_class = parent_class
 
         # Python function
         if node.type == "function_definition":
-            name = ""
-            for child in node.children:
-                if child.type == "identifier":
-                    name = code_bytes[child.start_byte : child.end_byte].decode("utf-8")
-                    break
-
+            name = node_name(node, ("identifier",))
             if name:
-                signature = extract_signature(node, code_bytes)
-                docstring = extract_docstring(node, code_bytes)
-
-                unit_type = "method" if parent_class else "function"
-
-                units.append(
-                    CodeUnit(
-                        type=unit_type,
-                        name=name,
-                        signature=signature,
-                        docstring=docstring,
-                        language=language,
-                        char_start=node.start_byte,
-                        char_end=node.end_byte,
-                        parent_class=parent_class,
-                    )
+                current = CodeUnit(
+                    type="method" if parent_class else "function",
+                    name=name,
+                    signature=extract_signature(node, code_bytes),
+                    docstring=extract_docstring(node, code_bytes),
+                    language=language,
+                    char_start=to_char(node.start_byte),
+                    char_end=to_char(node.end_byte),
+                    parent_class=parent_class,
                 )
+                units.append(current)
 
-        # Python class
+        # Python class: Methoden im Body bekommen parent_class
         elif node.type == "class_definition":
-            name = ""
-            for child in node.children:
-                if child.type == "identifier":
-                    name = code_bytes[child.start_byte : child.end_byte].decode("utf-8")
-                    break
-
+            name = node_name(node, ("identifier",))
             if name:
-                signature = extract_signature(node, code_bytes)
-                docstring = extract_docstring(node, code_bytes)
-
                 units.append(
                     CodeUnit(
                         type="class",
                         name=name,
-                        signature=signature,
-                        docstring=docstring,
+                        signature=extract_signature(node, code_bytes),
+                        docstring=extract_docstring(node, code_bytes),
                         language=language,
-                        char_start=node.start_byte,
-                        char_end=node.end_byte,
+                        char_start=to_char(node.start_byte),
+                        char_end=to_char(node.end_byte),
                     )
                 )
-
-                # Visit methods inside class
-                for child in node.children:
-                    if child.type == "block":
-                        for stmt in child.children:
-                            visit_node(stmt, parent_class=name)
+                child_class = name
+                current = None
 
         # JavaScript/TypeScript function
-        elif node.type in [
-            "function_declaration",
-            "method_definition",
-            "arrow_function",
-        ]:
-            name = ""
-            for child in node.children:
-                if child.type in ["identifier", "property_identifier"]:
-                    name = code_bytes[child.start_byte : child.end_byte].decode("utf-8")
-                    break
-
+        elif node.type in ["function_declaration", "method_definition", "arrow_function"]:
+            name = node_name(node, ("identifier", "property_identifier"))
             if name or node.type == "arrow_function":
-                if not name:
-                    name = "<anonymous>"
-
-                signature = (
-                    code_bytes[node.start_byte : node.end_byte]
+                current = CodeUnit(
+                    type="function" if node.type != "method_definition" else "method",
+                    name=name or "<anonymous>",
+                    signature=code_bytes[node.start_byte : node.end_byte]
                     .decode("utf-8")
-                    .split("\n")[0]
-                )
-
-                units.append(
-                    CodeUnit(
-                        type=(
-                            "function" if node.type != "method_definition" else "method"
-                        ),
-                        name=name,
-                        signature=signature,
-                        docstring="",
-                        language=language,
-                        char_start=node.start_byte,
-                        char_end=node.end_byte,
-                        parent_class=parent_class,
-                    )
+                    .split("\n")[0],
+                    docstring="",
+                    language=language,
+                    char_start=to_char(node.start_byte),
+                    char_end=to_char(node.end_byte),
+                    parent_class=parent_class,
                 )
+                units.append(current)
 
-        # Recurse into children
-        for child in node.children:
-            visit_node(child, parent_class)
+        elif node.type in CALL_NODE_TYPES and current is not None:
+            callee = _callee_name(node, code_bytes)
+            if callee and callee not in current.calls:
+                current.calls.append(callee)
 
-    # Start traversal from root
-    visit_node(tree.root_node)
+        # Kinder in Dokumentreihenfolge (Stack → umgekehrt pushen)
+        for child in reversed(node.children):
+            stack.append((child, child_class, current))
 
     return units
 
 
-def parse_markdown(text: str) -> list[Block]:
+def scan_markers(text: str) -> list[Marker]:
     """
-    Parst Markdown in Blöcke.
+    Findet Headings und Fenced-Code-Blöcke in einem linearen Zeilen-Scan.
 
-    Strategie:
-    1. Headings und Code-Blöcke als Marker mit Position extrahieren
-    2. Nach Position sortieren
-    3. Text zwischen Markern als Content-Blöcke
+    - ATX-Headings (`# Titel`, optional mit schließenden `#`); `#tag` ohne
+      Leerzeichen ist kein Heading
+    - Fenced Code mit ``` oder ~~~ (schließender Fence: gleiches Zeichen,
+      mindestens gleich lang); ein offener Fence läuft bis Dokumentende
+    - Headings innerhalb von Code-Blöcken werden ignoriert
+
+    Offsets sind exakt (Zeichen und UTF-8-Bytes), auch wenn sich Headings
+    oder Code-Blöcke wiederholen. Marker enden vor dem Zeilenumbruch.
     """
     markers: list[Marker] = []
-
-    # Headings extrahieren
-    headings = markdown_query.run("select(.h)", text, None)
-    for item in headings:
-        if not item.text or not item.text.strip():
+    char_pos = 0
+    byte_pos = 0
+    fence: dict[str, Any] | None = None
+
+    for line in LINE_RE.findall(text):
+        body = line.rstrip("\r\n")
+        line_start = char_pos
+        line_byte_start = byte_pos
+        body_end = char_pos + len(body)
+        body_byte_end = byte_pos + len(body.encode("utf-8"))
+        char_pos += len(line)
+        byte_pos += len(line.encode("utf-8"))
+
+        if fence is not None:
+            close = FENCE_RE.match(body)
+            if (
+                close
+                and close.group(1)[0] == fence["char"]
+                and len(close.group(1)) >= fence["length"]
+                and not close.group(2).strip()
+            ):
+                markers.append(
+                    Marker(
+                        type="code",
+                        start=fence["start"],
+                        end=body_end,
+                        content="".join(fence["lines"]).removesuffix("\n").removesuffix("\r"),
+                        language=fence["language"],
+                        byte_start=fence["byte_start"],
+                        byte_end=body_byte_end,
+                    )
+                )
+                fence = None
+            else:
+                fence["lines"].append(line)
             continue
 
-        pos = text.find(item.text)
-        if pos == -1:
+        open_ = FENCE_RE.match(body)
+        if open_ and not (open_.group(1)[0] == "`" and "`" in open_.group(2)):
+            fence = {
+                "char": open_.group(1)[0],
+                "length": len(open_.group(1)),
+                "language": open_.group(2).strip(),
+                "start": line_start,
+                "byte_start": line_byte_start,
+                "lines": [],
+            }
             continue
 
-        match = HEADING_RE.match(item.text)
-        if match:
-            level = len(match.group(1))
-            title = match.group(2).strip()
-        else:
-            level = item.text.count("#", 0, 7)
-            title = item.text.lstrip("#").strip()
+        heading = HEADING_RE.match(body)
+        if heading and heading.group(2).strip():
+            markers.append(
+                Marker(
+                    type="heading",
+                    start=line_start,
+                    end=body_end,
+                    content=heading.group(2).strip(),
+                    level=len(heading.group(1)),
+                    byte_start=line_byte_start,
+                    byte_end=body_byte_end,
+                )
+            )
 
+    # Nicht geschlossener Fence: Code bis Dokumentende
+    if fence is not None:
         markers.append(
             Marker(
-                type="heading",
-                start=pos,
-                end=pos + len(item.text),
-                content=title,
-                level=level,
+                type="code",
+                start=fence["start"],
+                end=len(text),
+                content="".join(fence["lines"]).removesuffix("\n").removesuffix("\r"),
+                language=fence["language"],
+                byte_start=fence["byte_start"],
+                byte_end=byte_pos,
             )
         )
 
-    # Code-Blöcke extrahieren
-    codes = markdown_query.run("select(.code)", text, None)
-    for item in codes:
-        if not item.text or not item.text.strip():
-            continue
-
-        pos = text.find(item.text)
-        if pos == -1:
-            continue
-
-        lines = item.text.split("\n")
-        first_line = lines[0] if lines else ""
-        lang = first_line.replace("`", "").strip()
+    return markers
 
-        # Code ohne Fences
-        code_lines = (
-            lines[1:-1] if len(lines) > 2 else lines[1:] if len(lines) > 1 else []
-        )
-        code_content = "\n".join(code_lines)
 
-        markers.append(
-            Marker(
-                type="code",
-                start=pos,
-                end=pos + len(item.text),
-                content=code_content,
-                language=lang,
-            )
-        )
+def parse_markdown(text: str) -> list[Block]:
+    """
+    Parst Markdown in Blöcke.
 
-    # Nach Position sortieren
-    markers.sort(key=lambda m: m.start)
+    Strategie:
+    1. Headings und Code-Blöcke als Marker mit Position extrahieren
+       (ein linearer Scan, siehe `scan_markers`)
+    2. Text zwischen Markern als Content-Blöcke
+    """
+    markers = scan_markers(text)
 
     # Blöcke generieren
     blocks: list[Block] = []
     last_end = 0
+    last_byte_end = 0
 
     for marker in markers:
         # Text vor diesem Marker?
@@ -488,6 +546,8 @@ def parse_markdown(text: str) -> list[Block]:
                         content=text_content,
                         char_start=last_end,
                         char_end=marker.start,
+                        byte_start=last_byte_end,
+                        byte_end=marker.byte_start,
                     )
                 )
 
@@ -500,6 +560,8 @@ def parse_markdown(text: str) -> list[Block]:
                     level=marker.level,
                     char_start=marker.start,
                     char_end=marker.end,
+                    byte_start=marker.byte_start,
+                    byte_end=marker.byte_end,
                 )
             )
         elif marker.type == "code":
@@ -510,10 +572,13 @@ def parse_markdown(text: str) -> list[Block]:
                     language=marker.language,
                     char_start=marker.start,
                     char_end=marker.end,
+                    byte_start=marker.byte_start,
+                    byte_end=marker.byte_end,
                 )
             )
 
         last_end = marker.end
+        last_byte_end = marker.byte_end
 
     # Text nach letztem Marker
     if last_end < len(text):
@@ -525,6 +590,8 @@ def parse_markdown(text: str) -> list[Block]:
                     content=text_content,
                     char_start=last_end,
                     char_end=len(text),
+                    byte_start=last_byte_end,
+                    byte_end=last_byte_end + len(text_content.encode("utf-8")),
                 )
             )
 
@@ -541,57 +608,25 @@ def estimate_tokens(text: str) -> int:
     return len(text) // 4
 
 
-def detect_language(text: str, default: str = "en") -> str:
-    """
-    Erkennt Sprache eines Textes.
-
-    Returns: ISO 639-1 code ('de', 'en', etc.) oder default bei Fehler
-    """
-    if not text or len(text) < 20:
-        return default
-
-    try:
-        # Nutze ersten 500 chars für Detection
-        sample = text[:500]
-        lang = detect(sample)
-        return lang
-    except LangDetectException:
-        return default
+# Ohne konfigurierten Tokenizer: chars / 4 (wie estimate_tokens)
+_HEURISTIC_COUNTER = TokenCounter()
 
 
-def split_sentences(
-    text: str, segmenter: pysbd.Segmenter
-) -> list[tuple[str, int, int]]:
+def split_sentences(text: str, segmenter: Segmenter) -> list[tuple[str, int, int]]:
     """Splittet Text in Sätze mit Positionen.
 
     Returns: Liste von (sentence, char_start, char_end)
     """
-    sentences = segmenter.segment(text)
-    result = []
-    pos = 0
-
-    for sent in sentences:
-        sent = sent.strip()
-        if not sent:
-            continue
-
-        # Finde Satz im Text
-        idx = text.find(sent, pos)
-        if idx == -1:
-            # Fallback: schätze Position
-            idx = pos
-
-        result.append((sent, idx, idx + len(sent)))
-        pos = idx + len(sent)
-
-    return result
+    return [(text[start:end], start, end) for start, end in segmenter.spans(text)]
 
 
 def split_long_sentence(
-    text: str, char_start: int, target_tokens: int
+    text: str, char_start: int, target_tokens: int, counter: TokenCounter | None = None
 ) -> list[tuple[str, int, int]]:
     """Splittet einen zu langen Satz an Kommas, Semikola, etc."""
-    if estimate_tokens(text) <= target_tokens:
+    counter = counter or _HEURISTIC_COUNTER
+    count = counter.count
+    if count(text) <= target_tokens:
         return [(text, char_start, char_start + len(text))]
 
     import re
@@ -607,7 +642,7 @@ def split_long_sentence(
     for segment in segments:
         # Probe: würde das Hinzufügen dieses Segments zu groß?
         test_part = current_part + segment
-        test_tokens = estimate_tokens(test_part)
+        test_tokens = count(test_part)
 
         if test_tokens > target_tokens and current_part:
             # Aktuellen Part speichern
@@ -624,18 +659,20 @@ def split_long_sentence(
     if stripped:
         parts.append((stripped, current_start, current_start + len(stripped)))
 
-    # Wenn immer noch zu große Teile, hard split
+    # Wenn immer noch zu große Teile, hard split nach Tokens (nicht Zeichen)
     final_parts = []
-    max_chars = target_tokens * 4
     for part_text, part_start, part_end in parts:
-        if estimate_tokens(part_text) > target_tokens:
-            # Hard split
-            for i in range(0, len(part_text), max_chars):
-                chunk = part_text[i : i + max_chars].strip()
+        if count(part_text) > target_tokens:
+            rest, offset = part_text, part_start
+            while rest:
+                # Längster Präfix mit höchstens target_tokens Tokens
+                piece = counter.truncate(rest, target_tokens) or rest[:1]
+                chunk = piece.strip()
                 if chunk:
-                    final_parts.append(
-                        (chunk, part_start + i, part_start + i + len(chunk))
-                    )
+                    lead = len(piece) - len(piece.lstrip())
+                    final_parts.append((chunk, offset + lead, offset + lead + len(chunk)))
+                offset += len(piece)
+                rest = rest[len(piece) :]
         else:
             final_parts.append((part_text, part_start, part_end))
 
@@ -647,89 +684,88 @@ def create_adaptive_chunks(
     target_tokens: int,
     min_tokens: int,
     overlap_tokens: int,
+    counter: TokenCounter | None = None,
 ) -> list[tuple[str, int, int, int]]:
     """
     Gruppiert Sätze in Chunks mit adaptiver Größe und Overlap.
 
     Args:
         sentences: Liste von (text, char_start, char_end)
+        counter: Token-Zähler (Tokenizer des Embedding-Modells); ohne: chars / 4
 
     Returns: Liste von (chunk_text, chunk_start, chunk_end, overlap_chars)
     """
     if not sentences:
         return []
 
-    chunks: list[tuple[str, int, int, int]] = []
-    current_sents: list[tuple[str, int, int]] = []
-    current_tokens = 0
+    counter = counter or _HEURISTIC_COUNTER
 
     # Splitten von zu langen Sätzen
     processed_sentences = []
-    for sent_text, sent_start, sent_end in sentences:
-        sent_tokens = estimate_tokens(sent_text)
-
+    for (sent_text, sent_start, sent_end), sent_tokens in zip(
+        sentences, counter.count_many([s[0] for s in sentences])
+    ):
         # Wenn Satz zu lang, weiter splitten
         if sent_tokens > target_tokens:
-            sub_parts = split_long_sentence(sent_text, sent_start, target_tokens)
-            processed_sentences.extend(sub_parts)
+            processed_sentences.extend(
+                split_long_sentence(sent_text, sent_start, target_tokens, counter)
+            )
         else:
             processed_sentences.append((sent_text, sent_start, sent_end))
 
-    for sent_text, sent_start, sent_end in processed_sentences:
-        sent_tokens = estimate_tokens(sent_text)
+    # Token-Zahl pro Satz einmal (ein Batch), danach nur noch Summen
+    sentence_tokens = counter.count_many([s[0] for s in processed_sentences])
+
+    chunks: list[tuple[str, int, int, int]] = []
+    current: list[int] = []  # Indizes in processed_sentences
+    current_tokens = 0
 
+    def overlap_tail() -> tuple[list[int], int]:
+        """Letzte Sätze des aktuellen Chunks, die in overlap_tokens passen."""
+        tail: list[int] = []
+        tail_tokens = 0
+        for i in reversed(current):
+            if tail_tokens + sentence_tokens[i] > overlap_tokens:
+                break
+            tail.insert(0, i)
+            tail_tokens += sentence_tokens[i]
+        return tail, tail_tokens
+
+    def span(indices: list[int]) -> tuple[str, int, int]:
+        chunk_text = " ".join(processed_sentences[i][0] for i in indices)
+        return chunk_text, processed_sentences[indices[0]][1], processed_sentences[indices[-1]][2]
+
+    for i, sent_tokens in enumerate(sentence_tokens):
         # Passt der Satz noch rein?
         if current_tokens + sent_tokens <= target_tokens:
-            current_sents.append((sent_text, sent_start, sent_end))
+            current.append(i)
             current_tokens += sent_tokens
         else:
             # Chunk ist voll - speichern
-            if current_sents:
-                texts = [s[0] for s in current_sents]
-                chunk_text = " ".join(texts)
-                chunk_start = current_sents[0][1]
-                chunk_end = current_sents[-1][2]
+            if current:
+                chunk_text, chunk_start, chunk_end = span(current)
+                tail, tail_tokens = overlap_tail()
 
                 # Overlap berechnen
                 overlap_chars = 0
                 if chunks:
-                    overlap_sents = []
-                    overlap_tok = 0
-                    for s in reversed(current_sents):
-                        s_tok = estimate_tokens(s[0])
-                        if overlap_tok + s_tok > overlap_tokens:
-                            break
-                        overlap_sents.insert(0, s)
-                        overlap_tok += s_tok
-                    overlap_chars = sum(len(s[0]) for s in overlap_sents)
+                    overlap_chars = sum(len(processed_sentences[j][0]) for j in tail)
 
                 chunks.append((chunk_text, chunk_start, chunk_end, overlap_chars))
 
                 # Starte neuen Chunk mit Overlap
-                overlap_sents = []
-                overlap_tok = 0
-                for s in reversed(current_sents):
-                    s_tok = estimate_tokens(s[0])
-                    if overlap_tok + s_tok > overlap_tokens:
-                        break
-                    overlap_sents.insert(0, s)
-                    overlap_tok += s_tok
-
-                current_sents = overlap_sents
-                current_tokens = overlap_tok
+                current = tail
+                current_tokens = tail_tokens
 
             # Aktueller Satz zum neuen Chunk
-            current_sents.append((sent_text, sent_start, sent_end))
+            current.append(i)
             current_tokens += sent_tokens
 
     # Rest-Chunk
-    if current_sents:
-        texts = [s[0] for s in current_sents]
-        chunk_text = " ".join(texts)
-        chunk_start = current_sents[0][1]
-        chunk_end = current_sents[-1][2]
+    if current:
+        chunk_text, chunk_start, chunk_end = span(current)
 
-        remaining_tokens = estimate_tokens(chunk_text)
+        remaining_tokens = counter.count(chunk_text)
 
         # Wenn zu klein, merge mit vorigem Chunk
         if remaining_tokens < min_tokens and chunks:
@@ -740,15 +776,8 @@ def create_adaptive_chunks(
         else:
             overlap_chars = 0
             if chunks:
-                overlap_sents = []
-                overlap_tok = 0
-                for s in reversed(current_sents):
-                    s_tok = estimate_tokens(s[0])
-                    if overlap_tok + s_tok > overlap_tokens:
-                        break
-                    overlap_sents.insert(0, s)
-                    overlap_tok += s_tok
-                overlap_chars = sum(len(s[0]) for s in overlap_sents)
+                tail, _ = overlap_tail()
+                overlap_chars = sum(len(processed_sentences[j][0]) for j in tail)
             chunks.append((chunk_text, chunk_start, chunk_end, overlap_chars))
 
     return chunks
@@ -844,11 +873,28 @@ def build_graph(
     config: dict[str, Any],
     *,
     doc_ulid: str,
+    document_language: str | None = None,
 ) -> tuple[list[Node], list[Edge]]:
-    """Baut Nodes und Edges aus Blöcken."""
+    """
+    Baut Nodes und Edges aus Blöcken.
+
+    Sprache: einmal pro Dokument erkannt (oder `document_language`); nur
+    Textblöcke ab `chunk_language_recheck_chars` Zeichen werden einzeln geprüft.
+    Sätze: Segmenter aus `chunk_segmenter` ("rule" oder "pysbd").
+    Chunk-Größen in Tokens des Embedding-Modells, falls `embedding_tokenizer` gesetzt.
+    """
     nodes: list[Node] = []
     edges: list[Edge] = []
 
+    if document_language is None:
+        document_language = detect_document_language(
+            [b.content for b in blocks if b.type == "text"],
+            default=config.get("chunk_language", "en"),
+        )
+    recheck_chars = config.get("chunk_language_recheck_chars", RECHECK_MIN_CHARS)
+    segmenter_kind = config.get("chunk_segmenter", DEFAULT_SEGMENTER)
+    token_counter = get_token_counter(config)
+
     ts_bytes = _ulid_timestamp_bytes(doc_ulid)
 
     # Section-Stack für Hierarchie
@@ -862,22 +908,10 @@ def build_graph(
     prev_chunk: Node | None = None
     chunk_counter = 0
 
-    # Segmenter-Cache für verschiedene Sprachen
-    segmenter_cache: dict[str, pysbd.Segmenter] = {}
-
-    def get_segmenter(lang: str) -> pysbd.Segmenter:
-        """Holt oder erstellt Segmenter für Sprache."""
-        if lang not in segmenter_cache:
-            try:
-                segmenter_cache[lang] = pysbd.Segmenter(language=lang, clean=False)
-            except ValueError:
-                # Fallback auf Deutsch wenn Sprache nicht unterstützt
-                print(
-                    f"Warning: Language '{lang}' not supported by pysbd, falling back to 'de'",
-                    file=sys.stderr,
-                )
-                segmenter_cache[lang] = pysbd.Segmenter(language="de", clean=False)
-        return segmenter_cache[lang]
+    # Indizes statt linearer Suchen über nodes/edges
+    edge_keys: set[tuple[str, str, str]] = set()  # (from, to, type) für Dedup
+    callables: dict[str, Node] = {}  # Funktions-/Methodenname → erste Definition im Dokument
+    pending_calls: list[tuple[Node, list[str], dict[str, Node]]] = []
 
     def make_id(prefix: str, content: str) -> str:
         """Erstellt eine ID aus Prefix und Content-Hash (xxhash64)."""
@@ -938,9 +972,8 @@ def build_graph(
             if code_units:
                 # Tree-sitter erfolgreich: Erstelle Nodes für Funktionen/Klassen
                 class_nodes = {}  # name -> node (für defines-Edges)
-                function_names = {
-                    unit.name for unit in code_units if unit.type == "function"
-                }
+                block_callables: dict[str, Node] = {}  # name -> node (für calls-Edges)
+                unit_nodes: list[tuple[CodeUnit, Node]] = []
 
                 for unit in code_units:
                     # Node ID basierend auf Typ und Name
@@ -961,10 +994,14 @@ def build_graph(
                         char_end=block.char_start + unit.char_end,
                     )
                     nodes.append(node)
+                    unit_nodes.append((unit, node))
 
                     # Track classes for defines-edges
                     if unit.type == "class":
                         class_nodes[unit.name] = node
+                    else:
+                        block_callables.setdefault(unit.name, node)
+                        callables.setdefault(unit.name, node)
 
                     # Contains-Edge von aktueller Section
                     if current_section:
@@ -1000,35 +1037,10 @@ def build_graph(
                         )
                     prev_chunk = node
 
-                # Optional: Calls-Edges (einfache Heuristik basierend auf Namen)
-                # Für jede Funktion: Suche Funktionsaufrufe im Code
-                for unit in code_units:
-                    if unit.type in ["function", "method"]:
-                        code_text = block.content[unit.char_start : unit.char_end]
-                        for func_name in function_names:
-                            if func_name != unit.name and func_name in code_text:
-                                # Finde Target-Node
-                                target_nodes = [
-                                    n
-                                    for n in nodes
-                                    if n.title == func_name
-                                    and n.type in ["function", "method"]
-                                ]
-                                for target in target_nodes:
-                                    edges.append(
-                                        Edge(
-                                            from_id=next(
-                                                n
-                                                for n in nodes
-                                                if n.title == unit.name
-                                                and n.type == unit.type
-                                            ).id,
-                                            to_id=target.id,
-                                            type="calls",
-                                            weight=5,
-                                        )
-                                    )
-                                    break
+                # Calls werden nach dem letzten Block aufgelöst (Ziele auch in späteren Blöcken)
+                for unit, node in unit_nodes:
+                    if unit.calls:
+                        pending_calls.append((node, unit.calls, block_callables))
 
             else:
                 # Fallback: Atomarer Code-Block (Tree-sitter nicht verfügbar oder parsing fehlgeschlagen)
@@ -1086,27 +1098,19 @@ def build_graph(
                 agent_id = f"entity_{agent_hash}"
 
                 # Avoid duplicate edges
-                edge_exists = False
-                for e in edges:
-                    if (
-                        e.from_id == doc_ulid
-                        and e.to_id == agent_id
-                        and e.type == "authored_by"
-                    ):
-                        edge_exists = True
-                        break
-
-                if not edge_exists:
+                key = (doc_ulid, agent_id, "authored_by")
+                if key not in edge_keys:
+                    edge_keys.add(key)
                     edges.append(
                         Edge(from_id=doc_ulid, to_id=agent_id, type="authored_by")
                     )
 
             # Text → Sätze → Chunks
-            # Erkenne Sprache für diesen Block
-            block_lang = detect_language(
-                block.content, default=config.get("chunk_language", "en")
+            # Sprache für diesen Block (kurze Blöcke erben die Dokumentsprache)
+            block_lang = block_language(
+                block.content, document_language, min_chars=recheck_chars
             )
-            block_segmenter = get_segmenter(block_lang)
+            block_segmenter = get_segmenter(block_lang, segmenter_kind)
 
             sentences = split_sentences(block.content, block_segmenter)
             chunks = create_adaptive_chunks(
@@ -1114,6 +1118,7 @@ def build_graph(
                 target_tokens=config["chunk_target_tokens"],
                 min_tokens=config["chunk_min_tokens"],
                 overlap_tokens=config["chunk_overlap_tokens"],
+                counter=token_counter,
             )
 
             for idx, (chunk_text, chunk_start, chunk_end, overlap_chars) in enumerate(
@@ -1182,6 +1187,26 @@ def build_graph(
                     )
                 prev_chunk = node
 
+    # Calls-Edges aus den Call-Knoten des Syntaxbaums:
+    # erst im selben Block auflösen, dann dokumentweit (O(Aufrufe))
+    for node, calls, block_callables in pending_calls:
+        for callee in calls:
+            target = block_callables.get(callee) or callables.get(callee)
+            if target is None or target is node:
+                continue
+            key = (node.id, target.id, "calls")
+            if key in edge_keys:
+                continue
+            edge_keys.add(key)
+            edges.append(
+                Edge(
+                    from_id=node.id,
+                    to_id=target.id,
+                    type="calls",
+                    weight=5,
+                )
+            )
+
     return nodes, edges
 
 
@@ -1190,6 +1215,239 @@ def build_graph(
 # -----------------------------------------------------------------------------
 
 
+def process_file(
+    input_path: Path,
+    config: dict[str, Any] | None = None,
+    *,
+    base_dir: Path = Path(".brain_graph/data"),
+    vault_dir: Path = Path("vault"),
+    delete_source: bool = False,
+    force: bool = False,
+) -> dict[str, Any]:
+    """
+    Chunkt eine Markdown-Datei: Vault-Kopie, nodes/edges/meta schreiben.
+
+    Kern von `main()` ohne CLI; der In-Process-Runner ruft das direkt auf.
+    Wirft bei Fehlern, gibt sonst das JSON-Result zurück.
+    """
+    start = time.perf_counter()
+    if not input_path.exists():
+        raise FileNotFoundError(f"File not found: {input_path}")
+
+    # Config laden
+    if config is None:
+        config = load_config()
+
+    # Markdown parsen
+    text = input_path.read_text(encoding="utf-8")
+    had_ulid = bool(re.search(r"\+id:[A-Z0-9]{26}", text))
+
+    # ULID generieren/extrahieren und in MD injizieren
+    doc_ulid = get_or_generate_ulid(input_path, text)
+    print(f"Document ULID: {doc_ulid}", file=sys.stderr)
+
+    # Monat aus Input-Pfad nutzen (falls vault/YYYY-MM/) oder aktuellen Monat
+    parent_name = input_path.parent.name
+    if re.match(r"^\d{4}-\d{2}$", parent_name):
+        month = parent_name
+    else:
+        month = get_month_folder()
+
+    # ULID-Suffix aus stem entfernen (falls Reprocessing von vault-Datei)
+    stem = re.sub(r"-[A-Z0-9]{6}$", "", input_path.stem, flags=re.IGNORECASE)
+    slug = slugify(stem)
+    ulid_suffix = doc_ulid[-6:]
+    vault_filename = f"{slug}-{ulid_suffix}.md"
+    vault_path = vault_dir / month / vault_filename
+
+    # Vault-Verzeichnis erstellen
+    vault_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Skip-Logik: Wenn vault existiert und hash gleich
+    vault_unchanged = False
+    input_is_vault_target = False
+    try:
+        input_is_vault_target = input_path.resolve() == vault_path.resolve()
+    except OSError:
+        # Fallback for non-resolvable paths (should be rare since input exists)
+        input_is_vault_target = input_path.absolute() == vault_path.absolute()
+
+    if input_is_vault_target:
+        print("✓ Input already at vault path, skipping copy", file=sys.stderr)
+        vault_unchanged = True
+    elif vault_path.exists() and not force:
+        vault_hash = get_source_hash(vault_path)
+        input_hash = get_source_hash(input_path)
+
+        if vault_hash == input_hash:
+            print("✓ Vault file unchanged, skipping copy", file=sys.stderr)
+            vault_unchanged = True
+        else:
+            print("✎ Vault file changed, updating...", file=sys.stderr)
+
+    copied_to_vault = (not vault_unchanged) and (not input_is_vault_target)
+    # Datei nach vault kopieren (mit aktualisierter ULID)
+    if copied_to_vault:
+        import shutil
+
+        try:
+            shutil.copy2(input_path, vault_path)
+            print(f"Copied to vault: {vault_path}", file=sys.stderr)
+        except shutil.SameFileError:
+            copied_to_vault = False
+            print("✓ Input already at vault path, skipping copy", file=sys.stderr)
+
+    deleted_source = False
+    # Optional: Originaldatei löschen
+    if delete_source:
+        if input_is_vault_target:
+            print(
+                "Warning: --delete-source ignored (input is already in vault)",
+                file=sys.stderr,
+            )
+        else:
+            input_path.unlink()
+            deleted_source = True
+            print(f"Deleted source: {input_path}", file=sys.stderr)
+
+    # Ab jetzt mit vault-Datei arbeiten
+    working_file = vault_path
+    text = working_file.read_text(encoding="utf-8")
+
+    # Output-Pfade basierend auf vault-Datei generieren
+    output_paths = get_output_paths(working_file, doc_ulid, base_dir)
+    ensure_output_dirs(output_paths)
+
+    # Blocks parsen
+    blocks = parse_markdown(text)
+    print(f"Parsed {len(blocks)} blocks", file=sys.stderr)
+
+    # Sprache einmal pro Dokument; Graph bauen (lange Blöcke werden nachgeprüft)
+    document_language = detect_document_language(
+        [b.content for b in blocks if b.type == "text"],
+        default=config.get("chunk_language", "en"),
+    )
+    nodes, edges = build_graph(
+        blocks,
+        working_file.name,
+        config,
+        doc_ulid=doc_ulid,
+        document_language=document_language,
+    )
+
+    # Nodes und Edges mit leeren Feldern für spätere Schritte erweitern
+    nodes_data = []
+    for n in nodes:
+        node_dict = n.to_dict()
+        # Füge leere Felder hinzu, die von späteren Schritten gefüllt werden
+        if n.type == "chunk":
+            node_dict.setdefault("summary", None)
+            node_dict.setdefault("categories", [])
+        nodes_data.append(node_dict)
+
+    edges_data = [e.to_dict() for e in edges]
+
+    # JSON schreiben
+    output_paths["nodes"].write_text(
+        json.dumps(nodes_data, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    output_paths["edges"].write_text(
+        json.dumps(edges_data, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+    # meta.json erstellen
+    now = datetime.now(timezone.utc)
+
+    # Source hash und git version
+    source_hash = get_source_hash(vault_path)
+    git_info = get_source_version(vault_path)
+
+    # Preserve existing metadata (uses, importance, decay)
+    existing_meta = {}
+    if output_paths["meta"].exists():
+        try:
+            existing_meta = json.loads(
+                output_paths["meta"].read_text(encoding="utf-8")
+            )
+        except Exception:
+            pass
+
+    uses_count = existing_meta.get("uses", 0) + 1
+
+    meta = {
+        "source_file": str(vault_path),  # Vault-Pfad als canonical source
+        "original_source": str(input_path) if input_path != vault_path else None,
+        "ulid": doc_ulid,
+        "language": document_language,
+        "source_hash": source_hash,
+        "source_commit": git_info["source_commit"],
+        "source_commit_date": git_info["source_commit_date"],
+        "source_dirty": git_info["source_dirty"],
+        "created_at": existing_meta.get("created_at", now.isoformat()),
+        "modified_at": now.isoformat(),
+        "uses": uses_count,
+        "importance": existing_meta.get("importance"),  # Preserve or inherit
+        "decay": existing_meta.get("decay"),  # Preserve or inherit
+        "categories": existing_meta.get("categories", []),
+        "processing_steps": [
+            {
+                "step": "chunking",
+                "completed": True,
+                "timestamp": now.isoformat(),
+                "node_count": len(nodes),
+                "edge_count": len(edges),
+            }
+        ],
+    }
+
+    output_paths["meta"].write_text(
+        json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+    # Stats
+    node_types = {}
+    for n in nodes:
+        node_types[n.type] = node_types.get(n.type, 0) + 1
+
+    edge_types = {}
+    for e in edges:
+        edge_types[e.type] = edge_types.get(e.type, 0) + 1
+
+    print(
+        f"Written {output_paths['nodes']} ({len(nodes)} nodes: {node_types})",
+        file=sys.stderr,
+    )
+    print(
+        f"Written {output_paths['edges']} ({len(edges)} edges: {edge_types})",
+        file=sys.stderr,
+    )
+    print(f"Written {output_paths['meta']}", file=sys.stderr)
+
+    result = ok_result(
+        "chunker",
+        input=str(input_path),
+        doc_ulid=doc_ulid,
+        language=document_language,
+        id_was_in_source=had_ulid,
+        copied_to_vault=copied_to_vault,
+        deleted_source=deleted_source,
+        vault_path=str(vault_path),
+        output={
+            "nodes": str(output_paths["nodes"]),
+            "edges": str(output_paths["edges"]),
+            "meta": str(output_paths["meta"]),
+        },
+        counts={
+            "nodes": len(nodes),
+            "edges": len(edges),
+            "nodes_by_type": node_types,
+            "edges_by_type": edge_types,
+        },
+        duration_ms=ms_since(start),
+    )
+    return result
+
+
 def main():
     start = time.perf_counter()
     parser = argparse.ArgumentParser(description="Chunk Markdown to graph")
@@ -1234,206 +1492,13 @@ def main():
     args = parser.parse_args()
 
     try:
-        if not args.input.exists():
-            raise FileNotFoundError(f"File not found: {args.input}")
-
-        # Config laden
-        config = load_config(args.config)
-
-        # Markdown parsen
-        text = args.input.read_text(encoding="utf-8")
-        had_ulid = bool(re.search(r"\+id:[A-Z0-9]{26}", text))
-
-        # ULID generieren/extrahieren und in MD injizieren
-        doc_ulid = get_or_generate_ulid(args.input, text)
-        print(f"Document ULID: {doc_ulid}", file=sys.stderr)
-
-        # Monat aus Input-Pfad nutzen (falls vault/YYYY-MM/) oder aktuellen Monat
-        parent_name = args.input.parent.name
-        if re.match(r"^\d{4}-\d{2}$", parent_name):
-            month = parent_name
-        else:
-            month = get_month_folder()
-
-        # ULID-Suffix aus stem entfernen (falls Reprocessing von vault-Datei)
-        stem = re.sub(r"-[A-Z0-9]{6}$", "", args.input.stem, flags=re.IGNORECASE)
-        slug = slugify(stem)
-        ulid_suffix = doc_ulid[-6:]
-        vault_filename = f"{slug}-{ulid_suffix}.md"
-        vault_path = args.vault_dir / month / vault_filename
-
-        # Vault-Verzeichnis erstellen
-        vault_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Skip-Logik: Wenn vault existiert und hash gleich
-        vault_unchanged = False
-        input_is_vault_target = False
-        try:
-            input_is_vault_target = args.input.resolve() == vault_path.resolve()
-        except OSError:
-            # Fallback for non-resolvable paths (should be rare since input exists)
-            input_is_vault_target = args.input.absolute() == vault_path.absolute()
-
-        if input_is_vault_target:
-            print("✓ Input already at vault path, skipping copy", file=sys.stderr)
-            vault_unchanged = True
-        elif vault_path.exists() and not args.force:
-            vault_hash = get_source_hash(vault_path)
-            input_hash = get_source_hash(args.input)
-
-            if vault_hash == input_hash:
-                print("✓ Vault file unchanged, skipping copy", file=sys.stderr)
-                vault_unchanged = True
-            else:
-                print("✎ Vault file changed, updating...", file=sys.stderr)
-
-        copied_to_vault = (not vault_unchanged) and (not input_is_vault_target)
-        # Datei nach vault kopieren (mit aktualisierter ULID)
-        if copied_to_vault:
-            import shutil
-
-            try:
-                shutil.copy2(args.input, vault_path)
-                print(f"Copied to vault: {vault_path}", file=sys.stderr)
-            except shutil.SameFileError:
-                copied_to_vault = False
-                print("✓ Input already at vault path, skipping copy", file=sys.stderr)
-
-        deleted_source = False
-        # Optional: Originaldatei löschen
-        if args.delete_source:
-            if input_is_vault_target:
-                print(
-                    "Warning: --delete-source ignored (input is already in vault)",
-                    file=sys.stderr,
-                )
-            else:
-                args.input.unlink()
-                deleted_source = True
-                print(f"Deleted source: {args.input}", file=sys.stderr)
-
-        # Ab jetzt mit vault-Datei arbeiten
-        working_file = vault_path
-        text = working_file.read_text(encoding="utf-8")
-
-        # Output-Pfade basierend auf vault-Datei generieren
-        output_paths = get_output_paths(working_file, doc_ulid, args.base_dir)
-        ensure_output_dirs(output_paths)
-
-        # Blocks parsen
-        blocks = parse_markdown(text)
-        print(f"Parsed {len(blocks)} blocks", file=sys.stderr)
-
-        # Graph bauen (mit automatischer Spracherkennung pro Block)
-        nodes, edges = build_graph(blocks, working_file.name, config, doc_ulid=doc_ulid)
-
-        # Nodes und Edges mit leeren Feldern für spätere Schritte erweitern
-        nodes_data = []
-        for n in nodes:
-            node_dict = n.to_dict()
-            # Füge leere Felder hinzu, die von späteren Schritten gefüllt werden
-            if n.type == "chunk":
-                node_dict.setdefault("summary", None)
-                node_dict.setdefault("categories", [])
-            nodes_data.append(node_dict)
-
-        edges_data = [e.to_dict() for e in edges]
-
-        # JSON schreiben
-        output_paths["nodes"].write_text(
-            json.dumps(nodes_data, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        output_paths["edges"].write_text(
-            json.dumps(edges_data, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-
-        # meta.json erstellen
-        now = datetime.now(timezone.utc)
-
-        # Source hash und git version
-        source_hash = get_source_hash(vault_path)
-        git_info = get_source_version(vault_path)
-
-        # Preserve existing metadata (uses, importance, decay)
-        existing_meta = {}
-        if output_paths["meta"].exists():
-            try:
-                existing_meta = json.loads(
-                    output_paths["meta"].read_text(encoding="utf-8")
-                )
-            except Exception:
-                pass
-
-        uses_count = existing_meta.get("uses", 0) + 1
-
-        meta = {
-            "source_file": str(vault_path),  # Vault-Pfad als canonical source
-            "original_source": str(args.input) if args.input != vault_path else None,
-            "ulid": doc_ulid,
-            "source_hash": source_hash,
-            "source_commit": git_info["source_commit"],
-            "source_commit_date": git_info["source_commit_date"],
-            "source_dirty": git_info["source_dirty"],
-            "created_at": existing_meta.get("created_at", now.isoformat()),
-            "modified_at": now.isoformat(),
-            "uses": uses_count,
-            "importance": existing_meta.get("importance"),  # Preserve or inherit
-            "decay": existing_meta.get("decay"),  # Preserve or inherit
-            "categories": existing_meta.get("categories", []),
-            "processing_steps": [
-                {
-                    "step": "chunking",
-                    "completed": True,
-                    "timestamp": now.isoformat(),
-                    "node_count": len(nodes),
-                    "edge_count": len(edges),
-                }
-            ],
-        }
-
-        output_paths["meta"].write_text(
-            json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-
-        # Stats
-        node_types = {}
-        for n in nodes:
-            node_types[n.type] = node_types.get(n.type, 0) + 1
-
-        edge_types = {}
-        for e in edges:
-            edge_types[e.type] = edge_types.get(e.type, 0) + 1
-
-        print(
-            f"Written {output_paths['nodes']} ({len(nodes)} nodes: {node_types})",
-            file=sys.stderr,
-        )
-        print(
-            f"Written {output_paths['edges']} ({len(edges)} edges: {edge_types})",
-            file=sys.stderr,
-        )
-        print(f"Written {output_paths['meta']}", file=sys.stderr)
-
-        result = ok_result(
-            "chunker",
-            input=str(args.input),
-            doc_ulid=doc_ulid,
-            id_was_in_source=had_ulid,
-            copied_to_vault=copied_to_vault,
-            deleted_source=deleted_source,
-            vault_path=str(vault_path),
-            output={
-                "nodes": str(output_paths["nodes"]),
-                "edges": str(output_paths["edges"]),
-                "meta": str(output_paths["meta"]),
-            },
-            counts={
-                "nodes": len(nodes),
-                "edges": len(edges),
-                "nodes_by_type": node_types,
-                "edges_by_type": edge_types,
-            },
-            duration_ms=ms_since(start),
+        result = process_file(
+            args.input,
+            load_config(args.config),
+            base_dir=args.base_dir,
+            vault_dir=args.vault_dir,
+            delete_source=args.delete_source,
+            force=args.force,
         )
         if args.format == "json":
             emit_json(result, pretty=args.pretty)
@@ -25,6 +25,7 @@ from typing import Any
 import pyarrow as pa
 import pyarrow.parquet as pq
 
+from brain_graph.utils.embedding_cache import get_passage_store, hit_ratio
 from brain_graph.utils.embedding_client import embed_batch
 from brain_graph.utils.file_utils import (
     extract_ulid_from_md,
@@ -89,41 +90,18 @@ def extract_code_ranges(source_path: Path, nodes: list[dict[str, Any]]) -> tuple
     return code_texts, code_ids
 
 
-def filter_oversized_texts(texts: list[str], code_ids: list[str], max_tokens: int = 7000) -> tuple[list[str], list[str], list[int]]:
-    """Filtert zu große Code-Texte aus und gibt Indices der gefilterten zurück.
+def embed_code(
+    texts: list[str], config: dict[str, Any], stats: dict[str, int] | None = None
+) -> list[list[float]]:
+    """Embedded Code-Texte via OpenAI-kompatible API (mit Batch-Support).
 
-    Args:
-        texts: Liste von Code-Texten
-        code_ids: Liste von code IDs (parallel zu texts)
-        max_tokens: Maximale Token-Anzahl (grobe Schätzung: chars / 4)
-
-    Returns:
-        (gefilterte_texte, gefilterte_code_ids, indices_der_geskippten)
+    Unveränderte Code-Units kommen aus dem Passage-Store (Schlüssel enthält
+    das Code-Modell); nur Cache-Misses gehen an den Server.
     """
-    filtered_texts = []
-    filtered_ids = []
-    skipped = []
-
-    max_chars = max_tokens * 4  # Grobe Schätzung: 1 token ≈ 4 chars
-
-    for i, (text, code_id) in enumerate(zip(texts, code_ids)):
-        if len(text) > max_chars:
-            print(f"Warning: Skipping code unit {i} ({code_id}) (too large: {len(text)} chars, ~{len(text)//4} tokens)",
-                  file=sys.stderr)
-            skipped.append(i)
-        else:
-            filtered_texts.append(text)
-            filtered_ids.append(code_id)
-
-    return filtered_texts, filtered_ids, skipped
-
-
-def embed_code(texts: list[str], config: dict[str, Any]) -> list[list[float]]:
-    """Embedded Code-Texte via OpenAI-kompatible API (mit Batch-Support)."""
     batch_size = config.get("code_embedding_batch_size", config.get("embedding_batch_size", 32))
-    total_batches = (len(texts) - 1) // batch_size + 1
+    stats = {} if stats is None else stats
 
-    print(f"Embedding {len(texts)} code units in {total_batches} batches...", file=sys.stderr)
+    print(f"Embedding {len(texts)} code units...", file=sys.stderr)
 
     # Use code-specific config
     code_config = config.copy()
@@ -131,8 +109,17 @@ def embed_code(texts: list[str], config: dict[str, Any]) -> list[list[float]]:
     code_config["embedding_base_url"] = config.get("code_embedding_base_url", config.get("embedding_base_url"))
     code_config["embedding_api_key"] = config.get("code_embedding_api_key", config.get("embedding_api_key"))
     code_config["embedding_batch_size"] = batch_size
-
-    return embed_batch(texts, code_config)
+    # Anderes Modell, anderer Tokenizer (ohne: chars / 4)
+    code_config["embedding_tokenizer"] = config.get("code_embedding_tokenizer")
+    # Einrückung und Zeilenumbrüche sind bei Code Inhalt: Store-Key auf dem exakten Text
+    code_config["embedding_exact_keys"] = True
+
+    embeddings = embed_batch(texts, code_config, cache=get_passage_store(config), stats=stats)
+    print(
+        f"Passage store: {stats.get('hits', 0)} hits, {stats.get('misses', 0)} embedded",
+        file=sys.stderr,
+    )
+    return embeddings
 
 
 def save_parquet(
@@ -223,22 +210,9 @@ def main():
             ), args.format, args.pretty)
             return 0
 
-        # Oversized filtern
-        code_texts, code_ids, skipped = filter_oversized_texts(code_texts, code_ids)
-        if skipped:
-            print(f"Skipped {len(skipped)} oversized code units", file=sys.stderr)
-
-        if not code_texts:
-            print("All code units oversized - nothing to embed", file=sys.stderr)
-            emit_json(ok_result(
-                tool="code_embedder",
-                output={"code_count": len(code_ids) + len(skipped), "embedded_count": 0, "skipped_count": len(skipped)},
-                duration_ms=ms_since(start)
-            ), args.format, args.pretty)
-            return 0
-
-        # Embeddings erstellen
-        embeddings = embed_code(code_texts, config)
+        # Embeddings erstellen (zu große Code-Units kürzt der Client statt sie zu verwerfen)
+        cache_stats: dict[str, int] = {}
+        embeddings = embed_code(code_texts, config, cache_stats)
         print(f"Created {len(embeddings)} embeddings", file=sys.stderr)
 
         # Output directories sicherstellen
@@ -263,12 +237,13 @@ def main():
         emit_json(ok_result(
             tool="code_embedder",
             output={
-                "code_count": len(code_texts) + len(skipped),
+                "code_count": len(code_texts),
                 "embedded_count": len(embeddings),
-                "skipped_count": len(skipped),
+                "truncated_count": cache_stats.get("truncated", 0),
                 "output_file": str(code_parquet_path),
             },
             counts={"code_units": len(code_texts), "embeddings": len(embeddings)},
+            embedding_cache=hit_ratio(cache_stats),
             duration_ms=ms_since(start)
         ), args.format, args.pretty)
 
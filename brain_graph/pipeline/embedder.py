@@ -26,6 +26,7 @@ from typing import Any
 import pyarrow as pa
 import pyarrow.parquet as pq
 
+from brain_graph.utils.embedding_cache import get_passage_store, hit_ratio
 from brain_graph.utils.embedding_client import embed_batch
 from brain_graph.utils.file_utils import (
     extract_ulid_from_md,
@@ -134,44 +135,23 @@ def extract_text_ranges(source_path: Path, nodes: list[dict[str, Any]], edges: l
     return texts, chunk_ids
 
 
-def filter_oversized_texts(texts: list[str], chunk_ids: list[str], max_tokens: int = 7000) -> tuple[list[str], list[str], list[int]]:
-    """Filtert zu große Texte aus und gibt Indices der gefilterten zurück.
+def embed_texts(
+    texts: list[str], config: dict[str, Any], stats: dict[str, int] | None = None
+) -> list[list[float]]:
+    """Embedded Texte via OpenAI-kompatible API (mit Batch-Support).
 
-    Args:
-        texts: Liste von Texten
-        chunk_ids: Liste von chunk IDs (parallel zu texts)
-        max_tokens: Maximale Token-Anzahl (grobe Schätzung: chars / 4)
-                    Default 7000 tokens für jina-embeddings-v2-base-de (~8k context)
-
-    Returns:
-        (gefilterte_texte, gefilterte_chunk_ids, indices_der_geskippten)
+    Unveränderte Passagen kommen aus dem Passage-Store (Hash aus Modell +
+    normalisiertem Text); nur Cache-Misses gehen an den Server.
     """
-    filtered_texts = []
-    filtered_ids = []
-    skipped = []
-
-    max_chars = max_tokens * 4  # Grobe Schätzung: 1 token ≈ 4 chars
-
-    for i, (text, chunk_id) in enumerate(zip(texts, chunk_ids)):
-        if len(text) > max_chars:
-            print(f"Warning: Skipping text {i} ({chunk_id}) (too large: {len(text)} chars, ~{len(text)//4} tokens)",
-                  file=sys.stderr)
-            skipped.append(i)
-        else:
-            filtered_texts.append(text)
-            filtered_ids.append(chunk_id)
-
-    return filtered_texts, filtered_ids, skipped
-
-
-def embed_texts(texts: list[str], config: dict[str, Any]) -> list[list[float]]:
-    """Embedded Texte via OpenAI-kompatible API (mit Batch-Support)."""
-    batch_size = config.get("embedding_batch_size", 32)
-    total_batches = (len(texts) - 1) // batch_size + 1
+    stats = {} if stats is None else stats
+    print(f"Embedding {len(texts)} texts...", file=sys.stderr)
 
-    print(f"Embedding {len(texts)} texts in {total_batches} batches...", file=sys.stderr)
-
-    return embed_batch(texts, config)
+    embeddings = embed_batch(texts, config, cache=get_passage_store(config), stats=stats)
+    print(
+        f"Passage store: {stats.get('hits', 0)} hits, {stats.get('misses', 0)} embedded",
+        file=sys.stderr,
+    )
+    return embeddings
 
 
 def save_parquet(
@@ -203,6 +183,103 @@ def save_parquet(
     pq.write_table(table, output_path, compression="zstd")
 
 
+def process_file(
+    input_path: Path,
+    config: dict[str, Any] | None = None,
+    *,
+    base_dir: Path = Path(".brain_graph/data"),
+) -> dict[str, Any]:
+    """Embedded die Chunks einer Datei und schreibt das Parquet (Kern von `main()`)."""
+    start = time.perf_counter()
+    if not input_path.exists():
+        raise FileNotFoundError(f"Source file not found: {input_path}")
+
+    # Config laden
+    if config is None:
+        config = load_config()
+
+    # ULID aus Markdown extrahieren
+    doc_ulid = extract_ulid_from_md(input_path)
+    if not doc_ulid:
+        raise ValueError(f"No ULID found in {input_path}. Run chunker.py first.")
+
+    print(f"Document ULID: {doc_ulid}", file=sys.stderr)
+
+    # Output-Pfade finden
+    output_paths = get_output_paths(input_path, doc_ulid, base_dir)
+
+    # Nodes und Edges laden
+    if not output_paths['nodes'].exists():
+        raise FileNotFoundError(f"Nodes file not found: {output_paths['nodes']}")
+
+    nodes = json.loads(output_paths['nodes'].read_text(encoding="utf-8"))
+
+    edges = None
+    if output_paths['edges'].exists():
+        edges = json.loads(output_paths['edges'].read_text(encoding="utf-8"))
+        print(f"Loaded {len(edges)} edges", file=sys.stderr)
+
+    # Texte extrahieren
+    print(f"Extracting text ranges from {input_path}", file=sys.stderr)
+    texts, chunk_ids = extract_text_ranges(input_path, nodes, edges)
+    print(f"Extracted {len(texts)} texts", file=sys.stderr)
+
+    if not texts:
+        raise ValueError("No texts extracted")
+
+    # Debug: Text-Größen
+    sizes = [len(t) for t in texts]
+    print(
+        f"Text sizes: min={min(sizes)}, max={max(sizes)}, avg={sum(sizes)//len(sizes)}",
+        file=sys.stderr,
+    )
+
+    # Embeddings erzeugen (zu große Texte kürzt der Client statt sie zu verwerfen)
+    cache_stats: dict[str, int] = {}
+    embeddings = embed_texts(texts, config, cache_stats)
+
+    # Dimension validieren
+    actual_dim = len(embeddings[0])
+    if actual_dim != config["embedding_dim"]:
+        print(f"Warning: expected dim {config['embedding_dim']}, got {actual_dim}", file=sys.stderr)
+
+    # Parquet schreiben
+    save_parquet(embeddings, chunk_ids, output_paths['embeddings'], config, input_path.name)
+    print(f"Written {output_paths['embeddings']} ({len(embeddings)} embeddings)", file=sys.stderr)
+
+    # Update meta
+    update_meta(
+        output_paths['meta'],
+        {
+            "step": "embedding",
+            "embedding_count": len(embeddings),
+            "model": config["embedding_model"],
+            "dim": actual_dim,
+        },
+    )
+    print(f"Updated {output_paths['meta']}", file=sys.stderr)
+
+    result = ok_result(
+        "embedder",
+        input=str(input_path),
+        doc_ulid=doc_ulid,
+        output={
+            "embeddings": str(output_paths["embeddings"]),
+            "meta": str(output_paths["meta"]),
+        },
+        counts={
+            "texts_extracted": len(texts),
+            "texts_embedded": len(embeddings),
+            "chunks_embedded": len(chunk_ids),
+            "truncated_texts": cache_stats.get("truncated", 0),
+        },
+        embedding={"model": config.get("embedding_model"), "dim": actual_dim},
+        embedding_cache=hit_ratio(cache_stats),
+        duration_ms=ms_since(start),
+    )
+    return result
+
+
 def main():
     start = time.perf_counter()
     parser = argparse.ArgumentParser(description="Embed texts to Parquet")
@@ -221,97 +298,7 @@ def main():
     args = parser.parse_args()
 
     try:
-        if not args.input.exists():
-            raise FileNotFoundError(f"Source file not found: {args.input}")
-
-        # Config laden
-        config = load_config(args.config)
-
-        # ULID aus Markdown extrahieren
-        doc_ulid = extract_ulid_from_md(args.input)
-        if not doc_ulid:
-            raise ValueError(f"No ULID found in {args.input}. Run chunker.py first.")
-
-        print(f"Document ULID: {doc_ulid}", file=sys.stderr)
-
-        # Output-Pfade finden
-        output_paths = get_output_paths(args.input, doc_ulid, args.base_dir)
-
-        # Nodes und Edges laden
-        if not output_paths['nodes'].exists():
-            raise FileNotFoundError(f"Nodes file not found: {output_paths['nodes']}")
-
-        nodes = json.loads(output_paths['nodes'].read_text(encoding="utf-8"))
-
-        edges = None
-        if output_paths['edges'].exists():
-            edges = json.loads(output_paths['edges'].read_text(encoding="utf-8"))
-            print(f"Loaded {len(edges)} edges", file=sys.stderr)
-
-        # Texte extrahieren
-        print(f"Extracting text ranges from {args.input}", file=sys.stderr)
-        texts, chunk_ids = extract_text_ranges(args.input, nodes, edges)
-        print(f"Extracted {len(texts)} texts", file=sys.stderr)
-
-        if not texts:
-            raise ValueError("No texts extracted")
-
-        # Debug: Text-Größen
-        sizes = [len(t) for t in texts]
-        print(
-            f"Text sizes: min={min(sizes)}, max={max(sizes)}, avg={sum(sizes)//len(sizes)}",
-            file=sys.stderr,
-        )
-
-        # Filter zu große Texte
-        texts, chunk_ids, skipped_indices = filter_oversized_texts(texts, chunk_ids)
-        if skipped_indices:
-            print(f"Skipped {len(skipped_indices)} oversized texts", file=sys.stderr)
-
-        if not texts:
-            raise ValueError("No texts remaining after filtering")
-
-        # Embeddings erzeugen
-        embeddings = embed_texts(texts, config)
-
-        # Dimension validieren
-        actual_dim = len(embeddings[0])
-        if actual_dim != config["embedding_dim"]:
-            print(f"Warning: expected dim {config['embedding_dim']}, got {actual_dim}", file=sys.stderr)
-
-        # Parquet schreiben
-        save_parquet(embeddings, chunk_ids, output_paths['embeddings'], config, args.input.name)
-        print(f"Written {output_paths['embeddings']} ({len(embeddings)} embeddings)", file=sys.stderr)
-
-        # Update meta
-        update_meta(
-            output_paths['meta'],
-            {
-                "step": "embedding",
-                "embedding_count": len(embeddings),
-                "model": config["embedding_model"],
-                "dim": actual_dim,
-            },
-        )
-        print(f"Updated {output_paths['meta']}", file=sys.stderr)
-
-        result = ok_result(
-            "embedder",
-            input=str(args.input),
-            doc_ulid=doc_ulid,
-            output={
-                "embeddings": str(output_paths["embeddings"]),
-                "meta": str(output_paths["meta"]),
-            },
-            counts={
-                "texts_extracted": len(texts) + len(skipped_indices),
-                "texts_embedded": len(embeddings),
-                "chunks_embedded": len(chunk_ids),
-                "skipped_texts": len(skipped_indices),
-            },
-            embedding={"model": config.get("embedding_model"), "dim": actual_dim},
-            duration_ms=ms_since(start),
-        )
+        result = process_file(args.input, load_config(args.config), base_dir=args.base_dir)
         if args.format == "json":
             emit_json(result, pretty=args.pretty)
         return 0
@@ -208,6 +208,172 @@ def apply_verified_categories(
     return updated_nodes, category_edges
 
 
+def process_file(
+    input_path: Path,
+    config: dict[str, Any] | None = None,
+    *,
+    taxonomy: Path = Path(".brain_graph/config/taxonomy.md.nodes.json"),
+    base_dir: Path = Path(".brain_graph/data"),
+    client: OpenAI | None = None,
+    categories: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """
+    Verifiziert die Kategorien einer Datei via LLM (Kern von `main()`).
+
+    `client` und `categories` (Taxonomy-Nodes) können vorab erzeugt übergeben
+    werden, damit der In-Process-Runner sie über Dateien hinweg wiederverwendet.
+    """
+    start = time.perf_counter()
+    if not input_path.exists():
+        raise FileNotFoundError(f"Source file not found: {input_path}")
+
+    # ULID extrahieren
+    doc_ulid = extract_ulid_from_md(input_path)
+    if not doc_ulid:
+        raise ValueError(f"No ULID found in {input_path}")
+
+    # Pfade ermitteln
+    output_paths = get_output_paths(input_path, doc_ulid, base_dir)
+
+    if not output_paths['nodes'].exists():
+        raise FileNotFoundError(f"Nodes file not found: {output_paths['nodes']} (run chunker.py and taxonomy_matcher.py first)")
+
+    if categories is None and not taxonomy.exists():
+        raise FileNotFoundError(f"Taxonomy file not found: {taxonomy}")
+
+    # Config laden
+    if config is None:
+        config = load_config()
+
+    # LLM Client
+    if client is None:
+        client = OpenAI(
+            base_url=config["summary_base_url"],
+            api_key=config["summary_api_key"],
+        )
+
+    # Lade Daten
+    print("Loading data...", file=sys.stderr)
+    nodes = json.loads(output_paths['nodes'].read_text(encoding="utf-8"))
+    if categories is None:
+        categories = json.loads(taxonomy.read_text(encoding="utf-8"))
+
+    # Lade Edges
+    edges = []
+    if output_paths['edges'].exists():
+        edges = json.loads(output_paths['edges'].read_text(encoding="utf-8"))
+
+    print(f"Loaded {len(nodes)} nodes, {len(categories)} categories", file=sys.stderr)
+
+    # Sammle Chunks mit Kategorien
+    chunks_with_categories = []
+    for node in nodes:
+        if node.get("type") == "chunk" and node.get("categories"):
+            chunks_with_categories.append((node["id"], node["categories"]))
+
+    if not chunks_with_categories:
+        print("Warning: No chunks with categories found. Run taxonomy_matcher.py first.", file=sys.stderr)
+        return ok_result(
+            "llm_verifier",
+            status="skipped",
+            input=str(input_path),
+            doc_ulid=doc_ulid,
+            reason="no_chunks_with_categories",
+            duration_ms=ms_since(start),
+        )
+
+    print(f"Found {len(chunks_with_categories)} chunks with categories", file=sys.stderr)
+
+    # Verifiziere Kategorien
+    print("Verifying categories via LLM...", file=sys.stderr)
+    verified_categories = {}
+
+    for i, (chunk_id, current_cats) in enumerate(chunks_with_categories, 1):
+        print(f"  {i}/{len(chunks_with_categories)}: {chunk_id} ({len(current_cats)} cats)", file=sys.stderr)
+
+        # Extrahiere Text
+        text = extract_chunk_text(chunk_id, input_path, nodes, edges)
+        if not text:
+            print(f"    Warning: No text for {chunk_id}", file=sys.stderr)
+            verified_categories[chunk_id] = current_cats
+            continue
+
+        # Verifiziere
+        verified = verify_categories(text, current_cats, categories, client, config["summary_model"])
+
+        if len(verified) < len(current_cats):
+            removed = set(current_cats) - set(verified)
+            print(f"    Removed: {removed}", file=sys.stderr)
+
+        verified_categories[chunk_id] = verified
+
+    print(f"Verified {len(verified_categories)} chunks", file=sys.stderr)
+
+    # Stats
+    original_count = sum(len(cats) for _, cats in chunks_with_categories)
+    verified_count = sum(len(cats) for cats in verified_categories.values())
+    removed_count = original_count - verified_count
+
+    print(f"Original: {original_count} assignments", file=sys.stderr)
+    print(f"Verified: {verified_count} assignments", file=sys.stderr)
+    print(f"Removed: {removed_count} false positives", file=sys.stderr)
+
+    # Apply verified categories (in-place update)
+    updated_nodes, category_edges = apply_verified_categories(nodes, verified_categories)
+
+    # Schreibe nodes.json zurück
+    output_paths['nodes'].write_text(
+        json.dumps(updated_nodes, ensure_ascii=False, indent=2),
+        encoding="utf-8"
+    )
+    print(f"Updated {output_paths['nodes']}", file=sys.stderr)
+
+    # Merge category-edges in edges.json (remove old, add new)
+    if output_paths['edges'].exists():
+        existing_edges = json.loads(output_paths['edges'].read_text(encoding="utf-8"))
+        existing_edges = [e for e in existing_edges if e.get('type') != 'categorized_as']
+        existing_edges.extend(category_edges)
+    else:
+        existing_edges = category_edges
+
+    output_paths['edges'].write_text(
+        json.dumps(existing_edges, ensure_ascii=False, indent=2),
+        encoding="utf-8"
+    )
+    print(f"Updated {output_paths['edges']}", file=sys.stderr)
+
+    # Update meta.json
+    update_meta(output_paths['meta'], {
+        "step": "llm_verification",
+        "original_assignments": original_count,
+        "verified_assignments": verified_count,
+        "removed_false_positives": removed_count,
+        "model": config["summary_model"]
+    })
+    print(f"Updated {output_paths['meta']}", file=sys.stderr)
+
+    result = ok_result(
+        "llm_verifier",
+        input=str(input_path),
+        doc_ulid=doc_ulid,
+        output={
+            "nodes": str(output_paths["nodes"]),
+            "edges": str(output_paths["edges"]),
+            "meta": str(output_paths["meta"]),
+        },
+        counts={
+            "chunks_verified": len(verified_categories),
+            "original_assignments": original_count,
+            "verified_assignments": verified_count,
+            "removed_false_positives": removed_count,
+            "category_edges": len(category_edges),
+        },
+        model=config.get("summary_model"),
+        duration_ms=ms_since(start),
+    )
+    return result
+
+
 def main():
     start = time.perf_counter()
     parser = argparse.ArgumentParser(description="Verify embedding-based categories via LLM")
@@ -228,152 +394,8 @@ def main():
     args = parser.parse_args()
 
     try:
-        if not args.input.exists():
-            raise FileNotFoundError(f"Source file not found: {args.input}")
-
-        # ULID extrahieren
-        doc_ulid = extract_ulid_from_md(args.input)
-        if not doc_ulid:
-            raise ValueError(f"No ULID found in {args.input}")
-
-        # Pfade ermitteln
-        output_paths = get_output_paths(args.input, doc_ulid, args.base_dir)
-
-        if not output_paths['nodes'].exists():
-            raise FileNotFoundError(f"Nodes file not found: {output_paths['nodes']} (run chunker.py and taxonomy_matcher.py first)")
-
-        if not args.taxonomy.exists():
-            raise FileNotFoundError(f"Taxonomy file not found: {args.taxonomy}")
-
-        # Config laden
-        config = load_config(args.config)
-
-        # LLM Client
-        client = OpenAI(
-            base_url=config["summary_base_url"],
-            api_key=config["summary_api_key"],
-        )
-
-        # Lade Daten
-        print("Loading data...", file=sys.stderr)
-        nodes = json.loads(output_paths['nodes'].read_text(encoding="utf-8"))
-        categories = json.loads(args.taxonomy.read_text(encoding="utf-8"))
-
-        # Lade Edges
-        edges = []
-        if output_paths['edges'].exists():
-            edges = json.loads(output_paths['edges'].read_text(encoding="utf-8"))
-
-        print(f"Loaded {len(nodes)} nodes, {len(categories)} categories", file=sys.stderr)
-
-        # Sammle Chunks mit Kategorien
-        chunks_with_categories = []
-        for node in nodes:
-            if node.get("type") == "chunk" and node.get("categories"):
-                chunks_with_categories.append((node["id"], node["categories"]))
-
-        if not chunks_with_categories:
-            print("Warning: No chunks with categories found. Run taxonomy_matcher.py first.", file=sys.stderr)
-            result = ok_result(
-                "llm_verifier",
-                status="skipped",
-                input=str(args.input),
-                doc_ulid=doc_ulid,
-                reason="no_chunks_with_categories",
-                duration_ms=ms_since(start),
-            )
-            if args.format == "json":
-                emit_json(result, pretty=args.pretty)
-            return 0
-
-        print(f"Found {len(chunks_with_categories)} chunks with categories", file=sys.stderr)
-
-        # Verifiziere Kategorien
-        print("Verifying categories via LLM...", file=sys.stderr)
-        verified_categories = {}
-
-        for i, (chunk_id, current_cats) in enumerate(chunks_with_categories, 1):
-            print(f"  {i}/{len(chunks_with_categories)}: {chunk_id} ({len(current_cats)} cats)", file=sys.stderr)
-
-            # Extrahiere Text
-            text = extract_chunk_text(chunk_id, args.input, nodes, edges)
-            if not text:
-                print(f"    Warning: No text for {chunk_id}", file=sys.stderr)
-                verified_categories[chunk_id] = current_cats
-                continue
-
-            # Verifiziere
-            verified = verify_categories(text, current_cats, categories, client, config["summary_model"])
-
-            if len(verified) < len(current_cats):
-                removed = set(current_cats) - set(verified)
-                print(f"    Removed: {removed}", file=sys.stderr)
-
-            verified_categories[chunk_id] = verified
-
-        print(f"Verified {len(verified_categories)} chunks", file=sys.stderr)
-
-        # Stats
-        original_count = sum(len(cats) for _, cats in chunks_with_categories)
-        verified_count = sum(len(cats) for cats in verified_categories.values())
-        removed_count = original_count - verified_count
-
-        print(f"Original: {original_count} assignments", file=sys.stderr)
-        print(f"Verified: {verified_count} assignments", file=sys.stderr)
-        print(f"Removed: {removed_count} false positives", file=sys.stderr)
-
-        # Apply verified categories (in-place update)
-        updated_nodes, category_edges = apply_verified_categories(nodes, verified_categories)
-
-        # Schreibe nodes.json zurück
-        output_paths['nodes'].write_text(
-            json.dumps(updated_nodes, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
-        print(f"Updated {output_paths['nodes']}", file=sys.stderr)
-
-        # Merge category-edges in edges.json (remove old, add new)
-        if output_paths['edges'].exists():
-            existing_edges = json.loads(output_paths['edges'].read_text(encoding="utf-8"))
-            existing_edges = [e for e in existing_edges if e.get('type') != 'categorized_as']
-            existing_edges.extend(category_edges)
-        else:
-            existing_edges = category_edges
-
-        output_paths['edges'].write_text(
-            json.dumps(existing_edges, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
-        print(f"Updated {output_paths['edges']}", file=sys.stderr)
-
-        # Update meta.json
-        update_meta(output_paths['meta'], {
-            "step": "llm_verification",
-            "original_assignments": original_count,
-            "verified_assignments": verified_count,
-            "removed_false_positives": removed_count,
-            "model": config["summary_model"]
-        })
-        print(f"Updated {output_paths['meta']}", file=sys.stderr)
-
-        result = ok_result(
-            "llm_verifier",
-            input=str(args.input),
-            doc_ulid=doc_ulid,
-            output={
-                "nodes": str(output_paths["nodes"]),
-                "edges": str(output_paths["edges"]),
-                "meta": str(output_paths["meta"]),
-            },
-            counts={
-                "chunks_verified": len(verified_categories),
-                "original_assignments": original_count,
-                "verified_assignments": verified_count,
-                "removed_false_positives": removed_count,
-                "category_edges": len(category_edges),
-            },
-            model=config.get("summary_model"),
-            duration_ms=ms_since(start),
+        result = process_file(
+            args.input, load_config(args.config), taxonomy=args.taxonomy, base_dir=args.base_dir
         )
         if args.format == "json":
             emit_json(result, pretty=args.pretty)
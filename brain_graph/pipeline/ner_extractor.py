@@ -12,14 +12,16 @@ Usage:
 import argparse
 import hashlib
 import json
+import re
 import sys
 import time
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
 import spacy
+from spacy.tokens import Doc
 
 from brain_graph.utils.file_utils import (
     extract_ulid_from_md,
@@ -30,6 +32,43 @@ from brain_graph.utils.file_utils import (
 )
 from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
 
+K = TypeVar("K")
+
+# Pipeline-Komponenten, die NER braucht (Rest wird beim Laden deaktiviert)
+NER_COMPONENTS = ("tok2vec", "ner")
+DEFAULT_BATCH_SIZE = 64
+
+# Filter, einmal kompiliert statt pro Entity neu aufgebaut
+_AGENT_RE = re.compile(r"&([A-Z][a-zA-Z0-9_]+)")
+_ARTIFACT_CHARS = frozenset("[]()%{")
+IGNORED_LABELS = frozenset({"MISC", "CARDINAL", "ORDINAL", "QUANTITY"})
+KNOWN_ACRONYMS = frozenset({"IBM", "BSD", "GNU", "MIT", "NASA", "CERN", "UNIX"})
+KNOWN_SINGLE_NAMES = frozenset({"Turing"})
+GENERIC_TERMS = frozenset(
+    {
+        # Deutsch
+        "intensiv",
+        "staaten",
+        "kommission",
+        "ki",
+        "al",
+        "black box",
+        "ki-systemen",
+        "ai-alignment",
+        "ki-ausrichtung",
+        "sprachzeichen",
+        "gpt-3",
+        "ki-verordnung",
+        # English
+        "cpu",
+        "gui",
+        "ram",
+        "usb",
+        "api",
+        "os",
+    }
+)
+
 
 def detect_language(nodes: list[dict[str, Any]]) -> str:
     """Erkennt vorherrschende Sprache aus Chunks."""
@@ -48,8 +87,12 @@ def detect_language(nodes: list[dict[str, Any]]) -> str:
     return most_common
 
 
-def load_spacy_model(lang: str = "de") -> spacy.Language:
-    """Lädt spaCy-Modell für Sprache."""
+def load_spacy_model(lang: str = "de", *, trim: bool = True) -> spacy.Language:
+    """Lädt spaCy-Modell für Sprache.
+
+    Mit `trim` laufen nur die Komponenten, die NER braucht (`NER_COMPONENTS`);
+    Tagger, Parser, Lemmatizer usw. werden deaktiviert.
+    """
     models = {
         "de": "de_core_news_lg",
         "en": "en_core_web_lg",
@@ -58,12 +101,16 @@ def load_spacy_model(lang: str = "de") -> spacy.Language:
     model_name = models.get(lang, "de_core_news_lg")
 
     try:
-        return spacy.load(model_name)
+        nlp = spacy.load(model_name)
     except OSError as e:
         raise RuntimeError(
             f"spaCy model '{model_name}' not found. Install with: python -m spacy download {model_name}"
         ) from e
 
+    if trim:
+        nlp.select_pipes(disable=[name for name in nlp.pipe_names if name not in NER_COMPONENTS])
+    return nlp
+
 
 def normalize_markdown(text: str) -> str:
     """Entfernt Markdown-Syntax vor NER."""
@@ -104,45 +151,28 @@ def make_entity_id(entity_text: str, entity_type: str) -> str:
     return f"entity_{short_hash}"
 
 
-def extract_entities(
-    text: str, nlp: spacy.Language, min_count: int = 1
-) -> list[tuple[str, str]]:
-    """Extrahiert Named Entities aus Text.
+def entities_from_doc(doc: Doc, text: str) -> list[tuple[str, str]]:
+    """Gefilterte Entities eines verarbeiteten spaCy-Docs (plus &Agent-Namen aus `text`).
 
     Returns: [(entity_text, entity_type), ...]
     """
-    import re
-
     # 1. Custom Agent Extraction (&Name)
-    agent_matches = re.findall(r"&([A-Z][a-zA-Z0-9_]+)", text)
-    custom_entities = []
-    for agent_name in agent_matches:
-        custom_entities.append((f"&{agent_name}", "AGENT"))
-
-    doc = nlp(text)
-
-    # Sammle Entities mit Typ
-    entities = []
-    entities.extend(custom_entities)
+    entities = [(f"&{name}", "AGENT") for name in _AGENT_RE.findall(text)]
 
     for ent in doc.ents:
         # Filtere irrelevante Entity-Types
-        if ent.label_ in ["MISC", "CARDINAL", "ORDINAL", "QUANTITY"]:
+        if ent.label_ in IGNORED_LABELS:
             continue
 
         # Normalisiere Text
         entity_text = ent.text.strip()
 
-        # Skip if it looks like an agent (already handled)
-        if entity_text.startswith("&"):
-            continue
-
-        # Filtere zu kurze Entities
-        if len(entity_text) < 3:
+        # Skip if it looks like an agent (already handled); filtere zu kurze Entities
+        if len(entity_text) < 3 or entity_text.startswith("&"):
             continue
 
         # Filtere URL-Artefakte und Markdown-Reste
-        if any(char in entity_text for char in ["[", "]", "(", ")", "%", "{"]):
+        if not _ARTIFACT_CHARS.isdisjoint(entity_text):
             continue
 
         # Nur Entities mit Großbuchstaben am Anfang
@@ -150,59 +180,78 @@ def extract_entities(
             continue
 
         # Filtere reine Akronyme (außer bekannte)
-        known_acronyms = {"IBM", "BSD", "GNU", "MIT", "NASA", "CERN", "UNIX"}
-        if entity_text.isupper() and len(entity_text) <= 4:
-            if entity_text not in known_acronyms:
-                continue
+        if entity_text.isupper() and len(entity_text) <= 4 and entity_text not in KNOWN_ACRONYMS:
+            continue
 
         # Filtere zu generische Wörter und Tech-Begriffe
-        generic_terms = [
-            # Deutsch
-            "intensiv",
-            "staaten",
-            "kommission",
-            "ki",
-            "al",
-            "black box",
-            "ki-systemen",
-            "ai-alignment",
-            "ki-ausrichtung",
-            "sprachzeichen",
-            "gpt-3",
-            "ki-verordnung",
-            # English
-            "cpu",
-            "gui",
-            "ram",
-            "usb",
-            "api",
-            "os",
-        ]
-        if entity_text.lower() in generic_terms:
+        if entity_text.lower() in GENERIC_TERMS:
             continue
 
-        # Filtere einzelne Vornamen (nur bei PER)
-        if ent.label_ == "PER" and len(entity_text.split()) == 1:
-            # Erlaube nur bekannte Einzelnamen (z.B. "Turing", "Microsoft")
-            if entity_text not in ["Turing"]:
-                continue
+        # Filtere einzelne Vornamen (nur bei PER); erlaube bekannte Einzelnamen
+        if ent.label_ == "PER" and len(entity_text.split()) == 1 and entity_text not in KNOWN_SINGLE_NAMES:
+            continue
 
         entities.append((entity_text, ent.label_))
 
     return entities
 
 
-def process_chunks(
-    nodes: list[dict[str, Any]],
-    source_text: str,
+def extract_entities(
+    text: str, nlp: spacy.Language, min_count: int = 1
+) -> list[tuple[str, str]]:
+    """Extrahiert Named Entities aus einem Text (ein `nlp()`-Aufruf).
+
+    Returns: [(entity_text, entity_type), ...]
+    """
+    return entities_from_doc(nlp(text), text)
+
+
+def pipe_entities(
+    items: Iterable[tuple[K, str]],
     nlp: spacy.Language,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_process: int = 1,
+    stats: dict[str, Any] | None = None,
+) -> Iterator[tuple[K, list[tuple[str, str]]]]:
+    """Streamt (key, text) durch `nlp.pipe` und liefert (key, entities).
+
+    `stats` erhält docs, seconds und docs_per_sec.
+    """
+    stats = {} if stats is None else stats
+    start = time.perf_counter()
+    docs = 0
+    texts_with_keys = ((text, key) for key, text in items)
+    for doc, key in nlp.pipe(
+        texts_with_keys, as_tuples=True, batch_size=batch_size, n_process=n_process
+    ):
+        docs += 1
+        yield key, entities_from_doc(doc, doc.text)
+    seconds = time.perf_counter() - start
+    stats["docs"] = stats.get("docs", 0) + docs
+    stats["seconds"] = round(stats.get("seconds", 0.0) + seconds, 3)
+    stats["docs_per_sec"] = round(stats["docs"] / stats["seconds"], 1) if stats["seconds"] else None
+
+
+def chunk_texts(nodes: list[dict[str, Any]], source_text: str) -> list[tuple[str, str]]:
+    """(chunk_id, normalisierter Text) aller Chunks mit Text."""
+    items = []
+    for node in nodes:
+        if node.get("type") != "chunk":
+            continue
+        text = extract_chunk_text(node, source_text)
+        if text:
+            items.append((node["id"], text))
+    return items
+
+
+def collect_entities(
+    chunk_entities: Iterable[tuple[str, list[tuple[str, str]]]],
     min_occurrences: int = 2,
 ) -> tuple[dict[str, dict[str, Any]], dict[str, list[str]]]:
-    """Verarbeitet alle Chunks und extrahiert Entities.
+    """Aggregiert Entities pro Chunk zu Entity-Daten und Chunk-Mappings.
 
     Returns: (entities_dict, chunk_to_entities_map)
-        entities_dict: {entity_id: {text, type, count, chunks}}
-        chunk_to_entities_map: {chunk_id: [entity_ids]}
     """
     entities = defaultdict(
         lambda: {"text": "", "type": "", "count": 0, "chunks": set()}
@@ -210,24 +259,8 @@ def process_chunks(
 
     chunk_to_entities = defaultdict(list)
 
-    chunk_count = 0
-    for node in nodes:
-        if node.get("type") != "chunk":
-            continue
-
-        chunk_count += 1
-        chunk_id = node["id"]
-
-        # Extrahiere Text
-        text = extract_chunk_text(node, source_text)
-        if not text:
-            continue
-
-        # Extrahiere Entities
-        print(f"Processing chunk {chunk_count}: {chunk_id}", file=sys.stderr)
-        chunk_entities = extract_entities(text, nlp)
-
-        for entity_text, entity_type in chunk_entities:
+    for chunk_id, found in chunk_entities:
+        for entity_text, entity_type in found:
             entity_id = make_entity_id(entity_text, entity_type)
 
             # Aktualisiere Entity-Daten
@@ -257,6 +290,32 @@ def process_chunks(
     return filtered_entities, filtered_chunk_to_entities
 
 
+def process_chunks(
+    nodes: list[dict[str, Any]],
+    source_text: str,
+    nlp: spacy.Language,
+    min_occurrences: int = 2,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_process: int = 1,
+    stats: dict[str, Any] | None = None,
+) -> tuple[dict[str, dict[str, Any]], dict[str, list[str]]]:
+    """Verarbeitet alle Chunks (gebatcht via `nlp.pipe`) und extrahiert Entities.
+
+    Returns: (entities_dict, chunk_to_entities_map)
+        entities_dict: {entity_id: {text, type, count, chunks}}
+        chunk_to_entities_map: {chunk_id: [entity_ids]}
+    """
+    found = pipe_entities(
+        chunk_texts(nodes, source_text),
+        nlp,
+        batch_size=batch_size,
+        n_process=n_process,
+        stats=stats,
+    )
+    return collect_entities(found, min_occurrences)
+
+
 def create_entity_nodes(entities: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
     """Erstellt Entity-Nodes."""
     nodes = []
@@ -322,11 +381,210 @@ def print_statistics(
         print(f"  {data['text']} ({data['type']}): {data['count']}x", file=sys.stderr)
 
 
+def _load_input(input_path: Path, base_dir: Path) -> dict[str, Any]:
+    """Prüft eine Eingabedatei und lädt nodes.json + Quelltext."""
+    if not input_path.exists():
+        raise FileNotFoundError(f"Source file not found: {input_path}")
+
+    # ULID extrahieren
+    doc_ulid = extract_ulid_from_md(input_path)
+    if not doc_ulid:
+        raise ValueError(f"No ULID found in {input_path}")
+
+    # Pfade ermitteln
+    output_paths = get_output_paths(input_path, doc_ulid, base_dir)
+
+    if not output_paths["nodes"].exists():
+        raise FileNotFoundError(
+            f"Nodes file not found: {output_paths['nodes']} (run chunker.py first)"
+        )
+
+    nodes = json.loads(output_paths["nodes"].read_text(encoding="utf-8"))
+
+    # Dokumentsprache vom Chunker (meta.json), sonst Mehrheit der Chunk-Sprachen
+    doc_lang = None
+    if output_paths["meta"].exists():
+        try:
+            meta = json.loads(output_paths["meta"].read_text(encoding="utf-8"))
+            doc_lang = meta.get("language")
+        except (json.JSONDecodeError, OSError):
+            pass
+
+    return {
+        "input": input_path,
+        "doc_ulid": doc_ulid,
+        "doc_lang": doc_lang,
+        "output_paths": output_paths,
+        "nodes": nodes,
+        "source_text": input_path.read_text(encoding="utf-8"),
+    }
+
+
+def _write_outputs(
+    item: dict[str, Any],
+    chunk_entities: list[tuple[str, list[tuple[str, str]]]],
+    min_occurrences: int,
+) -> dict[str, Any]:
+    """Aggregiert, schreibt NER-Files + meta.json einer Datei; gibt Counts zurück."""
+    output_paths = item["output_paths"]
+    entities, chunk_to_entities = collect_entities(chunk_entities, min_occurrences)
+
+    # Statistiken
+    print_statistics(entities, chunk_to_entities)
+
+    # Erstelle Nodes und Edges
+    entity_nodes = create_entity_nodes(entities)
+    entity_edges = create_entity_edges(chunk_to_entities)
+
+    # NER-Verzeichnisse erstellen
+    output_paths["ner_nodes"].parent.mkdir(parents=True, exist_ok=True)
+    output_paths["ner_edges"].parent.mkdir(parents=True, exist_ok=True)
+
+    # NER-Files schreiben
+    output_paths["ner_nodes"].write_text(
+        json.dumps(entity_nodes, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    output_paths["ner_edges"].write_text(
+        json.dumps(entity_edges, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(
+        f"Written {output_paths['ner_nodes']} ({len(entity_nodes)} entities, "
+        f"{len(entity_edges)} edges)",
+        file=sys.stderr,
+    )
+
+    # Update meta.json
+    update_meta(
+        output_paths["meta"],
+        {
+            "step": "ner_extraction",
+            "entity_count": len(entity_nodes),
+            "edge_count": len(entity_edges),
+            "language": item["lang"],
+            "min_occurrences": min_occurrences,
+        },
+    )
+
+    return {
+        "entities": len(entity_nodes),
+        "edges": len(entity_edges),
+        "chunks": sum(1 for n in item["nodes"] if n.get("type") == "chunk"),
+    }
+
+
+def process_files(
+    input_paths: list[Path],
+    *,
+    base_dir: Path = Path(".brain_graph/data"),
+    lang: str | None = None,
+    min_occurrences: int = 4,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_process: int = 1,
+    nlp_loader: Callable[[str], spacy.Language] = load_spacy_model,
+) -> list[dict[str, Any]]:
+    """
+    Extrahiert die Entities mehrerer Dateien in einem `nlp.pipe`-Stream.
+
+    Alle Chunks aller Dateien einer Sprache laufen gebatcht durch ein Modell
+    (`batch_size`, `n_process`); danach wird pro Datei aggregiert und
+    geschrieben. Gibt ein JSON-Result pro Datei zurück.
+
+    `nlp_loader` liefert das spaCy-Modell für eine Sprache; der
+    In-Process-Runner übergibt einen Loader, der Modelle einmal lädt.
+    """
+    start = time.perf_counter()
+    print(f"Loading {len(input_paths)} file(s)...", file=sys.stderr)
+    items = [_load_input(Path(path), base_dir) for path in input_paths]
+
+    # Auto-detect Sprache falls nicht angegeben
+    for item in items:
+        item["lang"] = lang or item["doc_lang"] or detect_language(item["nodes"])
+        item["chunk_entities"] = []
+
+    pipe_stats: dict[str, Any] = {}
+    for item_lang in sorted({item["lang"] for item in items}):
+        group = [i for i, item in enumerate(items) if item["lang"] == item_lang]
+        print(f"Loading spaCy model for '{item_lang}'...", file=sys.stderr)
+        nlp = nlp_loader(item_lang)
+
+        stream = (
+            ((i, chunk_id), text)
+            for i in group
+            for chunk_id, text in chunk_texts(items[i]["nodes"], items[i]["source_text"])
+        )
+        for (i, chunk_id), found in pipe_entities(
+            stream, nlp, batch_size=batch_size, n_process=n_process, stats=pipe_stats
+        ):
+            items[i]["chunk_entities"].append((chunk_id, found))
+
+    print(
+        f"NER: {pipe_stats.get('docs', 0)} chunks in {pipe_stats.get('seconds', 0)}s "
+        f"({pipe_stats.get('docs_per_sec')} docs/sec)",
+        file=sys.stderr,
+    )
+    ner_info = {
+        "docs": pipe_stats.get("docs", 0),
+        "docs_per_sec": pipe_stats.get("docs_per_sec"),
+        "batch_size": batch_size,
+        "n_process": n_process,
+    }
+
+    results = []
+    for item in items:
+        counts = _write_outputs(item, item["chunk_entities"], min_occurrences)
+        output_paths = item["output_paths"]
+        results.append(
+            ok_result(
+                "ner_extractor",
+                input=str(item["input"]),
+                doc_ulid=item["doc_ulid"],
+                output={
+                    "ner_nodes": str(output_paths["ner_nodes"]),
+                    "ner_edges": str(output_paths["ner_edges"]),
+                    "meta": str(output_paths["meta"]),
+                },
+                counts=counts,
+                language=item["lang"],
+                min_occurrences=min_occurrences,
+                ner=ner_info,
+                duration_ms=ms_since(start),
+            )
+        )
+    return results
+
+
+def process_file(
+    input_path: Path,
+    *,
+    base_dir: Path = Path(".brain_graph/data"),
+    lang: str | None = None,
+    min_occurrences: int = 4,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_process: int = 1,
+    nlp_loader: Callable[[str], spacy.Language] = load_spacy_model,
+) -> dict[str, Any]:
+    """Extrahiert die Entities einer Datei (Kern von `main()`)."""
+    return process_files(
+        [input_path],
+        base_dir=base_dir,
+        lang=lang,
+        min_occurrences=min_occurrences,
+        batch_size=batch_size,
+        n_process=n_process,
+        nlp_loader=nlp_loader,
+    )[0]
+
+
 def main():
     start = time.perf_counter()
     parser = argparse.ArgumentParser(description="Extract named entities from chunks")
     parser.add_argument(
-        "-i", "--input", type=Path, required=True, help="Source Markdown file"
+        "-i",
+        "--input",
+        type=Path,
+        nargs="+",
+        required=True,
+        help="Source Markdown file(s); several files share one nlp.pipe stream",
     )
     parser.add_argument(
         "--base-dir",
@@ -347,6 +605,18 @@ def main():
         default=4,
         help="Minimum occurrences for entity to be included",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Chunks per nlp.pipe batch (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--n-process",
+        type=int,
+        default=1,
+        help="spaCy worker processes for nlp.pipe (default: 1)",
+    )
     parser.add_argument(
         "--format",
         choices=["json", "text"],
@@ -362,102 +632,29 @@ def main():
     args = parser.parse_args()
 
     try:
-        if not args.input.exists():
-            raise FileNotFoundError(f"Source file not found: {args.input}")
-
-        # ULID extrahieren
-        doc_ulid = extract_ulid_from_md(args.input)
-        if not doc_ulid:
-            raise ValueError(f"No ULID found in {args.input}")
-
-        # Pfade ermitteln
-        output_paths = get_output_paths(args.input, doc_ulid, args.base_dir)
-
-        if not output_paths["nodes"].exists():
-            raise FileNotFoundError(
-                f"Nodes file not found: {output_paths['nodes']} (run chunker.py first)"
-            )
-
-        # Lade Daten
-        print("Loading nodes and source...", file=sys.stderr)
-        nodes = json.loads(output_paths["nodes"].read_text(encoding="utf-8"))
-        source_text = args.input.read_text(encoding="utf-8")
-
-        # Auto-detect Sprache falls nicht angegeben
-        lang = args.lang
-        if lang is None:
-            lang = detect_language(nodes)
-            print(f"Auto-detected language: {lang}", file=sys.stderr)
-
-        # Lade spaCy-Modell
-        print(f"Loading spaCy model for '{lang}'...", file=sys.stderr)
-        nlp = load_spacy_model(lang)
-
-        chunk_count = sum(1 for n in nodes if n.get("type") == "chunk")
-        print(f"Loaded {len(nodes)} nodes ({chunk_count} chunks)", file=sys.stderr)
-
-        # Extrahiere Entities
-        print("Extracting entities...", file=sys.stderr)
-        entities, chunk_to_entities = process_chunks(
-            nodes, source_text, nlp, args.min_occurrences
-        )
-
-        # Statistiken
-        print_statistics(entities, chunk_to_entities)
-
-        # Erstelle Nodes und Edges
-        entity_nodes = create_entity_nodes(entities)
-        entity_edges = create_entity_edges(chunk_to_entities)
-
-        print(f"\nCreated {len(entity_nodes)} entity nodes", file=sys.stderr)
-        print(f"Created {len(entity_edges)} entity edges", file=sys.stderr)
-
-        # NER-Verzeichnisse erstellen
-        output_paths["ner_nodes"].parent.mkdir(parents=True, exist_ok=True)
-        output_paths["ner_edges"].parent.mkdir(parents=True, exist_ok=True)
-
-        # NER-Files schreiben
-        output_paths["ner_nodes"].write_text(
-            json.dumps(entity_nodes, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        output_paths["ner_edges"].write_text(
-            json.dumps(entity_edges, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-
-        print(f"\nWritten {output_paths['ner_nodes']}", file=sys.stderr)
-        print(f"Written {output_paths['ner_edges']}", file=sys.stderr)
-
-        # Update meta.json
-        update_meta(
-            output_paths["meta"],
-            {
-                "step": "ner_extraction",
-                "entity_count": len(entity_nodes),
-                "edge_count": len(entity_edges),
-                "language": lang,
-                "min_occurrences": args.min_occurrences,
-            },
-        )
-        print(f"Updated {output_paths['meta']}", file=sys.stderr)
-
-        result = ok_result(
-            "ner_extractor",
-            input=str(args.input),
-            doc_ulid=doc_ulid,
-            output={
-                "ner_nodes": str(output_paths["ner_nodes"]),
-                "ner_edges": str(output_paths["ner_edges"]),
-                "meta": str(output_paths["meta"]),
-            },
-            counts={
-                "entities": len(entity_nodes),
-                "edges": len(entity_edges),
-                "chunks": chunk_count,
-            },
-            language=lang,
+        results = process_files(
+            args.input,
+            base_dir=args.base_dir,
+            lang=args.lang,
             min_occurrences=args.min_occurrences,
-            duration_ms=ms_since(start),
+            batch_size=args.batch_size,
+            n_process=args.n_process,
         )
+        if len(results) == 1:
+            result = results[0]
+        else:
+            result = ok_result(
+                "ner_extractor",
+                files=results,
+                counts={
+                    "files": len(results),
+                    "entities": sum(r["counts"]["entities"] for r in results),
+                    "edges": sum(r["counts"]["edges"] for r in results),
+                    "chunks": sum(r["counts"]["chunks"] for r in results),
+                },
+                ner=results[0]["ner"],
+                duration_ms=ms_since(start),
+            )
         if args.format == "json":
             emit_json(result, pretty=args.pretty)
         return 0
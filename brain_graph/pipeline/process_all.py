@@ -5,10 +5,21 @@ Process all documents through the full pipeline.
 Runs chunking, embedding, taxonomy matching, LLM verification, NER extraction,
 and summarization on all markdown files in inbox/ and vault/.
 
+Steps run in this process by default (see `runner.py`): step modules, configs,
+clients, the taxonomy matrix and spaCy models are loaded once for all files.
+`--subprocess` restores the old behaviour of one interpreter per step and file.
+
+`--jobs N` runs a staged pipeline over several files at once: CPU-bound steps
+(chunking, NER) go to a pool of N worker processes, remote-call steps
+(embedding, taxonomy, LLM verification, summarization) to one pool of N
+threads per step, so file k+1 is chunked while file k is being embedded.
+
 Usage:
     python process_all.py [--inbox-only] [--vault-only] [--force]
     python process_all.py --steps chunking,embedding
     python process_all.py --steps embedding --vault-only
+    python process_all.py --subprocess
+    python process_all.py --jobs 4 --skip-errors
 
 Output:
     By default, prints a single JSON object on stdout for agent workflows.
@@ -16,13 +27,16 @@ Output:
 """
 
 import argparse
+import multiprocessing
 import os
 import subprocess
 import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Any
 
+from brain_graph.pipeline.runner import CPU_STEPS, PipelineResources, run_step, step_tool_name
 from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
 
 # Available pipeline steps
@@ -105,14 +119,42 @@ def _run_step(
     }
 
 
+def _run_step_in_process(
+    *,
+    md_file: Path,
+    step_key: str,
+    resources: PipelineResources,
+    force: bool,
+    debug: bool,
+) -> dict[str, Any]:
+    step_name = AVAILABLE_STEPS[step_key][0]
+    try:
+        result = run_step(step_key, md_file, resources, force=force)
+        returncode = 0
+    except Exception as e:
+        print(f"  {type(e).__name__}: {e}", file=sys.stderr)
+        result = error_result(step_tool_name(step_key), e, include_traceback=debug)
+        returncode = 1
+
+    return {
+        "step": step_key,
+        "name": step_name,
+        "command": None,
+        "returncode": returncode,
+        "result": result,
+        "raw_stdout": None,
+    }
+
+
 def run_pipeline_on_file(
     md_file: Path,
     steps: list[str],
     *,
     force: bool = False,
-    python_exe: str,
-    child_format: str,
-    debug: bool,
+    resources: PipelineResources | None = None,
+    python_exe: str | None = None,
+    child_format: str = "json",
+    debug: bool = False,
 ) -> dict[str, Any]:
     """
     Run pipeline steps on a single markdown file.
@@ -121,6 +163,8 @@ def run_pipeline_on_file(
         md_file: Path to markdown file
         steps: List of step names to run
         force: Force processing even if vault file unchanged
+        resources: Shared resources for in-process runs; None runs every
+            step as a subprocess of `python_exe`
 
     Returns:
         Dict with step results and status.
@@ -145,14 +189,23 @@ def run_pipeline_on_file(
     for step_key in pipeline_steps:
         step_name = AVAILABLE_STEPS[step_key][0]
         print(f"→ {step_name}...", file=sys.stderr)
-        step_result = _run_step(
-            md_file=md_file,
-            step_key=step_key,
-            python_exe=python_exe,
-            child_format=child_format,
-            force=force,
-            debug=debug,
-        )
+        if resources is not None:
+            step_result = _run_step_in_process(
+                md_file=md_file,
+                step_key=step_key,
+                resources=resources,
+                force=force,
+                debug=debug,
+            )
+        else:
+            step_result = _run_step(
+                md_file=md_file,
+                step_key=step_key,
+                python_exe=python_exe or _tool_python(),
+                child_format=child_format,
+                force=force,
+                debug=debug,
+            )
         step_results.append(step_result)
 
         if step_result["returncode"] != 0:
@@ -170,6 +223,139 @@ def run_pipeline_on_file(
     return {"file": str(md_file), "ok": True, "status": "ok", "steps": step_results}
 
 
+# Resources of a `--jobs` worker process (loaded lazily, once per process)
+_worker_resources: PipelineResources | None = None
+
+
+def _init_worker(resources: PipelineResources) -> None:
+    global _worker_resources
+    _worker_resources = resources
+
+
+def _run_cpu_step(step_key: str, md_file: Path, force: bool, debug: bool) -> dict[str, Any]:
+    assert _worker_resources is not None
+    return _run_step_in_process(
+        md_file=md_file, step_key=step_key, resources=_worker_resources, force=force, debug=debug
+    )
+
+
+def run_pipeline_parallel(
+    files: list[Path],
+    steps: list[str],
+    resources: PipelineResources,
+    *,
+    jobs: int,
+    force: bool = False,
+    skip_errors: bool = False,
+    debug: bool = False,
+) -> list[dict[str, Any]]:
+    """
+    Run the pipeline on many files concurrently, step by step per file.
+
+    Each file passes through `steps` in order; finishing one step submits the
+    next step to that step's pool. At most `2 * jobs` files are in flight.
+
+    A failing file stops only its own remaining steps. Without `skip_errors`
+    no new files are started after the first failure; files already in flight
+    still finish. Results are returned in input order (status `not_started`
+    for files that never ran), independent of completion order.
+    """
+    file_steps: list[list[dict[str, Any]]] = [[] for _ in files]
+    results: list[dict[str, Any] | None] = [None] * len(files)
+    pools: dict[str, Executor] = {}
+    cpu_pool: ProcessPoolExecutor | None = None
+    if any(step in CPU_STEPS for step in steps):
+        # spawn: forking a process that already runs client threads is unsafe
+        cpu_pool = ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(resources,),
+        )
+    for step in steps:
+        if step not in CPU_STEPS:
+            pools[step] = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix=f"pipeline-{step}")
+
+    in_flight: dict[Future, tuple[int, int]] = {}
+
+    def submit(index: int, position: int) -> None:
+        step_key = steps[position]
+        if step_key in CPU_STEPS:
+            future = cpu_pool.submit(_run_cpu_step, step_key, files[index], force, debug)
+        else:
+            future = pools[step_key].submit(
+                _run_step_in_process,
+                md_file=files[index],
+                step_key=step_key,
+                resources=resources,
+                force=force,
+                debug=debug,
+            )
+        in_flight[future] = (index, position)
+
+    next_file = 0
+    aborted = False
+    try:
+        while True:
+            while not aborted and next_file < len(files) and len(in_flight) < 2 * jobs:
+                print(f"[{next_file + 1}/{len(files)}] {files[next_file]}", file=sys.stderr)
+                submit(next_file, 0)
+                next_file += 1
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, position = in_flight.pop(future)
+                step_key = steps[position]
+                try:
+                    step_result = future.result()
+                except Exception as e:
+                    # Worker process died (e.g. out of memory) before returning a result
+                    step_result = {
+                        "step": step_key,
+                        "name": AVAILABLE_STEPS[step_key][0],
+                        "command": None,
+                        "returncode": 1,
+                        "result": error_result(step_tool_name(step_key), e, include_traceback=debug),
+                        "raw_stdout": None,
+                    }
+                file_steps[index].append(step_result)
+                md_file = files[index]
+
+                if step_result["returncode"] != 0:
+                    print(f"✗ {md_file}: {step_result['name']} failed", file=sys.stderr)
+                    results[index] = {
+                        "file": str(md_file),
+                        "ok": False,
+                        "status": "failed",
+                        "failed_step": step_key,
+                        "steps": file_steps[index],
+                    }
+                    if not skip_errors:
+                        aborted = True
+                elif position + 1 < len(steps):
+                    submit(index, position + 1)
+                else:
+                    print(f"✓ {md_file}", file=sys.stderr)
+                    results[index] = {
+                        "file": str(md_file),
+                        "ok": True,
+                        "status": "ok",
+                        "steps": file_steps[index],
+                    }
+    finally:
+        for pool in [*pools.values(), *([cpu_pool] if cpu_pool else [])]:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return [
+        result
+        if result is not None
+        else {"file": str(md_file), "ok": False, "status": "not_started", "steps": []}
+        for md_file, result in zip(files, results)
+    ]
+
+
 def main():
     start = time.perf_counter()
     parser = argparse.ArgumentParser(
@@ -194,6 +380,17 @@ def main():
         action="store_true",
         help="Include per-file/per-step results in JSON output",
     )
+    parser.add_argument(
+        "--subprocess",
+        action="store_true",
+        help="Run each step in its own Python process (default: in-process)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Process up to N files concurrently (staged process/thread pools, default: 1)",
+    )
     parser.add_argument("--steps", type=str,
                        help="Comma-separated list of steps to run (default: all). "
                             f"Available: {', '.join(AVAILABLE_STEPS.keys())}")
@@ -211,6 +408,11 @@ def main():
 
         print(f"Pipeline steps: {', '.join(selected_steps)}", file=sys.stderr)
 
+        if args.jobs < 1:
+            raise ValueError("--jobs must be >= 1")
+        if args.jobs > 1 and args.subprocess:
+            raise ValueError("--jobs requires in-process mode (drop --subprocess)")
+
         # Determine which directories to process
         if args.inbox_only and args.vault_only:
             raise ValueError("Use only one of --inbox-only or --vault-only")
@@ -238,30 +440,52 @@ def main():
 
         python_exe = _tool_python()
         child_format = "json" if args.format == "json" else "text"
+        resources = None if args.subprocess else PipelineResources()
 
         # Process each file
         success_count = 0
         failed_files: list[str] = []
         all_results: list[dict[str, Any]] = []
 
-        for i, md_file in enumerate(all_files, 1):
-            print(f"[{i}/{len(all_files)}] {md_file}", file=sys.stderr)
-            file_result = run_pipeline_on_file(
-                md_file,
+        if args.jobs > 1:
+            file_results = run_pipeline_parallel(
+                all_files,
                 selected_steps,
+                resources,
+                jobs=args.jobs,
                 force=args.force,
-                python_exe=python_exe,
-                child_format=child_format,
+                skip_errors=args.skip_errors,
                 debug=args.debug,
             )
-            if args.include_results:
-                all_results.append(file_result)
-            if file_result.get("ok"):
-                success_count += 1
-            else:
-                failed_files.append(str(md_file))
-                if not args.skip_errors:
-                    break
+            for file_result in file_results:
+                if file_result["status"] == "not_started":
+                    continue
+                if args.include_results:
+                    all_results.append(file_result)
+                if file_result.get("ok"):
+                    success_count += 1
+                else:
+                    failed_files.append(file_result["file"])
+        else:
+            for i, md_file in enumerate(all_files, 1):
+                print(f"[{i}/{len(all_files)}] {md_file}", file=sys.stderr)
+                file_result = run_pipeline_on_file(
+                    md_file,
+                    selected_steps,
+                    force=args.force,
+                    resources=resources,
+                    python_exe=python_exe,
+                    child_format=child_format,
+                    debug=args.debug,
+                )
+                if args.include_results:
+                    all_results.append(file_result)
+                if file_result.get("ok"):
+                    success_count += 1
+                else:
+                    failed_files.append(str(md_file))
+                    if not args.skip_errors:
+                        break
 
         exit_code = 0 if not failed_files else 2
 
@@ -270,10 +494,13 @@ def main():
             status="ok" if exit_code == 0 else ("partial" if args.skip_errors else "aborted"),
             directories=[str(p) for p in dirs_to_process],
             steps=selected_steps,
+            mode="subprocess" if args.subprocess else "in_process",
+            jobs=args.jobs,
             counts={
                 "files_total": len(all_files),
                 "files_succeeded": success_count,
                 "files_failed": len(failed_files),
+                "files_not_started": len(all_files) - success_count - len(failed_files),
             },
             failed_files=failed_files,
             results=all_results if args.include_results else None,
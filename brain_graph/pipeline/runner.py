@@ -0,0 +1,187 @@
+"""
+In-process pipeline runner.
+
+Imports each step module once and calls its `process_file()` directly instead
+of spawning `python <step>.py -i <file>` per step and file. Heavy resources
+(configs, the LLM client, the taxonomy matrix, spaCy models) are loaded
+lazily on first use and reused for every following file; tree-sitter parsers,
+pysbd segmenters and embedding clients are cached by their modules.
+
+Usage:
+    resources = PipelineResources()
+    for md_file in files:
+        for step in ("chunking", "embedding", "taxonomy"):
+            result = run_step(step, md_file, resources)
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+# Step key -> module with a `process_file()` entry point
+STEP_MODULES = {
+    "chunking": "brain_graph.pipeline.chunker",
+    "embedding": "brain_graph.pipeline.embedder",
+    "taxonomy": "brain_graph.pipeline.taxonomy_matcher",
+    "llm_verification": "brain_graph.pipeline.llm_verifier",
+    "ner": "brain_graph.pipeline.ner_extractor",
+    "summarization": "brain_graph.pipeline.summarizer",
+}
+
+# CPU-bound steps (parsing, spaCy); the others mostly wait on remote APIs
+CPU_STEPS = frozenset({"chunking", "ner"})
+
+
+class PipelineResources:
+    """
+    Lazily loaded resources shared by all files of a pipeline run.
+
+    Every resource is created at most once per instance (thread-safe), so
+    step modules that are never used are never imported (e.g. spaCy).
+    """
+
+    def __init__(
+        self,
+        *,
+        base_dir: Path = Path(".brain_graph/data"),
+        vault_dir: Path = Path("vault"),
+        taxonomy_parquet: Path = Path(".brain_graph/config/taxonomy.md.parquet"),
+        taxonomy_md: Path = Path("config/taxonomy.md"),
+        taxonomy_nodes_path: Path = Path(".brain_graph/config/taxonomy.md.nodes.json"),
+    ):
+        self.base_dir = base_dir
+        self.vault_dir = vault_dir
+        self.taxonomy_parquet = taxonomy_parquet
+        self.taxonomy_md = taxonomy_md
+        self.taxonomy_nodes_path = taxonomy_nodes_path
+        self._lock = threading.RLock()
+        self._loaded: dict[str, Any] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Worker processes get the paths only and load their own resources
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_loaded"] = {}
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _get(self, key: str, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key not in self._loaded:
+                self._loaded[key] = loader()
+            return self._loaded[key]
+
+    def module(self, step_key: str) -> ModuleType:
+        """Step module (imported once)."""
+        return self._get(f"module:{step_key}", lambda: importlib.import_module(STEP_MODULES[step_key]))
+
+    def chunk_config(self) -> dict[str, Any]:
+        return self._get("chunk_config", lambda: self.module("chunking").load_config())
+
+    def embedding_config(self) -> dict[str, Any]:
+        return self._get("embedding_config", lambda: self.module("embedding").load_config())
+
+    def llm_config(self) -> dict[str, Any]:
+        """Config of the summary LLM (shared by verifier and summarizer)."""
+        return self._get("llm_config", lambda: self.module("summarization").load_config())
+
+    def llm_client(self) -> Any:
+        def load() -> Any:
+            from openai import OpenAI
+
+            config = self.llm_config()
+            return OpenAI(base_url=config["summary_base_url"], api_key=config["summary_api_key"])
+
+        return self._get("llm_client", load)
+
+    def taxonomy_embeddings(self) -> tuple[list[str], Any]:
+        """(category_ids, embedding matrix) of the taxonomy."""
+        def load() -> tuple[list[str], Any]:
+            if not self.taxonomy_parquet.exists():
+                raise FileNotFoundError(f"Taxonomy parquet not found: {self.taxonomy_parquet}")
+            return self.module("taxonomy").load_embeddings(self.taxonomy_parquet)
+
+        return self._get("taxonomy_embeddings", load)
+
+    def taxonomy_meta(self) -> dict[str, dict[str, int]]:
+        return self._get(
+            "taxonomy_meta", lambda: self.module("taxonomy").load_taxonomy_metadata(self.taxonomy_md)
+        )
+
+    def taxonomy_nodes(self) -> list[dict[str, Any]]:
+        def load() -> list[dict[str, Any]]:
+            import json
+
+            if not self.taxonomy_nodes_path.exists():
+                raise FileNotFoundError(f"Taxonomy file not found: {self.taxonomy_nodes_path}")
+            return json.loads(self.taxonomy_nodes_path.read_text(encoding="utf-8"))
+
+        return self._get("taxonomy_nodes", load)
+
+    def spacy_model(self, lang: str) -> Any:
+        def load() -> Any:
+            print(f"Loading spaCy model for '{lang}' (once per run)", file=sys.stderr)
+            return self.module("ner").load_spacy_model(lang)
+
+        return self._get(f"spacy:{lang}", load)
+
+
+def run_step(
+    step_key: str,
+    md_file: Path,
+    resources: PipelineResources,
+    *,
+    force: bool = False,
+) -> dict[str, Any]:
+    """
+    Run one pipeline step on one file in this process.
+
+    Returns the step's JSON result (same shape as its CLI output); raises on
+    failure like the step's `process_file()`.
+    """
+    if step_key not in STEP_MODULES:
+        raise ValueError(f"Unknown step: {step_key}")
+    module = resources.module(step_key)
+
+    if step_key == "chunking":
+        return module.process_file(
+            md_file,
+            resources.chunk_config(),
+            base_dir=resources.base_dir,
+            vault_dir=resources.vault_dir,
+            force=force,
+        )
+    if step_key == "embedding":
+        return module.process_file(md_file, resources.embedding_config(), base_dir=resources.base_dir)
+    if step_key == "taxonomy":
+        return module.process_file(
+            md_file,
+            base_dir=resources.base_dir,
+            taxonomy_embeddings=resources.taxonomy_embeddings(),
+            taxonomy_meta=resources.taxonomy_meta(),
+        )
+    if step_key == "llm_verification":
+        return module.process_file(
+            md_file,
+            resources.llm_config(),
+            base_dir=resources.base_dir,
+            client=resources.llm_client(),
+            categories=resources.taxonomy_nodes(),
+        )
+    if step_key == "ner":
+        return module.process_file(md_file, base_dir=resources.base_dir, nlp_loader=resources.spacy_model)
+    return module.process_file(
+        md_file, resources.llm_config(), base_dir=resources.base_dir, client=resources.llm_client()
+    )
+
+
+def step_tool_name(step_key: str) -> str:
+    """Tool name used in the step's JSON results (e.g. "chunker")."""
+    return STEP_MODULES[step_key].rsplit(".", 1)[-1]
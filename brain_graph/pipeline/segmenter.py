@@ -0,0 +1,176 @@
+"""
+Satz-Segmentierung für den Chunker.
+
+Ein Segmenter liefert Satz-Spans `(char_start, char_end)` direkt im
+Originaltext (ohne führende/folgende Whitespaces), d.h. kein erneutes
+Suchen der Sätze per `text.find`.
+
+- `RuleSegmenter`: schnelle, regelbasierte Segmentierung (ein linearer Scan):
+  Zeilenumbrüche und Satzzeichen `.!?…` sind Grenzen, außer nach
+  Abkürzungen, Initialen, (de) Ordinalzahlen oder vor Kleinbuchstaben.
+- `PysbdSegmenter`: pysbd (genauer, deutlich langsamer) als Fallback.
+
+Auswahl über `get_segmenter(lang, kind)`; im Chunker per Config
+`chunk_segmenter` ("rule" | "pysbd", Default: "rule").
+"""
+from __future__ import annotations
+
+import re
+import sys
+import threading
+from typing import Protocol
+
+import pysbd
+
+
+DEFAULT_SEGMENTER = "rule"
+SEGMENTER_KINDS = ("rule", "pysbd")
+
+# Abkürzungen (kleingeschrieben, ohne abschließenden Punkt)
+_COMMON_ABBREVIATIONS = frozenset(
+    {"etc", "ca", "vs", "bzw", "dr", "prof", "nr", "abb", "kap", "s", "z.b", "e.g", "i.e"}
+)
+ABBREVIATIONS: dict[str, frozenset[str]] = {
+    "de": _COMMON_ABBREVIATIONS
+    | frozenset(
+        {
+            "usw", "vgl", "d.h", "u.a", "evtl", "ggf", "inkl", "z.t", "u.u", "o.ä",
+            "bspw", "sog", "str", "tel", "jh", "jhd", "mio", "mrd", "std", "min",
+            "hr", "fr", "dipl", "ing", "geb", "max", "zzgl", "bzgl", "allg", "insb",
+            "jan", "feb", "mär", "apr", "jun", "jul", "aug", "sep", "sept", "okt", "nov", "dez",
+        }
+    ),
+    "en": _COMMON_ABBREVIATIONS
+    | frozenset(
+        {
+            "mr", "mrs", "ms", "jr", "sr", "st", "inc", "ltd", "co", "corp", "approx",
+            "fig", "no", "vol", "dept", "est", "u.s", "a.m", "p.m", "cf", "al",
+            "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+        }
+    ),
+}
+
+# Kandidaten: Satzzeichen (+ schließende Anführungszeichen/Klammern) vor Whitespace
+_TERMINAL_RE = re.compile(r"[.!?…]+[\"'”“»«)\]]*(?=\s)")
+_LINE_RE = re.compile(r"[^\n]+")
+
+
+class Segmenter(Protocol):
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        """Satz-Spans (char_start, char_end) in `text`."""
+        ...
+
+
+def _strip_span(text: str, start: int, end: int) -> tuple[int, int] | None:
+    """Span ohne Whitespace am Rand, None wenn leer."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+
+class RuleSegmenter:
+    """Regelbasierter Segmenter (linear in der Textlänge)."""
+
+    def __init__(self, lang: str = "de"):
+        self.lang = lang
+        self.abbreviations = ABBREVIATIONS.get(lang, _COMMON_ABBREVIATIONS)
+
+    def _is_boundary(self, text: str, line_start: int, match: re.Match[str]) -> bool:
+        # Nächstes Nicht-Whitespace-Zeichen: Kleinbuchstabe → kein Satzende
+        nxt = match.end()
+        while nxt < len(text) and text[nxt] in " \t":
+            nxt += 1
+        if nxt < len(text) and text[nxt].islower():
+            return False
+
+        if not match.group(0).startswith(".") or match.group(0).startswith(".."):
+            return True
+
+        # Token vor dem Punkt (rückwärts bis Whitespace, max. 40 Zeichen)
+        token_start = max(
+            text.rfind(" ", line_start, match.start()),
+            text.rfind("\t", line_start, match.start()),
+            match.start() - 40,
+            line_start - 1,
+        ) + 1
+        token = text[token_start : match.start()].lstrip("([\"'„“»«")
+        if not token:
+            return True
+        if token.lower() in self.abbreviations:
+            return False
+        # Initialen ("J. Smith")
+        if len(token) == 1 and token.isalpha() and token.isupper():
+            return False
+        # Deutsche Ordinalzahlen ("am 3. Mai")
+        if self.lang == "de" and token.isdigit() and len(token) <= 2:
+            return False
+        return True
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        result: list[tuple[int, int]] = []
+        # Jede Zeile ist mindestens ein Satz (wie pysbd mit clean=False)
+        for line in _LINE_RE.finditer(text):
+            start = line.start()
+            for match in _TERMINAL_RE.finditer(text, line.start(), line.end()):
+                if self._is_boundary(text, line.start(), match):
+                    span = _strip_span(text, start, match.end())
+                    if span:
+                        result.append(span)
+                    start = match.end()
+            span = _strip_span(text, start, line.end())
+            if span:
+                result.append(span)
+        return result
+
+
+class PysbdSegmenter:
+    """pysbd-Segmenter; Sätze werden im Originaltext verortet."""
+
+    def __init__(self, lang: str = "de"):
+        try:
+            self._segmenter = pysbd.Segmenter(language=lang, clean=False)
+            self.lang = lang
+        except ValueError:
+            # Fallback auf Deutsch wenn Sprache nicht unterstützt
+            print(
+                f"Warning: Language '{lang}' not supported by pysbd, falling back to 'de'",
+                file=sys.stderr,
+            )
+            self._segmenter = pysbd.Segmenter(language="de", clean=False)
+            self.lang = "de"
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        result: list[tuple[int, int]] = []
+        pos = 0
+        for sent in self._segmenter.segment(text):
+            sent = sent.strip()
+            if not sent:
+                continue
+
+            # Finde Satz im Text
+            idx = text.find(sent, pos)
+            if idx == -1:
+                # Fallback: schätze Position
+                idx = pos
+
+            result.append((idx, idx + len(sent)))
+            pos = idx + len(sent)
+        return result
+
+
+# Segmenter-Cache pro (Art, Sprache), über Dateien hinweg wiederverwendet
+_SEGMENTERS: dict[tuple[str, str], Segmenter] = {}
+_SEGMENTERS_LOCK = threading.Lock()
+
+
+def get_segmenter(lang: str, kind: str = DEFAULT_SEGMENTER) -> Segmenter:
+    """Holt oder erstellt Segmenter für Sprache (`kind`: "rule" oder "pysbd")."""
+    if kind not in SEGMENTER_KINDS:
+        raise ValueError(f"Unknown segmenter '{kind}' (expected one of {SEGMENTER_KINDS})")
+    key = (kind, lang)
+    with _SEGMENTERS_LOCK:
+        if key not in _SEGMENTERS:
+            _SEGMENTERS[key] = RuleSegmenter(lang) if kind == "rule" else PysbdSegmenter(lang)
+        return _SEGMENTERS[key]
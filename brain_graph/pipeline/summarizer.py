@@ -13,12 +13,15 @@ import argparse
 import json
 import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Any
 
 from openai import OpenAI
 
+from brain_graph.utils.embedding_client import estimate_tokens
 from brain_graph.utils.file_utils import extract_ulid_from_md, get_output_paths, strip_ulid_lines, update_meta
+from brain_graph.utils.summary_cache import get_summary_cache, summary_key
 from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
 
 
@@ -57,26 +60,34 @@ def extract_chunk_text(node: dict[str, Any], source_text: str) -> str:
     return strip_ulid_lines(source_text[start:end]).strip()
 
 
-def generate_summary(text: str, client: OpenAI, model: str) -> str:
-    """Generiert 1-Satz-Zusammenfassung via LLM."""
-    prompt = f"""Summarize the following text in ONE concise German sentence (max 20 words):
+SUMMARY_PROMPT = """Summarize the following text in ONE concise German sentence (max 20 words):
 
 {text}
 
 Summary:"""
+SUMMARY_MAX_TOKENS = 100
+DEFAULT_CONCURRENCY = 4
+
+
+def _complete_summary(text: str, client: OpenAI, model: str) -> tuple[str, int]:
+    """Ein LLM-Call; gibt (Summary, verbrauchte Tokens) zurück, wirft bei Fehlern."""
+    prompt = SUMMARY_PROMPT.format(text=text)
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=SUMMARY_MAX_TOKENS,
+        temperature=0.3,
+    )
+    summary = (response.choices[0].message.content or "").strip()
+    usage = getattr(response, "usage", None)
+    tokens = getattr(usage, "total_tokens", None) or estimate_tokens(prompt) + SUMMARY_MAX_TOKENS
+    return summary, tokens
 
-    print(f"Generating summary... {prompt}", file=sys.stderr)
 
+def generate_summary(text: str, client: OpenAI, model: str) -> str:
+    """Generiert 1-Satz-Zusammenfassung via LLM ("" bei Fehler)."""
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=100,
-            temperature=0.3,
-        )
-        print(f"LLM response: {response}", file=sys.stderr)
-        summary = response.choices[0].message.content.strip()
-        return summary
+        return _complete_summary(text, client, model)[0]
     except Exception as e:
         print(f"Error generating summary: {e}", file=sys.stderr)
         return ""
@@ -86,43 +97,199 @@ def summarize_chunks(
     nodes: list[dict[str, Any]],
     source_text: str,
     config: dict[str, Any],
+    client: OpenAI | None = None,
+    stats: dict[str, Any] | None = None,
 ) -> list[dict[str, Any]]:
     """
     Erstellt Summaries für alle Chunks.
 
+    - Summary-Cache (Hash aus Modell, Prompt, normalisiertem Chunk-Text):
+      nur geänderte Chunks gehen an das LLM
+    - bis zu `summary_concurrency` Requests parallel (default: 4), passend
+      zu Servern mit Continuous Batching
+    - Budget pro Lauf: `summary_token_budget` (Tokens) und
+      `summary_time_budget_s` (Sekunden); danach werden keine neuen Requests
+      mehr gestartet, betroffene Chunks behalten ihre bisherige Summary
+    - eine aggregierte Log-Zeile statt Prompt/Response pro Chunk
+
+    `stats` erhält cached/generated/failed/skipped_budget/tokens.
+
     Returns: updated_nodes
     """
-    client = OpenAI(
-        base_url=config["summary_base_url"],
-        api_key=config["summary_api_key"],
+    stats = {} if stats is None else stats
+    if client is None:
+        client = OpenAI(
+            base_url=config["summary_base_url"],
+            api_key=config["summary_api_key"],
+        )
+    model = config["summary_model"]
+    concurrency = max(1, int(config.get("summary_concurrency", DEFAULT_CONCURRENCY)))
+    token_budget = config.get("summary_token_budget")
+    time_budget = config.get("summary_time_budget_s")
+    cache = get_summary_cache(config)
+
+    texts: dict[int, str] = {}
+    for i, node in enumerate(nodes):
+        if node.get("type") == "chunk":
+            text = extract_chunk_text(node, source_text)
+            if text:
+                texts[i] = text
+
+    keys = {i: summary_key(text, model, SUMMARY_PROMPT) for i, text in texts.items()}
+    cached = cache.get_many(list(keys.values())) if cache else {}
+    summaries = {i: cached[key] for i, key in keys.items() if key in cached}
+    pending = [i for i in texts if i not in summaries]
+
+    counts = {"cached": len(summaries), "generated": 0, "failed": 0, "skipped_budget": 0, "tokens": 0}
+    first_error: str | None = None
+    start = time.perf_counter()
+    # Reservierung pro laufendem Request: Prompt mit Chunk-Text + maximale Antwort
+    reserved: dict[int, int] = {}
+
+    def reserve_budget(index: int) -> bool:
+        """Reserviert das Budget für den Request von `index`; False, wenn es nicht reicht."""
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            return False
+        if token_budget is not None:
+            needed = estimate_tokens(SUMMARY_PROMPT.format(text=texts[index])) + SUMMARY_MAX_TOKENS
+            if counts["tokens"] + sum(reserved.values()) + needed > token_budget:
+                return False
+            reserved[index] = needed
+        return True
+
+    if pending:
+        print(
+            f"Summarizing {len(pending)} chunks ({counts['cached']} cached, concurrency {concurrency})...",
+            file=sys.stderr,
+        )
+    queue = iter(pending)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="summarizer") as pool:
+        in_flight: dict[Future, int] = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < concurrency:
+                index = next(queue, None)
+                if index is None:
+                    exhausted = True
+                elif not reserve_budget(index):
+                    counts["skipped_budget"] += 1 + sum(1 for _ in queue)
+                    exhausted = True
+                else:
+                    in_flight[pool.submit(_complete_summary, texts[index], client, model)] = index
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                reserved.pop(index, None)
+                try:
+                    summary, tokens = future.result()
+                except Exception as e:
+                    counts["failed"] += 1
+                    first_error = first_error or f"{type(e).__name__}: {e}"
+                    continue
+                counts["tokens"] += tokens
+                if not summary:
+                    counts["failed"] += 1
+                    continue
+                summaries[index] = summary
+                counts["generated"] += 1
+                if cache:
+                    cache.put_many({keys[index]: summary}, model)
+
+    updated_nodes = [
+        {**node, "summary": summaries[i]} if i in summaries else node
+        for i, node in enumerate(nodes)
+    ]
+
+    print(
+        f"Summaries: {counts['generated']} generated, {counts['cached']} cached, "
+        f"{counts['failed']} failed, {counts['skipped_budget']} skipped (budget), "
+        f"~{counts['tokens']} tokens",
+        file=sys.stderr,
     )
+    if first_error:
+        print(f"  first error: {first_error}", file=sys.stderr)
+    stats.update(counts)
+    return updated_nodes
 
-    updated_nodes = []
-    chunk_count = 0
 
-    for i, node in enumerate(nodes):
-        if node.get("type") != "chunk":
-            updated_nodes.append(node)
-            continue
+def process_file(
+    input_path: Path,
+    config: dict[str, Any] | None = None,
+    *,
+    base_dir: Path = Path(".brain_graph/data"),
+    client: OpenAI | None = None,
+) -> dict[str, Any]:
+    """Erstellt die Summaries einer Datei (Kern von `main()`)."""
+    start = time.perf_counter()
+    if not input_path.exists():
+        raise FileNotFoundError(f"Source file not found: {input_path}")
 
-        # Extrahiere Text
-        text = extract_chunk_text(node, source_text)
-        if not text:
-            updated_nodes.append(node)
-            continue
+    # ULID extrahieren
+    doc_ulid = extract_ulid_from_md(input_path)
+    if not doc_ulid:
+        raise ValueError(f"No ULID found in {input_path}")
 
-        # Generiere Summary
-        print(f"Summarizing chunk {i+1}...", file=sys.stderr)
-        summary = generate_summary(text, client, config["summary_model"])
+    # Pfade ermitteln
+    output_paths = get_output_paths(input_path, doc_ulid, base_dir)
 
-        if summary:
-            node = {**node, "summary": summary}
-            chunk_count += 1
+    if not output_paths["nodes"].exists():
+        raise FileNotFoundError(f"Nodes file not found: {output_paths['nodes']} (run chunker.py first)")
 
-        updated_nodes.append(node)
+    # Config laden
+    if config is None:
+        config = load_config()
 
-    print(f"Generated {chunk_count} summaries", file=sys.stderr)
-    return updated_nodes
+    # Lade Daten
+    nodes = json.loads(output_paths["nodes"].read_text(encoding="utf-8"))
+    source_text = input_path.read_text(encoding="utf-8")
+
+    chunk_count = sum(1 for n in nodes if n.get("type") == "chunk")
+    print(f"Loaded {len(nodes)} nodes ({chunk_count} chunks)", file=sys.stderr)
+
+    # Summarize
+    summary_stats: dict[str, Any] = {}
+    updated_nodes = summarize_chunks(nodes, source_text, config, client=client, stats=summary_stats)
+
+    # Schreibe nodes.json zurück (in-place update)
+    output_paths["nodes"].write_text(
+        json.dumps(updated_nodes, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(f"Updated {output_paths['nodes']}", file=sys.stderr)
+
+    # Update meta.json
+    summary_count = sum(
+        1 for n in updated_nodes if n.get("type") == "chunk" and n.get("summary")
+    )
+    update_meta(
+        output_paths["meta"],
+        {
+            "step": "summarization",
+            "summary_count": summary_count,
+            "model": config["summary_model"],
+        },
+    )
+    print(f"Updated {output_paths['meta']}", file=sys.stderr)
+
+    result = ok_result(
+        "summarizer",
+        input=str(input_path),
+        doc_ulid=doc_ulid,
+        output={"nodes": str(output_paths["nodes"]), "meta": str(output_paths["meta"])},
+        counts={
+            "summaries": summary_count,
+            "chunks": chunk_count,
+            "generated": summary_stats["generated"],
+            "cached": summary_stats["cached"],
+            "failed": summary_stats["failed"],
+            "skipped_budget": summary_stats["skipped_budget"],
+        },
+        tokens=summary_stats["tokens"],
+        model=config.get("summary_model"),
+        duration_ms=ms_since(start),
+    )
+    return result
 
 
 def main():
@@ -155,62 +322,7 @@ def main():
     args = parser.parse_args()
 
     try:
-        if not args.input.exists():
-            raise FileNotFoundError(f"Source file not found: {args.input}")
-
-        # ULID extrahieren
-        doc_ulid = extract_ulid_from_md(args.input)
-        if not doc_ulid:
-            raise ValueError(f"No ULID found in {args.input}")
-
-        # Pfade ermitteln
-        output_paths = get_output_paths(args.input, doc_ulid, args.base_dir)
-
-        if not output_paths["nodes"].exists():
-            raise FileNotFoundError(f"Nodes file not found: {output_paths['nodes']} (run chunker.py first)")
-
-        # Config laden
-        config = load_config(args.config)
-
-        # Lade Daten
-        nodes = json.loads(output_paths["nodes"].read_text(encoding="utf-8"))
-        source_text = args.input.read_text(encoding="utf-8")
-
-        chunk_count = sum(1 for n in nodes if n.get("type") == "chunk")
-        print(f"Loaded {len(nodes)} nodes ({chunk_count} chunks)", file=sys.stderr)
-
-        # Summarize
-        updated_nodes = summarize_chunks(nodes, source_text, config)
-
-        # Schreibe nodes.json zurück (in-place update)
-        output_paths["nodes"].write_text(
-            json.dumps(updated_nodes, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        print(f"Updated {output_paths['nodes']}", file=sys.stderr)
-
-        # Update meta.json
-        summary_count = sum(
-            1 for n in updated_nodes if n.get("type") == "chunk" and n.get("summary")
-        )
-        update_meta(
-            output_paths["meta"],
-            {
-                "step": "summarization",
-                "summary_count": summary_count,
-                "model": config["summary_model"],
-            },
-        )
-        print(f"Updated {output_paths['meta']}", file=sys.stderr)
-
-        result = ok_result(
-            "summarizer",
-            input=str(args.input),
-            doc_ulid=doc_ulid,
-            output={"nodes": str(output_paths["nodes"]), "meta": str(output_paths["meta"])},
-            counts={"summaries": summary_count, "chunks": chunk_count},
-            model=config.get("summary_model"),
-            duration_ms=ms_since(start),
-        )
+        result = process_file(args.input, load_config(args.config), base_dir=args.base_dir)
         if args.format == "json":
             emit_json(result, pretty=args.pretty)
         return 0
@@ -22,9 +22,10 @@ from typing import Any
 
 import pyarrow as pa
 import pyarrow.parquet as pq
-from openai import OpenAI
 
 from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
+from brain_graph.utils.embedding_cache import get_passage_store, hit_ratio
+from brain_graph.utils.embedding_client import embed_batch
 from brain_graph.utils.file_utils import load_config
 
 
@@ -54,27 +55,21 @@ def category_to_text(category: dict[str, Any]) -> str:
     return f"Query: {content}"
 
 
-def embed_texts(texts: list[str], config: dict[str, Any]) -> list[list[float]]:
-    """Embedded Texte via OpenAI-kompatible API."""
-    client = OpenAI(
-        base_url=config["embedding_base_url"],
-        api_key=config.get("embedding_api_key", "unused"),
-    )
-
-    embeddings: list[list[float]] = []
-    batch_size = int(config.get("embedding_batch_size", 1))
-    model = config["embedding_model"]
-
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        print(
-            f"Embedding taxonomy batch {i//batch_size + 1}/{(len(texts)-1)//batch_size + 1}...",
-            file=sys.stderr,
-        )
-        response = client.embeddings.create(input=batch, model=model)
-        batch_embeddings = sorted(response.data, key=lambda x: x.index)
-        embeddings.extend([e.embedding for e in batch_embeddings])
+def embed_texts(
+    texts: list[str], config: dict[str, Any], stats: dict[str, int] | None = None
+) -> list[list[float]]:
+    """Embedded Texte via OpenAI-kompatible API (über den Passage-Store)."""
+    stats = {} if stats is None else stats
+    taxonomy_config = {**config, "embedding_batch_size": int(config.get("embedding_batch_size", 1))}
 
+    print(f"Embedding {len(texts)} taxonomy texts...", file=sys.stderr)
+    embeddings = embed_batch(
+        texts, taxonomy_config, cache=get_passage_store(config), stats=stats
+    )
+    print(
+        f"Passage store: {stats.get('hits', 0)} hits, {stats.get('misses', 0)} embedded",
+        file=sys.stderr,
+    )
     return embeddings
 
 
@@ -152,7 +147,8 @@ def main() -> int:
         if not texts:
             raise ValueError("No category texts prepared for embedding")
 
-        embeddings = embed_texts(texts, config)
+        cache_stats: dict[str, int] = {}
+        embeddings = embed_texts(texts, config, cache_stats)
 
         actual_dim = len(embeddings[0]) if embeddings else 0
         expected_dim = int(config.get("embedding_dim", actual_dim or 0) or 0)
@@ -177,6 +173,7 @@ def main() -> int:
             output={"parquet": str(args.output)},
             counts={"categories": len(categories), "texts_embedded": len(embeddings)},
             embedding={"model": config.get("embedding_model"), "dim": actual_dim},
+            embedding_cache=hit_ratio(cache_stats),
             duration_ms=ms_since(start),
         )
         if args.format == "json":
@@ -295,6 +295,176 @@ def apply_categories(
     return updated_nodes, category_edges
 
 
+def process_file(
+    input_path: Path,
+    *,
+    taxonomy: Path = Path(".brain_graph/config/taxonomy.md.parquet"),
+    taxonomy_md: Path = Path("config/taxonomy.md"),
+    base_dir: Path = Path(".brain_graph/data"),
+    top_n: int = 3,
+    min_similarity: float = 0.399,
+    max_gap: float | None = 0.1,
+    verbose: bool = False,
+    taxonomy_embeddings: tuple[list[str], np.ndarray] | None = None,
+    taxonomy_meta: dict[str, dict[str, int]] | None = None,
+) -> dict[str, Any]:
+    """
+    Ordnet die Chunks einer Datei Kategorien zu (Kern von `main()`).
+
+    `taxonomy_embeddings` / `taxonomy_meta` können vorab geladen übergeben
+    werden, damit der In-Process-Runner sie nur einmal liest.
+    """
+    start = time.perf_counter()
+    if not input_path.exists():
+        raise FileNotFoundError(f"Source file not found: {input_path}")
+
+    # ULID extrahieren
+    doc_ulid = extract_ulid_from_md(input_path)
+    if not doc_ulid:
+        raise ValueError(f"No ULID found in {input_path}")
+
+    # Pfade ermitteln
+    output_paths = get_output_paths(input_path, doc_ulid, base_dir)
+
+    # Prüfe ob Embeddings existieren
+    if not output_paths["embeddings"].exists():
+        raise FileNotFoundError(
+            f"Embeddings not found: {output_paths['embeddings']} (run embedder.py first)"
+        )
+
+    if taxonomy_embeddings is None and not taxonomy.exists():
+        raise FileNotFoundError(f"Taxonomy parquet not found: {taxonomy}")
+
+    # Lade Embeddings
+    print("Loading embeddings...", file=sys.stderr)
+    chunk_ids, chunk_embeddings = load_embeddings(output_paths["embeddings"])
+    if taxonomy_embeddings is None:
+        taxonomy_embeddings = load_embeddings(taxonomy)
+    category_ids, category_embeddings = taxonomy_embeddings
+
+    print(
+        f"Loaded {len(chunk_ids)} chunks, {len(category_ids)} categories",
+        file=sys.stderr,
+    )
+
+    # Match Categories
+    print("Matching categories...", file=sys.stderr)
+    if verbose:
+        print(
+            f"  Parameters: top_n={top_n}, min_similarity={min_similarity}, max_gap={max_gap}",
+            file=sys.stderr,
+        )
+
+    matches = match_categories(
+        chunk_ids,
+        chunk_embeddings,
+        category_ids,
+        category_embeddings,
+        top_n=top_n,
+        min_similarity=min_similarity,
+        max_gap=max_gap,
+        verbose=verbose,
+    )
+
+    print(f"Found matches for {len(matches)} chunks", file=sys.stderr)
+
+    # Lade Nodes
+    nodes = json.loads(output_paths["nodes"].read_text(encoding="utf-8"))
+
+    # Apply Categories (inkrementell)
+    updated_nodes, category_edges = apply_categories(nodes, matches)
+
+    # Count
+    classified = sum(
+        1 for n in updated_nodes if "categories" in n and n["categories"]
+    )
+    total_assignments = sum(len(n.get("categories", [])) for n in updated_nodes)
+
+    print(
+        f"Classified {classified} chunks with {total_assignments} category assignments",
+        file=sys.stderr,
+    )
+
+    # Schreibe nodes.json zurück (in-place update)
+    output_paths["nodes"].write_text(
+        json.dumps(updated_nodes, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(f"Updated {output_paths['nodes']}", file=sys.stderr)
+
+    # Merge category-edges in edges.json
+    if output_paths["edges"].exists():
+        existing_edges = json.loads(
+            output_paths["edges"].read_text(encoding="utf-8")
+        )
+        # Remove old category edges
+        existing_edges = [
+            e for e in existing_edges if e.get("type") != "categorized_as"
+        ]
+        # Add new category edges
+        existing_edges.extend(category_edges)
+    else:
+        existing_edges = category_edges
+
+    output_paths["edges"].write_text(
+        json.dumps(existing_edges, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(
+        f"Updated {output_paths['edges']} ({len(category_edges)} category edges)",
+        file=sys.stderr,
+    )
+
+    # Calculate inherited metadata
+    if taxonomy_meta is None:
+        taxonomy_meta = load_taxonomy_metadata(taxonomy_md)
+    inherited = calculate_inherited_metadata(matches, taxonomy_meta)
+
+    if inherited:
+        print(f"Inherited metadata: {inherited}", file=sys.stderr)
+
+    # Update meta.json
+    meta_update = {
+        "step": "taxonomy_matching",
+        "classified_chunks": classified,
+        "total_assignments": total_assignments,
+        "parameters": {
+            "top_n": top_n,
+            "min_similarity": min_similarity,
+            "max_gap": max_gap,
+        },
+    }
+    if inherited:
+        meta_update.update(inherited)
+
+    update_meta(
+        output_paths["meta"],
+        meta_update,
+    )
+    print(f"Updated {output_paths['meta']}", file=sys.stderr)
+
+    result = ok_result(
+        "taxonomy_matcher",
+        input=str(input_path),
+        doc_ulid=doc_ulid,
+        output={
+            "nodes": str(output_paths["nodes"]),
+            "edges": str(output_paths["edges"]),
+            "meta": str(output_paths["meta"]),
+        },
+        counts={
+            "classified_chunks": classified,
+            "total_assignments": total_assignments,
+            "category_edges": len(category_edges),
+        },
+        parameters={
+            "top_n": top_n,
+            "min_similarity": min_similarity,
+            "max_gap": max_gap,
+        },
+        duration_ms=ms_since(start),
+    )
+    return result
+
+
 def main():
     start = time.perf_counter()
     parser = argparse.ArgumentParser(
@@ -353,150 +523,16 @@ def main():
     args = parser.parse_args()
 
     try:
-        if not args.input.exists():
-            raise FileNotFoundError(f"Source file not found: {args.input}")
-
-        # ULID extrahieren
-        doc_ulid = extract_ulid_from_md(args.input)
-        if not doc_ulid:
-            raise ValueError(f"No ULID found in {args.input}")
-
-        # Pfade ermitteln
-        output_paths = get_output_paths(args.input, doc_ulid, args.base_dir)
-
-        # Prüfe ob Embeddings existieren
-        if not output_paths["embeddings"].exists():
-            raise FileNotFoundError(
-                f"Embeddings not found: {output_paths['embeddings']} (run embedder.py first)"
-            )
-
-        if not args.taxonomy.exists():
-            raise FileNotFoundError(f"Taxonomy parquet not found: {args.taxonomy}")
-
-        # Lade Embeddings
-        print("Loading embeddings...", file=sys.stderr)
-        chunk_ids, chunk_embeddings = load_embeddings(output_paths["embeddings"])
-        category_ids, category_embeddings = load_embeddings(args.taxonomy)
-
-        print(
-            f"Loaded {len(chunk_ids)} chunks, {len(category_ids)} categories",
-            file=sys.stderr,
-        )
-
-        # Match Categories
-        print("Matching categories...", file=sys.stderr)
-        if args.verbose:
-            print(
-                f"  Parameters: top_n={args.top_n}, min_similarity={args.min_similarity}, max_gap={args.max_gap}",
-                file=sys.stderr,
-            )
-
-        matches = match_categories(
-            chunk_ids,
-            chunk_embeddings,
-            category_ids,
-            category_embeddings,
+        result = process_file(
+            args.input,
+            taxonomy=args.taxonomy,
+            taxonomy_md=args.taxonomy_md,
+            base_dir=args.base_dir,
             top_n=args.top_n,
             min_similarity=args.min_similarity,
             max_gap=args.max_gap,
             verbose=args.verbose,
         )
-
-        print(f"Found matches for {len(matches)} chunks", file=sys.stderr)
-
-        # Lade Nodes
-        nodes = json.loads(output_paths["nodes"].read_text(encoding="utf-8"))
-
-        # Apply Categories (inkrementell)
-        updated_nodes, category_edges = apply_categories(nodes, matches)
-
-        # Count
-        classified = sum(
-            1 for n in updated_nodes if "categories" in n and n["categories"]
-        )
-        total_assignments = sum(len(n.get("categories", [])) for n in updated_nodes)
-
-        print(
-            f"Classified {classified} chunks with {total_assignments} category assignments",
-            file=sys.stderr,
-        )
-
-        # Schreibe nodes.json zurück (in-place update)
-        output_paths["nodes"].write_text(
-            json.dumps(updated_nodes, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        print(f"Updated {output_paths['nodes']}", file=sys.stderr)
-
-        # Merge category-edges in edges.json
-        if output_paths["edges"].exists():
-            existing_edges = json.loads(
-                output_paths["edges"].read_text(encoding="utf-8")
-            )
-            # Remove old category edges
-            existing_edges = [
-                e for e in existing_edges if e.get("type") != "categorized_as"
-            ]
-            # Add new category edges
-            existing_edges.extend(category_edges)
-        else:
-            existing_edges = category_edges
-
-        output_paths["edges"].write_text(
-            json.dumps(existing_edges, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        print(
-            f"Updated {output_paths['edges']} ({len(category_edges)} category edges)",
-            file=sys.stderr,
-        )
-
-        # Calculate inherited metadata
-        taxonomy_meta = load_taxonomy_metadata(args.taxonomy_md)
-        inherited = calculate_inherited_metadata(matches, taxonomy_meta)
-
-        if inherited:
-            print(f"Inherited metadata: {inherited}", file=sys.stderr)
-
-        # Update meta.json
-        meta_update = {
-            "step": "taxonomy_matching",
-            "classified_chunks": classified,
-            "total_assignments": total_assignments,
-            "parameters": {
-                "top_n": args.top_n,
-                "min_similarity": args.min_similarity,
-                "max_gap": args.max_gap,
-            },
-        }
-        if inherited:
-            meta_update.update(inherited)
-
-        update_meta(
-            output_paths["meta"],
-            meta_update,
-        )
-        print(f"Updated {output_paths['meta']}", file=sys.stderr)
-
-        result = ok_result(
-            "taxonomy_matcher",
-            input=str(args.input),
-            doc_ulid=doc_ulid,
-            output={
-                "nodes": str(output_paths["nodes"]),
-                "edges": str(output_paths["edges"]),
-                "meta": str(output_paths["meta"]),
-            },
-            counts={
-                "classified_chunks": classified,
-                "total_assignments": total_assignments,
-                "category_edges": len(category_edges),
-            },
-            parameters={
-                "top_n": args.top_n,
-                "min_similarity": args.min_similarity,
-                "max_gap": args.max_gap,
-            },
-            duration_ms=ms_since(start),
-        )
         if args.format == "json":
             emit_json(result, pretty=args.pretty)
         return 0
@@ -3,28 +3,69 @@
 Search daemon for brain-graph.
 
 Keeps a persistent DuckDB connection and indexes loaded in memory
-to avoid cold-start latency on every search request.
+to avoid cold-start latency on every search request. Indexes come from the
+search snapshot written by `brain db build` (see db/index_snapshot.py).
+
+Concurrency model:
+- Connections are handed to a fixed pool of worker threads; each worker uses
+  its own `con.cursor()` on the shared database.
+- At most `workers + queue_depth` requests are admitted. Beyond that the
+  accept thread answers immediately with 503. Health probes are answered on
+  the accept thread and never queue.
+- Every search, query embedding included, runs under a timeout; on expiry
+  the embedding request is abandoned or the worker's cursor is
+  interrupted (DuckDB interrupt) and the request returns 504.
+
+`POST /search` takes optional metadata `filters` in semantic mode (see
+search/filters.py). `POST /search/batch` runs many queries at once (see
+searcher.batch_search); the normalized chunk embedding matrix it needs is
+loaded once and kept.
+
+With `--first-stage quantized`, semantic search takes its candidates from the
+in-memory sign/int8 codes of the chunk embeddings (db/quantized_index.py)
+instead of the HNSW index, re-scored with the float vectors. With
+`--first-stage cascade` they come from the Matryoshka cascade recorded by
+`brain db build` (db/matryoshka.py), scored with the full query embedding.
+
+Document relevance decays by days, but the snapshot is only rebuilt when the
+indexed content changes: the daemon recomputes the relevance from the
+snapshot's `meta` on start and every RELEVANCE_RELOAD_S (db/relevance.py,
+`reload_relevance`).
 """
 from __future__ import annotations
 
 import argparse
 import json
+import math
 import signal
+import socket
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 from urllib.parse import parse_qs, urlparse
 
 import duckdb
+from openai import APITimeoutError
 
 # Add repo root to path
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from brain_graph.db.index_snapshot import open_search_connection
+from brain_graph.db.matryoshka import MatryoshkaCascade, format_cascade
+from brain_graph.db.quantized_index import QuantizedIndex
+from brain_graph.db.relevance import reload_relevance
+from brain_graph.search.filters import SearchFilters
 from brain_graph.search.searcher import (
+    BATCH_MODES,
+    ChunkMatrix,
+    batch_search,
     bm25_search,
     deduplicate_by_document,
     embed_query,
@@ -32,129 +73,230 @@ from brain_graph.search.searcher import (
     hybrid_search,
     semantic_search,
 )
+from brain_graph.utils.embedding_cache import get_query_cache
 from brain_graph.utils.file_utils import load_config
 
 
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_DEPTH = 32
+DEFAULT_TIMEOUT_S = 10.0
+FIRST_STAGES = ("hnsw", "quantized", "cascade")
+RELEVANCE_RELOAD_S = 3600.0
+SHUTDOWN_GRACE_S = 5.0
+
+
+class SearchTimeout(Exception):
+    """Raised when a search exceeded its time budget and was interrupted."""
+
+
+def parse_timeout(value: Any, server_timeout_s: float) -> float | None:
+    """
+    Request `timeout_s` as seconds, capped at the server timeout (None: server default).
+
+    Raises ValueError unless it is a positive finite number: a request may
+    shorten the server timeout but not lift it.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError("'timeout_s' must be a number")
+    try:
+        timeout_s = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("'timeout_s' must be a number") from None
+    if not math.isfinite(timeout_s) or timeout_s <= 0:
+        raise ValueError("'timeout_s' must be a positive number of seconds")
+    return min(timeout_s, server_timeout_s) if server_timeout_s > 0 else timeout_s
+
+
 class SearchDaemon:
     """Search daemon with persistent DB connection."""
 
-    def __init__(self, db_path: Path, config_path: Path | None = None):
+    def __init__(
+        self,
+        db_path: Path,
+        config_path: Path | None = None,
+        *,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        first_stage: str = "hnsw",
+    ):
         """Initialize daemon with database and config."""
+        if first_stage not in FIRST_STAGES:
+            raise ValueError(f"Unsupported first stage: {first_stage} (expected one of {FIRST_STAGES})")
         self.db_path = db_path
         self.config = load_config(config_path)
         self.con: duckdb.DuckDBPyConnection | None = None
+        self.index_info: dict[str, Any] = {}
         self.ready = False
+        self.timeout_s = timeout_s
+        self.first_stage = first_stage
+        self._local = threading.local()
+        self._cursors: list[duckdb.DuckDBPyConnection] = []
+        self._stats_lock = threading.Lock()
+        self._matrix: ChunkMatrix | None = None
+        self._matrix_lock = threading.Lock()
+        self._quantized: QuantizedIndex | None = None
+        self._cascade: MatryoshkaCascade | None = None
+        self._closing = threading.Event()
+        self.stats = {"requests": 0, "in_flight": 0, "timeouts": 0, "errors": 0}
 
     def load_database(self) -> None:
-        """Load database into memory with indexes."""
+        """Open the search snapshot (rebuilding it only if the fingerprint changed)."""
         print(f"Loading database from {self.db_path}...", file=sys.stderr)
         start = time.perf_counter()
 
-        self.con = duckdb.connect(":memory:")
-        self.con.execute(f"ATTACH '{self.db_path}' AS disk_db (READ_ONLY)")
-
-        main_tables = [
-            "nodes",
-            "edges",
-            "chunk_embeddings_256d",
-            "taxonomy_embeddings_256d",
-            "embedding_sources",
-            "meta",
-            "german_stopwords",
-        ]
-
-        for table_name in main_tables:
-            exists = self.con.execute(
-                f"SELECT COUNT(*) FROM duckdb_tables() WHERE database_name='disk_db' AND table_name='{table_name}'"
-            ).fetchone()[0]
-            if exists:
-                print(f"  Loading table: {table_name}", file=sys.stderr)
-                self.con.execute(
-                    f"CREATE TABLE {table_name} AS SELECT * FROM disk_db.{table_name}"
-                )
-
-        self.con.execute("DETACH disk_db")
+        self.con, self.index_info = open_search_connection(self.db_path)
 
-        print("Building indexes...", file=sys.stderr)
-
-        # VSS extension + HNSW index
-        vss_loaded = False
-        try:
-            self.con.execute("LOAD vss;")
-            vss_loaded = True
-        except duckdb.Error:
-            try:
-                self.con.execute("INSTALL vss;")
-                self.con.execute("LOAD vss;")
-                vss_loaded = True
-            except duckdb.Error as e:
-                print(
-                    f"Warning: Could not load VSS extension ({e})", file=sys.stderr
-                )
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Database ready in {elapsed:.0f}ms (source: {self.index_info['source']})",
+            file=sys.stderr,
+        )
+        if self.first_stage == "quantized":
+            self.load_quantized_index()
+        elif self.first_stage == "cascade":
+            self.load_cascade()
+        self.reload_relevance()
+        threading.Thread(target=self._relevance_loop, name="relevance-reload", daemon=True).start()
+        self.ready = True
 
-        if vss_loaded:
+    def reload_relevance(self) -> None:
+        """Recompute document relevance as of now (the snapshot's copy only changes on rebuilds)."""
+        stats = reload_relevance(self.cursor())
+        if stats is None:
+            return
+        with self._matrix_lock:
+            # The batch matrix holds relevance scores too: reload on next use
+            self._matrix = None
+        self.index_info["relevance"] = stats
+        print(
+            f"Relevance of {stats['documents']} documents reloaded in {stats['duration_ms']}ms",
+            file=sys.stderr,
+        )
+
+    def _relevance_loop(self) -> None:
+        while not self._closing.wait(RELEVANCE_RELOAD_S):
             try:
-                self.con.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_chunk_embeddings_hnsw
-                    ON chunk_embeddings_256d
-                    USING HNSW (embedding)
-                    WITH (metric = 'cosine')
-                    """
-                )
+                self.reload_relevance()
             except duckdb.Error as e:
-                print(
-                    f"Warning: Could not build HNSW index ({e})", file=sys.stderr
-                )
+                print(f"Warning: relevance reload failed ({e})", file=sys.stderr)
 
-        # FTS extension + index
-        fts_loaded = False
+    def load_quantized_index(self) -> None:
+        """Load the quantized chunk codes (HNSW stays the first stage if they are missing)."""
+        start = time.perf_counter()
+        self._quantized = QuantizedIndex.load(self.cursor(), "chunk")
+        if self._quantized is None:
+            print("Quantized embeddings not built, using the HNSW index", file=sys.stderr)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Quantized index loaded ({len(self._quantized)} rows, "
+            f"{self._quantized.nbytes / 2**20:.1f} MiB) in {elapsed:.0f}ms",
+            file=sys.stderr,
+        )
+
+    def load_cascade(self) -> None:
+        """Load the Matryoshka cascade recorded by `brain db build` (HNSW stays the first stage if it fails)."""
+        start = time.perf_counter()
         try:
-            self.con.execute("LOAD fts;")
-            fts_loaded = True
-        except duckdb.Error:
-            try:
-                self.con.execute("INSTALL fts;")
-                self.con.execute("LOAD fts;")
-                fts_loaded = True
-            except duckdb.Error as e:
-                print(
-                    f"Warning: Could not load FTS extension ({e})", file=sys.stderr
-                )
-
-        if fts_loaded:
-            has_stopwords = (
-                self.con.execute(
-                    "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name='german_stopwords'"
-                ).fetchone()[0]
-                > 0
-            )
-            stopwords_param = "german_stopwords" if has_stopwords else "none"
-            try:
-                self.con.execute(
-                    f"""
-                    PRAGMA create_fts_index(
-                        'nodes', 'id', 'text', 'summary', 'title', 'description',
-                        stemmer='german',
-                        stopwords='{stopwords_param}',
-                        ignore='(\\.|[^a-zäöüß])+',
-                        strip_accents=1,
-                        lower=1,
-                        overwrite=1
-                    )
-                    """
-                )
-            except duckdb.Error as e:
+            cascade = MatryoshkaCascade.load(self.cursor())
+        except duckdb.Error as e:
+            print(f"Matryoshka cascade not available ({e}), using the HNSW index", file=sys.stderr)
+            return
+        if not len(cascade):
+            print("No chunk embeddings for the Matryoshka cascade, using the HNSW index", file=sys.stderr)
+            return
+        self._cascade = cascade
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Matryoshka cascade {format_cascade(self._cascade.levels)} loaded ({len(self._cascade)} rows, "
+            f"{self._cascade.nbytes / 2**20:.1f} MiB) in {elapsed:.0f}ms",
+            file=sys.stderr,
+        )
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """Return this worker thread's own cursor on the shared database."""
+        cur = getattr(self._local, "cursor", None)
+        if cur is None:
+            assert self.con is not None
+            cur = self._local.cursor = self.con.cursor()
+            with self._stats_lock:
+                self._cursors.append(cur)
+        return cur
+
+    def chunk_matrix(self) -> ChunkMatrix:
+        """Load the chunk embedding matrix for batch search on first use."""
+        with self._matrix_lock:
+            if self._matrix is None:
+                start = time.perf_counter()
+                self._matrix = ChunkMatrix.load(self.cursor())
+                elapsed = (time.perf_counter() - start) * 1000
                 print(
-                    f"Warning: Could not build FTS index ({e})", file=sys.stderr
+                    f"Chunk matrix loaded ({len(self._matrix)} rows) in {elapsed:.0f}ms",
+                    file=sys.stderr,
                 )
-
-        elapsed = (time.perf_counter() - start) * 1000
-        print(f"Database ready in {elapsed:.0f}ms", file=sys.stderr)
-        self.ready = True
-
-    def search(self, query: str, mode: str = "hybrid", limit: int = 10) -> dict[str, Any]:
-        """Execute search query."""
+            return self._matrix
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += delta
+
+    def embedding_config(self, timeout_s: float) -> dict[str, Any]:
+        """Config whose embedding requests give up after `timeout_s` (0: no limit)."""
+        if timeout_s <= 0:
+            return self.config
+        return {**self.config, "embedding_timeout": timeout_s}
+
+    def run_with_timeout(
+        self,
+        fn: Callable[[duckdb.DuckDBPyConnection], Any],
+        timeout_s: float | None = None,
+    ) -> Any:
+        """
+        Run `fn(cursor)` on this worker's cursor; interrupt DuckDB after `timeout_s`.
+
+        Raises SearchTimeout if the query was interrupted, the embedding request
+        timed out (see `embedding_config`) or `fn` returned past the deadline.
+        """
+        cur = self.cursor()
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        expired = threading.Event()
+
+        def _interrupt() -> None:
+            expired.set()
+            cur.interrupt()
+
+        timer = threading.Timer(timeout_s, _interrupt) if timeout_s > 0 else None
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        self._count("in_flight")
+        try:
+            result = fn(cur)
+        except duckdb.Error as e:
+            if expired.is_set():
+                raise SearchTimeout(f"Search exceeded {timeout_s:.1f}s and was interrupted") from e
+            raise
+        except APITimeoutError as e:
+            raise SearchTimeout(f"Query embedding exceeded {timeout_s:.1f}s") from e
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._count("in_flight", -1)
+        if expired.is_set():
+            # Deadline passed outside DuckDB (e.g. while embedding), nothing to interrupt
+            raise SearchTimeout(f"Search exceeded {timeout_s:.1f}s")
+        return result
+
+    def search(
+        self,
+        query: str,
+        mode: str = "hybrid",
+        limit: int = 10,
+        timeout_s: float | None = None,
+        filters: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Execute search query (`filters`: see search/filters.py, semantic mode only)."""
         if not self.ready or self.con is None:
             return {
                 "ok": False,
@@ -162,25 +304,50 @@ class SearchDaemon:
             }
 
         start = time.perf_counter()
+        self._count("requests")
 
         try:
-            query_embedding = None
-            if mode in ["semantic", "hybrid"]:
-                query_embedding = embed_query(query, self.config)
+            search_filters = SearchFilters.from_dict(filters)
+            if search_filters and mode != "semantic":
+                raise ValueError(f"Filters are supported in semantic mode, not {mode}")
+
+            timeout_s = self.timeout_s if timeout_s is None else timeout_s
+            config = self.embedding_config(timeout_s)
 
             if mode == "semantic":
-                results = semantic_search(self.con, query_embedding, limit)
                 score_key = "similarity"
             elif mode == "bm25":
-                results = bm25_search(self.con, query, limit)
                 score_key = "bm25_score"
             elif mode == "fuzzy":
-                results = fuzzy_search(self.con, query, limit)
                 score_key = "fuzzy_score"
             else:  # hybrid
-                results = hybrid_search(self.con, query, query_embedding, limit, 0.7, 0.3)
                 score_key = "hybrid_score"
 
+            def run(cur: duckdb.DuckDBPyConnection) -> list[dict]:
+                # The query embedding counts against the timeout, too
+                if mode == "semantic":
+                    return semantic_search(
+                        cur,
+                        query_embedding=embed_query(query, config),
+                        limit=limit,
+                        filters=search_filters,
+                        quantized=self._quantized,
+                        cascade=self._cascade,
+                    )
+                if mode == "bm25":
+                    return bm25_search(cur, query=query, limit=limit)
+                if mode == "fuzzy":
+                    return fuzzy_search(cur, query=query, limit=limit)
+                return hybrid_search(
+                    cur,
+                    query=query,
+                    query_embedding=embed_query(query, config),
+                    limit=limit,
+                    semantic_weight=0.7,
+                    bm25_weight=0.3,
+                )
+
+            results = self.run_with_timeout(run, timeout_s)
             results = deduplicate_by_document(results, score_key)
 
             duration_ms = (time.perf_counter() - start) * 1000
@@ -193,6 +360,7 @@ class SearchDaemon:
                     "query": query,
                     "mode": mode,
                     "limit": limit,
+                    "filters": search_filters.to_dict(),
                     "score_key": score_key,
                 },
                 "results": results,
@@ -202,16 +370,104 @@ class SearchDaemon:
 
         except Exception as e:
             duration_ms = (time.perf_counter() - start) * 1000
+            timed_out = isinstance(e, SearchTimeout)
+            self._count("timeouts" if timed_out else "errors")
             return {
                 "ok": False,
                 "tool": "search",
-                "status": "failed",
+                "status": "timeout" if timed_out else "failed",
                 "error": {"type": type(e).__name__, "message": str(e)},
                 "duration_ms": duration_ms,
             }
 
+    def search_batch(
+        self,
+        queries: list[str],
+        mode: str = "hybrid",
+        limit: int = 10,
+        timeout_s: float | None = None,
+    ) -> dict[str, Any]:
+        """Execute many queries in one go (one embedding call, one matrix product)."""
+        if not self.ready or self.con is None:
+            return {
+                "ok": False,
+                "error": {"type": "DaemonNotReady", "message": "Daemon not ready"},
+            }
+
+        start = time.perf_counter()
+        self._count("requests")
+        score_key = {
+            "semantic": "similarity",
+            "bm25": "bm25_score",
+            "fuzzy": "fuzzy_score",
+            "hybrid": "hybrid_score",
+        }.get(mode)
+
+        try:
+            if score_key is None:
+                raise ValueError(f"Unsupported mode: {mode} (expected one of {BATCH_MODES})")
+            matrix = self.chunk_matrix() if mode in ("semantic", "hybrid") else None
+            timeout_s = self.timeout_s if timeout_s is None else timeout_s
+            batch = self.run_with_timeout(
+                partial(
+                    batch_search,
+                    queries=queries,
+                    config=self.embedding_config(timeout_s),
+                    mode=mode,
+                    limit=limit,
+                    matrix=matrix,
+                ),
+                timeout_s,
+            )
+            results = [
+                {"query": query, "results": deduplicate_by_document(hits, score_key)}
+                for query, hits in zip(queries, batch["results"])
+            ]
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            return {
+                "ok": True,
+                "tool": "search_batch",
+                "status": "completed",
+                "output": {"mode": mode, "limit": limit, "score_key": score_key},
+                "results": results,
+                "counts": {
+                    "queries": len(queries),
+                    "results": sum(len(r["results"]) for r in results),
+                },
+                "embedding_cache": batch["embedding_cache"],
+                "timings_ms": batch["timings_ms"],
+                "duration_ms": duration_ms,
+            }
+
+        except Exception as e:
+            duration_ms = (time.perf_counter() - start) * 1000
+            timed_out = isinstance(e, SearchTimeout)
+            self._count("timeouts" if timed_out else "errors")
+            return {
+                "ok": False,
+                "tool": "search_batch",
+                "status": "timeout" if timed_out else "failed",
+                "error": {"type": type(e).__name__, "message": str(e)},
+                "duration_ms": duration_ms,
+            }
+
+    def interrupt(self) -> None:
+        """Interrupt the queries running on any worker's cursor (shutdown)."""
+        self._closing.set()
+        with self._stats_lock:
+            cursors = list(self._cursors)
+        for cur in cursors:
+            cur.interrupt()
+
     def close(self) -> None:
-        """Close database connection."""
+        """Close database connection (after the server stopped handing out requests)."""
+        self._closing.set()
+        with self._stats_lock:
+            self._cursors.clear()
+        self._matrix = None
+        self._quantized = None
+        self._cascade = None
         if self.con is not None:
             self.con.close()
             self.con = None
@@ -225,92 +481,281 @@ daemon: SearchDaemon | None = None
 class SearchHTTPHandler(BaseHTTPRequestHandler):
     """HTTP request handler for search daemon."""
 
+    # Set on the handler used by the accept thread when the server is saturated.
+    overloaded = False
+
+    def _send_json(
+        self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None
+    ) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self) -> None:
         """Handle GET requests."""
         if self.path == "/health":
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
             response = {
                 "status": "ok" if daemon and daemon.ready else "not_ready",
                 "ready": daemon.ready if daemon else False,
+                "index_source": daemon.index_info.get("source") if daemon else None,
+                "overloaded": self.overloaded,
             }
-            self.wfile.write(json.dumps(response).encode())
+            if daemon:
+                response["stats"] = dict(daemon.stats)
+                # Session counters only: health must not wait on the cache file
+                query_cache = get_query_cache(getattr(daemon, "config", None) or {})
+                if query_cache is not None:
+                    response["embedding_cache"] = {
+                        "path": str(query_cache.path),
+                        **query_cache.session,
+                    }
+            server_stats = getattr(self.server, "stats", None)
+            if server_stats is not None:
+                response["server"] = server_stats()
+            self._send_json(200, response)
         else:
             self.send_response(404)
             self.end_headers()
 
     def do_POST(self) -> None:
         """Handle POST requests."""
-        if self.path == "/search":
-            content_length = int(self.headers.get("Content-Length", 0))
-            body = self.rfile.read(content_length)
+        if self.path not in ("/search", "/search/batch"):
+            self.send_response(404)
+            self.end_headers()
+            return
 
-            try:
-                data = json.loads(body)
-                query = data.get("query", "")
-                mode = data.get("mode", "hybrid")
-                limit = data.get("limit", 10)
-
-                if not query:
-                    self.send_response(400)
-                    self.send_header("Content-Type", "application/json")
-                    self.end_headers()
-                    self.wfile.write(
-                        json.dumps(
-                            {"ok": False, "error": "Missing 'query' parameter"}
-                        ).encode()
-                    )
-                    return
+        content_length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(content_length)
 
-                result = daemon.search(query, mode, limit)
+        if self.overloaded:
+            self._send_json(
+                503,
+                {"ok": False, "error": "Server busy, retry later"},
+                headers={"Retry-After": "1"},
+            )
+            return
 
-                self.send_response(200)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps(result, ensure_ascii=False).encode())
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            self._send_json(400, {"ok": False, "error": "Invalid JSON"})
+            return
 
-            except json.JSONDecodeError:
-                self.send_response(400)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(
-                    json.dumps({"ok": False, "error": "Invalid JSON"}).encode()
+        mode = data.get("mode", "hybrid")
+        limit = data.get("limit", 10)
+        try:
+            timeout_s = parse_timeout(data.get("timeout_s"), daemon.timeout_s)
+        except ValueError as e:
+            self._send_json(400, {"ok": False, "error": str(e)})
+            return
+
+        if self.path == "/search/batch":
+            queries = data.get("queries")
+            if not isinstance(queries, list) or not queries or not all(
+                isinstance(q, str) and q for q in queries
+            ):
+                self._send_json(
+                    400, {"ok": False, "error": "'queries' must be a non-empty list of strings"}
                 )
+                return
+            result = daemon.search_batch(queries, mode, limit, timeout_s=timeout_s)
         else:
-            self.send_response(404)
-            self.end_headers()
+            query = data.get("query", "")
+            if not query:
+                self._send_json(400, {"ok": False, "error": "Missing 'query' parameter"})
+                return
+            result = daemon.search(
+                query, mode, limit, timeout_s=timeout_s, filters=data.get("filters")
+            )
+
+        status = 504 if result.get("status") == "timeout" else 200
+        self._send_json(status, result)
 
     def log_message(self, format: str, *args: Any) -> None:
         """Suppress default logging."""
         pass
 
 
-def run_daemon(host: str, port: int, db_path: Path, config_path: Path | None) -> None:
+class OverloadedHTTPHandler(SearchHTTPHandler):
+    """Answers health probes normally and everything else with 503."""
+
+    overloaded = True
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer with a fixed worker pool and a bounded admission queue.
+
+    Admitted connections (at most `workers + queue_depth` at a time) are processed
+    by the pool; beyond that the accept thread answers directly via
+    `OverloadedHTTPHandler`, so callers get a fast 503 instead of piling up.
+    Health probes are answered on the accept thread before admission, so they
+    never wait behind queued searches.
+    """
+
+    # Slow clients must not stall the accept thread on the overload path.
+    overload_timeout_s = 2.0
+    # Socket timeout of admitted connections: a stalled client frees its worker.
+    request_timeout_s = 30.0
+    # How long the accept thread waits for the request line of a new connection.
+    health_peek_s = 0.05
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handler_class: type[BaseHTTPRequestHandler],
+        *,
+        workers: int = DEFAULT_WORKERS,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+    ):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search-worker")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._active = 0
+        self._admitted = 0
+        self._rejected = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "active": self._active,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+            }
+
+    def _is_health_probe(self, request: socket.socket) -> bool:
+        """Peek at the request line without consuming it."""
+        prefix = b"GET /health "
+        try:
+            request.settimeout(self.health_peek_s)
+            head = request.recv(len(prefix), socket.MSG_PEEK)
+        except OSError:
+            return False
+        finally:
+            request.settimeout(None)
+        return head == prefix
+
+    def _process_here(
+        self,
+        handler_class: type[BaseHTTPRequestHandler],
+        request: socket.socket,
+        client_address: Any,
+    ) -> None:
+        """Handle a connection on the accept thread."""
+        try:
+            request.settimeout(self.overload_timeout_s)
+            handler_class(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def process_request(self, request: socket.socket, client_address: Any) -> None:
+        if self._is_health_probe(request):
+            with self._lock:
+                saturated = self._active >= self.workers + self.queue_depth
+            self._process_here(
+                OverloadedHTTPHandler if saturated else self.RequestHandlerClass,
+                request,
+                client_address,
+            )
+            return
+
+        with self._lock:
+            admitted = self._active < self.workers + self.queue_depth
+            if admitted:
+                self._active += 1
+                self._admitted += 1
+            else:
+                self._rejected += 1
+        if not admitted:
+            self._process_here(OverloadedHTTPHandler, request, client_address)
+            return
+        self._pool.submit(self._process_pooled, request, client_address)
+
+    def _process_pooled(self, request: socket.socket, client_address: Any) -> None:
+        try:
+            request.settimeout(self.request_timeout_s)
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._lock:
+                self._active -= 1
+                if not self._active:
+                    self._idle.notify_all()
+
+    def drain(self, timeout_s: float) -> bool:
+        """Wait until admitted connections are done; False if some still run after `timeout_s`."""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._active, timeout_s)
+
+    def server_close(self) -> None:
+        """Stop accepting; connections already admitted are still processed (see `drain`)."""
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+def run_daemon(
+    host: str,
+    port: int,
+    db_path: Path,
+    config_path: Path | None,
+    *,
+    workers: int = DEFAULT_WORKERS,
+    queue_depth: int = DEFAULT_QUEUE_DEPTH,
+    timeout_s: float = DEFAULT_TIMEOUT_S,
+    first_stage: str = "hnsw",
+) -> None:
     """Run the search daemon."""
     global daemon
 
-    daemon = SearchDaemon(db_path, config_path)
+    daemon = SearchDaemon(db_path, config_path, timeout_s=timeout_s, first_stage=first_stage)
     daemon.load_database()
 
-    server = HTTPServer((host, port), SearchHTTPHandler)
+    server = PooledHTTPServer(
+        (host, port), SearchHTTPHandler, workers=workers, queue_depth=queue_depth
+    )
 
     def signal_handler(sig, frame):
         print("\nShutting down daemon...", file=sys.stderr)
-        daemon.close()
-        server.shutdown()
-        sys.exit(0)
+        # shutdown() waits for serve_forever(), which runs in this (main) thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    print(f"Search daemon listening on http://{host}:{port}", file=sys.stderr)
+    print(
+        f"Search daemon listening on http://{host}:{port} "
+        f"({workers} workers, queue depth {queue_depth}, timeout {timeout_s:.1f}s)",
+        file=sys.stderr,
+    )
     print("Endpoints:", file=sys.stderr)
     print("  GET  /health  - Health check", file=sys.stderr)
     print("  POST /search  - Search query", file=sys.stderr)
     print("", file=sys.stderr)
 
-    server.serve_forever()
+    try:
+        server.serve_forever()
+    finally:
+        # Stop accepting, let admitted requests finish (interrupting searches
+        # still running after the grace period), close the database last
+        server.server_close()
+        if not server.drain(SHUTDOWN_GRACE_S):
+            daemon.interrupt()
+            server.drain(SHUTDOWN_GRACE_S)
+        daemon.close()
 
 
 def main() -> int:
@@ -339,6 +784,31 @@ def main() -> int:
         default=None,
         help="Config file path (default: auto-detect)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Worker threads, each with its own DB cursor (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=DEFAULT_QUEUE_DEPTH,
+        help=f"Requests allowed to wait for a worker before 503 (default: {DEFAULT_QUEUE_DEPTH})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_S,
+        help=f"Per-request search timeout in seconds, 0 = none (default: {DEFAULT_TIMEOUT_S})",
+    )
+    parser.add_argument(
+        "--first-stage",
+        choices=FIRST_STAGES,
+        default="hnsw",
+        help="Candidate source of semantic search: HNSW index, quantized codes or "
+        "Matryoshka cascade (default: hnsw)",
+    )
 
     args = parser.parse_args()
 
@@ -346,7 +816,16 @@ def main() -> int:
         print(f"Error: Database not found: {args.db}", file=sys.stderr)
         return 1
 
-    run_daemon(args.host, args.port, args.db, args.config)
+    run_daemon(
+        args.host,
+        args.port,
+        args.db,
+        args.config,
+        workers=args.workers,
+        queue_depth=args.queue_depth,
+        timeout_s=args.timeout,
+        first_stage=args.first_stage,
+    )
     return 0
 
 
@@ -0,0 +1,129 @@
+"""
+Metadata filters for vector search.
+
+A `SearchFilters` turns into one parametrized SQL predicate over the rows of
+a vector search (chunks or code units), never into interpolated values:
+
+- `languages`: chunk language (`nodes.language`) or code language
+  (`code_embeddings_256d.language`)
+- `doc_types`, `research_statuses`: `meta.doc_type` / `meta.research_status`
+  of the row's document (via `source_file`)
+- `categories`: `categorized_as` edges of a chunk to a taxonomy node, given
+  by node id (ULID) or title
+- `created_after`, `created_before`: ULID time range; ULIDs sort by their
+  millisecond timestamp, so the range is a plain string range on the id
+
+searcher.py counts the rows passing the predicate (metadata only, no
+embeddings) and picks the strategy by selectivity: brute force over the
+passing rows when few pass, HNSW with over-fetch and post-filtering otherwise.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import Any
+
+import ulid
+
+
+def _as_tuple(value: Any) -> tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(str(v).strip() for v in value if str(v).strip())
+
+
+def _as_datetime(value: Any) -> datetime | None:
+    if value is None or value == "":
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def ulid_bound(moment: datetime) -> str:
+    """Smallest ULID of `moment` (every ULID created at or after it sorts >= this)."""
+    millis = int(moment.timestamp() * 1000)
+    return str(ulid.ULID.from_bytes(millis.to_bytes(6, "big") + bytes(10)))
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Restrictions of a vector search; empty fields do not filter."""
+
+    languages: tuple[str, ...] = ()
+    doc_types: tuple[str, ...] = ()
+    research_statuses: tuple[str, ...] = ()
+    categories: tuple[str, ...] = ()
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> SearchFilters:
+        """
+        Parse filters from a request body or CLI arguments.
+
+        Lists may be given as lists or comma-separated strings, times as
+        datetimes or ISO 8601 strings (naive times are UTC).
+        """
+        data = data or {}
+        unknown = set(data) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown search filters: {', '.join(sorted(unknown))}")
+        return cls(
+            languages=_as_tuple(data.get("languages")),
+            doc_types=_as_tuple(data.get("doc_types")),
+            research_statuses=_as_tuple(data.get("research_statuses")),
+            categories=_as_tuple(data.get("categories")),
+            created_after=_as_datetime(data.get("created_after")),
+            created_before=_as_datetime(data.get("created_before")),
+        )
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f.name) for f in fields(self))
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-friendly form of the set filters (for result metadata)."""
+        result: dict[str, Any] = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, datetime):
+                result[f.name] = value.isoformat()
+            elif value:
+                result[f.name] = list(value)
+        return result
+
+    def predicate(self, id_column: str, source_column: str, language_column: str) -> tuple[str, list]:
+        """(SQL predicate, parameters) over the given columns of a search row."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if self.languages:
+            clauses.append(f"{language_column} IN (SELECT UNNEST(?::VARCHAR[]))")
+            params.append(list(self.languages))
+        for column, values in (("doc_type", self.doc_types), ("research_status", self.research_statuses)):
+            if values:
+                clauses.append(
+                    f"""{source_column} IN (
+                        SELECT source_file FROM meta WHERE {column} IN (SELECT UNNEST(?::VARCHAR[]))
+                    )"""
+                )
+                params.append(list(values))
+        if self.categories:
+            clauses.append(
+                f"""{id_column} IN (
+                    SELECT e.from_id
+                    FROM edges e
+                    JOIN nodes c ON c.id = e.to_id
+                    WHERE e.type = 'categorized_as'
+                      AND (c.id IN (SELECT UNNEST(?::VARCHAR[])) OR c.title IN (SELECT UNNEST(?::VARCHAR[])))
+                )"""
+            )
+            params += [list(self.categories), list(self.categories)]
+        if self.created_after is not None:
+            clauses.append(f"{id_column} >= ?")
+            params.append(ulid_bound(self.created_after))
+        if self.created_before is not None:
+            clauses.append(f"{id_column} < ?")
+            params.append(ulid_bound(self.created_before))
+        return (" AND ".join(clauses) or "TRUE"), params
@@ -0,0 +1,263 @@
+"""
+Reranker client with endpoint capability caching.
+
+- probes the server once: `/reranking` (llama.cpp), `/rerank` (TEI/jina),
+  the embeddings API (query+document → score) and chat completion; the first
+  method that works is remembered. A failing call is retried once and then
+  falls back to the other methods for that call only
+- one pooled `requests.Session` and one OpenAI client per server and model
+- documents are sent in batches (`reranker_batch_size`), up to
+  `reranker_concurrency` requests in flight; chat scoring runs concurrently
+- scores are cached by (query, document hash, method, model) in the rerank
+  cache (see embedding_cache.py), so repeated agent queries skip the reranker;
+  fallback scores are not cached
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+import requests
+from openai import OpenAI
+from requests.adapters import HTTPAdapter
+
+from brain_graph.utils.embedding_cache import get_rerank_cache
+
+
+RERANK_ENDPOINTS = ("/reranking", "/rerank")
+METHODS = (*RERANK_ENDPOINTS, "embeddings", "chat")
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CONCURRENCY = 8
+
+CHAT_PROMPT = (
+    "Rate the relevance of this document to the query on a scale of 0-1.\n\n"
+    "Query: {query}\n\nDocument: {document}\n\nRelevance score (0-1):"
+)
+
+_clients: dict[tuple[str, str, str], RerankerClient] = {}
+_clients_lock = threading.Lock()
+
+T = TypeVar("T")
+
+
+class RerankerUnavailable(RuntimeError):
+    """No reranking method works for this server."""
+
+
+def _normalize_score(score: float) -> float:
+    """llama.cpp may return raw logits; map very small scores through a sigmoid."""
+    if score < 0.01:
+        try:
+            return 1.0 / (1.0 + math.exp(-score))
+        except OverflowError:
+            return score
+    return score
+
+
+class RerankerClient:
+    """
+    Reranker for one (server, model), shared per process via `get_reranker_client`.
+
+    Config:
+        reranker_base_url, reranker_api_key, reranker_model
+        reranker_timeout: seconds per request (default 30)
+        reranker_batch_size: documents per request (default 32)
+        reranker_concurrency: requests in flight (default 8)
+        reranker_cache: false to disable the score cache (default: enabled)
+    """
+
+    def __init__(self, config: dict[str, Any], model: str | None = None):
+        self.model = model or config.get("reranker_model")
+        if not self.model:
+            raise ValueError("No reranker model specified in config or parameters")
+        self.base_url = (config.get("reranker_base_url") or "").rstrip("/")
+        self.api_key = config.get("reranker_api_key") or "unused"
+        self.timeout = float(config.get("reranker_timeout", DEFAULT_TIMEOUT))
+        self.batch_size = max(1, int(config.get("reranker_batch_size", DEFAULT_BATCH_SIZE)))
+        self.concurrency = max(1, int(config.get("reranker_concurrency", DEFAULT_CONCURRENCY)))
+        self.cache = get_rerank_cache(config)
+        self.method: str | None = None
+
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers["Authorization"] = f"Bearer {self.api_key}"
+        self._openai: OpenAI | None = None
+
+    @property
+    def openai(self) -> OpenAI:
+        with self._lock:
+            if self._openai is None:
+                self._openai = OpenAI(
+                    base_url=self.base_url or None, api_key=self.api_key, timeout=self.timeout
+                )
+            return self._openai
+
+    def _key(self, query: str, document: str, method: str) -> str:
+        doc_hash = hashlib.sha256(document.encode("utf-8")).hexdigest()
+        payload = json.dumps([query, doc_hash, method], ensure_ascii=False)
+        return self.cache.key(payload, self.model, self.base_url)
+
+    def score(
+        self, query: str, documents: list[str], stats: dict[str, Any] | None = None
+    ) -> list[float]:
+        """
+        Relevance scores parallel to `documents`.
+
+        Cached scores (of the probed method) are reused; only the misses go to
+        the server. Raises RerankerUnavailable if no method works.
+        """
+        if not documents:
+            return []
+        if self.cache is None:
+            scores, method = self._score_uncached(query, documents)
+            if stats is not None:
+                stats.update(cached=0, scored=len(documents), method=method)
+            return scores
+
+        scored: dict[str, list[float]] = {}
+        method = self.method
+        if method is None:
+            # Cache keys depend on the method: probe with the first document
+            probe, method = self._score_uncached(query, documents[:1])
+            scored[self._key(query, documents[0], method)] = probe
+        preferred = method
+
+        keys = [self._key(query, doc, preferred) for doc in documents]
+        found = self.cache.get_many([key for key in keys if key not in scored])
+        missing: dict[str, str] = {}
+        for key, doc in zip(keys, documents):
+            if key not in found and key not in scored and key not in missing:
+                missing[key] = doc
+        if missing:
+            scores, method = self._score_uncached(query, list(missing.values()))
+            scored.update((key, [score]) for key, score in zip(missing, scores))
+        if method == preferred:
+            self.cache.put_many(scored, self.model)
+        found.update(scored)
+
+        if stats is not None:
+            stats.update(cached=len(documents) - len(scored), scored=len(scored), method=method)
+        return [float(found[key][0]) for key in keys]
+
+    def _score_uncached(self, query: str, documents: list[str]) -> tuple[list[float], str]:
+        """(scores, method used): the probed method (one retry), else the others for this call."""
+        preferred = self.method
+        if preferred is None:
+            methods = list(METHODS)
+        else:
+            methods = [preferred, preferred, *(method for method in METHODS if method != preferred)]
+
+        errors = []
+        for method in methods:
+            try:
+                scores = self._run(method, query, documents)
+            except Exception as e:
+                errors.append(f"{method}: {e}")
+                continue
+            if preferred is None:
+                with self._lock:
+                    self.method = method
+                print(f"  ✓ Reranking via {method}", file=sys.stderr)
+            elif method != preferred:
+                print(f"  Reranker {preferred} failed ({errors[-1]}), scored via {method}", file=sys.stderr)
+            return scores, method
+        raise RerankerUnavailable("; ".join(errors))
+
+    def _run(self, method: str, query: str, documents: list[str]) -> list[float]:
+        if method in RERANK_ENDPOINTS:
+            batches = [
+                documents[start : start + self.batch_size]
+                for start in range(0, len(documents), self.batch_size)
+            ]
+            results = self._map(lambda batch: self._rerank_endpoint(method, query, batch), batches)
+            return [score for batch_scores in results for score in batch_scores]
+        if method == "embeddings":
+            inputs = [f"Query: {query}\nDocument: {doc}" for doc in documents]
+            batches = [
+                inputs[start : start + self.batch_size]
+                for start in range(0, len(inputs), self.batch_size)
+            ]
+            results = self._map(self._embedding_scores, batches)
+            return [score for batch_scores in results for score in batch_scores]
+        if method == "chat":
+            return self._map(lambda doc: self._chat_score(query, doc), documents)
+        raise ValueError(f"Unknown rerank method: {method}")
+
+    def _map(self, fn: Callable[[Any], T], items: list[Any]) -> list[T]:
+        """Apply `fn` to items, up to `concurrency` at once; keeps order."""
+        if len(items) <= 1 or self.concurrency <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def _rerank_endpoint(self, endpoint: str, query: str, documents: list[str]) -> list[float]:
+        response = self._session.post(
+            f"{self.base_url}{endpoint}",
+            json={"query": query, "documents": documents},  # llama.cpp uses 'documents'
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint} returned {response.status_code}")
+        results = response.json().get("results")
+        if not results:
+            raise RuntimeError(f"{endpoint} returned no results")
+
+        # Format: {"results": [{"index": 0, "relevance_score": 0.99}, ...]}
+        scores: list[float | None] = [None] * len(documents)
+        for item in results:
+            score = item.get("relevance_score")
+            if score is None:
+                score = item.get("score", 0.0)
+            scores[item["index"]] = _normalize_score(float(score))
+        if any(score is None for score in scores):
+            raise RuntimeError(f"{endpoint} returned {len(results)} of {len(documents)} scores")
+        return scores  # type: ignore[return-value]
+
+    def _embedding_scores(self, inputs: list[str]) -> list[float]:
+        response = self.openai.embeddings.create(input=inputs, model=self.model)
+        scores = []
+        # For rerankers, the embedding is often just a single score
+        for item in sorted(response.data, key=lambda x: x.index):
+            embedding = item.embedding
+            scores.append(float(embedding[0]) if embedding else 0.0)
+        return scores
+
+    def _chat_score(self, query: str, document: str) -> float:
+        response = self.openai.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": CHAT_PROMPT.format(query=query, document=document)}],
+            temperature=0.0,
+            max_tokens=10,
+        )
+        try:
+            return float(response.choices[0].message.content.strip())
+        except (TypeError, ValueError, AttributeError):
+            return 0.0
+
+
+def get_reranker_client(config: dict[str, Any], model: str | None = None) -> RerankerClient:
+    """Process-wide reranker client per (base_url, api_key, model)."""
+    model = model or config.get("reranker_model")
+    if not model:
+        raise ValueError("No reranker model specified in config or parameters")
+    key = (config.get("reranker_base_url") or "", config.get("reranker_api_key") or "", model)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = RerankerClient(config, model)
+        return client
+
+
+def clear_clients() -> None:
+    """Forget clients and probed capabilities (tests, config changes)."""
+    with _clients_lock:
+        _clients.clear()
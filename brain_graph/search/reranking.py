@@ -6,16 +6,22 @@ Functions:
 - rerank_with_full_vectors: Re-rank with full 1024d Matryoshka embeddings
 - rerank_with_model: Re-rank with dedicated reranker model (jina, bge, etc.)
 - semantic_search_with_reranking: Two-stage semantic search (256d → 1024d)
+- semantic_search_cascade: Matryoshka cascade (e.g. 64d → 256d → 1024d)
 - hybrid_search_with_reranking: Hybrid search with re-ranking
 """
 
+import sys
 from pathlib import Path
 from typing import Any
 
 import duckdb
 import numpy as np
 import pyarrow.parquet as pq
-from openai import OpenAI
+
+from brain_graph.db.matryoshka import MatryoshkaCascade
+from brain_graph.db.vector_store import full_vector_scores
+from brain_graph.search.reranker_client import RerankerUnavailable, get_reranker_client
+from brain_graph.search.searcher import bm25_search, exact_string_search, fuzzy_search
 
 
 def reciprocal_rank_fusion(
@@ -84,14 +90,12 @@ def rerank_with_model(
     config: dict[str, Any],
     top_k: int | None = None,
     model: str | None = None,
-    task: str = "reranking",
 ) -> list[dict[str, Any]]:
     """
     Re-rank candidates using a dedicated reranker model.
 
     Supports:
     - Dedicated rerankers (jina-reranker-v2, bge-reranker-v2-m3, etc.)
-    - Jina-v3 with task="separation"
     - Any OpenAI-compatible reranking API
 
     Args:
@@ -100,7 +104,6 @@ def rerank_with_model(
         config: Config dict with reranker settings
         top_k: Number of results to return (default: all)
         model: Reranker model to use (default: from config)
-        task: Task type for multi-task models (default: "reranking")
 
     Returns:
         Reranked list with added 'rerank_score' field
@@ -112,193 +115,65 @@ def rerank_with_model(
             "reranker_model": "jinaai/jina-reranker-v2-base-multilingual"
         }
     """
-    import sys
-    import requests
-
     if not candidates:
         return []
 
-    # Use provided model or from config
-    model = model or config.get("reranker_model")
-    if not model:
-        raise ValueError("No reranker model specified in config or parameters")
-
-    # Initialize OpenAI client for reranker
-    client = OpenAI(
-        base_url=config.get("reranker_base_url"),
-        api_key=config.get("reranker_api_key", "dummy"),
-    )
+    # Shared client: endpoint probed once, pooled connections, cached scores
+    client = get_reranker_client(config, model)
 
     # Prepare documents for reranking
     # Use summary if available, else text (truncated)
-    documents = []
-    for cand in candidates:
-        text = cand.get("summary") or cand.get("text", "")
-
-        # Clean metadata and markdown headers from text
-        # Remove lines starting with "id:", markdown headers, and leading empty lines
-        lines = text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            stripped = line.strip()
-            # Skip ID lines (e.g., "id:01KCA7E7C4VHG6V539XWMCZXES")
-            if stripped.startswith('id:'):
-                continue
-            # Skip markdown headers (e.g., "## Summary", "### Section")
-            if stripped.startswith('#'):
-                continue
-            # Skip empty lines at the start
-            if not cleaned_lines and not stripped:
-                continue
-            cleaned_lines.append(line)
-
-        text = '\n'.join(cleaned_lines).strip()
-
-        # Truncate very long texts (rerankers typically have token limits)
-        max_chars = 2000
-        if len(text) > max_chars:
-            text = text[:max_chars] + "..."
-        documents.append(text)
-
-    # Call reranker - try different API styles
-    reranked = []
+    documents = [_rerank_document(cand) for cand in candidates]
 
-    # Method 1: Try dedicated rerank endpoints
-    # llama.cpp with --reranking uses /reranking (base_url already has /v1)
-    # TEI/jina uses /rerank
-    rerank_endpoints = ["/reranking", "/rerank"]
-
-    for endpoint in rerank_endpoints:
-        try:
-            response = requests.post(
-                f"{config.get('reranker_base_url')}{endpoint}",
-                json={
-                    "query": query,
-                    "documents": documents,  # llama.cpp uses 'documents'
-                },
-                headers={"Authorization": f"Bearer {config.get('reranker_api_key', 'unused')}"},
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                results = response.json()
-
-                # Parse results (llama.cpp/jina format)
-                if "results" in results:
-                    # Format: {"results": [{"index": 0, "relevance_score": 0.99}, ...]}
-                    import math
-                    for item in results["results"]:
-                        idx = item["index"]
-                        # Use explicit None check to handle 0.0 scores correctly
-                        score = item.get("relevance_score")
-                        if score is None:
-                            score = item.get("score", 0.0)
-
-                        # WORKAROUND: llama.cpp reranking might return raw logits
-                        # If scores are very small (< 0.01), try sigmoid normalization
-                        if score < 0.01:
-                            # Apply sigmoid: 1 / (1 + e^(-x))
-                            try:
-                                score = 1.0 / (1.0 + math.exp(-score))
-                            except:
-                                pass  # Keep original if sigmoid fails
-
-                        candidate = candidates[idx].copy()
-                        candidate["rerank_score"] = score
-                        reranked.append(candidate)
-
-                    if reranked:
-                        print(f"  ✓ Reranking via {endpoint} successful ({len(reranked)} results)", file=sys.stderr)
-                        break
-            else:
-                print(f"  {endpoint} returned {response.status_code}", file=sys.stderr)
-
-        except Exception as e:
-            print(f"  {endpoint} failed: {e}", file=sys.stderr)
+    stats: dict[str, Any] = {}
+    try:
+        scores = client.score(query, documents, stats=stats)
+    except RerankerUnavailable as e:
+        print(f"  Reranking failed ({e})", file=sys.stderr)
+        print("  All reranking methods failed, returning original order", file=sys.stderr)
+        return candidates[:top_k] if top_k else candidates
+
+    print(
+        f"  Reranked {len(candidates)} candidates via {stats.get('method') or 'cache'} "
+        f"({stats.get('cached', 0)} cached)",
+        file=sys.stderr,
+    )
+    reranked = []
+    for cand, score in zip(candidates, scores):
+        candidate = cand.copy()
+        candidate["rerank_score"] = score
+        reranked.append(candidate)
+    reranked.sort(key=lambda x: x.get("rerank_score", 0.0), reverse=True)
+    return reranked[:top_k] if top_k else reranked
+
+
+def _rerank_document(cand: dict[str, Any], max_chars: int = 2000) -> str:
+    """Reranker input for a candidate: summary or text, without id lines and headers."""
+    text = cand.get("summary") or cand.get("text", "")
+
+    # Clean metadata and markdown headers from text
+    # Remove lines starting with "id:", markdown headers, and leading empty lines
+    lines = text.split('\n')
+    cleaned_lines = []
+    for line in lines:
+        stripped = line.strip()
+        # Skip ID lines (e.g., "id:01KCA7E7C4VHG6V539XWMCZXES")
+        if stripped.startswith('id:'):
+            continue
+        # Skip markdown headers (e.g., "## Summary", "### Section")
+        if stripped.startswith('#'):
             continue
+        # Skip empty lines at the start
+        if not cleaned_lines and not stripped:
+            continue
+        cleaned_lines.append(line)
 
-    # If we got results, return them sorted by score
-    if reranked:
-        reranked.sort(key=lambda x: x.get("rerank_score", 0.0), reverse=True)
-        return reranked[:top_k] if top_k else reranked
+    text = '\n'.join(cleaned_lines).strip()
 
-    # Method 2: Fallback - try embeddings API with query+document (llama.cpp style)
-    print("  Rerank endpoints failed, trying embeddings fallback...", file=sys.stderr)
-    try:
-        scores = []
-        for idx, doc in enumerate(documents):
-            # Concatenate query and document
-            combined_input = f"Query: {query}\nDocument: {doc}"
-
-            response = client.embeddings.create(
-                input=combined_input,
-                model=model
-            )
-
-            # For rerankers, the embedding is often just a single score
-            embedding = response.data[0].embedding
-            if isinstance(embedding, list) and len(embedding) > 0:
-                score = float(embedding[0])
-            else:
-                score = 0.0
-
-            scores.append((idx, score))
-
-        # Sort by score and build results
-        scores.sort(key=lambda x: x[1], reverse=True)
-        for idx, score in scores:
-            candidate = candidates[idx].copy()
-            candidate["rerank_score"] = score
-            reranked.append(candidate)
-
-        if reranked:
-            print(f"  ✓ Embeddings fallback successful", file=sys.stderr)
-            return reranked[:top_k] if top_k else reranked
-
-    except Exception as e2:
-        print(f"  Embeddings fallback failed: {e2}", file=sys.stderr)
-
-    # Method 3: Last resort - chat completion with scoring prompt
-    print("  Trying chat completion fallback...", file=sys.stderr)
-    try:
-        scores = []
-        for idx, doc in enumerate(documents):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{
-                    "role": "user",
-                    "content": f"Rate the relevance of this document to the query on a scale of 0-1.\n\nQuery: {query}\n\nDocument: {doc}\n\nRelevance score (0-1):"
-                }],
-                temperature=0.0,
-                max_tokens=10
-            )
-
-            # Parse score from response
-            try:
-                score_text = response.choices[0].message.content.strip()
-                score = float(score_text)
-            except:
-                score = 0.0
-
-            scores.append((idx, score))
-
-        # Sort and build results
-        scores.sort(key=lambda x: x[1], reverse=True)
-        for idx, score in scores:
-            candidate = candidates[idx].copy()
-            candidate["rerank_score"] = score
-            reranked.append(candidate)
-
-        if reranked:
-            print(f"  ✓ Chat completion fallback successful", file=sys.stderr)
-            return reranked[:top_k] if top_k else reranked
-
-    except Exception as e3:
-        print(f"  Chat completion fallback failed: {e3}", file=sys.stderr)
-
-    # All methods failed - return original order
-    print(f"  All reranking methods failed, returning original order", file=sys.stderr)
-    return candidates[:top_k] if top_k else candidates
+    # Truncate very long texts (rerankers typically have token limits)
+    if len(text) > max_chars:
+        text = text[:max_chars] + "..."
+    return text
 
 
 def rerank_with_full_vectors(
@@ -312,7 +187,8 @@ def rerank_with_full_vectors(
     """
     Re-rank candidates using full 1024-dim vectors from Parquet.
 
-    This is called after initial retrieval with 256-dim vectors.
+    Fallback for databases without a full-vector store (see
+    `db/vector_store.py`); only the candidate rows are read.
 
     Args:
         candidate_ids: List of chunk IDs to re-rank
@@ -326,38 +202,69 @@ def rerank_with_full_vectors(
     if not candidate_ids:
         return []
 
-    # Load full vectors for candidates
-    table = pq.read_table(parquet_path)
-    df = table.to_pandas()
-
-    # chunk_idx is now stored as string IDs (e.g. "chunk_360dc915") in Parquet
-    # Filter to candidates only
-    candidate_df = df[df["chunk_idx"].isin(candidate_ids)]
-
-    if len(candidate_df) == 0:
+    # chunk_idx is stored as string IDs (e.g. "chunk_360dc915") in Parquet
+    table = pq.read_table(
+        parquet_path,
+        columns=["chunk_idx", "embedding"],
+        filters=[("chunk_idx", "in", list(candidate_ids))],
+    )
+    if table.num_rows == 0:
         return []
 
-    # Compute cosine similarity with full vectors
-    query_vec = np.array(query_embedding_full)
-    query_norm = np.linalg.norm(query_vec)
-
-    scores: list[dict[str, Any]] = []
-    for _, row in candidate_df.iterrows():
-        full_vec = np.array(row["embedding"])
-        full_norm = np.linalg.norm(full_vec)
+    chunk_idxs = table.column("chunk_idx").to_pylist()
+    vectors = np.asarray(table.column("embedding").to_pylist(), dtype=np.float32)
+    query_vec = np.asarray(query_embedding_full, dtype=np.float32)
 
-        # Cosine similarity
-        similarity = float(np.dot(query_vec, full_vec) / (query_norm * full_norm))
+    # Cosine similarity for all candidates at once
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query_vec)
+    norms[norms == 0] = 1.0
+    similarities = (vectors @ query_vec) / norms
 
-        chunk_idx = row["chunk_idx"]
-        mapped_id = id_map.get(chunk_idx, chunk_idx) if id_map else chunk_idx
-        scores.append({"chunk_id": mapped_id, "similarity": similarity})
+    scores: list[dict[str, Any]] = [
+        {
+            "chunk_id": id_map.get(chunk_idx, chunk_idx) if id_map else chunk_idx,
+            "similarity": float(similarity),
+        }
+        for chunk_idx, similarity in zip(chunk_idxs, similarities)
+    ]
 
     # Sort by similarity and return top-k
     scores.sort(key=lambda x: x["similarity"], reverse=True)
     return scores[:top_k]
 
 
+def full_vector_similarities(
+    con: duckdb.DuckDBPyConnection,
+    ids_by_source: dict[str, list[str]],
+    query_embedding_full: list[float],
+) -> dict[str, float]:
+    """
+    Full-dimension similarity for candidate chunks, keyed by chunk id.
+
+    Uses the memory-mapped full-vector store (one gather + one matvec for all
+    candidates). Chunks not covered by the store fall back to their source's
+    Parquet file. Chunks without full vectors are absent from the result.
+    """
+    all_ids = [cid for ids in ids_by_source.values() for cid in ids]
+    scores = full_vector_scores(con, all_ids, query_embedding_full) or {}
+
+    for source, ids in ids_by_source.items():
+        missing = [cid for cid in ids if cid not in scores]
+        if not missing:
+            continue
+        result = con.execute(
+            "SELECT parquet_path FROM embedding_sources WHERE source_file = ?", [source]
+        ).fetchone()
+        if not result:
+            continue
+        parquet_ids, id_map = _get_parquet_id_map(con, source, missing)
+        for score in rerank_with_full_vectors(
+            parquet_ids, query_embedding_full, result[0], len(missing), id_map=id_map
+        ):
+            scores[score["chunk_id"]] = score["similarity"]
+    return scores
+
+
 def _get_parquet_id_map(
     con: duckdb.DuckDBPyConnection,
     source_file: str,
@@ -414,7 +321,7 @@ def semantic_search_with_reranking(
     Two-stage semantic search with re-ranking.
 
     Stage 1: Fast retrieval with 256d vectors (HNSW index)
-    Stage 2: Re-ranking with 1024d vectors from Parquet
+    Stage 2: Re-ranking with 1024d vectors from the full-vector store
 
     Args:
         con: DuckDB connection with loaded database
@@ -449,67 +356,83 @@ def semantic_search_with_reranking(
     if not candidates:
         return []
 
-    # Group by source file for efficient Parquet loading
-    by_source = {}
-    for cand_id, text, summary, source, sim in candidates:
-        by_source.setdefault(source, []).append(
-            {"id": cand_id, "text": text, "summary": summary, "sim_256d": sim}
-        )
+    # Stage 2: Re-rank with full vectors (store gather, Parquet fallback)
+    ids_by_source: dict[str, list[str]] = {}
+    for cand_id, _, _, source, _ in candidates:
+        ids_by_source.setdefault(source, []).append(cand_id)
+    scores_by_id = full_vector_similarities(con, ids_by_source, query_embedding_full)
 
-    # Stage 2: Re-rank with full vectors
     reranked = []
-    for source, chunks in by_source.items():
-        # Get parquet path for this source
-        result = con.execute(
-            "SELECT parquet_path FROM embedding_sources WHERE source_file = ?", [source]
-        ).fetchone()
-
-        if not result:
-            # No parquet file, use 256d similarity
-            for chunk in chunks:
-                reranked.append(
-                    {
-                        "chunk_id": chunk["id"],
-                        "text": chunk["text"],
-                        "summary": chunk["summary"],
-                        "similarity": chunk["sim_256d"],
-                        "reranked": False,
-                    }
-                )
-            continue
-
-        parquet_path = result[0]
-
-        # Re-rank these candidates
-        chunk_ids = [c["id"] for c in chunks]
-        parquet_ids, id_map = _get_parquet_id_map(con, source, chunk_ids)
-        scores = rerank_with_full_vectors(
-            parquet_ids,
-            query_embedding_full,
-            parquet_path,
-            final_k,
-            id_map=id_map,
+    for cand_id, text, summary, _, sim in candidates:
+        # Without full vectors, keep the 256d similarity
+        reranked.append(
+            {
+                "chunk_id": cand_id,
+                "text": text,
+                "summary": summary,
+                "similarity": scores_by_id.get(cand_id, sim),
+                "reranked": cand_id in scores_by_id,
+            }
         )
 
-        # Merge with text/summary
-        scores_by_id = {s["chunk_id"]: s["similarity"] for s in scores}
-        for chunk in chunks:
-            if chunk["id"] in scores_by_id:
-                reranked.append(
-                    {
-                        "chunk_id": chunk["id"],
-                        "text": chunk["text"],
-                        "summary": chunk["summary"],
-                        "similarity": scores_by_id[chunk["id"]],
-                        "reranked": True,
-                    }
-                )
-
     # Final sort by similarity
     reranked.sort(key=lambda x: x["similarity"], reverse=True)
     return reranked[:final_k]
 
 
+def semantic_search_cascade(
+    con: duckdb.DuckDBPyConnection,
+    query_embedding_full: list[float],
+    final_k: int = 10,
+    cascade: MatryoshkaCascade | None = None,
+    stats: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Semantic search through a Matryoshka cascade (see db/matryoshka.py).
+
+    A short prefix scans all chunks, longer prefixes re-score shrinking
+    candidate sets; similarities are those of the last level.
+
+    Args:
+        con: DuckDB connection with loaded database
+        query_embedding_full: Full 1024-dim query embedding
+        final_k: Number of results
+        cascade: Loaded cascade (default: MatryoshkaCascade.load(con), i.e. the
+            levels recorded by `brain db build`); keep it to avoid reloading
+        stats: Optional dict, filled with the cascade and per-level timings
+
+    Returns:
+        List of dicts with chunk_id, similarity, text, summary, source_file
+    """
+    if cascade is None:
+        cascade = MatryoshkaCascade.load(con)
+    hits = cascade.search(query_embedding_full, final_k, stats)
+    if not hits:
+        return []
+    rows = con.execute(
+        """
+        SELECT id, text, summary, source_file
+        FROM nodes
+        WHERE id IN (SELECT UNNEST(?::VARCHAR[]))
+        """,
+        [[chunk_id for chunk_id, _ in hits]],
+    ).fetchall()
+    chunks = {row[0]: row[1:] for row in rows}
+    results = []
+    for chunk_id, similarity in hits:
+        text, summary, source_file = chunks.get(chunk_id, (None, None, None))
+        results.append(
+            {
+                "chunk_id": chunk_id,
+                "text": text,
+                "summary": summary,
+                "source_file": source_file,
+                "similarity": similarity,
+            }
+        )
+    return results
+
+
 def hybrid_search_with_reranking(
     con: duckdb.DuckDBPyConnection,
     query_text: str,
@@ -537,7 +460,12 @@ def hybrid_search_with_reranking(
     # Truncate query to 256d
     query_emb_256d = query_embedding_full[:256]
 
-    # Stage 1: Retrieve candidates
+    # Stage 1: Retrieve candidates (BM25 via the top-k engine, see bm25_search)
+    bm25_hits = bm25_search(con, query_text, initial_k)
+    bm25_columns = [
+        [hit[key] for hit in bm25_hits]
+        for key in ("chunk_id", "text", "summary", "source_file", "bm25_score")
+    ]
     results = con.execute(
         """
         WITH semantic_results AS (
@@ -555,15 +483,11 @@ def hybrid_search_with_reranking(
         ),
         bm25_results AS (
             SELECT
-                id,
-                text,
-                summary,
-                source_file,
-                fts_main_nodes.match_bm25(id, ?) as bm25_score
-            FROM nodes
-            WHERE fts_main_nodes.match_bm25(id, ?) IS NOT NULL
-            ORDER BY bm25_score DESC
-            LIMIT ?
+                UNNEST(?::VARCHAR[]) as id,
+                UNNEST(?::VARCHAR[]) as text,
+                UNNEST(?::VARCHAR[]) as summary,
+                UNNEST(?::VARCHAR[]) as source_file,
+                UNNEST(?::DOUBLE[]) as bm25_score
         )
         SELECT
             COALESCE(s.id, b.id) as id,
@@ -575,7 +499,7 @@ def hybrid_search_with_reranking(
         FROM semantic_results s
         FULL OUTER JOIN bm25_results b ON s.id = b.id
     """,
-        [query_emb_256d, initial_k, query_text, query_text, initial_k],
+        [query_emb_256d, initial_k, *bm25_columns],
     ).fetchall()
 
     if not results:
@@ -585,86 +509,45 @@ def hybrid_search_with_reranking(
     max_sem = max(r[4] for r in results) or 1.0
     max_bm25 = max(r[5] for r in results) or 1.0
 
-    # Group by source for re-ranking
-    by_source = {}
+    candidates = []
+    ids_by_source: dict[str, list[str]] = {}
     for cid, text, summary, source, sem, bm25 in results:
-        sem_norm = sem / max_sem
-        bm25_norm = bm25 / max_bm25
-        hybrid = sem_norm * semantic_weight + bm25_norm * bm25_weight
-
-        by_source.setdefault(source, []).append(
+        candidates.append(
             {
                 "id": cid,
                 "text": text,
                 "summary": summary,
-                "hybrid_score_256d": hybrid,
-                "sem_score_256d": sem_norm,
-                "bm25_score": bm25_norm,
+                "sem_score_256d": sem / max_sem,
+                "bm25_score": bm25 / max_bm25,
             }
         )
+        ids_by_source.setdefault(source, []).append(cid)
 
     # Stage 2: Re-rank semantic component with full vectors
-    reranked = []
-    for source, chunks in by_source.items():
-        # Get parquet path
-        result = con.execute(
-            "SELECT parquet_path FROM embedding_sources WHERE source_file = ?", [source]
-        ).fetchone()
+    scores_by_id = full_vector_similarities(con, ids_by_source, query_embedding_full)
 
-        if not result:
-            # No re-ranking, use 256d scores
-            for chunk in chunks:
-                reranked.append(
-                    {
-                        "chunk_id": chunk["id"],
-                        "text": chunk["text"],
-                        "summary": chunk["summary"],
-                        "hybrid_score": chunk["hybrid_score_256d"],
-                        "semantic_score": chunk["sem_score_256d"],
-                        "bm25_score": chunk["bm25_score"],
-                        "reranked": False,
-                    }
-                )
-            continue
+    # Normalize new semantic scores (256d score where no full vector exists)
+    sem_full = {
+        c["id"]: scores_by_id.get(c["id"], c["sem_score_256d"]) for c in candidates
+    }
+    max_sem_full = max(sem_full.values()) or 1.0
 
-        parquet_path = result[0]
-
-        # Re-rank with full vectors
-        chunk_ids = [c["id"] for c in chunks]
-        parquet_ids, id_map = _get_parquet_id_map(con, source, chunk_ids)
-        scores = rerank_with_full_vectors(
-            parquet_ids,
-            query_embedding_full,
-            parquet_path,
-            len(chunk_ids),
-            id_map=id_map,
+    reranked = []
+    for chunk in candidates:
+        sem_full_norm = sem_full[chunk["id"]] / max_sem_full
+        reranked.append(
+            {
+                "chunk_id": chunk["id"],
+                "text": chunk["text"],
+                "summary": chunk["summary"],
+                "hybrid_score": sem_full_norm * semantic_weight
+                + chunk["bm25_score"] * bm25_weight,
+                "semantic_score": sem_full_norm,
+                "bm25_score": chunk["bm25_score"],
+                "reranked": chunk["id"] in scores_by_id,
+            }
         )
 
-        # Re-compute hybrid scores with full-vector semantic scores
-        scores_by_id = {s["chunk_id"]: s["similarity"] for s in scores}
-
-        # Normalize new semantic scores
-        max_sem_full = max(scores_by_id.values()) or 1.0
-
-        for chunk in chunks:
-            sem_full = scores_by_id.get(chunk["id"], chunk["sem_score_256d"])
-            sem_full_norm = sem_full / max_sem_full
-            hybrid_full = (
-                sem_full_norm * semantic_weight + chunk["bm25_score"] * bm25_weight
-            )
-
-            reranked.append(
-                {
-                    "chunk_id": chunk["id"],
-                    "text": chunk["text"],
-                    "summary": chunk["summary"],
-                    "hybrid_score": hybrid_full,
-                    "semantic_score": sem_full_norm,
-                    "bm25_score": chunk["bm25_score"],
-                    "reranked": True,
-                }
-            )
-
     # Final sort
     reranked.sort(key=lambda x: x["hybrid_score"], reverse=True)
     return reranked[:final_k]
@@ -747,145 +630,36 @@ def multiway_search_with_rrf(
         rankings.append(semantic_ranking)
 
     if enable_bm25:
-        # BM25 search
-        bm25_results = con.execute(
-            """
-            SELECT
-                id,
-                text,
-                summary,
-                source_file,
-                fts_main_nodes.match_bm25(id, ?) as bm25_score
-            FROM nodes
-            WHERE fts_main_nodes.match_bm25(id, ?) IS NOT NULL
-            ORDER BY bm25_score DESC
-            LIMIT ?
-        """,
-            [query_text, query_text, initial_k],
-        ).fetchall()
+        # BM25 search (top-k engine, see bm25_search)
+        bm25_ranking = bm25_search(con, query_text, initial_k)
+        rankings.append(bm25_ranking)
 
-        bm25_ranking = [
+    if enable_fuzzy:
+        # Fuzzy search (typo index lookups, see typo_index.py)
+        fuzzy_ranking = [
             {
-                "chunk_id": cid,
-                "text": text,
-                "summary": summary,
-                "source_file": source,
-                "bm25_score": score,
+                "chunk_id": hit["chunk_id"],
+                "text": hit["text"],
+                "summary": hit["summary"],
+                "source_file": hit["source_file"],
+                "fuzzy_score": hit["fuzzy_score"],
             }
-            for cid, text, summary, source, score in bm25_results
+            for hit in fuzzy_search(con, query_text, initial_k, fuzzy_max_distance)
         ]
-        rankings.append(bm25_ranking)
-
-    if enable_fuzzy:
-        # Fuzzy search
-        query_terms = query_text.lower().split()
-        if query_terms:
-            fuzzy_results = con.execute(
-                """
-                WITH query_terms AS (
-                    SELECT UNNEST(?::VARCHAR[]) as term
-                ),
-                word_matches AS (
-                    SELECT
-                        n.id,
-                        n.text,
-                        n.summary,
-                        n.source_file,
-                        qt.term as query_term,
-                        word.word as matched_word,
-                        editdist3(qt.term, word.word) as distance
-                    FROM nodes n,
-                         LATERAL (
-                             SELECT UNNEST(string_split(lower(n.text), ' ')) as word
-                         ) word,
-                         query_terms qt
-                    WHERE n.type = 'chunk'
-                      AND editdist3(qt.term, word.word) <= ?
-                      AND length(word.word) >= 3
-                ),
-                scored_chunks AS (
-                    SELECT
-                        id,
-                        text,
-                        summary,
-                        source_file,
-                        COUNT(DISTINCT query_term) as matched_terms,
-                        AVG(distance) as avg_distance
-                    FROM word_matches
-                    GROUP BY id, text, summary, source_file
-                )
-                SELECT
-                    id,
-                    text,
-                    summary,
-                    source_file,
-                    (matched_terms * 10.0 / (1.0 + avg_distance)) as fuzzy_score
-                FROM scored_chunks
-                ORDER BY fuzzy_score DESC
-                LIMIT ?
-            """,
-                [query_terms, fuzzy_max_distance, initial_k],
-            ).fetchall()
-
-            fuzzy_ranking = [
-                {
-                    "chunk_id": cid,
-                    "text": text,
-                    "summary": summary,
-                    "source_file": source,
-                    "fuzzy_score": score,
-                }
-                for cid, text, summary, source, score in fuzzy_results
-            ]
+        if fuzzy_ranking:
             rankings.append(fuzzy_ranking)
 
     if enable_exact:
-        # Exact string search
-        if exact_case_sensitive:
-            exact_results = con.execute(
-                """
-                SELECT
-                    id,
-                    text,
-                    summary,
-                    source_file,
-                    (length(text) - length(replace(text, ?, ''))) / length(?) as match_count
-                FROM nodes
-                WHERE type = 'chunk'
-                  AND text LIKE '%' || ? || '%'
-                ORDER BY match_count DESC
-                LIMIT ?
-            """,
-                [query_text, query_text, query_text, initial_k],
-            ).fetchall()
-        else:
-            query_lower = query_text.lower()
-            exact_results = con.execute(
-                """
-                SELECT
-                    id,
-                    text,
-                    summary,
-                    source_file,
-                    (length(lower(text)) - length(replace(lower(text), ?, ''))) / length(?) as match_count
-                FROM nodes
-                WHERE type = 'chunk'
-                  AND lower(text) LIKE '%' || ? || '%'
-                ORDER BY match_count DESC
-                LIMIT ?
-            """,
-                [query_lower, query_lower, query_lower, initial_k],
-            ).fetchall()
-
+        # Exact string search (trigram index, see trigram_index.py)
         exact_ranking = [
             {
-                "chunk_id": cid,
-                "text": text,
-                "summary": summary,
-                "source_file": source,
-                "exact_score": float(count),
+                "chunk_id": hit["chunk_id"],
+                "text": hit["text"],
+                "summary": hit["summary"],
+                "source_file": hit["source_file"],
+                "exact_score": float(hit["match_count"]),
             }
-            for cid, text, summary, source, count in exact_results
+            for hit in exact_string_search(con, query_text, initial_k, exact_case_sensitive)
         ]
         rankings.append(exact_ranking)
 
@@ -900,46 +674,19 @@ def multiway_search_with_rrf(
 
     # Stage 3: Optional re-ranking with full 1024d vectors
     if rerank_with_full:
-        # Group by source file
-        by_source = {}
+        ids_by_source: dict[str, list[str]] = {}
         for result in rrf_results:
             source = result.get("source_file")
             if source:
-                by_source.setdefault(source, []).append(result)
+                ids_by_source.setdefault(source, []).append(result["chunk_id"])
+        scores_by_id = full_vector_similarities(con, ids_by_source, query_embedding_full)
 
         reranked = []
-        for source, chunks in by_source.items():
-            # Get parquet path
-            parquet_result = con.execute(
-                "SELECT parquet_path FROM embedding_sources WHERE source_file = ?",
-                [source],
-            ).fetchone()
-
-            if not parquet_result:
-                # No parquet, keep RRF scores
-                reranked.extend(chunks)
-                continue
-
-            parquet_path = parquet_result[0]
-
-            # Re-rank with full vectors
-            chunk_ids = [c["chunk_id"] for c in chunks]
-            parquet_ids, id_map = _get_parquet_id_map(con, source, chunk_ids)
-            scores = rerank_with_full_vectors(
-                parquet_ids,
-                query_embedding_full,
-                parquet_path,
-                len(chunk_ids),
-                id_map=id_map,
-            )
-
-            # Merge scores
-            scores_by_id = {s["chunk_id"]: s["similarity"] for s in scores}
-            for chunk in chunks:
-                if chunk["chunk_id"] in scores_by_id:
-                    chunk["similarity"] = scores_by_id[chunk["chunk_id"]]
-                    chunk["reranked"] = True
-                    reranked.append(chunk)
+        for chunk in rrf_results:
+            if chunk["chunk_id"] in scores_by_id:
+                chunk["similarity"] = scores_by_id[chunk["chunk_id"]]
+                chunk["reranked"] = True
+            reranked.append(chunk)
 
         # Sort by similarity (full vector) if available, else RRF score
         reranked.sort(
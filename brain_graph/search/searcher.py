@@ -7,77 +7,297 @@ Supports semantic search, BM25 full-text search, and hybrid search.
 
 import argparse
 import json
+import math
 import sys
 import time
+from dataclasses import replace
 from pathlib import Path
 
 import duckdb
-
+import numpy as np
+
+from brain_graph.db.bm25_index import bm25_index_available, bm25_topk
+from brain_graph.db.index_snapshot import open_search_connection
+from brain_graph.db.matryoshka import MatryoshkaCascade
+from brain_graph.db.quantized_index import QuantizedIndex
+from brain_graph.db.relevance import (
+    RELEVANCE_SCALE,
+    RELEVANCE_WEIGHT,
+    SIMILARITY_WEIGHT,
+    combined_score,
+    max_relevance,
+    relevance_join,
+)
+from brain_graph.db.trigram_index import trigram_candidates, trigram_index_available
+from brain_graph.db.typo_index import MAX_DISTANCE as TYPO_MAX_DISTANCE
+from brain_graph.db.typo_index import typo_index_available, typo_search
+from brain_graph.search.filters import SearchFilters
 from brain_graph.utils.cli_utils import emit_json, error_result, ms_since, ok_result
-from brain_graph.utils.embedding_client import embed_single_cached
+from brain_graph.utils.embedding_client import embed_many_cached, embed_single_cached
 from brain_graph.utils.file_utils import load_config
 
 
+# Query prefix for Jina v3 asymmetric search
+QUERY_PREFIX = "Query: "
+
+BATCH_MODES = ("semantic", "bm25", "hybrid", "fuzzy")
+
+# Re-scored / filtered vector search: HNSW candidates per result (first
+# round, divided by the filter selectivity), at least / at most this many
+ANN_OVERFETCH = 4
+ANN_MIN_CANDIDATES = 32
+ANN_MAX_CANDIDATES = 4096
+
+# Filtered vector search: brute force over the passing rows when at most this
+# many or this share of all rows pass the filter, else HNSW + post-filter
+PREFILTER_MAX_ROWS = 10_000
+PREFILTER_MAX_FRACTION = 0.05
+
+
 def embed_query(query: str, config: dict) -> list[float]:
     """Embed query text using the configured embedding model (cached)."""
-    # Add query prefix for Jina v3 asymmetric search
-    query_text = f"Query: {query}"
-    return embed_single_cached(query_text, config)
+    return embed_single_cached(f"{QUERY_PREFIX}{query}", config)
+
+
+def embed_queries(
+    queries: list[str], config: dict, stats: dict[str, int] | None = None
+) -> list[list[float]]:
+    """Embed many queries; uncached ones go to the server in a single batch."""
+    return embed_many_cached([f"{QUERY_PREFIX}{q}" for q in queries], config, stats)
+
+
+def _vector_topk(
+    con: duckdb.DuckDBPyConnection,
+    query_embedding: list[float],
+    limit: int,
+    *,
+    table: str,
+    id_column: str,
+    rows_sql: str,
+    row_id: str,
+    filters: SearchFilters,
+    filter_columns: tuple[str, str, str],
+    base_where: str = "TRUE",
+    join_sql: str = "",
+    relevance_sql: str = "0.0",
+    best_relevance: float = 0.0,
+    quantized: QuantizedIndex | None = None,
+    cascade: MatryoshkaCascade | None = None,
+    stats: dict | None = None,
+) -> list[tuple[float, str, float, float]]:
+    """
+    Top `limit` rows of an embedding table as (score, id, similarity, relevance), best first.
+
+    score = combined_score(similarity, relevance). Rows are described by
+    `rows_sql` (FROM clause, id `row_id`, `base_where` restricts it to the
+    rows of `table`); `filters` apply to its `filter_columns` (id, source
+    file, language) and `relevance_sql` is evaluated there after `join_sql`.
+
+    Strategy:
+    - pre-filter: few rows pass the filters -> exact distances of those rows
+    - post-filter: HNSW top-N by distance on `table` alone, rows failing the
+      filters dropped, the rest re-scored. N starts at the over-fetch divided
+      by the selectivity and doubles until no unseen row can reach the
+      top-k; at ANN_MAX_CANDIDATES it falls back to the pre-filter path.
+      With `quantized` (db/quantized_index.py) the top-N come from the
+      quantized codes, with `cascade` (db/matryoshka.py) from the Matryoshka
+      cascade over the full query embedding instead of the HNSW index.
+    """
+    query_emb_256d = query_embedding[:256]
+    filter_sql, params = filters.predicate(*filter_columns)
+    where_sql = f"{base_where} AND {filter_sql}"
+
+    def exact(candidates: int) -> list[tuple[float, str, float, float]]:
+        """Pre-filter path: exact distances of the rows passing the filters."""
+        rows = con.execute(
+            f"""
+            WITH passing AS MATERIALIZED (
+                SELECT {row_id} AS id, ({relevance_sql})::DOUBLE AS relevance
+                FROM {rows_sql}
+                {join_sql}
+                WHERE {where_sql}
+            )
+            SELECT
+                v.{id_column},
+                1.0 - array_cosine_distance(v.embedding, ?::FLOAT[256]) AS similarity,
+                p.relevance
+            FROM {table} v
+            JOIN passing p ON p.id = v.{id_column}
+            ORDER BY
+                similarity * {SIMILARITY_WEIGHT} + p.relevance / {RELEVANCE_SCALE} * {RELEVANCE_WEIGHT} DESC,
+                v.{id_column}
+            LIMIT {int(limit)}
+            """,
+            [*params, query_emb_256d],
+        ).fetchall()
+        if stats is not None:
+            stats.update(strategy="prefilter", candidates=candidates, rounds=1, stable=True)
+        ranked = [(combined_score(sim, rel), row_key, sim, rel) for row_key, sim, rel in rows]
+        ranked.sort(key=lambda row: (-row[0], row[1]))
+        return ranked
+
+    selectivity = 1.0
+    if filters:
+        passing, total = con.execute(
+            f"SELECT COUNT(*), (SELECT COUNT(*) FROM {table}) FROM {rows_sql} WHERE {where_sql}",
+            params,
+        ).fetchone()
+        if passing == 0:
+            if stats is not None:
+                stats.update(strategy="prefilter", candidates=0, rounds=0, stable=True)
+            return []
+        selectivity = min(1.0, passing / max(total, 1))
+        if passing <= PREFILTER_MAX_ROWS or selectivity <= PREFILTER_MAX_FRACTION:
+            return exact(passing)
+
+    # Without relevance and filters the distance order is final
+    fetch = limit
+    if best_relevance > 0.0 or filters:
+        fetch = min(
+            math.ceil(max(limit * ANN_OVERFETCH, ANN_MIN_CANDIDATES) / selectivity),
+            ANN_MAX_CANDIDATES,
+        )
+
+    relevance: dict[str, float] = {}
+    looked_up: set[str] = set()
+    rounds = 0
+    while True:
+        rounds += 1
+        # ORDER BY distance + constant LIMIT on the embedding table alone
+        # triggers the HNSW index scan (metric='cosine'); the quantized
+        # index replaces it with Hamming/int8 candidates re-scored exactly
+        if quantized is not None:
+            hits = quantized.search(query_emb_256d, fetch)
+        elif cascade is not None:
+            hits = cascade.search(query_embedding, fetch)
+        else:
+            hits = con.execute(
+                f"""
+                SELECT {id_column}, 1.0 - array_cosine_distance(embedding, ?::FLOAT[256]) AS similarity
+                FROM {table}
+                ORDER BY array_cosine_distance(embedding, ?::FLOAT[256]) ASC
+                LIMIT {int(fetch)}
+                """,
+                [query_emb_256d, query_emb_256d],
+            ).fetchall()
+
+        new_ids = [row_key for row_key, _ in hits if row_key not in looked_up]
+        if new_ids:
+            looked_up.update(new_ids)
+            relevance.update(
+                con.execute(
+                    f"""
+                    SELECT {row_id}, ({relevance_sql})::DOUBLE
+                    FROM {rows_sql}
+                    {join_sql}
+                    WHERE {row_id} IN (SELECT UNNEST(?::VARCHAR[])) AND {where_sql}
+                    """,
+                    [new_ids, *params],
+                ).fetchall()
+            )
+
+        ranked = sorted(
+            (
+                (combined_score(similarity, relevance[row_key]), row_key, similarity, relevance[row_key])
+                for row_key, similarity in hits
+                if row_key in relevance
+            ),
+            key=lambda row: (-row[0], row[1]),
+        )
+        exhausted = len(hits) < fetch
+        # Unseen rows are at most as similar as the last hit
+        stable = exhausted or (
+            len(ranked) >= limit
+            and ranked[limit - 1][0] >= combined_score(hits[-1][1], best_relevance)
+        )
+        if stable or fetch >= ANN_MAX_CANDIDATES:
+            break
+        fetch = min(fetch * 2, ANN_MAX_CANDIDATES)
+
+    if not stable and filters:
+        # Filter too selective for the candidate cap: exact over the passing rows
+        return exact(passing)
+    if stats is not None:
+        stats.update(strategy="ann", candidates=len(hits), rounds=rounds, stable=stable)
+    return ranked[:limit]
 
 
 def semantic_search(
-    con: duckdb.DuckDBPyConnection, query_embedding: list[float], limit: int = 10
+    con: duckdb.DuckDBPyConnection,
+    query_embedding: list[float],
+    limit: int = 10,
+    stats: dict | None = None,
+    filters: SearchFilters | None = None,
+    quantized: QuantizedIndex | None = None,
+    cascade: MatryoshkaCascade | None = None,
 ) -> list[dict]:
     """
     Semantic search using 256d embeddings with HNSW index.
 
+    Ranking: similarity * 0.6 + (relevance / 10.0) * 0.4. The HNSW index
+    only serves ORDER BY distance, so this runs in two phases: fetch the
+    top-N chunks by distance, re-score them with the materialized document
+    relevance (db/relevance.py). N starts at limit * ANN_OVERFETCH and
+    doubles while a chunk beyond the N-th hit could still enter the top
+    `limit` (capped at ANN_MAX_CANDIDATES).
+
     Args:
         con: DuckDB connection
         query_embedding: Query embedding (full 1024d, will be truncated)
         limit: Number of results to return
+        stats: Optional dict, filled with strategy ("ann" or "prefilter"),
+            candidates (final N), rounds and stable (False if the cap was
+            hit before the top results settled)
+        filters: Optional metadata filters (see search/filters.py); selective
+            filters switch to exact search over the passing chunks
+        quantized: Optional quantized chunk index (QuantizedIndex.load(con,
+            "chunk")) used as first stage instead of the HNSW index
+        cascade: Optional Matryoshka cascade (MatryoshkaCascade.load(con)) used
+            as first stage instead of the HNSW index; similarities are those
+            of its last level
 
     Returns:
         List of results with chunk_id, text, summary, similarity
     """
-    # Truncate to 256d
-    query_emb_256d = query_embedding[:256]
+    if limit <= 0:
+        return []
 
-    # Use array_cosine_distance for HNSW index utilization (metric='cosine')
-    # ORDER BY distance ASC + LIMIT triggers HNSW index scan
-    # Hybrid ranking: similarity * 0.6 + (relevance / 10.0) * 0.4
-    results = con.execute(
-        """
-        SELECT
-            e.chunk_id,
-            n.text,
-            n.summary,
-            n.source_file,
-            1.0 - array_cosine_distance(e.embedding, ?::FLOAT[256]) as similarity,
-            COALESCE(r.relevance_score, 0.0) as relevance
-        FROM chunk_embeddings_256d e
-        JOIN nodes n ON e.chunk_id = n.id
-        LEFT JOIN relevance_scores r ON n.ulid = r.ulid
-        ORDER BY (
-            (1.0 - array_cosine_distance(e.embedding, ?::FLOAT[256])) * 0.6 +
-            (COALESCE(r.relevance_score, 0.0) / 10.0) * 0.4
-        ) DESC
-        LIMIT ?
-    """,
-        [query_emb_256d, query_emb_256d, limit],
-    ).fetchall()
+    join_sql, relevance_sql = relevance_join(con)
+    ranked = _vector_topk(
+        con,
+        query_embedding,
+        limit,
+        table="chunk_embeddings_256d",
+        id_column="chunk_id",
+        rows_sql="nodes n",
+        row_id="n.id",
+        filters=filters or SearchFilters(),
+        filter_columns=("n.id", "n.source_file", "n.language"),
+        base_where="n.type = 'chunk'" if filters else "TRUE",
+        join_sql=join_sql,
+        relevance_sql=relevance_sql,
+        best_relevance=max_relevance(con),
+        quantized=quantized,
+        cascade=cascade,
+        stats=stats,
+    )
 
-    return [
-        {
-            "chunk_id": chunk_id,
-            "text": text,
-            "summary": summary,
-            "source_file": source_file,
-            "similarity": similarity,
-            "relevance": relevance,
-            "score": similarity * 0.6 + (relevance / 10.0) * 0.4,
-        }
-        for chunk_id, text, summary, source_file, similarity, relevance in results
-    ]
+    chunks = _hydrate_chunks(con, [chunk_id for _, chunk_id, _, _ in ranked])
+    results = []
+    for score, chunk_id, similarity, relevance in ranked:
+        text, summary, source_file = chunks[chunk_id]
+        results.append(
+            {
+                "chunk_id": chunk_id,
+                "text": text,
+                "summary": summary,
+                "source_file": source_file,
+                "similarity": similarity,
+                "relevance": relevance,
+                "score": score,
+            }
+        )
+    return results
 
 
 def code_search(
@@ -85,34 +305,55 @@ def code_search(
     query_embedding: list[float],
     limit: int = 10,
     languages: list[str] | None = None,
+    filters: SearchFilters | None = None,
+    stats: dict | None = None,
+    quantized: QuantizedIndex | None = None,
 ) -> list[dict]:
     """
     Semantic code search using code embeddings.
 
     Searches functions, classes, and methods using their embeddings.
-    Optionally filters by programming language.
+    Optionally filters by programming language and document metadata.
 
     Args:
         con: DuckDB connection
         query_embedding: Query embedding (full dimension, will be truncated to 256d)
         limit: Number of results to return
         languages: Optional list of languages to filter (e.g., ["python", "javascript"])
+        filters: Optional metadata filters (see search/filters.py); `languages`
+            is added to its languages
+        stats: Optional dict, filled like in semantic_search
+        quantized: Optional quantized code index (QuantizedIndex.load(con,
+            "code")) used as first stage instead of the HNSW index
 
     Returns:
         List of results with code_id, name, signature, docstring, similarity, language
     """
-    # Truncate to 256d
-    query_emb_256d = query_embedding[:256]
-
-    # Language filter
-    lang_filter = ""
+    if limit <= 0:
+        return []
+    filters = filters or SearchFilters()
     if languages:
-        lang_list = "', '".join(languages)
-        lang_filter = f"AND e.language IN ('{lang_list}')"
+        filters = replace(filters, languages=(*filters.languages, *languages))
+
+    ranked = _vector_topk(
+        con,
+        query_embedding,
+        limit,
+        table="code_embeddings_256d",
+        id_column="code_id",
+        rows_sql="code_embeddings_256d e",
+        row_id="e.code_id",
+        filters=filters,
+        filter_columns=("e.code_id", "e.source_file", "e.language"),
+        quantized=quantized,
+        stats=stats,
+    )
+    if not ranked:
+        return []
+    similarities = {code_id: similarity for _, code_id, similarity, _ in ranked}
 
-    # Use array_cosine_distance for HNSW index utilization (metric='cosine')
-    results = con.execute(
-        f"""
+    rows = con.execute(
+        """
         SELECT
             e.code_id,
             n.title as name,
@@ -120,19 +361,15 @@ def code_search(
             n.docstring,
             n.content as text,
             n.source_file,
-            e.language,
-            1.0 - array_cosine_distance(e.embedding, ?::FLOAT[256]) as similarity
+            e.language
         FROM code_embeddings_256d e
         JOIN nodes n ON e.code_id = n.id
-        WHERE n.type IN ('function', 'class', 'method')
-          {lang_filter}
-        ORDER BY array_cosine_distance(e.embedding, ?::FLOAT[256]) ASC
-        LIMIT ?
-    """,
-        [query_emb_256d, query_emb_256d, limit],
+        WHERE e.code_id IN (SELECT UNNEST(?::VARCHAR[]))
+          AND n.type IN ('function', 'class', 'method')
+        """,
+        [list(similarities)],
     ).fetchall()
-
-    return [
+    results = [
         {
             "code_id": code_id,
             "name": name,
@@ -141,10 +378,12 @@ def code_search(
             "text": text,
             "source_file": source_file,
             "language": language,
-            "similarity": similarity,
+            "similarity": similarities[code_id],
         }
-        for code_id, name, signature, docstring, text, source_file, language, similarity in results
+        for code_id, name, signature, docstring, text, source_file, language in rows
     ]
+    results.sort(key=lambda r: (-r["similarity"], r["code_id"]))
+    return results
 
 
 def bm25_search(
@@ -153,6 +392,10 @@ def bm25_search(
     """
     BM25 full-text search.
 
+    With the BM25 engine postings (see bm25_index.py) only the postings of the
+    query terms are read (MaxScore top-k); otherwise `match_bm25` is evaluated
+    for every node.
+
     Args:
         con: DuckDB connection
         query: Query text
@@ -161,21 +404,28 @@ def bm25_search(
     Returns:
         List of results with chunk_id, text, summary, score
     """
-    results = con.execute(
-        """
-        SELECT
-            id,
-            text,
-            summary,
-            source_file,
-            fts_main_nodes.match_bm25(id, ?) as score
-        FROM nodes
-        WHERE fts_main_nodes.match_bm25(id, ?) IS NOT NULL
-        ORDER BY score DESC
-        LIMIT ?
-    """,
-        [query, query, limit],
-    ).fetchall()
+    if bm25_index_available(con):
+        hits = bm25_topk(con, query, limit)
+        nodes = _hydrate_chunks(con, [node_id for node_id, _ in hits])
+        results = [
+            (node_id, *nodes.get(node_id, (None, None, None)), score) for node_id, score in hits
+        ]
+    else:
+        results = con.execute(
+            """
+            SELECT
+                id,
+                text,
+                summary,
+                source_file,
+                fts_main_nodes.match_bm25(id, ?) as score
+            FROM nodes
+            WHERE fts_main_nodes.match_bm25(id, ?) IS NOT NULL
+            ORDER BY score DESC
+            LIMIT ?
+        """,
+            [query, query, limit],
+        ).fetchall()
 
     return [
         {
@@ -220,6 +470,13 @@ def hybrid_search(
     # Fetch more candidates than final limit for better coverage
     candidate_limit = min(limit * 5, 100)
 
+    # Top-K BM25 results (postings of the query terms only, see bm25_search)
+    bm25_hits = bm25_search(con, query, candidate_limit)
+    bm25_columns = [
+        [hit[key] for hit in bm25_hits]
+        for key in ("chunk_id", "text", "summary", "source_file", "bm25_score")
+    ]
+
     # Top-K semantic results using HNSW index
     results = con.execute(
         """
@@ -237,15 +494,11 @@ def hybrid_search(
         ),
         bm25_topk AS (
             SELECT
-                id,
-                text,
-                summary,
-                source_file,
-                fts_main_nodes.match_bm25(id, ?) as bm25_score
-            FROM nodes
-            WHERE fts_main_nodes.match_bm25(id, ?) IS NOT NULL
-            ORDER BY bm25_score DESC
-            LIMIT ?
+                UNNEST(?::VARCHAR[]) as id,
+                UNNEST(?::VARCHAR[]) as text,
+                UNNEST(?::VARCHAR[]) as summary,
+                UNNEST(?::VARCHAR[]) as source_file,
+                UNNEST(?::DOUBLE[]) as bm25_score
         ),
         merged AS (
             SELECT id, text, summary, source_file, sem_score, 0.0 as bm25_score
@@ -268,9 +521,7 @@ def hybrid_search(
             query_emb_256d,
             query_emb_256d,
             candidate_limit,
-            query,
-            query,
-            candidate_limit,
+            *bm25_columns,
         ],
     ).fetchall()
     if not results:
@@ -303,15 +554,274 @@ def hybrid_search(
     return combined[:limit]
 
 
+def _arrow_table(relation: duckdb.DuckDBPyConnection):
+    """Fetch a result as a pyarrow Table (DuckDB >= 1.4 returns a RecordBatchReader)."""
+    result = relation.arrow()
+    return result.read_all() if hasattr(result, "read_all") else result
+
+
+class ChunkMatrix:
+    """
+    In-memory matrix of L2-normalized chunk embeddings for batch search.
+
+    Cosine similarity of all queries against all chunks is one matrix product,
+    which replaces one HNSW/scan statement per query.
+    """
+
+    def __init__(self, ids: list[str], vectors: np.ndarray, relevance: np.ndarray):
+        self.ids = ids
+        self.vectors = vectors
+        self.relevance = relevance
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    @classmethod
+    def load(cls, con: duckdb.DuckDBPyConnection) -> "ChunkMatrix":
+        """Load chunk_embeddings_256d (and relevance scores, if available)."""
+        join_sql, relevance_sql = relevance_join(con)
+
+        table = _arrow_table(
+            con.execute(
+                f"""
+                SELECT e.chunk_id, e.embedding, {relevance_sql}::FLOAT AS relevance
+                FROM chunk_embeddings_256d e
+                JOIN nodes n ON e.chunk_id = n.id
+                {join_sql}
+                WHERE e.embedding IS NOT NULL
+                ORDER BY e.chunk_id
+                """
+            )
+        )
+        ids = table.column("chunk_id").to_pylist()
+        dim = table.schema.field("embedding").type.list_size
+        vectors = (
+            table.column("embedding").combine_chunks().flatten().to_numpy(zero_copy_only=False)
+        )
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(ids), dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        relevance = table.column("relevance").to_numpy().astype(np.float32)
+        return cls(ids, vectors, relevance)
+
+    def top_k(
+        self,
+        query_vectors: np.ndarray,
+        k: int,
+        *,
+        with_relevance: bool = False,
+        block_size: int = 256,
+    ) -> list[list[tuple[int, float]]]:
+        """
+        Top-k rows per query as (row index, cosine similarity), best first.
+
+        With `with_relevance` rows are ranked like semantic_search:
+        similarity * 0.6 + (relevance / 10) * 0.4.
+        """
+        if len(self) == 0 or k <= 0:
+            return [[] for _ in range(len(query_vectors))]
+
+        queries = np.asarray(query_vectors, dtype=np.float32)[:, : self.dim]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries = queries / norms
+        k = min(k, len(self))
+        boost = self.relevance / 10.0 * 0.4 if with_relevance else None
+
+        hits: list[list[tuple[int, float]]] = []
+        for start in range(0, len(queries), block_size):
+            sims = queries[start : start + block_size] @ self.vectors.T
+            ranking = sims * 0.6 + boost if boost is not None else sims
+            top = np.argpartition(-ranking, k - 1, axis=1)[:, :k]
+            for row, candidates in enumerate(top):
+                order = candidates[np.argsort(-ranking[row, candidates], kind="stable")]
+                hits.append([(int(i), float(sims[row, i])) for i in order])
+        return hits
+
+
+def _hydrate_chunks(
+    con: duckdb.DuckDBPyConnection, chunk_ids: list[str]
+) -> dict[str, tuple[str, str, str]]:
+    """Fetch text, summary and source_file for many chunks in one statement."""
+    if not chunk_ids:
+        return {}
+    rows = con.execute(
+        """
+        SELECT id, text, summary, source_file
+        FROM nodes
+        WHERE id IN (SELECT UNNEST(?::VARCHAR[]))
+        """,
+        [chunk_ids],
+    ).fetchall()
+    return {cid: (text, summary, source_file) for cid, text, summary, source_file in rows}
+
+
+def _combine_hybrid(
+    merged: dict[str, list],
+    limit: int,
+    semantic_weight: float,
+    bm25_weight: float,
+) -> list[dict]:
+    """Normalize and combine merged candidates exactly like hybrid_search."""
+    if not merged:
+        return []
+    max_sem = max((row[3] for row in merged.values()), default=1.0) or 1.0
+    max_bm25 = max((row[4] for row in merged.values()), default=1.0) or 1.0
+
+    combined = []
+    for chunk_id, (text, summary, source_file, sem, bm25) in merged.items():
+        sem_norm = sem / max_sem if sem else 0.0
+        bm25_norm = bm25 / max_bm25 if bm25 else 0.0
+        combined.append(
+            {
+                "chunk_id": chunk_id,
+                "text": text,
+                "summary": summary,
+                "source_file": source_file,
+                "hybrid_score": sem_norm * semantic_weight + bm25_norm * bm25_weight,
+                "semantic_score": sem_norm,
+                "bm25_score": bm25_norm,
+            }
+        )
+    combined.sort(key=lambda x: x["hybrid_score"], reverse=True)
+    return combined[:limit]
+
+
+def batch_search(
+    con: duckdb.DuckDBPyConnection,
+    queries: list[str],
+    config: dict,
+    *,
+    mode: str = "hybrid",
+    limit: int = 10,
+    semantic_weight: float = 0.7,
+    bm25_weight: float = 0.3,
+    matrix: ChunkMatrix | None = None,
+) -> dict:
+    """
+    Run many queries at once.
+
+    Uncached queries are embedded in a single embedding request, the semantic
+    top-k for all queries is one matrix product over `matrix` (loaded from
+    `con` if not given), all semantic hits are hydrated with one statement and
+    BM25 / fuzzy run per query. Scores match semantic_search / hybrid_search.
+
+    Args:
+        con: DuckDB connection
+        queries: Query texts
+        config: Configuration dict (embedding settings)
+        mode: One of BATCH_MODES
+        limit: Number of results per query
+        semantic_weight: Weight for semantic similarity (hybrid)
+        bm25_weight: Weight for BM25 score (hybrid)
+        matrix: Preloaded ChunkMatrix (the daemon keeps one)
+
+    Returns:
+        Dict with "results" (one list per query, in input order), "timings_ms"
+        per stage and "embedding_cache" hit/miss counts
+    """
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Unsupported batch mode: {mode}")
+
+    start = time.perf_counter()
+    timings: dict[str, int] = {}
+    cache_stats: dict[str, int] = {"hits": 0, "misses": 0}
+    results: list[list[dict]] = [[] for _ in queries]
+    if not queries:
+        timings["total"] = 0
+        return {"results": results, "timings_ms": timings, "embedding_cache": cache_stats}
+
+    candidate_limit = min(limit * 5, 100)
+    semantic_hits: list[list[tuple[int, float]]] = []
+
+    if mode in ("semantic", "hybrid"):
+        stage = time.perf_counter()
+        embeddings = embed_queries(queries, config, cache_stats)
+        timings["embed"] = ms_since(stage)
+
+        stage = time.perf_counter()
+        if matrix is None:
+            matrix = ChunkMatrix.load(con)
+            timings["load_matrix"] = ms_since(stage)
+            stage = time.perf_counter()
+        semantic_hits = matrix.top_k(
+            np.asarray(embeddings, dtype=np.float32),
+            limit if mode == "semantic" else candidate_limit,
+            with_relevance=mode == "semantic",
+        )
+        timings["semantic"] = ms_since(stage)
+
+        stage = time.perf_counter()
+        hit_ids = sorted({matrix.ids[i] for hits in semantic_hits for i, _ in hits})
+        chunks = _hydrate_chunks(con, hit_ids)
+        timings["hydrate"] = ms_since(stage)
+
+    if mode == "semantic":
+        for qi, hits in enumerate(semantic_hits):
+            for i, similarity in hits:
+                chunk_id = matrix.ids[i]
+                text, summary, source_file = chunks.get(chunk_id, (None, None, None))
+                relevance = float(matrix.relevance[i])
+                results[qi].append(
+                    {
+                        "chunk_id": chunk_id,
+                        "text": text,
+                        "summary": summary,
+                        "source_file": source_file,
+                        "similarity": similarity,
+                        "relevance": relevance,
+                        "score": combined_score(similarity, relevance),
+                    }
+                )
+
+    elif mode == "fuzzy":
+        stage = time.perf_counter()
+        results = [fuzzy_search(con, query, limit) for query in queries]
+        timings["fuzzy"] = ms_since(stage)
+
+    else:
+        stage = time.perf_counter()
+        bm25_limit = limit if mode == "bm25" else candidate_limit
+        bm25_results = [bm25_search(con, query, bm25_limit) for query in queries]
+        timings["bm25"] = ms_since(stage)
+
+        if mode == "bm25":
+            results = bm25_results
+        else:
+            stage = time.perf_counter()
+            for qi, bm25_hits in enumerate(bm25_results):
+                merged: dict[str, list] = {}
+                for i, similarity in semantic_hits[qi]:
+                    chunk_id = matrix.ids[i]
+                    merged[chunk_id] = [*chunks.get(chunk_id, (None, None, None)), similarity, 0.0]
+                for hit in bm25_hits:
+                    row = merged.setdefault(
+                        hit["chunk_id"],
+                        [hit["text"], hit["summary"], hit["source_file"], 0.0, 0.0],
+                    )
+                    row[4] = max(row[4], hit["bm25_score"])
+                results[qi] = _combine_hybrid(merged, limit, semantic_weight, bm25_weight)
+            timings["merge"] = ms_since(stage)
+
+    timings["total"] = ms_since(start)
+    return {"results": results, "timings_ms": timings, "embedding_cache": cache_stats}
+
+
 def fuzzy_search(
     con: duckdb.DuckDBPyConnection, query: str, limit: int = 50, max_distance: int = 2
 ) -> list[dict]:
     """
     Fuzzy search using Levenshtein distance (edit distance).
 
-    Uses a two-phase approach for performance:
-    1. Pre-filter candidates using LIKE patterns (fast)
-    2. Apply editdist3 only on promising candidates
+    Uses the symmetric-delete typo index built by `build_indexes()`
+    (see typo_index.py): a few index lookups per query term, no chunk text is
+    tokenized at query time. Databases without the index fall back to
+    scanning LIKE-prefiltered candidates with editdist3.
 
     Args:
         con: DuckDB connection
@@ -322,6 +832,30 @@ def fuzzy_search(
     Returns:
         List of dicts with chunk_id, text, summary, fuzzy_score
     """
+    if max_distance <= TYPO_MAX_DISTANCE and typo_index_available(con):
+        results = typo_search(con, query, limit, max_distance)
+    else:
+        results = _fuzzy_search_scan(con, query, limit, max_distance)
+
+    return [
+        {
+            "chunk_id": cid,
+            "text": text,
+            "summary": summary,
+            "source_file": source_file,
+            "matched_terms": matched_terms,
+            "avg_distance": avg_distance,
+            "total_matches": total_matches,
+            "fuzzy_score": fuzzy_score,
+        }
+        for cid, text, summary, source_file, matched_terms, avg_distance, total_matches, fuzzy_score in results
+    ]
+
+
+def _fuzzy_search_scan(
+    con: duckdb.DuckDBPyConnection, query: str, limit: int, max_distance: int
+) -> list[tuple]:
+    """Fuzzy search without typo index: LIKE pre-filter, then editdist3 per word."""
     # Split query into terms
     query_terms = [t for t in query.lower().split() if len(t) >= 3]
 
@@ -341,7 +875,7 @@ def fuzzy_search(
     candidate_limit = min(limit * 10, 500)
 
     # Two-phase fuzzy search: pre-filter then editdist
-    results = con.execute(
+    return con.execute(
         f"""
         WITH candidates AS (
             SELECT id, text, summary, source_file
@@ -401,20 +935,6 @@ def fuzzy_search(
         [query_terms, max_distance, limit],
     ).fetchall()
 
-    return [
-        {
-            "chunk_id": cid,
-            "text": text,
-            "summary": summary,
-            "source_file": source_file,
-            "matched_terms": matched_terms,
-            "avg_distance": avg_distance,
-            "total_matches": total_matches,
-            "fuzzy_score": fuzzy_score,
-        }
-        for cid, text, summary, source_file, matched_terms, avg_distance, total_matches, fuzzy_score in results
-    ]
-
 
 def exact_string_search(
     con: duckdb.DuckDBPyConnection,
@@ -428,6 +948,10 @@ def exact_string_search(
     Finds chunks containing the exact query string.
     Useful for searching specific terms, IDs, or phrases.
 
+    With the trigram index (see trigram_index.py) only chunks containing all
+    trigrams of the query are verified; short or unselective queries scan
+    all chunks.
+
     Args:
         con: DuckDB connection
         query: Exact string to search for
@@ -437,45 +961,45 @@ def exact_string_search(
     Returns:
         List of dicts with chunk_id, text, summary, exact_match_count
     """
-    if case_sensitive:
-        # Case-sensitive search
-        results = con.execute(
-            """
-            SELECT
-                id,
-                text,
-                summary,
-                source_file,
-                (length(text) - length(replace(text, ?, ''))) / length(?) as match_count,
-                1.0 / (1.0 + strpos(text, ?)) as position_score
-            FROM nodes
-            WHERE type = 'chunk'
-              AND text LIKE '%' || ? || '%'
-            ORDER BY match_count DESC, position_score DESC
-            LIMIT ?
-        """,
-            [query, query, query, query, limit],
-        ).fetchall()
+    candidates = trigram_candidates(con, query) if trigram_index_available(con) else None
+    if candidates is not None and not candidates:
+        return []
+
+    # Case-insensitive: compare lowercased text (candidates come from lowercase trigrams either way)
+    haystack = "text" if case_sensitive else "lower(text)"
+    needle = query if case_sensitive else query.lower()
+    if candidates is None:
+        # Short or unselective query, or no index: scan all chunks
+        candidates_cte = ""
+        source = "nodes"
+        candidate_params: list[str] = []
     else:
-        # Case-insensitive search
-        query_lower = query.lower()
-        results = con.execute(
-            """
-            SELECT
-                id,
-                text,
-                summary,
-                source_file,
-                (length(lower(text)) - length(replace(lower(text), ?, ''))) / length(?) as match_count,
-                1.0 / (1.0 + strpos(lower(text), ?)) as position_score
+        # Materialized on its own so the id lookup runs as an ART index scan
+        candidates_cte = f"""
+        WITH candidates AS MATERIALIZED (
+            SELECT id, type, text, summary, source_file
             FROM nodes
-            WHERE type = 'chunk'
-              AND lower(text) LIKE '%' || ? || '%'
-            ORDER BY match_count DESC, position_score DESC
-            LIMIT ?
-        """,
-            [query_lower, query_lower, query_lower, query_lower, limit],
-        ).fetchall()
+            WHERE id IN ({', '.join('?' * len(candidates))})
+        )"""
+        source = "candidates"
+        candidate_params = candidates
+    results = con.execute(
+        f"""{candidates_cte}
+        SELECT
+            id,
+            text,
+            summary,
+            source_file,
+            (length({haystack}) - length(replace({haystack}, ?, ''))) / length(?) as match_count,
+            1.0 / (1.0 + strpos({haystack}, ?)) as position_score
+        FROM {source}
+        WHERE type = 'chunk'
+          AND {haystack} LIKE '%' || ? || '%'
+        ORDER BY match_count DESC, position_score DESC, id
+        LIMIT ?
+    """,
+        [*candidate_params, needle, needle, needle, needle, limit],
+    ).fetchall()
 
     return [
         {
@@ -603,7 +1127,29 @@ def main():
     )
     parser.add_argument(
         "--languages",
-        help="Comma-separated list of languages for code search (e.g., python,javascript)",
+        help=(
+            "Comma-separated languages: programming languages in code mode "
+            "(e.g., python,javascript), chunk languages in semantic mode (e.g., de,en)"
+        ),
+    )
+    parser.add_argument(
+        "--doc-types", help="Comma-separated document types (semantic/code mode)"
+    )
+    parser.add_argument(
+        "--research-statuses",
+        help="Comma-separated document research statuses (semantic/code mode)",
+    )
+    parser.add_argument(
+        "--categories",
+        help="Comma-separated taxonomy categories, by id or title (semantic mode)",
+    )
+    parser.add_argument(
+        "--created-after",
+        help="Only items created at/after this ISO date (ULID time, semantic/code mode)",
+    )
+    parser.add_argument(
+        "--created-before",
+        help="Only items created before this ISO date (ULID time, semantic/code mode)",
     )
     parser.add_argument(
         "--semantic-weight",
@@ -633,20 +1179,6 @@ def main():
 
     con: duckdb.DuckDBPyConnection | None = None
 
-    def _load_extension_safe(ext: str) -> None:
-        assert con is not None
-        try:
-            con.execute(f"LOAD {ext};")
-        except duckdb.Error:
-            try:
-                con.execute(f"INSTALL {ext};")
-                con.execute(f"LOAD {ext};")
-            except duckdb.Error as e:
-                print(
-                    f"Warning: Could not load DuckDB extension '{ext}' ({e})",
-                    file=sys.stderr,
-                )
-
     try:
         # Check if DB exists, otherwise build from documents directory
         db_path = Path(args.db)
@@ -662,7 +1194,7 @@ def main():
                 from brain_graph.db.db_builder import BrainGraphDB
 
                 db = BrainGraphDB(":memory:")
-                db.import_directory_fast(data_dir)
+                db.import_directory(data_dir)
                 db.build_indexes()
                 con = db.con
                 print("Database ready", file=sys.stderr)
@@ -673,84 +1205,11 @@ def main():
         # Load config
         config = load_config(args.config)
 
-        # Load database if not already loaded
+        # Open search snapshot (rebuilt only if the DB content changed)
         if db_path is not None:
-            print("Loading database into memory...", file=sys.stderr)
-            con = duckdb.connect(":memory:")
-
-            con.execute(f"ATTACH '{db_path}' AS disk_db (READ_ONLY)")
-
-            main_tables = [
-                "nodes",
-                "edges",
-                "chunk_embeddings_256d",
-                "code_embeddings_256d",
-                "taxonomy_embeddings_256d",
-                "embedding_sources",
-                "meta",
-                "german_stopwords",
-            ]
-
-            for table_name in main_tables:
-                exists = con.execute(
-                    f"SELECT COUNT(*) FROM duckdb_tables() WHERE database_name='disk_db' AND table_name='{table_name}'"
-                ).fetchone()[0]
-                if exists:
-                    print(f"  Loading table: {table_name}", file=sys.stderr)
-                    con.execute(
-                        f"CREATE TABLE {table_name} AS SELECT * FROM disk_db.{table_name}"
-                    )
-
-            con.execute("DETACH disk_db")
-
-            print("Building indexes...", file=sys.stderr)
-
-            _load_extension_safe("vss")
-            try:
-                con.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_chunk_embeddings_hnsw
-                    ON chunk_embeddings_256d
-                    USING HNSW (embedding)
-                    WITH (metric = 'cosine')
-                    """
-                )
-            except duckdb.Error as e:
-                print(
-                    f"Warning: Could not build HNSW index, skipping ({e})",
-                    file=sys.stderr,
-                )
-
-            _load_extension_safe("fts")
-
-            has_stopwords = (
-                con.execute(
-                    "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name='german_stopwords'"
-                ).fetchone()[0]
-                > 0
-            )
-            stopwords_param = "german_stopwords" if has_stopwords else "none"
-            try:
-                con.execute(
-                    f"""
-                    PRAGMA create_fts_index(
-                        'nodes', 'id', 'text', 'summary', 'title', 'description',
-                        stemmer='german',
-                        stopwords='{stopwords_param}',
-                        ignore='(\\.|[^a-zäöüß])+',
-                        strip_accents=1,
-                        lower=1,
-                        overwrite=1
-                    )
-                    """
-                )
-            except duckdb.Error as e:
-                print(
-                    f"Warning: Could not build FTS index, skipping ({e})",
-                    file=sys.stderr,
-                )
-
-            print("Database ready (indexes built)", file=sys.stderr)
+            print("Loading search snapshot...", file=sys.stderr)
+            con, index_info = open_search_connection(db_path)
+            print(f"Database ready (source: {index_info['source']})", file=sys.stderr)
 
         if con is None:
             raise RuntimeError("Database connection not available")
@@ -762,6 +1221,19 @@ def main():
         elif args.semantic_only:
             mode = "semantic"
 
+        filters = SearchFilters.from_dict(
+            {
+                "languages": args.languages if mode == "semantic" else None,
+                "doc_types": args.doc_types,
+                "research_statuses": args.research_statuses,
+                "categories": args.categories,
+                "created_after": args.created_after,
+                "created_before": args.created_before,
+            }
+        )
+        if filters and mode not in ("semantic", "code"):
+            raise ValueError(f"Filters are supported in semantic and code mode, not {mode}")
+
         query_embedding = None
         if mode in ["semantic", "hybrid", "code"]:
             print("Embedding query...", file=sys.stderr)
@@ -770,7 +1242,7 @@ def main():
         print(f"Searching with {mode} mode...", file=sys.stderr)
 
         if mode == "semantic":
-            results = semantic_search(con, query_embedding, args.limit)
+            results = semantic_search(con, query_embedding, args.limit, filters=filters)
             score_key = "similarity"
         elif mode == "bm25":
             results = bm25_search(con, args.query, args.limit)
@@ -780,7 +1252,7 @@ def main():
             score_key = "fuzzy_score"
         elif mode == "code":
             languages = args.languages.split(",") if args.languages else None
-            results = code_search(con, query_embedding, args.limit, languages)
+            results = code_search(con, query_embedding, args.limit, languages, filters)
             score_key = "similarity"
         else:
             bm25_weight = 1.0 - args.semantic_weight
@@ -803,6 +1275,7 @@ def main():
                     query=args.query,
                     mode=mode,
                     limit=args.limit,
+                    filters=filters.to_dict(),
                     score_key=score_key,
                     results=results,
                     counts={"results": len(results)},
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import random
+
+import duckdb
+import pyarrow as pa
+import pytest
+
+from brain_graph.db.bm25_index import bm25_index_available, bm25_topk_terms, build_bm25_index
+
+VOCABULARY = [f"t{i}" for i in range(400)]
+
+
+def _make_fts_con(n_docs: int = 3000) -> duckdb.DuckDBPyConnection:
+    """nodes + the fts_main_nodes tables create_fts_index would write (tokens given directly)."""
+    rng = random.Random(7)
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]  # Zipf-like
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE SCHEMA fts_main_nodes")
+    ids, texts, terms = [], [], {"docid": [], "fieldid": [], "termid": []}
+    for docid in range(n_docs):
+        # Some nodes (sections without text) have no tokens at all
+        length = 0 if docid % 50 == 0 else rng.randint(3, 60)
+        tokens = rng.choices(range(len(VOCABULARY)), weights, k=length)
+        ids.append(f"n{docid:05d}")
+        texts.append(" ".join(VOCABULARY[t] for t in tokens))
+        terms["docid"] += [docid] * length
+        terms["fieldid"] += [0] * length
+        terms["termid"] += tokens
+    nodes_arrow = pa.table({"id": ids, "text": texts})
+    terms_arrow = pa.table({name: pa.array(values, pa.int64()) for name, values in terms.items()})
+    con.execute("CREATE TABLE nodes AS SELECT id, 'chunk' AS type, text FROM nodes_arrow")
+    con.execute("CREATE TABLE fts_main_nodes.terms AS SELECT * FROM terms_arrow")
+    con.execute(
+        """
+        CREATE TABLE fts_main_nodes.docs AS
+        SELECT rowid AS docid, id AS name,
+               (SELECT COUNT(*) FROM fts_main_nodes.terms t WHERE t.docid = n.rowid) AS len
+        FROM nodes n
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE fts_main_nodes.dict AS
+        SELECT termid, 't' || termid AS term, COUNT(DISTINCT docid) AS df
+        FROM fts_main_nodes.terms GROUP BY termid
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE fts_main_nodes.stats AS
+        SELECT COUNT(docid) AS num_docs, SUM(len) / COUNT(len) AS avgdl FROM fts_main_nodes.docs
+        """
+    )
+    return con
+
+
+def _match_bm25(con: duckdb.DuckDBPyConnection, terms: list[str]) -> dict[str, float]:
+    """Scores of all matching docs, computed like the match_bm25 macro."""
+    rows = con.execute(
+        """
+        WITH tf AS (
+            SELECT t.termid, t.docid, COUNT(*) AS tf
+            FROM fts_main_nodes.terms t JOIN fts_main_nodes.dict d USING (termid)
+            WHERE list_contains(?, d.term)
+            GROUP BY t.termid, t.docid
+        )
+        SELECT docs.name, SUM(
+            log((s.num_docs - d.df + 0.5) / (d.df + 0.5) + 1)
+            * (tf.tf * 2.2 / (tf.tf + 1.2 * (1 - 0.75 + 0.75 * (docs.len / s.avgdl))))
+        )
+        FROM tf
+        JOIN fts_main_nodes.dict d USING (termid)
+        JOIN fts_main_nodes.docs docs USING (docid), fts_main_nodes.stats s
+        GROUP BY docs.name
+        """,
+        [terms],
+    ).fetchall()
+    return dict(rows)
+
+
+def test_topk_equals_exhaustive_bm25() -> None:
+    con = _make_fts_con()
+    assert not bm25_index_available(con)
+    info = build_bm25_index(con)
+    assert bm25_index_available(con)
+    assert info["blocks"] > info["terms"]  # frequent terms span several blocks
+
+    rng = random.Random(3)
+    queries = [["t0"], ["t0", "t1", "t2"], ["t5", "t150"], ["t399", "t1"], ["nope"], ["t3", "nope"]]
+    queries += [rng.sample(VOCABULARY[:120], rng.randint(2, 6)) for _ in range(30)]
+    pruned = 0
+    for terms in queries:
+        expected = _match_bm25(con, terms)
+        for k in (1, 10, 50):
+            stats: dict = {}
+            hits = bm25_topk_terms(con, terms, k, stats)
+            ranking = sorted(expected.items(), key=lambda item: (-item[1], item[0]))[:k]
+            assert len(hits) == len(ranking)
+            for (node_id, score), (_, expected_score) in zip(hits, ranking):
+                assert score == pytest.approx(expected[node_id], rel=1e-5)
+                assert score == pytest.approx(expected_score, rel=1e-5)
+            if hits:
+                total = con.execute(
+                    "SELECT SUM(df) FROM bm25_terms WHERE list_contains(?, term)", [terms]
+                ).fetchone()[0]
+                pruned += stats["postings_read"] < total
+    # MaxScore skipped postings for some multi-term queries
+    assert pruned > 0
+
+
+def test_bm25_search_matches_match_bm25() -> None:
+    con = duckdb.connect(":memory:")
+    try:
+        con.execute("LOAD fts")
+    except duckdb.Error:
+        pytest.skip("DuckDB fts extension not available")
+    from brain_graph.db.index_snapshot import build_fts_index
+    from brain_graph.search.searcher import bm25_search
+
+    con.execute(
+        "CREATE TABLE nodes (id VARCHAR, type VARCHAR, title VARCHAR, text VARCHAR, "
+        "summary VARCHAR, description VARCHAR, source_file VARCHAR)"
+    )
+    texts = [
+        "Die Häuser am Fluss wurden renoviert.",
+        "Ein Haus mit Garten und einem Fluss dahinter.",
+        "Gärten brauchen Wasser, Flüsse liefern es.",
+        "Notizen über Graphen und Suche.",
+    ]
+    for i, text in enumerate(texts):
+        con.execute("INSERT INTO nodes VALUES (?, 'chunk', NULL, ?, NULL, NULL, 'doc.md')", [f"c{i}", text])
+    con.execute("INSERT INTO nodes VALUES ('s1', 'section', 'Haus und Garten', NULL, NULL, NULL, 'doc.md')")
+    assert build_fts_index(con, "none")
+
+    queries = ["Haus Fluss", "Gärten", "Graph Suche Haus", "unbekannt"]
+    expected = {q: bm25_search(con, q, limit=10) for q in queries}
+    build_bm25_index(con)
+    for query in queries:
+        hits = bm25_search(con, query, limit=10)
+        assert [h["chunk_id"] for h in hits] == [h["chunk_id"] for h in expected[query]]
+        for hit, reference in zip(hits, expected[query]):
+            assert hit["bm25_score"] == pytest.approx(reference["bm25_score"], rel=1e-5)
+            assert hit["text"] == reference["text"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+
+from brain_graph.pipeline.chunker import build_graph, get_parser, parse_markdown
+
+CONFIG = {
+    "chunk_target_tokens": 200,
+    "chunk_min_tokens": 10,
+    "chunk_overlap_tokens": 0,
+    "chunk_language": "de",
+}
+
+
+def test_call_edges_come_from_syntax_and_are_unique() -> None:
+    if get_parser("python") is None:
+        pytest.skip("tree-sitter-python not available")
+
+    md = (
+        "# Code\n\n"
+        "```python\n"
+        "class Store:\n"
+        "    def load(self):\n"
+        "        return self.parse(helper())\n"
+        "    def parse(self, x):\n"
+        "        return x\n"
+        "\n"
+        "def helper():\n"
+        "    # parse_all wird hier nur erwähnt\n"
+        "    return later() + later()\n"
+        "```\n\n"
+        "```python\n"
+        "def later():\n"
+        "    return 1\n"
+        "```\n"
+    )
+    nodes, edges = build_graph(parse_markdown(md), "note.md", CONFIG, doc_ulid="01HZZZZZZZZZZZZZZZZZZZZZZZ")
+
+    units = [(n.type, n.title) for n in nodes if n.type in ("class", "function", "method")]
+    assert units == [
+        ("class", "Store"),
+        ("method", "load"),
+        ("method", "parse"),
+        ("function", "helper"),
+        ("function", "later"),
+    ]
+
+    by_id = {n.id: n.title for n in nodes}
+    calls = sorted((by_id[e.from_id], by_id[e.to_id]) for e in edges if e.type == "calls")
+    # "parse" steht als Teilstring in helper, wird dort aber nicht aufgerufen
+    assert calls == [("helper", "later"), ("load", "helper"), ("load", "parse")]
+
+    defines = [(by_id[e.from_id], by_id[e.to_id]) for e in edges if e.type == "defines"]
+    assert defines == [("Store", "load"), ("Store", "parse")]
+
+
+def test_document_authored_by_edge_is_added_once() -> None:
+    md = "# Eins\n\nErster Absatz +author:&Archivist\n\n# Zwei\n\nZweiter Absatz +author:&Archivist\n"
+    doc_ulid = "01HZZZZZZZZZZZZZZZZZZZZZZZ"
+    nodes, edges = build_graph(parse_markdown(md), "note.md", CONFIG, doc_ulid=doc_ulid)
+
+    doc_edges = [e for e in edges if e.from_id == doc_ulid and e.type == "authored_by"]
+    chunk_edges = [e for e in edges if e.from_id != doc_ulid and e.type == "authored_by"]
+    assert len(doc_edges) == 1
+    assert len(chunk_edges) == len([n for n in nodes if n.type == "chunk"]) == 2
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from brain_graph.pipeline.chunker import parse_markdown, scan_markers
+
+
+def test_parse_markdown_offsets_are_exact_for_repeated_blocks() -> None:
+    md = (
+        "# Titel\n\nÄrger über Umlaute.\n\n"
+        "## Schritt\n\n```python\ndef f():\n    # kein Heading\n    pass\n```\n\n"
+        "## Schritt\n\n#tag ist kein Heading\n\n"
+        "```python\ndef f():\n    # kein Heading\n    pass\n```\n"
+    )
+    blocks = parse_markdown(md)
+    raw = md.encode("utf-8")
+
+    assert [b.type for b in blocks] == ["heading", "text", "heading", "code", "heading", "text", "code"]
+    for block in blocks:
+        assert md[block.char_start : block.char_end].encode("utf-8") == raw[block.byte_start : block.byte_end]
+
+    headings = [b for b in blocks if b.type == "heading"]
+    assert [(h.content, h.level) for h in headings] == [("Titel", 1), ("Schritt", 2), ("Schritt", 2)]
+    assert headings[1].char_start < headings[2].char_start
+    assert md[headings[2].char_start : headings[2].char_end] == "## Schritt"
+
+    codes = [b for b in blocks if b.type == "code"]
+    assert codes[0].char_start != codes[1].char_start
+    assert codes[1].language == "python"
+    assert codes[1].content == "def f():\n    # kein Heading\n    pass"
+    assert "#tag" in blocks[5].content
+
+
+def test_parse_markdown_handles_tilde_and_unclosed_fences() -> None:
+    md = "Text\n\n~~~\n```\nnicht geschlossen\n~~~\n\n````\nbis zum Ende\n"
+    blocks = parse_markdown(md)
+
+    assert [b.type for b in blocks] == ["text", "code", "code"]
+    assert blocks[1].content == "```\nnicht geschlossen"
+    assert blocks[2].content == "bis zum Ende"
+    assert blocks[2].char_end == len(md)
+
+
+def test_scan_markers_splits_lines_on_newline_only() -> None:
+    # Form feed and U+2028 inside a line: no heading or fence starts there
+    md = "Text\x0c# kein Heading\u2028```\nmehr\n\n# Titel\n"
+    markers = scan_markers(md)
+
+    assert [(m.type, m.content) for m in markers] == [("heading", "Titel")]
+    heading = markers[0]
+    assert md[heading.start : heading.end] == "# Titel"
+    assert md.encode("utf-8")[heading.byte_start : heading.byte_end] == b"# Titel"
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import duckdb
+import pytest
+
+import brain_graph.search.daemon as daemon_module
+from brain_graph.search.daemon import (
+    PooledHTTPServer,
+    SearchDaemon,
+    SearchHTTPHandler,
+    SearchTimeout,
+    parse_timeout,
+)
+
+
+def _make_daemon() -> SearchDaemon:
+    d = SearchDaemon(None, timeout_s=0.2)  # type: ignore[arg-type]
+    d.con = duckdb.connect(":memory:")
+    d.ready = True
+    return d
+
+
+def test_run_with_timeout_interrupts_slow_query() -> None:
+    d = _make_daemon()
+    slow = lambda cur: cur.execute(  # noqa: E731
+        "SELECT COUNT(*) FROM range(100000000000) t(a) WHERE a % 7 = 3"
+    ).fetchone()
+
+    start = time.perf_counter()
+    with pytest.raises(SearchTimeout):
+        d.run_with_timeout(slow)
+    assert time.perf_counter() - start < 5
+
+    # The worker cursor stays usable after the interrupt.
+    assert d.run_with_timeout(lambda cur: cur.execute("SELECT 42").fetchone()[0]) == 42
+    assert d.stats["in_flight"] == 0
+
+
+def test_search_timeout_covers_query_embedding(monkeypatch: pytest.MonkeyPatch) -> None:
+    d = _make_daemon()
+    timeouts: list[float] = []
+
+    def slow_embed(query: str, config: dict) -> list[float]:
+        timeouts.append(config["embedding_timeout"])
+        time.sleep(0.4)
+        return [0.0] * 256
+
+    monkeypatch.setattr(daemon_module, "embed_query", slow_embed)
+    monkeypatch.setattr(daemon_module, "semantic_search", lambda cur, **kwargs: [])
+
+    result = d.search("x", mode="semantic")
+    assert result["status"] == "timeout"
+    assert timeouts == [0.2]
+    assert d.stats["timeouts"] == 1
+    assert d.stats["in_flight"] == 0
+
+
+def test_interrupt_stops_running_queries_before_close() -> None:
+    d = _make_daemon()
+    d.timeout_s = 0
+    errors: list[Exception] = []
+
+    def slow() -> None:
+        try:
+            d.run_with_timeout(
+                lambda cur: cur.execute(
+                    "SELECT COUNT(*) FROM range(100000000000) t(a) WHERE a % 7 = 3"
+                ).fetchone()
+            )
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=slow)
+    worker.start()
+    deadline = time.time() + 5
+    while d.stats["in_flight"] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+
+    d.interrupt()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert isinstance(errors[0], duckdb.Error)
+    assert d.stats["in_flight"] == 0
+    d.close()
+    assert d.con is None
+
+
+def test_cursor_is_per_thread() -> None:
+    d = _make_daemon()
+    cursors = []
+    t = threading.Thread(target=lambda: cursors.append(d.cursor()))
+    t.start()
+    t.join()
+    assert d.cursor() is d.cursor()
+    assert cursors[0] is not d.cursor()
+
+
+class _SlowDaemon:
+    ready = True
+    index_info = {"source": "snapshot"}
+    stats: dict = {}
+    timeout_s = 10.0
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def search(self, query, mode, limit, timeout_s=None, filters=None):
+        self.release.wait(5)
+        return {"ok": True, "status": "completed", "results": []}
+
+
+def _post(url: str, **fields) -> int:
+    req = urllib.request.Request(
+        url, data=json.dumps({"query": "x", **fields}).encode(), method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_pooled_server_rejects_with_503_and_keeps_health(monkeypatch: pytest.MonkeyPatch) -> None:
+    slow = _SlowDaemon()
+    monkeypatch.setattr(daemon_module, "daemon", slow)
+    server = PooledHTTPServer(("127.0.0.1", 0), SearchHTTPHandler, workers=1, queue_depth=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        statuses: list[int] = []
+        busy = threading.Thread(target=lambda: statuses.append(_post(f"{base}/search")))
+        busy.start()
+        deadline = time.time() + 5
+        while server.stats()["admitted"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert _post(f"{base}/search") == 503
+        with urllib.request.urlopen(f"{base}/health", timeout=5) as resp:
+            health = json.loads(resp.read())
+        assert health["overloaded"] is True
+        assert health["server"]["rejected"] >= 1
+
+        slow.release.set()
+        busy.join(5)
+        assert statuses == [200]
+    finally:
+        slow.release.set()
+        server.shutdown()
+        server.server_close()
+
+
+def test_health_does_not_queue_behind_searches(monkeypatch: pytest.MonkeyPatch) -> None:
+    slow = _SlowDaemon()
+    monkeypatch.setattr(daemon_module, "daemon", slow)
+    server = PooledHTTPServer(("127.0.0.1", 0), SearchHTTPHandler, workers=1, queue_depth=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    busy = [threading.Thread(target=_post, args=(f"{base}/search",)) for _ in range(2)]
+    try:
+        for t in busy:
+            t.start()
+        deadline = time.time() + 5
+        while server.stats()["active"] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        # The only worker is blocked and a search is queued: health still answers
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"{base}/health", timeout=5) as resp:
+            health = json.loads(resp.read())
+        assert time.perf_counter() - start < 1
+        assert health["overloaded"] is False
+        assert health["server"]["admitted"] == 2
+    finally:
+        slow.release.set()
+        for t in busy:
+            t.join(5)
+        server.shutdown()
+        server.server_close()
+
+
+def test_stalled_client_frees_its_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(daemon_module, "daemon", _SlowDaemon())
+    server = PooledHTTPServer(("127.0.0.1", 0), SearchHTTPHandler, workers=1, queue_depth=0)
+    server.request_timeout_s = 0.2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        # Half a request line, then silence
+        with socket.create_connection(server.server_address, timeout=5) as stalled:
+            stalled.sendall(b"POST /sea")
+            deadline = time.time() + 5
+            while server.stats()["admitted"] < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            while server.stats()["active"] and time.time() < deadline:
+                time.sleep(0.01)
+            assert server.stats()["active"] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_close_drains_admitted_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    slow = _SlowDaemon()
+    monkeypatch.setattr(daemon_module, "daemon", slow)
+    server = PooledHTTPServer(("127.0.0.1", 0), SearchHTTPHandler, workers=1, queue_depth=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    statuses: list[int] = []
+    busy = threading.Thread(target=lambda: statuses.append(_post(f"{base}/search")))
+    try:
+        busy.start()
+        deadline = time.time() + 5
+        while server.stats()["active"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        server.shutdown()
+        server.server_close()
+        assert not server.drain(0.1)
+
+        # The admitted request is still answered after the listener closed
+        slow.release.set()
+        assert server.drain(5)
+        busy.join(5)
+        assert statuses == [200]
+    finally:
+        slow.release.set()
+        busy.join(5)
+
+
+def test_request_timeout_is_validated_and_capped(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert parse_timeout(None, 10.0) is None
+    assert parse_timeout(2, 10.0) == 2.0
+    assert parse_timeout("0.5", 10.0) == 0.5
+    assert parse_timeout(60, 10.0) == 10.0
+    assert parse_timeout(60, 0) == 60.0
+    for value in (0, -1, "soon", True, [1], float("nan"), float("inf")):
+        with pytest.raises(ValueError):
+            parse_timeout(value, 10.0)
+
+    slow = _SlowDaemon()
+    slow.release.set()
+    monkeypatch.setattr(daemon_module, "daemon", slow)
+    server = PooledHTTPServer(("127.0.0.1", 0), SearchHTTPHandler, workers=2, queue_depth=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert _post(f"{base}/search", timeout_s="soon") == 400
+        assert _post(f"{base}/search", timeout_s=0) == 400
+        assert _post(f"{base}/search", timeout_s=3) == 200
+    finally:
+        server.shutdown()
+        server.server_close()
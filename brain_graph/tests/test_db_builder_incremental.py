@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from brain_graph.db.db_builder import BrainGraphDB
+from brain_graph.db.trigram_index import build_trigram_index
+
+
+def _write_doc(
+    docs_dir: Path, emb_dir: Path, name: str, doc_id: str, text: str, *, category: str = "cat_a"
+) -> Path:
+    chunk_ulid = doc_id[:-1] + "1"
+    section_ulid = doc_id[:-1] + "2"
+    doc = {
+        "id": doc_id,
+        "path": f"vault/2025-12/{name}.md",
+        "language": "de",
+        "doc_type": "note",
+        "file_hash": f"sha256:{text}",
+        "created": "2025-01-01T00:00:00+00:00",
+        "updated": "2025-01-01T00:00:00+00:00",
+        "uses": 0,
+        "nodes": {
+            "sections": [{"id": "sec_1", "ulid": section_ulid, "title": name, "level": 1}],
+            "chunks": [
+                {
+                    "id": "chunk_1",
+                    "ulid": chunk_ulid,
+                    "text": text,
+                    "language": "de",
+                    "char_start": 0,
+                    "char_end": len(text),
+                    "summary": None,
+                    "categories": [category],
+                }
+            ],
+            "entities": [],
+        },
+        "edges": [
+            {
+                "from_id": "sec_1",
+                "to_id": "chunk_1",
+                "type": "in_section",
+                "weight": None,
+                "similarity": None,
+                "overlap_chars": None,
+            }
+        ],
+        "links": [],
+    }
+    path = docs_dir / f"{name}.document.json"
+    path.write_text(json.dumps(doc), encoding="utf-8")
+    pq.write_table(
+        pa.table({"chunk_idx": ["chunk_1"], "embedding": [[float(len(text))] * 1024]}),
+        emb_dir / f"{name}.parquet",
+    )
+    return path
+
+
+def _bump_mtime(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _trigrams(db: BrainGraphDB) -> list[tuple[str, str]]:
+    return db.con.execute(
+        """
+        SELECT p.trigram, n.node_id
+        FROM trigram_postings p, UNNEST(p.node_keys) AS k(key)
+        JOIN trigram_nodes n ON n.node_key = k.key
+        ORDER BY ALL
+        """
+    ).fetchall()
+
+
+def _snapshot(db: BrainGraphDB) -> dict[str, list]:
+    return {
+        "nodes": db.con.execute(
+            "SELECT id, type, source_file, text FROM nodes ORDER BY id"
+        ).fetchall(),
+        "edges": db.con.execute(
+            "SELECT from_id, to_id, type, source_file FROM edges ORDER BY from_id, to_id, type"
+        ).fetchall(),
+        "meta": db.con.execute("SELECT ulid, source_hash FROM meta ORDER BY ulid").fetchall(),
+        "chunk_embeddings": db.con.execute(
+            "SELECT chunk_id, embedding[1] FROM chunk_embeddings_256d ORDER BY chunk_id"
+        ).fetchall(),
+    }
+
+
+@pytest.fixture()
+def vault(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    config_dir = tmp_path / ".brain_graph" / "config"
+    config_dir.mkdir(parents=True)
+    (config_dir / "taxonomy.md.nodes.json").write_text(
+        json.dumps(
+            [
+                {"id": "cat_a", "ulid": "01KC7K0PC5737PKEF9EBXDFTA0", "title": "A", "description": "", "keywords": []},
+                {"id": "cat_b", "ulid": "01KC7K0PC5737PKEF9EBXDFTB0", "title": "B", "description": "", "keywords": []},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    data_dir = tmp_path / ".brain_graph" / "data"
+    (data_dir / "documents" / "2025-12").mkdir(parents=True)
+    (data_dir / "embeddings" / "2025-12").mkdir(parents=True)
+    return data_dir
+
+
+def test_incremental_import_matches_full_rebuild(vault: Path, tmp_path: Path) -> None:
+    docs_dir = vault / "documents" / "2025-12"
+    emb_dir = vault / "embeddings" / "2025-12"
+    doc_a = _write_doc(docs_dir, emb_dir, "a-AAAAAA", "01KCEQFS97VZFWN6Y0JH84BSA0", "Alpha")
+    doc_b = _write_doc(docs_dir, emb_dir, "b-BBBBBB", "01KCEQFS97VZFWN6Y0JH84BSB0", "Beta")
+    doc_c = _write_doc(docs_dir, emb_dir, "c-CCCCCC", "01KCEQFS97VZFWN6Y0JH84BSC0", "Gamma")
+
+    db = BrainGraphDB(str(tmp_path / "brain.duckdb"))
+    db.import_directory(vault)
+    build_trigram_index(db.con)
+
+    # Unchanged content but touched file -> parsed, not re-imported.
+    _bump_mtime(doc_a)
+    # Changed content + re-embedded -> re-imported with new category.
+    doc_b = _write_doc(docs_dir, emb_dir, "b-BBBBBB", "01KCEQFS97VZFWN6Y0JH84BSB0", "Beta v2", category="cat_b")
+    _bump_mtime(doc_b)
+    # Deleted and added documents.
+    doc_c.unlink()
+    (emb_dir / "c-CCCCCC.parquet").unlink()
+    _write_doc(docs_dir, emb_dir, "d-DDDDDD", "01KCEQFS97VZFWN6Y0JH84BSD0", "Delta")
+
+    stats = db.import_incremental(vault)
+    assert stats["mode"] == "incremental"
+    assert stats["documents"] == {"added": 1, "changed": 1, "unchanged": 1, "deleted": 1}
+
+    edge_ids = [row[0] for row in db.con.execute("SELECT id FROM edges").fetchall()]
+    assert len(edge_ids) == len(set(edge_ids))
+
+    full = BrainGraphDB(":memory:")
+    full.import_directory(vault)
+    assert _snapshot(db) == _snapshot(full)
+    # Trigram postings were updated in place
+    build_trigram_index(full.con)
+    assert _trigrams(db) == _trigrams(full)
+
+    # Nothing changed -> nothing parsed.
+    stats = db.import_incremental(vault)
+    assert stats["documents"] == {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+    assert _snapshot(db) == _snapshot(full)
+
+
+def test_incremental_import_without_manifest_falls_back_to_full(vault: Path, tmp_path: Path) -> None:
+    _write_doc(
+        vault / "documents" / "2025-12",
+        vault / "embeddings" / "2025-12",
+        "a-AAAAAA",
+        "01KCEQFS97VZFWN6Y0JH84BSA0",
+        "Alpha",
+    )
+    db = BrainGraphDB(str(tmp_path / "brain.duckdb"))
+    stats = db.import_incremental(vault)
+    assert stats == {"mode": "full", "reason": "no manifest"}
+    assert db.con.execute("SELECT COUNT(*) FROM import_manifest").fetchone()[0] == 2
@@ -4,7 +4,6 @@ from pathlib import Path
 
 from brain_graph.pipeline.embedder import (
     extract_text_ranges,
-    filter_oversized_texts,
     normalize_markdown,
 )
 
@@ -46,13 +45,34 @@ def test_extract_text_ranges_adds_section_context(tmp_path: Path) -> None:
     assert "Hello world." in texts[0]
 
 
-def test_filter_oversized_texts_skips_large_items() -> None:
-    texts = ["short", "x" * (8000 * 4 + 1)]
-    ids = ["a", "b"]
+def test_embed_texts_reuses_passage_store(tmp_path: Path, monkeypatch) -> None:
+    import brain_graph.utils.embedding_client as embedding_client
+    from brain_graph.pipeline.embedder import embed_texts
+    from brain_graph.utils.embedding_cache import close_all, hit_ratio
 
-    filtered_texts, filtered_ids, skipped = filter_oversized_texts(
-        texts, ids, max_tokens=8000
+    requested: list[str] = []
+
+    def fake_request(texts, config, stats=None):
+        requested.extend(texts)
+        return [[float(len(t)), 0.0] for t in texts]
+
+    monkeypatch.setattr(embedding_client, "_request_embeddings", fake_request)
+    config = {
+        "embedding_model": "m",
+        "embedding_base_url": "http://x",
+        "embedding_cache_dir": str(tmp_path / "cache"),
+    }
+
+    first_stats: dict[str, int] = {}
+    first = embed_texts(["Passage: a", "Passage: b"], config, first_stats)
+    assert hit_ratio(first_stats) == {"hits": 0, "misses": 2, "hit_ratio": 0.0}
+
+    # One chunk edited: only that one goes to the server; another base_url still hits.
+    second_stats: dict[str, int] = {}
+    second = embed_texts(
+        ["Passage: a", "Passage: b2"], {**config, "embedding_base_url": "http://y"}, second_stats
     )
-    assert filtered_texts == ["short"]
-    assert filtered_ids == ["a"]
-    assert skipped == [1]
+    assert requested == ["Passage: a", "Passage: b", "Passage: b2"]
+    assert second[0] == first[0]
+    assert hit_ratio(second_stats)["hit_ratio"] == 0.5
+    close_all()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import brain_graph.utils.embedding_client as embedding_client
+from brain_graph.utils.embedding_cache import EmbeddingCache, cache_key
+
+
+def test_cache_key_normalizes_text_but_keeps_prefix_and_model() -> None:
+    base = cache_key("Query: Maschinelles  Lernen\n", "m", "http://x")
+    assert cache_key("Query: Maschinelles Lernen", "m", "http://x") == base
+    assert cache_key("Passage: Maschinelles Lernen", "m", "http://x") != base
+    assert cache_key("Query: Maschinelles Lernen", "other", "http://x") != base
+    assert cache_key("Query: Maschinelles Lernen", "m", "http://y") != base
+
+
+def test_exact_cache_key_keeps_code_whitespace() -> None:
+    code = "if x:\n    return 1\n"
+    assert cache_key(code, "m", exact=True) != cache_key("if x:\n  return 1\n", "m", exact=True)
+    assert cache_key(code, "m", exact=True) != cache_key("if x: return 1", "m", exact=True)
+    # Still NFC: composed and decomposed umlauts share a key
+    assert cache_key("x = 'ä'", "m", exact=True) == cache_key("x = 'a\u0308'", "m", exact=True)
+
+
+def test_cache_persists_across_instances_and_evicts_lru(tmp_path: Path) -> None:
+    path = tmp_path / "cache" / "emb.sqlite"
+    cache = EmbeddingCache(path, max_entries=10)
+    cache.put_many({f"k{i}": [float(i), 0.5] for i in range(10)}, "m")
+    assert cache.get_many(["k0", "missing"]) == {"k0": [0.0, 0.5]}
+    assert cache.session == {"hits": 1, "misses": 1, "evictions": 0}
+
+    # k0 was just used, so k1 and k2 are the least recently used entries.
+    cache.put_many({"k10": [1.0, 1.0]}, "m")
+    cache.close()
+
+    reopened = EmbeddingCache(path, max_entries=10)
+    stats = reopened.stats()
+    assert stats["entries"] == 9
+    assert stats["totals"] == {"hits": 1, "misses": 1, "evictions": 2}
+    assert set(reopened.get_many(["k0", "k1", "k2", "k10"])) == {"k0", "k10"}
+    reopened.close()
+
+
+def test_embed_batch_only_requests_cache_misses(tmp_path: Path, monkeypatch) -> None:
+    requested: list[list[str]] = []
+
+    def fake_request(texts, config, stats=None):
+        requested.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    monkeypatch.setattr(embedding_client, "_request_embeddings", fake_request)
+    config = {"embedding_model": "m", "embedding_base_url": "http://x"}
+    cache = EmbeddingCache(tmp_path / "emb.sqlite")
+
+    stats: dict[str, int] = {}
+    first = embedding_client.embed_batch(["Query: a", "Query: bb", "Query: a"], config, cache=cache, stats=stats)
+    assert requested == [["Query: a", "Query: bb"]]
+    assert stats == {"hits": 1, "misses": 2}
+
+    second = embedding_client.embed_batch(["Query:  a ", "Query: ccc"], config, cache=cache)
+    assert requested[-1] == ["Query: ccc"]
+    assert second[0] == first[0]
+    cache.close()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+
+import httpx
+import openai
+
+import brain_graph.utils.embedding_client as embedding_client
+from brain_graph.utils.embedding_client import plan_batches
+
+
+def _context_error() -> openai.BadRequestError:
+    response = httpx.Response(400, request=httpx.Request("POST", "http://x/embeddings"))
+    return openai.BadRequestError(
+        "input (9000 tokens) exceeds the context size", response=response, body=None
+    )
+
+
+def test_plan_batches_packs_by_items_and_tokens() -> None:
+    texts = ["a" * 40, "b" * 40, "c" * 40, "d" * 400, "e"]
+    # ~11 tokens each for the short ones, ~101 for "d"
+    assert plan_batches(texts, max_items=2, max_tokens=1000) == [[0, 1], [2, 3], [4]]
+    assert plan_batches(texts, max_items=10, max_tokens=50) == [[0, 1, 2], [3], [4]]
+
+
+def test_request_embeddings_splits_rejected_batches_and_keeps_order(monkeypatch) -> None:
+    calls: list[int] = []
+    lock = threading.Lock()
+
+    def fake_create(texts, config):
+        with lock:
+            calls.append(len(texts))
+        # The "server" accepts at most 60 chars per request
+        if sum(len(t) for t in texts) > 60:
+            raise _context_error()
+        return [[float(len(t)), float(ord(t[0]))] for t in texts]
+
+    monkeypatch.setattr(embedding_client, "_create_embeddings", fake_create)
+    texts = [chr(ord("a") + i) * 20 for i in range(8)] + ["z" * 200]
+    config = {"embedding_batch_size": 4, "embedding_concurrency": 3}
+
+    stats: dict[str, int] = {}
+    embeddings = embedding_client._request_embeddings(texts, config, stats)
+
+    # Order preserved; the 200-char text was truncated instead of dropped.
+    assert [e[1] for e in embeddings] == [float(ord(t[0])) for t in texts]
+    assert embeddings[-1][0] <= 60
+    assert [e[0] for e in embeddings[:-1]] == [20.0] * 8
+    # Halved twice (200 -> 100 -> 50 chars), counted once
+    assert stats["truncated"] == 1
+    assert max(calls) == 4
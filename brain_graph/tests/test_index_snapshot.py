@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+
+from brain_graph.db.index_snapshot import (
+    content_fingerprint,
+    open_search_connection,
+    read_manifest,
+    snapshot_path_for,
+    write_snapshot,
+)
+
+
+def _make_db(path: Path) -> None:
+    con = duckdb.connect(str(path))
+    con.execute(
+        "CREATE TABLE nodes (id VARCHAR, type VARCHAR, text VARCHAR, summary VARCHAR, "
+        "title VARCHAR, description VARCHAR, source_file VARCHAR)"
+    )
+    con.execute("CREATE TABLE meta (ulid VARCHAR, source_file VARCHAR, source_hash VARCHAR)")
+    con.execute("CREATE TABLE german_stopwords (word VARCHAR)")
+    con.execute("INSERT INTO nodes VALUES ('c1', 'chunk', 'Hallo Welt', NULL, NULL, NULL, 'a.md')")
+    con.execute("INSERT INTO meta VALUES ('D1', 'a.md', 'sha256:1')")
+    con.execute("INSERT INTO german_stopwords VALUES ('der'), ('die')")
+    con.execute("CREATE VIEW relevance_scores AS SELECT ulid, 1.0 AS relevance_score FROM meta")
+    con.close()
+
+
+def test_snapshot_path_for() -> None:
+    assert snapshot_path_for(Path(".brain_graph/brain.duckdb")) == Path(
+        ".brain_graph/brain.snapshot.duckdb"
+    )
+
+
+def test_fingerprint_tracks_content(tmp_path: Path) -> None:
+    db_path = tmp_path / "brain.duckdb"
+    _make_db(db_path)
+
+    con = duckdb.connect(str(db_path))
+    before = content_fingerprint(con)
+    assert content_fingerprint(con) == before
+
+    con.execute("UPDATE meta SET source_hash = 'sha256:2'")
+    assert content_fingerprint(con) != before
+    con.close()
+
+
+def test_fingerprint_tracks_embedding_values_and_vector_store(tmp_path: Path) -> None:
+    db_path = tmp_path / "brain.duckdb"
+    _make_db(db_path)
+    store = tmp_path / "brain.vectors.npy"
+    store.write_bytes(b"v1")
+
+    con = duckdb.connect(str(db_path))
+    con.execute("CREATE TABLE chunk_embeddings_256d (chunk_id VARCHAR, embedding FLOAT[2])")
+    con.execute("INSERT INTO chunk_embeddings_256d VALUES ('c1', [1.0, 0.0])")
+    con.execute("CREATE TABLE full_vector_store (path VARCHAR, rows BIGINT, dim INTEGER, dtype VARCHAR)")
+    con.execute("INSERT INTO full_vector_store VALUES (?, 1, 2, 'float16')", [str(store)])
+    before = content_fingerprint(con)
+
+    # Same chunk id, new vector
+    con.execute("UPDATE chunk_embeddings_256d SET embedding = [0.0, 1.0]")
+    changed = content_fingerprint(con)
+    assert changed != before
+
+    # Rewritten matrix file, same metadata rows
+    store.write_bytes(b"v2 longer")
+    assert content_fingerprint(con) != changed
+    con.close()
+
+
+def test_open_search_connection_reuses_valid_snapshot(tmp_path: Path) -> None:
+    db_path = tmp_path / "brain.duckdb"
+    _make_db(db_path)
+
+    source = duckdb.connect(str(db_path))
+    written = write_snapshot(source, snapshot_path_for(db_path))
+    source.close()
+    assert Path(written["path"]).exists()
+
+    con, info = open_search_connection(db_path)
+    assert info["source"] == "snapshot"
+    assert read_manifest(con)["fingerprint"] == written["fingerprint"]
+    assert con.execute("SELECT ulid FROM relevance_scores").fetchall() == [("D1",)]
+    assert con.execute("SELECT text FROM nodes").fetchone()[0] == "Hallo Welt"
+    con.close()
+
+
+def test_open_search_connection_rebuilds_stale_snapshot(tmp_path: Path) -> None:
+    db_path = tmp_path / "brain.duckdb"
+    _make_db(db_path)
+
+    source = duckdb.connect(str(db_path))
+    write_snapshot(source, snapshot_path_for(db_path))
+    source.execute("INSERT INTO nodes VALUES ('c2', 'chunk', 'Neu', NULL, NULL, NULL, 'b.md')")
+    source.close()
+
+    con, info = open_search_connection(db_path)
+    assert info["source"] == "rebuilt_snapshot"
+    assert info["reason"] == "fingerprint mismatch"
+    assert con.execute("SELECT COUNT(*) FROM nodes").fetchone()[0] == 2
+    con.close()
+
+    con, info = open_search_connection(db_path)
+    assert info["source"] == "snapshot"
+    con.close()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pytest
+
+from brain_graph.utils import language_id
+
+
+def test_detections_are_memoized_and_short_blocks_inherit(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    def fake_detect(sample: str) -> str:
+        calls.append(sample)
+        return "en" if "the" in sample.split() else "de"
+
+    monkeypatch.setattr(language_id, "detect", fake_detect)
+    language_id.clear_memo()
+
+    german = "Das ist ein längerer deutscher Absatz über Graphen und Suche. " * 5
+    english = "This is the longer English paragraph about graphs and search. " * 5
+
+    assert language_id.detect_document_language([german, "kurz"], "en") == "de"
+    assert language_id.block_language("the short one", "de") == "de"
+    assert language_id.block_language(english, "de") == "en"
+    assert language_id.block_language(english, "de") == "en"
+    assert len(calls) == 2
+
+    # Too short for any detection: default, no call
+    assert language_id.detect_language("kurz", "fr") == "fr"
+    assert len(calls) == 2
+    language_id.clear_memo()
+
+
+def test_langdetect_is_deterministic() -> None:
+    text = "Der Graph verbindet Notizen, Abschnitte und Funktionen miteinander."
+    language_id.clear_memo()
+    first = language_id.detect_language(text)
+    language_id.clear_memo()
+    assert language_id.detect_language(text) == first == "de"
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from brain_graph.db import vector_store
+from brain_graph.db.matryoshka import (
+    CascadeLevel,
+    MatryoshkaCascade,
+    format_cascade,
+    parse_cascade,
+    record_cascade,
+)
+from brain_graph.search.reranking import semantic_search_cascade
+from brain_graph.search.searcher import semantic_search
+
+
+N_CHUNKS = 2000
+FULL_DIM = 1024
+
+
+def _vectors() -> np.ndarray:
+    """Clustered vectors whose energy decays with the dimension, like Matryoshka embeddings."""
+    rng = np.random.default_rng(8)
+    weights = 1.0 / np.sqrt(1.0 + np.arange(FULL_DIM) / 32.0)
+    centers = rng.normal(size=(50, FULL_DIM))
+    vectors = centers[rng.integers(0, 50, N_CHUNKS)] + rng.normal(size=(N_CHUNKS, FULL_DIM)) * 0.9
+    return vectors * weights
+
+
+@pytest.fixture(scope="module")
+def full() -> np.ndarray:
+    return _vectors()
+
+
+def _build(path: Path, full: np.ndarray, with_store: bool) -> duckdb.DuckDBPyConnection:
+    con = duckdb.connect(str(path / "brain.duckdb"))
+    ids = [f"c{i:05d}" for i in range(N_CHUNKS)]
+    con.execute("CREATE TABLE nodes (id VARCHAR, type VARCHAR, text VARCHAR, summary VARCHAR, source_file VARCHAR)")
+    con.executemany("INSERT INTO nodes VALUES (?, 'chunk', ?, NULL, 'doc.md')", [(i, f"text {i}") for i in ids])
+    con.execute("CREATE TABLE chunk_embeddings_256d (chunk_id VARCHAR, embedding FLOAT[256])")
+    arrow = pa.table(
+        {
+            "chunk_id": pa.array(ids),
+            "embedding": pa.FixedSizeListArray.from_arrays(pa.array(full[:, :256].astype(np.float32).ravel()), 256),
+        }
+    )
+    con.register("_vectors", arrow)
+    con.execute("INSERT INTO chunk_embeddings_256d SELECT * FROM _vectors")
+    con.unregister("_vectors")
+    if with_store:
+        # Store rows in reverse id order: offsets must be mapped, not assumed
+        store_path = path / "brain.vectors.npy"
+        normalized = full / np.linalg.norm(full, axis=1, keepdims=True)
+        np.save(store_path, normalized[::-1].astype(np.float16))
+        con.execute("CREATE TABLE full_vector_rows (chunk_id VARCHAR PRIMARY KEY, row_offset INTEGER)")
+        con.executemany(
+            "INSERT INTO full_vector_rows VALUES (?, ?)", [(i, N_CHUNKS - 1 - n) for n, i in enumerate(ids)]
+        )
+        con.execute("CREATE TABLE full_vector_store (path VARCHAR, rows BIGINT, dim INTEGER, dtype VARCHAR)")
+        con.execute(
+            "INSERT INTO full_vector_store VALUES (?, ?, ?, 'float16')", [str(store_path), N_CHUNKS, FULL_DIM]
+        )
+    vector_store.clear_cache()
+    return con
+
+
+def _exact(full: np.ndarray, query: np.ndarray, dim: int, k: int) -> list[str]:
+    vectors = full[:, :dim] / np.linalg.norm(full[:, :dim], axis=1, keepdims=True)
+    sims = vectors @ (query[:dim] / np.linalg.norm(query[:dim]))
+    return [f"c{i:05d}" for i in np.argsort(-sims, kind="stable")[:k]]
+
+
+def test_parse_cascade() -> None:
+    levels = parse_cascade("64:2000, 256:200, 1024")
+    assert levels == (CascadeLevel(64, 2000), CascadeLevel(256, 200), CascadeLevel(1024, 0))
+    assert format_cascade(levels) == "64:2000,256:200,1024"
+    assert parse_cascade("256") == (CascadeLevel(256, 0),)
+    for spec in ("", "64,1024", "64:100,1024:10", "256:100,64", "64:100,128:200,1024"):
+        with pytest.raises(ValueError):
+            parse_cascade(spec)
+
+
+def test_cascade_with_vector_store(tmp_path: Path, full: np.ndarray) -> None:
+    con = _build(tmp_path, full, with_store=True)
+    rng = np.random.default_rng(9)
+
+    # Every level keeps all rows: exact 1024d search
+    exhaustive = MatryoshkaCascade.load(con, f"64:{N_CHUNKS},256:{N_CHUNKS},1024")
+    query = full[rng.integers(0, N_CHUNKS)] + rng.normal(size=FULL_DIM) * 0.3
+    hits = exhaustive.search(query.tolist(), 10)
+    assert [chunk_id for chunk_id, _ in hits] == _exact(full, query, FULL_DIM, 10)
+
+    record_cascade(con, parse_cascade("64:400,256:50,1024"))
+    cascade = MatryoshkaCascade.load(con)
+    assert format_cascade(cascade.levels) == "64:400,256:50,1024"
+    assert cascade.nbytes == N_CHUNKS * 64 * 4
+    recalls = []
+    for _ in range(20):
+        query = full[rng.integers(0, N_CHUNKS)] + rng.normal(size=FULL_DIM) * 0.3
+        stats: dict = {}
+        hits = cascade.search(query.tolist(), 10, stats)
+        recalls.append(len({c for c, _ in hits} & set(_exact(full, query, FULL_DIM, 10))) / 10)
+        assert [level["kept"] for level in stats["levels"]] == [400, 50, 10]
+    assert np.mean(recalls) >= 0.9
+
+    results = semantic_search_cascade(con, query.tolist(), final_k=3, cascade=cascade)
+    assert [r["chunk_id"] for r in results] == [c for c, _ in cascade.search(query.tolist(), 3)]
+    assert results[0]["text"] == f"text {results[0]['chunk_id']}"
+
+    # As first stage of semantic search (search daemon --first-stage cascade)
+    stats = {}
+    results = semantic_search(con, query.tolist(), limit=5, stats=stats, cascade=cascade)
+    assert [r["chunk_id"] for r in results] == [c for c, _ in cascade.search(query.tolist(), 5)]
+    assert stats["strategy"] == "ann"
+
+
+def test_cascade_without_store_is_clamped(tmp_path: Path, full: np.ndarray) -> None:
+    con = _build(tmp_path, full, with_store=False)
+    cascade = MatryoshkaCascade.load(con, f"64:{N_CHUNKS},128:{N_CHUNKS},1024")
+    assert format_cascade(cascade.levels) == f"64:{N_CHUNKS},128:{N_CHUNKS},256"
+    # Later levels re-score from the 256d vectors held in memory
+    assert cascade.vectors is not None and cascade.nbytes == N_CHUNKS * (64 + 256) * 4
+    query = np.random.default_rng(10).normal(size=FULL_DIM)
+    assert [c for c, _ in cascade.search(query.tolist(), 10)] == _exact(full, query, 256, 10)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from brain_graph.pipeline.ner_extractor import process_chunks  # noqa: E402
+
+
+def _nlp():
+    nlp = spacy.blank("de")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [
+            {"label": "ORG", "pattern": "Microsoft"},
+            {"label": "PER", "pattern": [{"LOWER": "ada"}, {"LOWER": "lovelace"}]},
+            {"label": "PER", "pattern": "Ada"},
+            {"label": "ORG", "pattern": "API"},
+        ]
+    )
+    return nlp
+
+
+def test_process_chunks_pipes_all_chunks_and_filters() -> None:
+    parts = [
+        "Microsoft und Ada Lovelace.",
+        "Ada schreibt eine API für Microsoft.",
+        "Nochmal Ada Lovelace, &Archivist hilft.",
+    ]
+    source = "\n\n".join(parts)
+    nodes = []
+    for i, part in enumerate(parts):
+        start = source.index(part)
+        nodes.append({"id": f"c{i}", "type": "chunk", "char_start": start, "char_end": start + len(part)})
+
+    stats: dict = {}
+    entities, chunk_to_entities = process_chunks(
+        nodes, source, _nlp(), min_occurrences=1, batch_size=2, stats=stats
+    )
+
+    texts = {data["text"] for data in entities.values()}
+    # Single first names (PER) and generic terms ("API") are filtered out.
+    assert texts == {"Microsoft", "Ada Lovelace", "&Archivist"}
+    assert stats["docs"] == 3
+    assert set(chunk_to_entities) == {"c0", "c1", "c2"}
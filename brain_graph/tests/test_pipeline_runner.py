@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from brain_graph.pipeline import process_all, taxonomy_matcher
+from brain_graph.pipeline.runner import PipelineResources, run_step
+
+
+def test_run_step_chunks_in_process(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    md_file = inbox / "note.md"
+    md_file.write_text("# Title\n\nEin kurzer Absatz über Graphen.\n", encoding="utf-8")
+
+    resources = PipelineResources(base_dir=tmp_path / "data", vault_dir=tmp_path / "vault")
+    result = run_step("chunking", md_file, resources)
+
+    assert result["ok"] is True
+    assert result["tool"] == "chunker"
+    nodes = json.loads(Path(result["output"]["nodes"]).read_text(encoding="utf-8"))
+    assert any(n["type"] == "chunk" for n in nodes)
+    assert Path(result["vault_path"]).exists()
+
+
+def test_taxonomy_matrix_is_loaded_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    taxonomy = tmp_path / "taxonomy.parquet"
+    taxonomy.write_bytes(b"")
+    loads: list[Path] = []
+    seen: list[object] = []
+
+    def fake_load_embeddings(path: Path):
+        loads.append(path)
+        return ["cat_a"], np.ones((1, 4), dtype=np.float32)
+
+    def fake_process_file(md_file: Path, **kwargs):
+        seen.append(kwargs["taxonomy_embeddings"])
+        return {"ok": True, "tool": "taxonomy_matcher", "input": str(md_file)}
+
+    monkeypatch.setattr(taxonomy_matcher, "load_embeddings", fake_load_embeddings)
+    monkeypatch.setattr(taxonomy_matcher, "process_file", fake_process_file)
+
+    resources = PipelineResources(taxonomy_parquet=taxonomy, taxonomy_md=tmp_path / "missing.md")
+    for name in ("a.md", "b.md", "c.md"):
+        run_step("taxonomy", tmp_path / name, resources)
+
+    assert loads == [taxonomy]
+    assert len(seen) == 3 and seen[0] is seen[1] is seen[2]
+
+
+def test_run_pipeline_on_file_reports_in_process_failure(tmp_path: Path) -> None:
+    missing = tmp_path / "missing.md"
+    result = process_all.run_pipeline_on_file(
+        missing, ["chunking", "embedding"], resources=PipelineResources()
+    )
+
+    assert result["ok"] is False
+    assert result["failed_step"] == "chunking"
+    assert len(result["steps"]) == 1
+    step = result["steps"][0]
+    assert step["returncode"] == 1
+    assert step["result"]["tool"] == "chunker"
+    assert step["result"]["error"]["type"] == "FileNotFoundError"
+
+
+def test_parallel_pipeline_is_ordered_and_isolates_failures(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    files = []
+    for i in range(4):
+        md_file = tmp_path / f"note{i}.md"
+        md_file.write_text(f"# Note {i}\n\nAbsatz Nummer {i}.\n", encoding="utf-8")
+        files.append(md_file)
+    files.insert(2, tmp_path / "missing.md")
+
+    embedded: list[str] = []
+
+    def fake_run_step(step_key, md_file, resources, *, force=False):
+        assert step_key == "embedding"
+        embedded.append(md_file.name)
+        return {"ok": True, "tool": "embedder", "input": str(md_file)}
+
+    # Chunking runs for real in spawned worker processes; embedding in threads.
+    monkeypatch.setattr(process_all, "run_step", fake_run_step)
+    resources = PipelineResources(base_dir=tmp_path / "data", vault_dir=tmp_path / "vault")
+    results = process_all.run_pipeline_parallel(
+        files, ["chunking", "embedding"], resources, jobs=2, skip_errors=True
+    )
+
+    assert [r["file"] for r in results] == [str(f) for f in files]
+    assert [r["status"] for r in results] == ["ok", "ok", "failed", "ok", "ok"]
+    assert results[2]["failed_step"] == "chunking"
+    assert [s["step"] for s in results[0]["steps"]] == ["chunking", "embedding"]
+    assert sorted(embedded) == sorted(f.name for f in files if f.exists())
+
+
+def test_parallel_pipeline_stops_starting_files_after_failure(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fake_run_step(step_key, md_file, resources, *, force=False):
+        if md_file.name == "bad.md":
+            raise RuntimeError("boom")
+        return {"ok": True}
+
+    monkeypatch.setattr(process_all, "run_step", fake_run_step)
+    files = [tmp_path / "bad.md", *(tmp_path / f"f{i}.md" for i in range(10))]
+    results = process_all.run_pipeline_parallel(files, ["embedding"], PipelineResources(), jobs=1)
+
+    assert results[0]["status"] == "failed"
+    assert results[0]["steps"][0]["result"]["error"]["message"] == "boom"
+    assert results[-1]["status"] == "not_started"
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from brain_graph.db import quantized_index, vector_store
+from brain_graph.db.quantized_index import QuantizedIndex, build_quantized_embeddings
+from brain_graph.search.searcher import semantic_search
+
+
+N_CHUNKS = 3000
+N_CLUSTERS = 40
+
+
+def _insert(con: duckdb.DuckDBPyConnection, table: str, id_column: str, ids: list[str], vectors: np.ndarray) -> None:
+    arrow = pa.table(
+        {
+            id_column: pa.array(ids, pa.string()),
+            "embedding": pa.FixedSizeListArray.from_arrays(pa.array(vectors.astype(np.float32).ravel()), 256),
+        }
+    )
+    con.register("_vectors", arrow)
+    con.execute(f"INSERT INTO {table} ({id_column}, embedding) SELECT * FROM _vectors")
+    con.unregister("_vectors")
+
+
+@pytest.fixture(scope="module")
+def centers() -> np.ndarray:
+    return np.random.default_rng(1).normal(size=(N_CLUSTERS, 256))
+
+
+@pytest.fixture(scope="module")
+def con(centers: np.ndarray) -> duckdb.DuckDBPyConnection:
+    rng = np.random.default_rng(2)
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE nodes (id VARCHAR, ulid VARCHAR, type VARCHAR, text VARCHAR, summary VARCHAR, source_file VARCHAR)")
+    con.execute("CREATE TABLE chunk_embeddings_256d (chunk_id VARCHAR, embedding FLOAT[256])")
+    con.execute("CREATE TABLE code_embeddings_256d (code_id VARCHAR, embedding FLOAT[256], source_file VARCHAR, language VARCHAR)")
+    ids = [f"c{i:05d}" for i in range(N_CHUNKS)]
+    vectors = centers[rng.integers(0, N_CLUSTERS, N_CHUNKS)] + rng.normal(size=(N_CHUNKS, 256)) * 0.8
+    _insert(con, "chunk_embeddings_256d", "chunk_id", ids, vectors)
+    con.executemany(
+        "INSERT INTO nodes VALUES (?, ?, 'chunk', ?, NULL, ?)",
+        [(i, i, f"text {i}", f"doc{n % 100}.md") for n, i in enumerate(ids)],
+    )
+    build_quantized_embeddings(con)
+    return con
+
+
+def _exact_top(con: duckdb.DuckDBPyConnection, query: list[float], k: int) -> list[str]:
+    rows = con.execute(
+        f"""
+        SELECT chunk_id FROM chunk_embeddings_256d
+        ORDER BY array_cosine_distance(embedding, ?::FLOAT[256]), chunk_id
+        LIMIT {k}
+        """,
+        [query],
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def test_codes_reconstruct_the_normalized_vectors(con: duckdb.DuckDBPyConnection) -> None:
+    index = QuantizedIndex.load(con, "chunk")
+    assert index is not None and len(index) == N_CHUNKS
+    assert index.bits.shape == (N_CHUNKS, 32) and index.codes.shape == (N_CHUNKS, 256)
+    assert index.nbytes == N_CHUNKS * (32 + 256) + 256 * 4
+    assert QuantizedIndex.load(con, "code") is None
+
+    vectors = np.array(
+        [row[0] for row in con.execute("SELECT embedding FROM chunk_embeddings_256d ORDER BY chunk_id").fetchall()]
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    assert np.abs(index.codes).max() == 127
+    assert np.all(np.abs(index.codes * index.scales - vectors) <= index.scales / 2 + 1e-6)
+    assert np.array_equal(np.unpackbits(index.bits, axis=1).astype(bool), vectors > 0)
+
+
+def test_rescored_search_recall(con: duckdb.DuckDBPyConnection, centers: np.ndarray) -> None:
+    index = QuantizedIndex.load(con, "chunk")
+    rng = np.random.default_rng(3)
+    recalls = []
+    for _ in range(30):
+        query = (centers[rng.integers(0, N_CLUSTERS)] + rng.normal(size=256)).tolist()
+        expected = _exact_top(con, query, 10)
+        hits = index.search(query, 10)
+        recalls.append(len(set(expected) & {row_id for row_id, _ in hits}) / 10)
+        # Similarities are cosine similarities (float16 vectors), ranked best first
+        sims = [sim for _, sim in hits]
+        assert sims == sorted(sims, reverse=True)
+        exact = dict(
+            con.execute(
+                """
+                SELECT chunk_id, 1.0 - array_cosine_distance(embedding, ?::FLOAT[256])
+                FROM chunk_embeddings_256d WHERE chunk_id IN (SELECT UNNEST(?::VARCHAR[]))
+                """,
+                [query, [row_id for row_id, _ in hits]],
+            ).fetchall()
+        )
+        assert all(abs(exact[row_id] - sim) < 2e-3 for row_id, sim in hits)
+    assert np.mean(recalls) >= 0.95
+
+    # Re-scoring every row is exact search
+    query = (centers[0] + rng.normal(size=256)).tolist()
+    assert [row_id for row_id, _ in index.search(query, 10, rescore=N_CHUNKS)] == _exact_top(con, query, 10)
+
+
+def test_semantic_search_with_quantized_first_stage(
+    con: duckdb.DuckDBPyConnection, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(quantized_index, "RESCORE_CANDIDATES", N_CHUNKS)
+    index = QuantizedIndex.load(con, "chunk")
+    query = np.random.default_rng(4).normal(size=256).tolist()
+    stats: dict = {}
+    results = semantic_search(con, query, limit=8, stats=stats, quantized=index)
+    assert [r["chunk_id"] for r in results] == _exact_top(con, query, 8)
+    assert stats["strategy"] == "ann" and stats["stable"]
+    assert results[0]["text"] == f"text {results[0]['chunk_id']}"
+
+
+def test_rebuild_follows_the_embedding_tables() -> None:
+    rng = np.random.default_rng(5)
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE chunk_embeddings_256d (chunk_id VARCHAR, embedding FLOAT[256])")
+    con.execute("CREATE TABLE code_embeddings_256d (code_id VARCHAR, embedding FLOAT[256])")
+    _insert(con, "chunk_embeddings_256d", "chunk_id", [f"c{i:02d}" for i in range(30)], rng.normal(size=(30, 256)))
+    assert build_quantized_embeddings(con)["rows"] == {"chunk": 30, "code": 0}
+    assert QuantizedIndex.load(con, "code") is None
+
+    codes = rng.normal(size=(20, 256))
+    _insert(con, "code_embeddings_256d", "code_id", [f"f{i:02d}" for i in range(20)], codes)
+    con.execute("DELETE FROM chunk_embeddings_256d WHERE chunk_id >= 'c10'")
+    assert build_quantized_embeddings(con)["rows"] == {"chunk": 10, "code": 20}
+    assert len(QuantizedIndex.load(con, "chunk")) == 10
+    code_index = QuantizedIndex.load(con, "code")
+    assert code_index.ids == [f"f{i:02d}" for i in range(20)]
+    assert [row_id for row_id, _ in code_index.search(codes[7].tolist(), 1)] == ["f07"]
+
+
+def test_rescore_from_the_vector_store(tmp_path: Path) -> None:
+    rng = np.random.default_rng(6)
+    full = rng.normal(size=(500, 1024))
+    ids = [f"c{i:03d}" for i in range(500)]
+    con = duckdb.connect(str(tmp_path / "brain.duckdb"))
+    con.execute("CREATE TABLE chunk_embeddings_256d (chunk_id VARCHAR, embedding FLOAT[256])")
+    _insert(con, "chunk_embeddings_256d", "chunk_id", ids, full[:, :256])
+    build_quantized_embeddings(con)
+    # Store rows in reverse id order: offsets must be mapped, not assumed
+    store_path = tmp_path / "brain.vectors.npy"
+    np.save(store_path, (full / np.linalg.norm(full, axis=1, keepdims=True))[::-1].astype(np.float16))
+    con.execute("CREATE TABLE full_vector_rows (chunk_id VARCHAR PRIMARY KEY, row_offset INTEGER)")
+    con.executemany("INSERT INTO full_vector_rows VALUES (?, ?)", [(i, 499 - n) for n, i in enumerate(ids)])
+    con.execute("CREATE TABLE full_vector_store (path VARCHAR, rows BIGINT, dim INTEGER, dtype VARCHAR)")
+    con.execute("INSERT INTO full_vector_store VALUES (?, 500, 1024, 'float16')", [str(store_path)])
+    vector_store.clear_cache()
+
+    index = QuantizedIndex.load(con, "chunk")
+    assert index.vectors is None and index.rescore_nbytes == 500 * 8
+    query = full[42, :256] + rng.normal(size=256) * 0.5
+    hits = index.search(query.tolist(), 5, rescore=500)
+    assert [row_id for row_id, _ in hits] == _exact_top(con, query.tolist(), 5)
+    prefix = full[42, :256] / np.linalg.norm(full[42, :256])
+    expected = float(prefix @ (query / np.linalg.norm(query)))
+    assert abs(dict(hits)["c042"] - expected) < 2e-3
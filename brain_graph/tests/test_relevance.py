@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pytest
+
+from brain_graph.db.db_builder import BrainGraphDB
+from brain_graph.db.index_snapshot import content_fingerprint
+from brain_graph.db.relevance import (
+    combined_score,
+    max_relevance,
+    refresh_relevance,
+    relevance_join,
+    reload_relevance,
+)
+from brain_graph.search import searcher
+from brain_graph.search.searcher import ChunkMatrix, semantic_search
+
+
+N_DOCS = 60
+CHUNKS_PER_DOC = 5
+
+
+@pytest.fixture(scope="module")
+def db() -> BrainGraphDB:
+    rng = np.random.default_rng(11)
+    db = BrainGraphDB(":memory:")
+    for d in range(N_DOCS):
+        doc_ulid = f"D{d:03d}"
+        source = f"vault/doc{d}.md"
+        db.con.execute(
+            """
+            INSERT INTO meta (ulid, source_file, source_hash, modified_at, uses, importance, decay)
+            VALUES (?, ?, 'h', now()::TIMESTAMP - to_days(?), ?, ?, ?)
+            """,
+            [
+                doc_ulid,
+                source,
+                int(rng.integers(0, 2000)),
+                int(rng.integers(0, 20)),
+                float(rng.integers(1, 11)),
+                float(rng.integers(1, 11)),
+            ],
+        )
+        for c in range(CHUNKS_PER_DOC):
+            chunk = f"C{d:03d}{c}"
+            db.con.execute(
+                "INSERT INTO nodes (id, ulid, type, source_file, text) VALUES (?, ?, 'chunk', ?, ?)",
+                [chunk, chunk, source, f"text {chunk}"],
+            )
+            db.con.execute(
+                "INSERT INTO chunk_embeddings_256d (chunk_id, embedding) VALUES (?, ?::FLOAT[256])",
+                [chunk, rng.normal(size=256).tolist()],
+            )
+    return db
+
+
+def _brute_force(db: BrainGraphDB, query: list[float], limit: int) -> list[tuple[str, float]]:
+    rows = db.con.execute(
+        """
+        SELECT e.chunk_id,
+               1.0 - array_cosine_distance(e.embedding, ?::FLOAT[256]),
+               COALESCE(r.relevance, 0.0)
+        FROM chunk_embeddings_256d e
+        JOIN nodes n ON n.id = e.chunk_id
+        LEFT JOIN document_relevance r ON r.source_file = n.source_file
+        """,
+        [query],
+    ).fetchall()
+    scored = sorted(((combined_score(sim, rel), cid) for cid, sim, rel in rows), key=lambda r: (-r[0], r[1]))
+    return [(cid, score) for score, cid in scored[:limit]]
+
+
+def test_refresh_materializes_the_view_per_document(db: BrainGraphDB) -> None:
+    stats = refresh_relevance(db.con)
+    assert stats["documents"] == N_DOCS
+
+    view = dict(db.con.execute("SELECT ulid, relevance_score FROM relevance_scores").fetchall())
+    table = dict(db.con.execute("SELECT ulid, relevance FROM document_relevance").fetchall())
+    assert table.keys() == view.keys()
+    assert all(abs(table[k] - view[k]) < 1e-4 for k in view)
+    assert stats["max_relevance"] == pytest.approx(max(view.values()), abs=1e-4)
+
+    # Chunks inherit the relevance of their document
+    matrix = ChunkMatrix.load(db.con)
+    relevance = dict(zip(matrix.ids, matrix.relevance))
+    assert relevance["C0073"] == pytest.approx(view["D007"], abs=1e-4)
+
+
+def test_two_phase_search_matches_brute_force(db: BrainGraphDB, monkeypatch: pytest.MonkeyPatch) -> None:
+    refresh_relevance(db.con)
+    # Small first round so that the over-fetch has to widen
+    monkeypatch.setattr(searcher, "ANN_OVERFETCH", 1)
+    monkeypatch.setattr(searcher, "ANN_MIN_CANDIDATES", 1)
+
+    matrix = ChunkMatrix.load(db.con)
+    rng = np.random.default_rng(3)
+    rounds = []
+    for limit in (1, 5, 20):
+        for _ in range(5):
+            query = rng.normal(size=256).tolist()
+            stats: dict = {}
+            results = semantic_search(db.con, query, limit=limit, stats=stats)
+            expected = _brute_force(db, query, limit)
+            assert [r["chunk_id"] for r in results] == [cid for cid, _ in expected]
+            assert all(abs(r["score"] - s) < 1e-6 for r, (_, s) in zip(results, expected))
+            assert stats["stable"]
+            # Batch search ranks with the same relevance
+            hits = matrix.top_k(np.array([query]), limit, with_relevance=True)[0]
+            assert [matrix.ids[i] for i, _ in hits] == [cid for cid, _ in expected]
+            rounds.append(stats["rounds"])
+    assert max(rounds) > 1
+
+
+def test_without_relevance_one_round_by_distance() -> None:
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE nodes (id VARCHAR, ulid VARCHAR, text VARCHAR, summary VARCHAR, source_file VARCHAR)")
+    con.execute("CREATE TABLE chunk_embeddings_256d (chunk_id VARCHAR, embedding FLOAT[256])")
+    rng = np.random.default_rng(5)
+    for i in range(30):
+        con.execute("INSERT INTO nodes VALUES (?, ?, ?, NULL, 'doc.md')", [f"c{i}", f"c{i}", f"text {i}"])
+        con.execute(
+            "INSERT INTO chunk_embeddings_256d VALUES (?, ?::FLOAT[256])", [f"c{i}", rng.normal(size=256).tolist()]
+        )
+
+    stats: dict = {}
+    results = semantic_search(con, rng.normal(size=256).tolist(), limit=7, stats=stats)
+    assert stats == {"strategy": "ann", "candidates": 7, "rounds": 1, "stable": True}
+    sims = [r["similarity"] for r in results]
+    assert sims == sorted(sims, reverse=True)
+    assert all(r["relevance"] == 0.0 for r in results)
+
+
+def test_reload_into_read_only_snapshot(tmp_path: Path) -> None:
+    path = tmp_path / "brain.snapshot.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute("CREATE TABLE meta (ulid VARCHAR, source_file VARCHAR, source_hash VARCHAR)")
+    con.execute("INSERT INTO meta VALUES ('D1', 'a.md', 'h1'), ('D2', 'b.md', 'h2')")
+    con.execute("CREATE VIEW relevance_scores AS SELECT ulid, 4.0 + (ulid = 'D2')::INTEGER AS relevance_score FROM meta")
+    refresh_relevance(con)
+    before = content_fingerprint(con)
+    # A stale copy (as written into the snapshot days ago) does not change the fingerprint
+    con.execute("UPDATE document_relevance SET relevance = 1.0")
+    assert content_fingerprint(con) == before
+    con.close()
+
+    snapshot = duckdb.connect(str(path), read_only=True)
+    assert max_relevance(snapshot) == 1.0
+    assert reload_relevance(snapshot)["documents"] == 2
+    cursor = snapshot.cursor()
+    join_sql, relevance_sql = relevance_join(cursor, "m")
+    rows = cursor.execute(f"SELECT m.source_file, {relevance_sql} FROM meta m {join_sql} ORDER BY 1").fetchall()
+    assert rows == [("a.md", 4.0), ("b.md", 5.0)]
+    assert max_relevance(cursor) == 5.0
+    assert reload_relevance(duckdb.connect(":memory:")) is None
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from brain_graph.search import reranker_client
+from brain_graph.search.reranking import rerank_with_model
+from brain_graph.utils.embedding_cache import close_all
+
+
+class FakeSession:
+    def __init__(self, working: str) -> None:
+        self.working = working
+        self.failures = 0
+        self.calls: list[tuple[str, int]] = []
+        self.headers: dict[str, str] = {}
+
+    def mount(self, prefix, adapter) -> None:
+        pass
+
+    def post(self, url, json, timeout):
+        endpoint = url[url.rindex("/") :]
+        self.calls.append((endpoint, len(json["documents"])))
+        if endpoint != self.working:
+            return SimpleNamespace(status_code=404)
+        if self.failures:
+            self.failures -= 1
+            return SimpleNamespace(status_code=503)
+        results = [
+            {"index": i, "relevance_score": 0.5 + len(doc) / 100} for i, doc in enumerate(json["documents"])
+        ]
+        return SimpleNamespace(status_code=200, json=lambda: {"results": results})
+
+
+@pytest.fixture
+def config(tmp_path: Path):
+    reranker_client.clear_clients()
+    yield {
+        "reranker_base_url": "http://reranker/v1",
+        "reranker_model": "rr",
+        "reranker_batch_size": 2,
+        "embedding_cache_dir": str(tmp_path),
+    }
+    reranker_client.clear_clients()
+    close_all()
+
+
+def test_endpoint_is_probed_once_and_scores_are_cached(config, monkeypatch: pytest.MonkeyPatch) -> None:
+    session = FakeSession("/rerank")
+    monkeypatch.setattr(reranker_client.requests, "Session", lambda: session)
+    candidates = [{"chunk_id": f"c{i}", "text": "x" * (10 * i + 1)} for i in range(5)]
+
+    results = rerank_with_model("frage", candidates, config)
+    assert [r["chunk_id"] for r in results] == ["c4", "c3", "c2", "c1", "c0"]
+    assert reranker_client.get_reranker_client(config).method == "/rerank"
+    # Probed with one document (one failed endpoint), then 2 batches of the other 4
+    assert session.calls[:2] == [("/reranking", 1), ("/rerank", 1)]
+    assert sorted(n for endpoint, n in session.calls if endpoint == "/rerank") == [1, 2, 2]
+
+    session.calls.clear()
+    candidates.append({"chunk_id": "c5", "text": "neu"})
+    results = rerank_with_model("frage", candidates, config, top_k=2)
+    # Only the new candidate goes to the server, straight to the known endpoint
+    assert session.calls == [("/rerank", 1)]
+    assert [r["chunk_id"] for r in results] == ["c4", "c3"]
+
+
+def test_embeddings_fallback_is_batched(config, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(reranker_client.requests, "Session", lambda: FakeSession("/none"))
+    inputs: list[int] = []
+
+    def create(*, input, model):
+        inputs.append(len(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=data)
+
+    client = reranker_client.get_reranker_client({**config, "reranker_cache": False})
+    client._openai = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+
+    stats: dict = {}
+    scores = client.score("q", ["a", "bbb", "cc"], stats=stats)
+    # Score = first embedding dimension of "Query: q\nDocument: <doc>", in input order
+    assert scores == [20.0, 22.0, 21.0]
+    assert sorted(inputs) == [1, 2]
+    assert stats["method"] == "embeddings" and stats["scored"] == 3
+
+
+def test_transient_failure_falls_back_for_one_call_without_caching(
+    config, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    session = FakeSession("/rerank")
+    monkeypatch.setattr(reranker_client.requests, "Session", lambda: session)
+    client = reranker_client.get_reranker_client(config)
+    client._openai = SimpleNamespace(
+        embeddings=SimpleNamespace(
+            create=lambda *, input, model: SimpleNamespace(
+                data=[SimpleNamespace(index=i, embedding=[-1.0]) for i in range(len(input))]
+            )
+        )
+    )
+    assert client.score("q", ["a"]) == [0.51]
+    assert client.method == "/rerank"
+
+    # /rerank fails twice (call and retry): this call is scored via embeddings
+    session.failures = 2
+    stats: dict = {}
+    assert client.score("q", ["bb", "ccc"], stats=stats) == [-1.0, -1.0]
+    assert stats["method"] == "embeddings"
+    assert client.method == "/rerank"
+    keys = [client._key("q", doc, "/rerank") for doc in ("bb", "ccc")]
+    assert client.cache.get_many(keys) == {}
+
+    # A single failure is retried; the reranker scores are cached again
+    session.failures = 1
+    assert client.score("q", ["bb", "ccc"], stats=stats) == [0.52, 0.53]
+    assert stats["method"] == "/rerank"
+    assert set(client.cache.get_many(keys)) == set(keys)
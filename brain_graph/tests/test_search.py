@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import random
+
 import duckdb
 
+import brain_graph.utils.embedding_client as embedding_client
 from brain_graph.search.searcher import (
+    ChunkMatrix,
+    batch_search,
     exact_string_search,
     fuzzy_search,
     semantic_search,
@@ -90,3 +95,75 @@ def test_semantic_search_orders_by_cosine_similarity() -> None:
 
     results = semantic_search(con, emb1, limit=2)
     assert [r["chunk_id"] for r in results] == ["c1", "c2"]
+
+
+def _fill_random_chunks(con: duckdb.DuckDBPyConnection, n: int) -> list[list[float]]:
+    rng = random.Random(7)
+    embeddings = []
+    for i in range(n):
+        emb = [rng.uniform(-1.0, 1.0) for _ in range(256)]
+        embeddings.append(emb)
+        con.execute(
+            "INSERT INTO nodes VALUES (?, ?, 'chunk', ?, NULL, ?)",
+            [f"c{i}", f"u{i}", f"text {i}", f"doc{i % 5}.md"],
+        )
+        con.execute(
+            "INSERT INTO chunk_embeddings_256d VALUES (?, ?::FLOAT[256])", [f"c{i}", emb]
+        )
+        con.execute("INSERT INTO relevance_scores VALUES (?, ?)", [f"u{i}", float(i % 10)])
+    return embeddings
+
+
+def test_batch_search_semantic_matches_single_query(monkeypatch) -> None:
+    con = _make_con()
+    embeddings = _fill_random_chunks(con, 40)
+    queries = ["erste", "zweite", "erste"]
+    query_vectors = {"Query: erste": embeddings[3], "Query: zweite": embeddings[17]}
+
+    calls: list[list[str]] = []
+
+    def fake_embed_batch(texts, config, *, cache=None, stats=None):
+        calls.append(list(texts))
+        stats["misses"] += len(texts)
+        return [query_vectors[t] for t in texts]
+
+    monkeypatch.setattr(embedding_client, "embed_batch", fake_embed_batch)
+    embedding_client.clear_cache()
+    config = {
+        "embedding_model": "m",
+        "embedding_base_url": "http://x",
+        "embedding_api_key": "k",
+        "embedding_cache": False,
+    }
+
+    batch = batch_search(con, queries, config, mode="semantic", limit=5)
+
+    # One embedding request for all distinct uncached queries.
+    assert calls == [["Query: erste", "Query: zweite"]]
+    assert batch["embedding_cache"] == {"hits": 1, "misses": 2}
+    assert {"embed", "semantic", "hydrate", "total"} <= set(batch["timings_ms"])
+
+    for query, results in zip(queries, batch["results"]):
+        expected = semantic_search(con, query_vectors[f"Query: {query}"], limit=5)
+        assert [r["chunk_id"] for r in results] == [r["chunk_id"] for r in expected]
+        for got, want in zip(results, expected):
+            assert abs(got["score"] - want["score"]) < 1e-4
+            assert got["source_file"] == want["source_file"]
+
+    # Second batch is served from the query cache.
+    batch_search(con, ["zweite"], config, mode="semantic", limit=5)
+    assert len(calls) == 1
+    embedding_client.clear_cache()
+
+
+def test_chunk_matrix_top_k_is_sorted_by_similarity() -> None:
+    con = _make_con()
+    embeddings = _fill_random_chunks(con, 25)
+    matrix = ChunkMatrix.load(con)
+    assert len(matrix) == 25 and matrix.dim == 256
+
+    hits = matrix.top_k([embeddings[11]], k=4)[0]
+    assert matrix.ids[hits[0][0]] == "c11"
+    assert abs(hits[0][1] - 1.0) < 1e-5
+    sims = [sim for _, sim in hits]
+    assert sims == sorted(sims, reverse=True)
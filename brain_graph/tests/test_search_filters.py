@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import duckdb
+import numpy as np
+import pytest
+import ulid
+
+from brain_graph.search import searcher
+from brain_graph.search.filters import SearchFilters, ulid_bound
+from brain_graph.search.searcher import code_search, semantic_search
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+DOC_TYPES = ("note", "paper", "journal", "meeting")
+LANGUAGES = ("de", "en")
+CODE_LANGUAGES = ("python", "rust", "o'caml")
+
+
+def _ulid(moment: datetime, i: int) -> str:
+    millis = int(moment.timestamp() * 1000)
+    return str(ulid.ULID.from_bytes(millis.to_bytes(6, "big") + i.to_bytes(10, "big")))
+
+
+@pytest.fixture(scope="module")
+def con() -> duckdb.DuckDBPyConnection:
+    rng = np.random.default_rng(2)
+    con = duckdb.connect(":memory:")
+    con.execute(
+        """
+        CREATE TABLE nodes (
+            id VARCHAR, ulid VARCHAR, type VARCHAR, title VARCHAR, text VARCHAR, summary VARCHAR,
+            source_file VARCHAR, language VARCHAR, signature VARCHAR, docstring VARCHAR, content VARCHAR
+        )
+        """
+    )
+    con.execute("CREATE TABLE meta (ulid VARCHAR, source_file VARCHAR, doc_type VARCHAR, research_status VARCHAR)")
+    con.execute("CREATE TABLE edges (id INTEGER, from_id VARCHAR, to_id VARCHAR, type VARCHAR)")
+    con.execute("CREATE TABLE chunk_embeddings_256d (chunk_id VARCHAR, embedding FLOAT[256])")
+    con.execute(
+        "CREATE TABLE code_embeddings_256d (code_id VARCHAR, embedding FLOAT[256], source_file VARCHAR, language VARCHAR)"
+    )
+    con.execute("INSERT INTO nodes (id, ulid, type, title) VALUES ('CAT1', 'CAT1', 'category', 'Datenbanken')")
+
+    nodes, meta, edges, chunks, codes = [], [], [], [], []
+    for d in range(40):
+        created = START + timedelta(days=9 * d)
+        source = f"vault/doc{d}.md"
+        meta.append((f"D{d}", source, DOC_TYPES[d % 4], "done" if d % 5 == 0 else "open"))
+        for c in range(10):
+            chunk = _ulid(created, c)
+            nodes.append((chunk, chunk, "chunk", None, f"text {d}/{c}", None, source, LANGUAGES[c % 2], None, None, None))
+            chunks.append((chunk, rng.normal(size=256).tolist()))
+            if c % 4 == 0:
+                edges.append((len(edges), chunk, "CAT1", "categorized_as"))
+        for c in range(3):
+            code = _ulid(created, 100 + c)
+            nodes.append((code, code, "function", f"f{d}_{c}", None, None, source, None, "def f()", None, "pass"))
+            codes.append((code, rng.normal(size=256).tolist(), source, CODE_LANGUAGES[(d + c) % 3]))
+
+    con.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", nodes)
+    con.executemany("INSERT INTO meta VALUES (?, ?, ?, ?)", meta)
+    con.executemany("INSERT INTO edges VALUES (?, ?, ?, ?)", edges)
+    con.executemany("INSERT INTO chunk_embeddings_256d VALUES (?, ?::FLOAT[256])", chunks)
+    con.executemany("INSERT INTO code_embeddings_256d VALUES (?, ?::FLOAT[256], ?, ?)", codes)
+    return con
+
+
+def _expected(con: duckdb.DuckDBPyConnection, query: list[float], filters: SearchFilters, limit: int) -> list[str]:
+    where, params = filters.predicate("n.id", "n.source_file", "n.language")
+    rows = con.execute(
+        f"""
+        SELECT e.chunk_id
+        FROM chunk_embeddings_256d e JOIN nodes n ON n.id = e.chunk_id
+        WHERE {where}
+        ORDER BY array_cosine_distance(e.embedding, ?::FLOAT[256]), e.chunk_id
+        LIMIT {limit}
+        """,
+        [*params, query],
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+FILTERS = [
+    SearchFilters(doc_types=("paper",)),
+    SearchFilters(doc_types=("paper", "note"), languages=("de",)),
+    SearchFilters(research_statuses=("done",)),
+    SearchFilters(categories=("Datenbanken",)),
+    SearchFilters(categories=("CAT1",), languages=("en",)),
+    SearchFilters(created_after=START + timedelta(days=100), created_before=START + timedelta(days=200)),
+    SearchFilters(doc_types=("unknown",)),
+]
+
+
+@pytest.mark.parametrize("strategy", ["prefilter", "ann"])
+def test_filtered_semantic_search_matches_exact(
+    con: duckdb.DuckDBPyConnection, strategy: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if strategy == "ann":
+        monkeypatch.setattr(searcher, "PREFILTER_MAX_ROWS", 0)
+        monkeypatch.setattr(searcher, "PREFILTER_MAX_FRACTION", 0.0)
+    else:
+        monkeypatch.setattr(searcher, "PREFILTER_MAX_FRACTION", 1.0)
+
+    rng = np.random.default_rng(9)
+    for filters in FILTERS:
+        query = rng.normal(size=256).tolist()
+        stats: dict = {}
+        results = semantic_search(con, query, limit=8, stats=stats, filters=filters)
+        assert [r["chunk_id"] for r in results] == _expected(con, query, filters, 8)
+        if results:
+            assert stats["strategy"] == strategy and stats["stable"]
+
+
+def test_selectivity_picks_the_strategy(con: duckdb.DuckDBPyConnection, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(searcher, "PREFILTER_MAX_ROWS", 50)
+    query = np.random.default_rng(4).normal(size=256).tolist()
+
+    stats: dict = {}
+    semantic_search(con, query, limit=5, stats=stats, filters=SearchFilters(research_statuses=("done",)))
+    # 80 of 400 chunks pass: post-filtered HNSW, over-fetched by the selectivity
+    assert stats["strategy"] == "ann" and stats["candidates"] >= 32 * 5
+
+    stats = {}
+    filters = SearchFilters(created_after=START, created_before=START + timedelta(days=10))
+    semantic_search(con, query, limit=5, stats=stats, filters=filters)
+    assert stats == {"strategy": "prefilter", "candidates": 20, "rounds": 1, "stable": True}
+
+
+def test_code_search_language_values_are_parameters(con: duckdb.DuckDBPyConnection) -> None:
+    query = np.random.default_rng(6).normal(size=256).tolist()
+    results = code_search(con, query, limit=5, languages=["o'caml"])
+    assert len(results) == 5
+    assert {r["language"] for r in results} == {"o'caml"}
+    sims = [r["similarity"] for r in results]
+    assert sims == sorted(sims, reverse=True)
+
+    filters = SearchFilters(doc_types=("journal",))
+    results = code_search(con, query, limit=50, languages=["rust"], filters=filters)
+    assert results and all(r["language"] == "rust" for r in results)
+    assert all(int(r["source_file"][len("vault/doc") : -3]) % 4 == 2 for r in results)
+
+
+def test_filters_from_dict() -> None:
+    filters = SearchFilters.from_dict({"doc_types": "paper, note", "created_after": "2024-03-01"})
+    assert filters.doc_types == ("paper", "note")
+    assert filters.created_after == datetime(2024, 3, 1, tzinfo=timezone.utc)
+    assert filters.to_dict() == {"doc_types": ["paper", "note"], "created_after": "2024-03-01T00:00:00+00:00"}
+    assert not SearchFilters.from_dict(None)
+    assert ulid_bound(START) <= _ulid(START, 1) < ulid_bound(START + timedelta(milliseconds=1))
+    with pytest.raises(ValueError):
+        SearchFilters.from_dict({"tags": ["x"]})
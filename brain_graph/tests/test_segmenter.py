@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from brain_graph.pipeline.chunker import split_sentences
+from brain_graph.pipeline.segmenter import get_segmenter
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.mark.parametrize("lang", ["de", "en"])
+def test_rule_segmenter_agrees_with_pysbd(lang: str) -> None:
+    text = (FIXTURES / f"sentences_{lang}.md").read_text(encoding="utf-8")
+    rule = get_segmenter(lang, "rule").spans(text)
+    reference = get_segmenter(lang, "pysbd").spans(text)
+
+    # Spans are exact, ordered and stripped
+    for (start, end), (next_start, _) in zip(rule, rule[1:] + [(len(text), 0)]):
+        assert start < end <= next_start
+        assert text[start:end] == text[start:end].strip()
+
+    agreement = len(set(rule) & set(reference)) / len(reference)
+    assert agreement >= 0.85
+
+
+def test_rule_segmenter_keeps_abbreviations_and_ordinals() -> None:
+    text = "Das gilt z.B. am 3. Mai für Dr. Müller. Danach nicht mehr!\n- Punkt eins\n- Punkt zwei"
+    sentences = [s for s, _, _ in split_sentences(text, get_segmenter("de"))]
+
+    assert sentences == [
+        "Das gilt z.B. am 3. Mai für Dr. Müller.",
+        "Danach nicht mehr!",
+        "- Punkt eins",
+        "- Punkt zwei",
+    ]
+
+
+def test_unknown_segmenter_kind_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        get_segmenter("de", "spacy")
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from brain_graph.pipeline.summarizer import summarize_chunks
+from brain_graph.utils.embedding_cache import close_all
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, *, model, messages, max_tokens, temperature):
+        prompt = messages[0]["content"]
+        with self._lock:
+            self.prompts.append(prompt)
+        text = prompt.split("\n\n")[1]
+        message = SimpleNamespace(content=f"Kurz: {text[:10]}")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(total_tokens=50),
+        )
+
+
+def _nodes(source: str, parts: list[str]) -> list[dict]:
+    nodes = [{"id": "doc", "type": "document"}]
+    for i, part in enumerate(parts):
+        start = source.index(part)
+        nodes.append(
+            {"id": f"c{i}", "type": "chunk", "char_start": start, "char_end": start + len(part)}
+        )
+    return nodes
+
+
+def test_summaries_are_cached_by_chunk_text(tmp_path: Path) -> None:
+    config = {
+        "summary_model": "m",
+        "summary_base_url": "http://x",
+        "summary_api_key": "unused",
+        "embedding_cache_dir": str(tmp_path),
+    }
+    parts = ["Erster Absatz.", "Zweiter Absatz.", "Dritter Absatz."]
+    source = "\n\n".join(parts)
+    client = FakeClient()
+
+    stats: dict = {}
+    nodes = summarize_chunks(_nodes(source, parts), source, config, client=client, stats=stats)
+    assert len(client.prompts) == 3
+    assert stats["generated"] == 3 and stats["cached"] == 0
+    assert [n["summary"] for n in nodes[1:]] == [
+        "Kurz: Erster Abs", "Kurz: Zweiter Ab", "Kurz: Dritter Ab"
+    ]
+    assert "summary" not in nodes[0]
+
+    # Lightly edited note: only the changed chunk goes to the LLM.
+    edited = ["Erster Absatz.", "Zweiter Absatz, geändert.", "Dritter Absatz."]
+    source = "\n\n".join(edited)
+    client = FakeClient()
+    stats = {}
+    summarize_chunks(_nodes(source, edited), source, config, client=client, stats=stats)
+    assert len(client.prompts) == 1
+    assert "geändert" in client.prompts[0]
+    assert stats["cached"] == 2 and stats["generated"] == 1
+    close_all()
+
+
+def test_token_budget_stops_new_requests(tmp_path: Path) -> None:
+    config = {
+        "summary_model": "m",
+        "summary_base_url": "http://x",
+        "summary_api_key": "unused",
+        "summary_cache": False,
+        "summary_concurrency": 1,
+        "summary_token_budget": 300,
+    }
+    parts = [f"Absatz {i}." for i in range(10)]
+    source = "\n\n".join(parts)
+    client = FakeClient()
+
+    stats: dict = {}
+    nodes = summarize_chunks(_nodes(source, parts), source, config, client=client, stats=stats)
+    assert 0 < stats["generated"] < 10
+    assert stats["generated"] + stats["skipped_budget"] == 10
+    assert stats["tokens"] <= 300
+    assert sum(1 for n in nodes if n.get("summary")) == stats["generated"]
+
+
+def test_token_budget_reserves_the_chunk_text(tmp_path: Path) -> None:
+    config = {
+        "summary_model": "m",
+        "summary_base_url": "http://x",
+        "summary_api_key": "unused",
+        "summary_cache": False,
+        "summary_token_budget": 300,
+    }
+    # ~500 tokens of chunk text alone: the request cannot fit the budget
+    parts = ["Langer Absatz. " * 140]
+    source = parts[0]
+    client = FakeClient()
+
+    stats: dict = {}
+    summarize_chunks(_nodes(source, parts), source, config, client=client, stats=stats)
+    assert client.prompts == []
+    assert stats["skipped_budget"] == 1 and stats["generated"] == 0
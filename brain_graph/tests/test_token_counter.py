@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from brain_graph.pipeline.chunker import create_adaptive_chunks, split_long_sentence
+from brain_graph.utils.token_counter import TokenCounter, get_token_counter
+
+
+def test_without_tokenizer_counts_are_estimated(tmp_path: Path) -> None:
+    counter = get_token_counter({})
+    assert counter is get_token_counter({"embedding_tokenizer": ""})
+    assert not counter.exact
+    assert counter.count_many(["abcd" * 10, ""]) == [10, 0]
+    assert counter.truncate("x" * 100, 5) == "x" * 20
+
+    missing = TokenCounter(tmp_path / "tokenizer.json")
+    assert not missing.exact
+
+
+def _word_tokenizer(path: Path) -> Path:
+    tokenizers = pytest.importorskip("tokenizers")
+    vocab = {"[UNK]": 0, "ein": 1, "satz": 2, "graph": 3}
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.save(str(path))
+    return path
+
+
+def test_tokenizer_counts_drive_chunk_sizes(tmp_path: Path) -> None:
+    counter = TokenCounter(_word_tokenizer(tmp_path / "tokenizer.json"))
+    assert counter.exact
+
+    # One token per word, whatever the word length
+    assert counter.count_many(["ein satz", "graph " * 7]) == [2, 7]
+    assert counter.truncate("ein satz graph ein satz", 3) == "ein satz graph"
+
+    sentences = []
+    pos = 0
+    for text in ["ein satz graph ein satz ."] * 6:
+        sentences.append((text, pos, pos + len(text)))
+        pos += len(text) + 1
+    chunks = create_adaptive_chunks(
+        sentences, target_tokens=12, min_tokens=1, overlap_tokens=0, counter=counter
+    )
+    # 6 tokens per sentence (punctuation included): two sentences per chunk
+    assert [c[0].count(".") for c in chunks] == [2, 2, 2]
+
+
+def test_long_sentence_is_hard_split_by_tokens(tmp_path: Path) -> None:
+    counter = TokenCounter(_word_tokenizer(tmp_path / "tokenizer.json"))
+    text = " ".join(["graph"] * 20)
+
+    parts = split_long_sentence(text, 100, target_tokens=5, counter=counter)
+    # Five words per piece, not target_tokens * 4 characters
+    assert [counter.count(part) for part, _, _ in parts] == [5, 5, 5, 5]
+    for part, start, end in parts:
+        assert text[start - 100 : end - 100] == part
+
+
+def test_truncate_leaves_room_for_special_tokens(tmp_path: Path) -> None:
+    tokenizers = pytest.importorskip("tokenizers")
+    vocab = {"[UNK]": 0, "[CLS]": 1, "[SEP]": 2, "ein": 3, "satz": 4, "graph": 5}
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.post_processor = tokenizers.processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 1), ("[SEP]", 2)]
+    )
+    tokenizer.save(str(tmp_path / "tokenizer.json"))
+    counter = TokenCounter(tmp_path / "tokenizer.json")
+
+    text = "ein satz graph ein satz graph"
+    assert counter.count(text) == 8
+    for max_tokens in range(2, 8):
+        truncated = counter.truncate(text, max_tokens)
+        # The truncated text re-encodes within the limit, [CLS]/[SEP] included
+        assert counter.count(truncated) == max_tokens
+        assert text.startswith(truncated)
+    assert counter.truncate(text, 5) == "ein satz graph"
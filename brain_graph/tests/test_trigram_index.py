@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import duckdb
+import pytest
+
+from brain_graph.db import trigram_index
+from brain_graph.db.trigram_index import (
+    add_nodes,
+    build_trigram_index,
+    remove_nodes,
+    trigram_candidates,
+    trigram_index_available,
+)
+from brain_graph.search.searcher import exact_string_search
+
+TEXTS = [
+    "Fehler ERR-4711 beim Import: Datei nicht gefunden.",
+    "err-4711 tritt auf, wenn die Datei fehlt. ERR-4711 erneut prüfen.",
+    "def parse_markdown(text): return blocks",
+    "Größenänderung der Straße, Maß für Maß.",
+]
+
+
+def _make_con() -> duckdb.DuckDBPyConnection:
+    con = duckdb.connect(":memory:")
+    con.execute(
+        "CREATE TABLE nodes (id VARCHAR, type VARCHAR, title VARCHAR, text VARCHAR, "
+        "summary VARCHAR, source_file VARCHAR)"
+    )
+    for i, text in enumerate(TEXTS):
+        con.execute("INSERT INTO nodes VALUES (?, 'chunk', NULL, ?, NULL, 'doc.md')", [f"c{i}", text])
+    con.execute("INSERT INTO nodes VALUES ('s1', 'section', 'Fehlerbehandlung', NULL, NULL, 'doc.md')")
+    return con
+
+
+def _search(con: duckdb.DuckDBPyConnection, query: str, case_sensitive: bool = False) -> list[tuple]:
+    return [
+        (r["chunk_id"], r["match_count"], r["position_score"])
+        for r in exact_string_search(con, query, limit=10, case_sensitive=case_sensitive)
+    ]
+
+
+def _postings(con: duckdb.DuckDBPyConnection) -> dict[str, list[str]]:
+    """trigram -> node ids (keys differ between incremental updates and rebuilds)."""
+    rows = con.execute(
+        """
+        SELECT p.trigram, list(n.node_id ORDER BY n.node_id)
+        FROM trigram_postings p, UNNEST(p.node_keys) AS k(key)
+        JOIN trigram_nodes n ON n.node_key = k.key
+        GROUP BY p.trigram
+        """
+    ).fetchall()
+    return dict(rows)
+
+
+def test_trigram_search_matches_full_scan(monkeypatch: pytest.MonkeyPatch) -> None:
+    con = _make_con()
+    queries = ["ERR-4711", "err-4711", "parse_markdown", "straße", "MASS", "Maß", "datei", "fehl", "zz9", "ß"]
+    scans = {(q, cs): _search(con, q, cs) for q in queries for cs in (False, True)}
+
+    assert not trigram_index_available(con)
+    info = build_trigram_index(con)
+    assert trigram_index_available(con)
+    assert info["nodes"] == 5
+    assert info["postings"] > info["trigrams"] > 0
+
+    for (query, case_sensitive), expected in scans.items():
+        assert _search(con, query, case_sensitive) == expected, (query, case_sensitive)
+    assert [r[:2] for r in _search(con, "ERR-4711")] == [("c1", 2), ("c0", 1)]
+    assert [r[0] for r in _search(con, "ERR-4711", case_sensitive=True)] == ["c0", "c1"]
+
+    # Candidates are narrowed by trigrams (titles included), short queries are not
+    assert sorted(trigram_candidates(con, "Fehler")) == ["c0", "s1"]
+    assert trigram_candidates(con, "zz9") == []
+    assert trigram_candidates(con, "ß") is None
+    # Unselective queries fall back to the scan
+    monkeypatch.setattr(trigram_index, "MIN_CANDIDATE_LIMIT", 1)
+    assert trigram_candidates(con, "Fehler", max_fraction=0.2) is None
+
+
+def test_index_is_updated_per_node() -> None:
+    con = _make_con()
+    build_trigram_index(con)
+
+    remove_nodes(con, "id = 'c0'")
+    con.execute("DELETE FROM nodes WHERE id = 'c0'")
+    con.execute("INSERT INTO nodes VALUES ('c9', 'chunk', NULL, 'Neuer Fehler ERR-4711', NULL, 'new.md')")
+    add_nodes(con, "source_file = 'new.md'")
+    assert [r[0] for r in _search(con, "err-4711")] == ["c1", "c9"]
+    assert sorted(trigram_candidates(con, "Fehler")) == ["c9", "s1"]
+
+    updated = _postings(con)
+    build_trigram_index(con)
+    assert _postings(con) == updated
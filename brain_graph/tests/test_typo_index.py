@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import duckdb
+
+from brain_graph.db.typo_index import build_typo_index, deletes, query_terms, typo_index_available
+from brain_graph.search.searcher import fuzzy_search
+
+TEXTS = [
+    "Maschinelles Lernen ist ein Teilgebiet der KI.",
+    "Graphen verbinden Notizen; Graphen helfen beim Lernen.",
+    "Die Suche nutzt BM25, Vektoren und einen Graphen.",
+    "Rezepte für Apfelkuchen und Käsekuchen.",
+]
+
+
+def _make_con() -> duckdb.DuckDBPyConnection:
+    con = duckdb.connect(":memory:")
+    con.execute(
+        "CREATE TABLE nodes (id VARCHAR, type VARCHAR, text VARCHAR, summary VARCHAR, source_file VARCHAR)"
+    )
+    for i, text in enumerate(TEXTS):
+        con.execute("INSERT INTO nodes VALUES (?, 'chunk', ?, NULL, 'doc.md')", [f"c{i}", text])
+    con.execute("INSERT INTO nodes VALUES ('s1', 'section', 'Graphen', NULL, 'doc.md')")
+    return con
+
+
+def test_deletes_share_a_variant_within_distance() -> None:
+    assert deletes("graph") & deletes("garph")
+    assert deletes("lernen") & deletes("lehrnen")
+    assert not deletes("graph", 1) & deletes("kuchen", 1)
+
+
+def _full_scan(con: duckdb.DuckDBPyConnection, query: str) -> dict[str, tuple[int, float]]:
+    """chunk_id -> (matched_terms, fuzzy_score), editdist3 against every word."""
+    rows = con.execute(
+        """
+        WITH words AS (
+            SELECT id, UNNEST(regexp_split_to_array(lower(text), '[^a-zäöüß]+')) AS word
+            FROM nodes WHERE type = 'chunk'
+        ),
+        matches AS (
+            SELECT id, t.term, editdist3(t.term, word) AS distance
+            FROM words, (SELECT UNNEST(?::VARCHAR[]) AS term) t
+            WHERE length(word) >= 3 AND editdist3(t.term, word) <= 2
+        )
+        SELECT id, COUNT(DISTINCT term), COUNT(DISTINCT term) * 10.0 / (1.0 + AVG(distance))
+        FROM matches GROUP BY id
+        """,
+        [query_terms(query)],
+    ).fetchall()
+    return {cid: (matched, score) for cid, matched, score in rows}
+
+
+def test_typo_index_matches_full_scan() -> None:
+    con = _make_con()
+    assert not typo_index_available(con)
+    info = build_typo_index(con)
+    assert typo_index_available(con)
+    assert info["tokens"] > 0 and info["deletes"] > info["tokens"]
+
+    for query in ["Mashinelles Lehrnen", "Grapen", "kasekuchen apfel", "vektorn suhe"]:
+        indexed = fuzzy_search(con, query, limit=10)
+        expected = _full_scan(con, query)
+        assert indexed
+        assert {r["chunk_id"]: r["matched_terms"] for r in indexed} == {
+            cid: matched for cid, (matched, _) in expected.items()
+        }
+        for r in indexed:
+            assert abs(r["fuzzy_score"] - expected[r["chunk_id"]][1]) < 1e-9
+
+    # Only chunks are indexed
+    assert "s1" not in {r["chunk_id"] for r in fuzzy_search(con, "Graphen")}
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from brain_graph.db.vector_store import (
+    build_vector_store,
+    clear_cache,
+    full_vector_scores,
+    vector_store_path_for,
+)
+from brain_graph.search.reranking import full_vector_similarities
+
+
+def _make_db(tmp_path: Path) -> tuple[duckdb.DuckDBPyConnection, dict[str, list[float]]]:
+    rng = random.Random(3)
+    con = duckdb.connect(str(tmp_path / "brain.duckdb"))
+    con.execute(
+        "CREATE TABLE chunk_embeddings_256d "
+        "(chunk_id VARCHAR PRIMARY KEY, chunk_local_id VARCHAR, embedding FLOAT[256], source_file VARCHAR)"
+    )
+    con.execute(
+        "CREATE TABLE embedding_sources (source_file VARCHAR, parquet_path VARCHAR, "
+        "embedding_dim INTEGER, model VARCHAR, created_at TIMESTAMP)"
+    )
+
+    vectors: dict[str, list[float]] = {}
+    for doc in range(3):
+        source_file = f"doc{doc}.md"
+        parquet_path = tmp_path / f"doc{doc}.parquet"
+        local_ids, embeddings = [], []
+        for chunk in range(4):
+            local_id = f"chunk_{doc}{chunk}"
+            chunk_id = f"ULID{doc}{chunk}"
+            emb = [rng.uniform(-1.0, 1.0) for _ in range(64)]
+            vectors[chunk_id] = emb
+            local_ids.append(local_id)
+            embeddings.append(emb)
+            con.execute(
+                "INSERT INTO chunk_embeddings_256d VALUES (?, ?, NULL, ?)",
+                [chunk_id, local_id, source_file],
+            )
+        pq.write_table(pa.table({"chunk_idx": local_ids, "embedding": embeddings}), parquet_path)
+        con.execute(
+            "INSERT INTO embedding_sources VALUES (?, ?, 64, 'm', NULL)",
+            [source_file, str(parquet_path)],
+        )
+    return con, vectors
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    a_vec, b_vec = np.asarray(a), np.asarray(b)
+    return float(a_vec @ b_vec / (np.linalg.norm(a_vec) * np.linalg.norm(b_vec)))
+
+
+def test_vector_store_scores_match_cosine(tmp_path: Path) -> None:
+    con, vectors = _make_db(tmp_path)
+    store_path = vector_store_path_for(tmp_path / "brain.duckdb")
+    assert store_path.name == "brain.vectors.npy"
+
+    info = build_vector_store(con, store_path, dtype="float32")
+    assert info is not None
+    assert (info["rows"], info["dim"]) == (12, 64)
+
+    query = vectors["ULID11"]
+    candidates = ["ULID11", "ULID02", "ULID23", "unknown"]
+    scores = full_vector_scores(con, candidates, query)
+    assert set(scores) == {"ULID11", "ULID02", "ULID23"}
+    for chunk_id, score in scores.items():
+        assert abs(score - _cosine(query, vectors[chunk_id])) < 1e-5
+    clear_cache()
+
+
+def test_full_vector_similarities_falls_back_to_parquet(tmp_path: Path) -> None:
+    con, vectors = _make_db(tmp_path)
+    query = vectors["ULID00"]
+    ids_by_source = {"doc0.md": ["ULID00", "ULID01"], "doc2.md": ["ULID22"]}
+
+    # No store built yet: per-source Parquet reads.
+    from_parquet = full_vector_similarities(con, ids_by_source, query)
+
+    build_vector_store(con, vector_store_path_for(tmp_path / "brain.duckdb"))
+    from_store = full_vector_similarities(con, ids_by_source, query)
+
+    assert set(from_parquet) == set(from_store) == {"ULID00", "ULID01", "ULID22"}
+    for chunk_id in from_store:
+        # float16 storage keeps cosine within a small tolerance
+        assert abs(from_store[chunk_id] - from_parquet[chunk_id]) < 2e-3
+    clear_cache()
@@ -0,0 +1,378 @@
+"""
+Persistent embedding caches shared across processes (SQLite under `.brain_graph/cache/`).
+
+- query cache: query embeddings, keyed by (model, base_url, prefix, text), LRU-bounded
+- passage store: content-addressed chunk/code/taxonomy embeddings, keyed by
+  (model, prefix, text) so re-processing unchanged content costs no API calls;
+  code is keyed on its exact text, prose on collapsed whitespace
+- rerank scores: one-element vectors keyed by (model, base_url, query, document
+  hash, scoring method), so repeated agent queries skip the reranker
+
+`SQLiteCache` is the shared plumbing (one WAL-mode file per process, schema
+setup, errors disable instead of failing); summary_cache.py builds on it too.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+import numpy as np
+
+
+QUERY_CACHE_FILE = "query_embeddings.sqlite"
+PASSAGE_STORE_FILE = "passage_embeddings.sqlite"
+RERANK_CACHE_FILE = "rerank_scores.sqlite"
+DEFAULT_MAX_ENTRIES = 50_000
+
+# Instruction prefixes (Jina v3 asymmetric search) are part of the key, not the text
+_PREFIX_RE = re.compile(r"^(Query|Passage|Document): ")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_caches: dict[str, SQLiteCache] = {}
+_caches_lock = threading.Lock()
+
+C = TypeVar("C", bound="SQLiteCache")
+
+
+def split_prefix(text: str) -> tuple[str, str]:
+    """Split an instruction prefix ("Query: ", "Passage: ") from the text."""
+    match = _PREFIX_RE.match(text)
+    if not match:
+        return "", text
+    return match.group(0), text[match.end() :]
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC, collapsed whitespace, stripped."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def hash_key(*parts: str) -> str:
+    """SHA-256 of the JSON list of `parts`."""
+    payload = json.dumps(list(parts), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_key(
+    text: str, model: str, base_url: str | None = None, *, exact: bool = False
+) -> str:
+    """
+    Key of an embedding: (model, base_url, normalized text, prefix).
+
+    With `exact` the text is only NFC-normalized: for code, indentation and
+    line breaks are content.
+    """
+    prefix, body = split_prefix(text)
+    body = unicodedata.normalize("NFC", body) if exact else normalize_text(body)
+    return hash_key(model, base_url or "", prefix, body)
+
+
+def default_cache_dir() -> Path:
+    """`.brain_graph/cache` of the nearest vault (cwd or a parent), else relative to cwd."""
+    for parent in [Path.cwd(), *Path.cwd().parents]:
+        if (parent / ".brain_graph").is_dir():
+            return parent / ".brain_graph" / "cache"
+    return Path(".brain_graph") / "cache"
+
+
+class SQLiteCache:
+    """
+    One SQLite cache file, shared across processes (WAL mode).
+
+    Subclasses set NAME (for warnings) and SCHEMA (run on connect). The
+    connection is opened lazily and used under `_lock`; cache errors never
+    fail the caller, they disable the cache for this process.
+    """
+
+    NAME = "cache"
+    SCHEMA = ""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._con: sqlite3.Connection | None = None
+        self._disabled = False
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self._con is None and not self._disabled:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                con = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+                con.execute("PRAGMA journal_mode=WAL")
+                con.execute("PRAGMA synchronous=NORMAL")
+                con.executescript(self.SCHEMA)
+                self._con = con
+            except (sqlite3.Error, OSError) as e:
+                self._warn(e)
+        return self._con
+
+    def _warn(self, error: Exception) -> None:
+        if not self._disabled:
+            print(f"Warning: {self.NAME} disabled ({self.path}: {error})", file=sys.stderr)
+        self._disabled = True
+        self._con = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+class EmbeddingCache(SQLiteCache):
+    """
+    SQLite-backed embedding cache.
+
+    - WAL mode, so several processes (daemon, CLI, agents) can share one file
+    - LRU eviction down to 90% once `max_entries` is exceeded (None = unbounded)
+    - hit/miss/eviction counters per process (`session`) and persisted totals
+    - cache errors never fail an embedding call; they count as misses
+    """
+
+    NAME = "embedding cache"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_entries: int | None = DEFAULT_MAX_ENTRIES,
+        *,
+        key_by_base_url: bool = True,
+    ):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.key_by_base_url = key_by_base_url
+        self.session = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def key(
+        self, text: str, model: str, base_url: str | None = None, *, exact: bool = False
+    ) -> str:
+        """Cache key of `text` (see `cache_key`); base_url only counts if `key_by_base_url`."""
+        return cache_key(text, model, base_url if self.key_by_base_url else None, exact=exact)
+
+    def _bump(self, con: sqlite3.Connection, **deltas: int) -> None:
+        for name, delta in deltas.items():
+            self.session[name] += delta
+            if delta:
+                con.execute(
+                    """
+                    INSERT INTO counters (name, value) VALUES (?, ?)
+                    ON CONFLICT (name) DO UPDATE SET value = value + excluded.value
+                    """,
+                    [name, delta],
+                )
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """Look up embeddings by key; returns only the hits."""
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return {}
+        with self._lock:
+            con = self._connect()
+            if con is None:
+                self.session["misses"] += len(unique)
+                return {}
+            try:
+                found: dict[str, list[float]] = {}
+                for start in range(0, len(unique), 500):
+                    part = unique[start : start + 500]
+                    rows = con.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                        part,
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                if found:
+                    con.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(time.time(), key) for key in found],
+                    )
+                self._bump(con, hits=len(found), misses=len(unique) - len(found))
+                con.commit()
+                return found
+            except sqlite3.Error as e:
+                self._warn(e)
+                self.session["misses"] += len(unique)
+                return {}
+
+    def put_many(self, items: dict[str, list[float]], model: str) -> None:
+        """Store embeddings and evict least recently used entries beyond `max_entries`."""
+        if not items:
+            return
+        with self._lock:
+            con = self._connect()
+            if con is None:
+                return
+            try:
+                now = time.time()
+                con.executemany(
+                    """
+                    INSERT OR REPLACE INTO embeddings (key, model, dim, vector, created_at, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (key, model, len(vec), np.asarray(vec, dtype=np.float32).tobytes(), now, now)
+                        for key, vec in items.items()
+                    ],
+                )
+                if self.max_entries is not None:
+                    count = con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                    if count > self.max_entries:
+                        excess = count - int(self.max_entries * 0.9)
+                        con.execute(
+                            """
+                            DELETE FROM embeddings WHERE key IN (
+                                SELECT key FROM embeddings ORDER BY last_used LIMIT ?
+                            )
+                            """,
+                            [excess],
+                        )
+                        self._bump(con, evictions=excess)
+                con.commit()
+            except sqlite3.Error as e:
+                self._warn(e)
+
+    def stats(self) -> dict[str, Any]:
+        """Entry count, persisted totals and this process's counters."""
+        result: dict[str, Any] = {
+            "path": str(self.path),
+            "max_entries": self.max_entries,
+            "session": dict(self.session),
+        }
+        with self._lock:
+            con = self._connect()
+            if con is None:
+                result["enabled"] = False
+                return result
+            try:
+                result["entries"] = con.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                result["totals"] = dict(con.execute("SELECT name, value FROM counters").fetchall())
+            except sqlite3.Error as e:
+                self._warn(e)
+        result["enabled"] = not self._disabled
+        return result
+
+    def clear(self) -> None:
+        """Delete all entries and counters."""
+        with self._lock:
+            con = self._connect()
+            if con is None:
+                return
+            con.execute("DELETE FROM embeddings")
+            con.execute("DELETE FROM counters")
+            con.commit()
+
+
+def shared_cache(path: Path | str, factory: Callable[[Path], C]) -> C:
+    """Process-wide cache instance per file (`factory(path)` on first use)."""
+    key = str(Path(path).resolve())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = factory(Path(path))
+        return cache  # type: ignore[return-value]
+
+
+def get_cache(
+    path: Path | str,
+    max_entries: int | None = DEFAULT_MAX_ENTRIES,
+    *,
+    key_by_base_url: bool = True,
+) -> EmbeddingCache:
+    """Process-wide EmbeddingCache instance per file."""
+    return shared_cache(
+        path, lambda file: EmbeddingCache(file, max_entries, key_by_base_url=key_by_base_url)
+    )
+
+
+def get_query_cache(config: dict[str, Any]) -> EmbeddingCache | None:
+    """
+    Shared query embedding cache, or None if disabled.
+
+    Config:
+        embedding_cache: false to disable (default: enabled)
+        embedding_cache_dir: directory (default: .brain_graph/cache)
+        embedding_cache_max_entries: LRU bound (default: 50000)
+    """
+    if not config.get("embedding_cache", True):
+        return None
+    cache_dir = Path(config.get("embedding_cache_dir") or default_cache_dir())
+    max_entries = config.get("embedding_cache_max_entries", DEFAULT_MAX_ENTRIES)
+    return get_cache(cache_dir / QUERY_CACHE_FILE, max_entries)
+
+
+def get_passage_store(config: dict[str, Any]) -> EmbeddingCache | None:
+    """
+    Content-addressed passage embedding store, or None if disabled.
+
+    Used by the chunk, code and taxonomy embedders. Keys ignore the server
+    URL: the same model embeds the same text to the same vector anywhere.
+
+    Config:
+        embedding_store: false to disable (default: enabled)
+        embedding_cache_dir: directory (default: .brain_graph/cache)
+        embedding_store_max_entries: LRU bound (default: unbounded)
+    """
+    if not config.get("embedding_store", True):
+        return None
+    cache_dir = Path(config.get("embedding_cache_dir") or default_cache_dir())
+    max_entries = config.get("embedding_store_max_entries")
+    return get_cache(cache_dir / PASSAGE_STORE_FILE, max_entries, key_by_base_url=False)
+
+
+def get_rerank_cache(config: dict[str, Any]) -> EmbeddingCache | None:
+    """
+    Shared reranker score cache, or None if disabled.
+
+    Config:
+        reranker_cache: false to disable (default: enabled)
+        embedding_cache_dir: directory (default: .brain_graph/cache)
+        reranker_cache_max_entries: LRU bound (default: 50000)
+    """
+    if not config.get("reranker_cache", True):
+        return None
+    cache_dir = Path(config.get("embedding_cache_dir") or default_cache_dir())
+    max_entries = config.get("reranker_cache_max_entries", DEFAULT_MAX_ENTRIES)
+    return get_cache(cache_dir / RERANK_CACHE_FILE, max_entries)
+
+
+def hit_ratio(stats: dict[str, int]) -> dict[str, Any]:
+    """Summarize embed_batch hit/miss stats for JSON results."""
+    hits = stats.get("hits", 0)
+    misses = stats.get("misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
+
+
+def close_all() -> None:
+    """Close all open cache files (tests, shutdown)."""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
@@ -1,14 +1,53 @@
-"""Cached OpenAI-compatible embedding client."""
+"""
+Cached OpenAI-compatible embedding client.
+
+Two cache layers for query embeddings:
+- an in-process LRU (fast path for the daemon)
+- the persistent SQLite cache under `.brain_graph/cache/` (see embedding_cache.py),
+  shared by the daemon, CLI invocations and agents
+
+Requests to the server are pipelined:
+- batches are packed by tokens (`embedding_batch_tokens`) and item count
+  (`embedding_batch_size`); tokens are exact with `embedding_tokenizer`
+  (see token_counter.py), otherwise estimated
+- up to `embedding_concurrency` batches are in flight at once
+- a batch rejected for context length is split in half and retried; a single
+  oversized text is truncated instead of dropped
+- output order always matches input order
+"""
 from __future__ import annotations
 
-from functools import lru_cache
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from openai import OpenAI
+from openai import APIStatusError, OpenAI
+
+from brain_graph.utils.embedding_cache import EmbeddingCache, get_query_cache
+from brain_graph.utils.token_counter import get_token_counter
+
 
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BATCH_TOKENS = 8192
+DEFAULT_MAX_ITEM_TOKENS = 7000  # jina context 8k; headroom for the chars/4 estimate
+DEFAULT_CONCURRENCY = 4
+
+# Substrings of server errors that mean "input too long" (OpenAI, llama.cpp, vLLM)
+_CONTEXT_ERROR_MARKERS = (
+    "context length",
+    "context size",
+    "maximum context",
+    "too large",
+    "too long",
+    "physical batch size",
+    "exceeds",
+)
 
 # Module-level client cache (one client per base_url + api_key combo)
 _clients: dict[tuple[str, str], OpenAI] = {}
+_clients_lock = threading.Lock()
 
 
 def get_embedding_client(config: dict[str, Any]) -> OpenAI:
@@ -22,30 +61,23 @@ def get_embedding_client(config: dict[str, Any]) -> OpenAI:
         Cached OpenAI client instance
     """
     base_url = config["embedding_base_url"]
-    api_key = config["embedding_api_key"]
+    api_key = config.get("embedding_api_key", "unused")
     cache_key = (base_url, api_key)
 
-    if cache_key not in _clients:
-        _clients[cache_key] = OpenAI(base_url=base_url, api_key=api_key)
+    with _clients_lock:
+        if cache_key not in _clients:
+            _clients[cache_key] = OpenAI(base_url=base_url, api_key=api_key)
+        return _clients[cache_key]
 
-    return _clients[cache_key]
 
+# Query embedding cache: (model, base_url, text) -> embedding (LRU, thread-safe)
+QUERY_CACHE_SIZE = 1024
+_query_cache: OrderedDict[tuple[str, str, str], tuple[float, ...]] = OrderedDict()
+_query_cache_lock = threading.Lock()
 
-@lru_cache(maxsize=128)
-def _cached_embed(text: str, model: str, base_url: str, api_key: str) -> tuple[float, ...]:
-    """
-    Cached embedding for a single text.
 
-    Uses LRU cache to avoid redundant API calls for identical queries.
-    Returns tuple (hashable) instead of list.
-    """
-    client = _clients.get((base_url, api_key))
-    if client is None:
-        client = OpenAI(base_url=base_url, api_key=api_key)
-        _clients[(base_url, api_key)] = client
-
-    response = client.embeddings.create(input=[text], model=model)
-    return tuple(response.data[0].embedding)
+def _cache_key(text: str, config: dict[str, Any]) -> tuple[str, str, str]:
+    return (config["embedding_model"], config["embedding_base_url"], text)
 
 
 def embed_single_cached(text: str, config: dict[str, Any]) -> list[float]:
@@ -61,46 +93,260 @@ def embed_single_cached(text: str, config: dict[str, Any]) -> list[float]:
     Returns:
         Embedding as list of floats
     """
-    result = _cached_embed(
-        text,
-        config["embedding_model"],
-        config["embedding_base_url"],
-        config["embedding_api_key"],
-    )
-    return list(result)
+    return embed_many_cached([text], config)[0]
+
+
+def embed_many_cached(
+    texts: list[str],
+    config: dict[str, Any],
+    stats: dict[str, int] | None = None,
+) -> list[list[float]]:
+    """
+    Embed several texts, reusing cached query embeddings.
+
+    Texts missing from the in-process LRU (deduplicated) go to a single
+    `embed_batch` call backed by the persistent query cache.
 
+    Args:
+        texts: Texts to embed (order is preserved in the result)
+        config: Configuration dict
+        stats: Optional dict; "hits" (memory or disk) and "misses" (sent to
+               the embedding server) are incremented
 
-def embed_batch(texts: list[str], config: dict[str, Any]) -> list[list[float]]:
+    Returns:
+        List of embeddings, one per input text
+    """
+    found: dict[str, tuple[float, ...]] = {}
+    with _query_cache_lock:
+        for text in texts:
+            key = _cache_key(text, config)
+            if key in _query_cache:
+                _query_cache.move_to_end(key)
+                found[text] = _query_cache[key]
+
+    misses = list(dict.fromkeys(t for t in texts if t not in found))
+    if stats is not None:
+        stats["hits"] = stats.get("hits", 0) + len(texts) - len(misses)
+        stats.setdefault("misses", 0)
+    if misses:
+        embedded = embed_batch(misses, config, cache=get_query_cache(config), stats=stats)
+        with _query_cache_lock:
+            for text, embedding in zip(misses, embedded):
+                found[text] = tuple(embedding)
+                _query_cache[_cache_key(text, config)] = found[text]
+            while len(_query_cache) > QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+
+    return [list(found[text]) for text in texts]
+
+
+def embed_batch(
+    texts: list[str],
+    config: dict[str, Any],
+    *,
+    cache: EmbeddingCache | None = None,
+    stats: dict[str, int] | None = None,
+) -> list[list[float]]:
     """
     Embed multiple texts in a batch.
 
-    Does not use cache (batch embeddings are typically unique documents).
+    With `cache`, stored embeddings are reused and only the misses are sent
+    to the server (and stored afterwards). Cache keys collapse whitespace
+    unless `embedding_exact_keys` is set in the config (code).
 
     Args:
         texts: List of texts to embed
         config: Configuration dict
+        cache: Optional persistent embedding cache
+        stats: Optional dict; "hits" and "misses" are incremented
 
     Returns:
         List of embeddings
     """
+    if cache is None:
+        embeddings = _request_embeddings(texts, config, stats)
+        if stats is not None:
+            stats["misses"] = stats.get("misses", 0) + len(texts)
+        return embeddings
+
+    model = config["embedding_model"]
+    base_url = config.get("embedding_base_url")
+    exact = bool(config.get("embedding_exact_keys", False))
+    keys = [cache.key(text, model, base_url, exact=exact) for text in texts]
+    found = cache.get_many(keys)
+
+    # Embed each missing key once, even if the text repeats
+    missing: dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+    if missing:
+        embedded = _request_embeddings(list(missing.values()), config, stats)
+        new = dict(zip(missing.keys(), embedded))
+        cache.put_many(new, model)
+        found.update(new)
+
+    if stats is not None:
+        stats["hits"] = stats.get("hits", 0) + len(texts) - len(missing)
+        stats["misses"] = stats.get("misses", 0) + len(missing)
+    return [found[key] for key in keys]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (1 token ≈ 4 chars)."""
+    return len(text) // 4 + 1
+
+
+def plan_batches(
+    texts: list[str],
+    max_items: int = DEFAULT_BATCH_SIZE,
+    max_tokens: int = DEFAULT_BATCH_TOKENS,
+    token_counts: list[int] | None = None,
+) -> list[list[int]]:
+    """
+    Pack text indices into consecutive batches bounded by item count and tokens.
+
+    `token_counts` (parallel to texts) defaults to `estimate_tokens`.
+    """
+    if token_counts is None:
+        token_counts = [estimate_tokens(text) for text in texts]
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for i, tokens in enumerate(token_counts):
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_context_length_error(error: Exception) -> bool:
+    """True if the server rejected the request because the input is too long."""
+    if not isinstance(error, APIStatusError) or error.status_code not in (400, 413, 500):
+        return False
+    message = str(error).lower()
+    return any(marker in message for marker in _CONTEXT_ERROR_MARKERS)
+
+
+def _create_embeddings(texts: list[str], config: dict[str, Any]) -> list[list[float]]:
+    """One embeddings request; results sorted by index."""
     client = get_embedding_client(config)
-    batch_size = config.get("embedding_batch_size", 32)
-
-    embeddings = []
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        response = client.embeddings.create(
-            input=batch,
-            model=config["embedding_model"],
+    timeout = config.get("embedding_timeout")
+    if timeout is not None:
+        # Request deadline (search daemon): give up instead of retrying past it
+        client = client.with_options(timeout=float(timeout), max_retries=0)
+    response = client.embeddings.create(
+        input=texts,
+        model=config["embedding_model"],
+    )
+    # Sort by index in case API returns out of order
+    return [e.embedding for e in sorted(response.data, key=lambda x: x.index)]
+
+
+def _embed_with_split(
+    texts: list[str], indices: list[int], config: dict[str, Any], truncated: set[int]
+) -> list[list[float]]:
+    """
+    Embed a batch; on context-length errors split it, truncating single texts.
+
+    `indices` are the positions of `texts` in the request; a truncated text
+    is recorded once in `truncated`, however often it is halved.
+    """
+    try:
+        return _create_embeddings(texts, config)
+    except APIStatusError as e:
+        if not is_context_length_error(e):
+            raise
+        if len(texts) > 1:
+            mid = len(texts) // 2
+            return _embed_with_split(
+                texts[:mid], indices[:mid], config, truncated
+            ) + _embed_with_split(texts[mid:], indices[mid:], config, truncated)
+        text = texts[0]
+        if len(text) < 64:
+            raise
+        shorter = text[: len(text) // 2]
+        print(
+            f"Warning: text rejected for context length, truncating {len(text)} -> {len(shorter)} chars",
+            file=sys.stderr,
         )
-        # Sort by index in case API returns out of order
-        batch_embeddings = sorted(response.data, key=lambda x: x.index)
-        embeddings.extend([e.embedding for e in batch_embeddings])
+        truncated.add(indices[0])
+        return _embed_with_split([shorter], indices, config, truncated)
+
+
+def _request_embeddings(
+    texts: list[str],
+    config: dict[str, Any],
+    stats: dict[str, int] | None = None,
+) -> list[list[float]]:
+    """
+    Send texts to the embedding server, pipelined.
+
+    Config:
+        embedding_batch_size: max items per request (default 32)
+        embedding_batch_tokens: max tokens per request (default 8192)
+        embedding_max_tokens: texts above this are truncated up front (default 7000)
+        embedding_concurrency: requests in flight (default 4)
+        embedding_tokenizer: tokenizer.json of the model for exact counts (optional)
+        embedding_timeout: seconds per request, without retries (optional)
+    """
+    if not texts:
+        return []
+    max_items = int(config.get("embedding_batch_size", DEFAULT_BATCH_SIZE))
+    max_tokens = int(config.get("embedding_batch_tokens", DEFAULT_BATCH_TOKENS))
+    max_item_tokens = int(config.get("embedding_max_tokens", DEFAULT_MAX_ITEM_TOKENS))
+    concurrency = int(config.get("embedding_concurrency", DEFAULT_CONCURRENCY))
+    counter = get_token_counter(config)
+
+    truncated: set[int] = set()
+    prepared = []
+    token_counts: list[int] | None = None
+    if counter.exact:
+        # Real token counts: cut over-length texts before the round trip
+        token_counts = counter.count_many(texts)
+        for i, (text, tokens) in enumerate(zip(texts, token_counts)):
+            if tokens > max_item_tokens:
+                truncated.add(i)
+                text = counter.truncate(text, max_item_tokens)
+                token_counts[i] = counter.count(text)
+            prepared.append(text)
+    else:
+        max_item_chars = max_item_tokens * 4
+        for i, text in enumerate(texts):
+            if len(text) > max_item_chars:
+                truncated.add(i)
+                text = text[:max_item_chars]
+            prepared.append(text)
+    if truncated:
+        print(f"Warning: truncated {len(truncated)} oversized texts", file=sys.stderr)
+
+    batches = plan_batches(prepared, max_items, max_tokens, token_counts)
+
+    def run(batch: list[int]) -> list[list[float]]:
+        return _embed_with_split([prepared[i] for i in batch], batch, config, truncated)
+
+    if concurrency <= 1 or len(batches) == 1:
+        results = [run(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as pool:
+            results = list(pool.map(run, batches))
+
+    embeddings: list[list[float]] = [[] for _ in texts]
+    for batch, batch_embeddings in zip(batches, results):
+        for i, embedding in zip(batch, batch_embeddings):
+            embeddings[i] = embedding
 
+    if stats is not None and truncated:
+        stats["truncated"] = stats.get("truncated", 0) + len(truncated)
     return embeddings
 
 
 def clear_cache() -> None:
-    """Clear the embedding cache."""
-    _cached_embed.cache_clear()
+    """Clear the in-process embedding cache (the persistent cache is kept)."""
+    with _query_cache_lock:
+        _query_cache.clear()
     _clients.clear()
@@ -0,0 +1,70 @@
+"""
+Language identification for chunking (langdetect, seeded and memoized).
+
+- one detection per document (`detect_document_language`)
+- blocks only get their own detection when they are long enough to plausibly
+  differ from the document (`block_language`); shorter ones inherit it
+- results are memoized by a content hash of the detection sample, so repeated
+  paragraphs and re-chunked notes cost nothing
+"""
+from __future__ import annotations
+
+import threading
+
+import xxhash
+from langdetect import DetectorFactory, LangDetectException, detect
+
+# langdetect samples randomly; a fixed seed makes results reproducible
+DetectorFactory.seed = 0
+
+MIN_DETECT_CHARS = 20  # below: no detection, default
+SAMPLE_CHARS = 500  # block detection uses the first N chars
+DOCUMENT_SAMPLE_CHARS = 2000  # document detection uses the first N chars of prose
+RECHECK_MIN_CHARS = 200  # blocks shorter than this inherit the document language
+MEMO_MAX_ENTRIES = 100_000
+
+_memo: dict[int, str | None] = {}
+_memo_lock = threading.Lock()
+
+
+def _detect_sample(sample: str) -> str | None:
+    """Detect the language of a sample; None if langdetect finds no features."""
+    key = xxhash.xxh64_intdigest(sample.encode("utf-8"))
+    with _memo_lock:
+        if key in _memo:
+            return _memo[key]
+    try:
+        lang: str | None = detect(sample)
+    except LangDetectException:
+        lang = None
+    with _memo_lock:
+        if len(_memo) >= MEMO_MAX_ENTRIES:
+            _memo.clear()
+        _memo[key] = lang
+    return lang
+
+
+def detect_language(text: str, default: str = "en", *, sample_chars: int = SAMPLE_CHARS) -> str:
+    """ISO 639-1 code of `text` ('de', 'en', ...), or `default` if too short/undetectable."""
+    if not text or len(text) < MIN_DETECT_CHARS:
+        return default
+    return _detect_sample(text[:sample_chars]) or default
+
+
+def detect_document_language(texts: list[str], default: str = "en") -> str:
+    """Language of a document from its prose blocks (one detection)."""
+    sample = "\n".join(texts)
+    return detect_language(sample, default, sample_chars=DOCUMENT_SAMPLE_CHARS)
+
+
+def block_language(text: str, document_language: str, *, min_chars: int = RECHECK_MIN_CHARS) -> str:
+    """Language of a block: short blocks inherit `document_language`, long ones are re-checked."""
+    if len(text) < min_chars:
+        return document_language
+    return detect_language(text, default=document_language)
+
+
+def clear_memo() -> None:
+    """Drop memoized detections (tests, benchmarks)."""
+    with _memo_lock:
+        _memo.clear()
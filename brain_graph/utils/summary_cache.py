@@ -0,0 +1,102 @@
+"""
+Persistent chunk summary cache (SQLite under `.brain_graph/cache/`).
+
+Keyed by (model, prompt, normalized chunk text): re-summarizing a lightly
+edited note only sends the changed chunks to the LLM. File handling is the
+one of the embedding caches (`SQLiteCache`, embedding_cache.py).
+"""
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from brain_graph.utils.embedding_cache import (
+    SQLiteCache,
+    default_cache_dir,
+    hash_key,
+    normalize_text,
+    shared_cache,
+)
+
+
+SUMMARY_CACHE_FILE = "summaries.sqlite"
+
+
+def summary_key(text: str, model: str, prompt: str) -> str:
+    """Key of a summary: (model, prompt template, normalized text)."""
+    return hash_key(model, prompt, normalize_text(text))
+
+
+class SummaryCache(SQLiteCache):
+    """
+    SQLite-backed summary cache (WAL mode, shared across processes).
+
+    Cache errors never fail summarization; they disable the cache for the run.
+    """
+
+    NAME = "summary cache"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS summaries (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            summary TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+    """
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Look up summaries by key; returns only the hits."""
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return {}
+        with self._lock:
+            con = self._connect()
+            if con is None:
+                return {}
+            try:
+                found: dict[str, str] = {}
+                for start in range(0, len(unique), 500):
+                    part = unique[start : start + 500]
+                    rows = con.execute(
+                        f"SELECT key, summary FROM summaries WHERE key IN ({','.join('?' * len(part))})",
+                        part,
+                    ).fetchall()
+                    found.update(rows)
+                return found
+            except sqlite3.Error as e:
+                self._warn(e)
+                return {}
+
+    def put_many(self, items: dict[str, str], model: str) -> None:
+        """Store summaries (empty summaries are not cached)."""
+        rows = [(key, model, summary, time.time()) for key, summary in items.items() if summary]
+        if not rows:
+            return
+        with self._lock:
+            con = self._connect()
+            if con is None:
+                return
+            try:
+                con.executemany(
+                    "INSERT OR REPLACE INTO summaries (key, model, summary, created_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                con.commit()
+            except sqlite3.Error as e:
+                self._warn(e)
+
+
+def get_summary_cache(config: dict[str, Any]) -> SummaryCache | None:
+    """
+    Shared summary cache, or None if disabled.
+
+    Config:
+        summary_cache: false to disable (default: enabled)
+        embedding_cache_dir: directory (default: .brain_graph/cache)
+    """
+    if not config.get("summary_cache", True):
+        return None
+    cache_dir = Path(config.get("embedding_cache_dir") or default_cache_dir())
+    return shared_cache(cache_dir / SUMMARY_CACHE_FILE, SummaryCache)
@@ -0,0 +1,127 @@
+"""
+Token counting with the embedding model's tokenizer.
+
+With `embedding_tokenizer` (path to a Hugging Face `tokenizer.json`) and the
+optional `tokenizers` package installed, counts are exact; otherwise the
+chars/4 heuristic is used. Counts are memoized per text, and `count_many`
+encodes all misses in one `encode_batch` call.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+try:
+    from tokenizers import Tokenizer
+
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    Tokenizer = None
+    TOKENIZERS_AVAILABLE = False
+
+
+CHARS_PER_TOKEN = 4
+DEFAULT_MEMO_SIZE = 100_000
+
+_counters: dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+class TokenCounter:
+    """
+    Counts tokens with a local tokenizer file, or chars/4 without one.
+
+    Thread-safe; the memo is LRU-bounded (`memo_size` texts).
+    """
+
+    def __init__(self, tokenizer_path: Path | str | None = None, *, memo_size: int = DEFAULT_MEMO_SIZE):
+        self.tokenizer_path = Path(tokenizer_path) if tokenizer_path else None
+        self.memo_size = memo_size
+        self._memo: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._tokenizer = None
+        if self.tokenizer_path is not None:
+            if not TOKENIZERS_AVAILABLE:
+                print(
+                    "Warning: 'tokenizers' not installed, token counts are estimated (chars / 4)",
+                    file=sys.stderr,
+                )
+            elif not self.tokenizer_path.exists():
+                print(
+                    f"Warning: tokenizer file not found ({self.tokenizer_path}), token counts are estimated",
+                    file=sys.stderr,
+                )
+            else:
+                self._tokenizer = Tokenizer.from_file(str(self.tokenizer_path))
+
+    @property
+    def exact(self) -> bool:
+        """True if counts come from the model's tokenizer."""
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        """Token count of one text."""
+        return self.count_many([text])[0]
+
+    def count_many(self, texts: list[str]) -> list[int]:
+        """Token counts of many texts (misses are encoded in one batch)."""
+        if self._tokenizer is None:
+            return [len(text) // CHARS_PER_TOKEN for text in texts]
+
+        counts: list[int | None] = [None] * len(texts)
+        missing: dict[str, list[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                cached = self._memo.get(text)
+                if cached is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._memo.move_to_end(text)
+                    counts[i] = cached
+
+        if missing:
+            encodings = self._tokenizer.encode_batch(list(missing))
+            with self._lock:
+                for (text, positions), encoding in zip(missing.items(), encodings):
+                    n = len(encoding.ids)
+                    for i in positions:
+                        counts[i] = n
+                    self._memo[text] = n
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return counts  # type: ignore[return-value]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of `text` with at most `max_tokens` tokens (special tokens included)."""
+        if self._tokenizer is None:
+            return text[: max_tokens * CHARS_PER_TOKEN]
+        if self.count(text) <= max_tokens:
+            return text
+        encoding = self._tokenizer.encode(text)
+        # Special tokens ([CLS], [SEP], ...) are added to every encoding and
+        # take part of the budget; only real tokens end the prefix
+        ends = [end for (_, end), special in zip(encoding.offsets, encoding.special_tokens_mask) if not special]
+        keep = max_tokens - (len(encoding.ids) - len(ends))
+        # Re-encoding a cut text can merge differently at the cut: shrink until it fits
+        while keep > 0 and self.count(text[: ends[keep - 1]]) > max_tokens:
+            keep -= 1
+        return text[: ends[keep - 1]] if keep > 0 else ""
+
+
+def get_token_counter(config: dict[str, Any]) -> TokenCounter:
+    """
+    Shared token counter for a config.
+
+    Config:
+        embedding_tokenizer: path to the embedding model's tokenizer.json (optional)
+    """
+    path = config.get("embedding_tokenizer") or ""
+    key = str(Path(path).resolve()) if path else ""
+    with _counters_lock:
+        counter = _counters.get(key)
+        if counter is None:
+            counter = _counters[key] = TokenCounter(path or None)
+        return counter